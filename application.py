@@ -28,6 +28,22 @@ def create_app(testing=False):
             "message": "API is running"
         }), 200
 
+    @app.route('/health/cache')
+    def cache_stats():
+        # Counters only; lets us see how many auth and users reads the caches absorb
+        from backend.services.user_cache import user_cache
+        from backend.utils.auth import verified_token_cache
+        return jsonify({
+            "user_cache": user_cache.stats(),
+            "verified_token_cache": verified_token_cache.stats()
+        }), 200
+
+    @app.route('/health/calendar')
+    def calendar_read_stats():
+        # Process-wide stale-while-revalidate counters only; no per-user data on an unauthenticated route
+        from backend.services.calendar_revalidator import calendar_revalidator
+        return jsonify({"calendar_reads": calendar_revalidator.stats()}), 200
+
     # Single CORS configuration for all routes
     CORS(app, resources={
         r"/*": {
@@ -3,18 +3,25 @@ from backend.db_config import get_database
 import traceback
 from datetime import datetime, timezone, timedelta
 import uuid
-import requests
 import os
 import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
-# urllib.parse imports removed - no longer needed after OAuth route cleanup
+from urllib.parse import quote
 from firebase_admin import credentials, get_app
 import firebase_admin
-from backend.services.calendar_service import convert_calendar_event_to_task
+from backend.services.calendar_service import convert_calendar_event_to_task, _event_overlaps_date, _event_sort_key
+from backend.services.calendar_event_store import PRIMARY_CALENDAR_ID, calendar_event_store
+from backend.services.calendar_sync import calendar_delta_sync
+from backend.services.calendar_webhook_queue import calendar_webhook_queue
 from backend.services.schedule_service import schedule_service
+from backend.services.token_refresher import token_refresher
 from backend.services.event_bus import event_bus
+from backend.services.user_cache import user_cache
 import pytz  # Add pytz for timezone handling
 from backend.utils.auth import get_user_id_from_token as auth_get_user_id_from_token
+from backend.utils.google_http import google_http, CALENDAR_EVENTS_LIST_FIELDS, CALENDAR_CHANGES_LIST_FIELDS
 from backend.utils.timezone import get_user_timezone_for_date_calculation, get_reliable_user_timezone
 
 calendar_bp = Blueprint("calendar", __name__)
@@ -61,14 +68,79 @@ def get_user_id_from_token(token: str) -> Optional[str]:
     return auth_get_user_id_from_token(token)
 
 
-def fetch_google_calendar_events(access_token: str, date: str, user_timezone: str = "Australia/Sydney") -> List[Dict]:
+# Shared pool for fetching several calendars of one user at once; bounded so a
+# user with many calendars cannot flood Google or the HTTP connection pool
+_calendar_fetch_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CALENDAR_FETCH_CONCURRENCY', '8')),
+    thread_name_prefix="calendar-fetch"
+)
+
+# Sync-token bootstraps run here so notification processing never waits on the listing
+_sync_token_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="calendar-sync-token")
+_sync_token_inflight: set = set()
+_sync_token_lock = threading.Lock()
+
+# Days past today a bootstrapped sync token covers. Google keeps the time bounds
+# of the initial listing, so the token is replaced before the sync horizon passes them
+SYNC_TOKEN_BOOTSTRAP_DAYS = int(os.getenv('CALENDAR_SYNC_TOKEN_DAYS', '90'))
+
+
+def _fetch_calendar_event_pages(calendar_id: str, params: Dict, headers: Dict) -> List[Dict]:
     """
-    Fetch Google Calendar events for a specific date using the access token.
+    List one calendar's events, following pages.
+
+    Each event is tagged with `calendarId` so the event store can key it by
+    the calendar it came from.
+
+    Raises:
+        PermissionError: Access token rejected (401)
+        RuntimeError: Any other Google API error
+    """
+    url = f"https://www.googleapis.com/calendar/v3/calendars/{quote(calendar_id, safe='')}/events"
+    params = dict(params)
+    events: List[Dict] = []
+    while True:
+        response = google_http.get(url, endpoint='calendar.events', params=params, headers=headers)
+
+        if response.status_code == 200:
+            events_data = response.json()
+            for event in events_data.get('items', []):
+                # Google's event resource does not say which calendar it was listed from
+                event['calendarId'] = calendar_id
+                events.append(event)
+            page_token = events_data.get('nextPageToken')
+            if not isinstance(page_token, str) or not page_token:
+                return events
+            params['pageToken'] = page_token
+        elif response.status_code == 401:
+            # Bubble up 401 via special exception to allow caller to refresh & retry
+            raise PermissionError("Unauthorized")
+        else:
+            print(f"Google Calendar API error for calendar {calendar_id}: {response.status_code} - {response.text}")
+            raise RuntimeError(f"Google Calendar API error: {response.status_code}")
+
+
+def fetch_google_calendar_events(
+    access_token: str,
+    date: str,
+    user_timezone: str = "Australia/Sydney",
+    days: int = 1,
+    raise_errors: bool = False,
+    calendar_ids: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Fetch Google Calendar events for a specific date (or a window of days) using the access token.
     
     Args:
         access_token (str): Google Calendar access token
-        date (str): Date in YYYY-MM-DD format
+        date (str): Date in YYYY-MM-DD format (first day of the window)
         user_timezone (str): User's timezone in IANA format (e.g., 'Australia/Sydney')
+        days (int): Number of days to fetch starting at `date`
+        raise_errors (bool): Raise on API/network errors instead of returning an empty list,
+            so callers can tell "no events" from "fetch failed"
+        calendar_ids (List[str]): Calendars to read (the user's selectedCalendars);
+            defaults to the primary calendar. Several calendars are fetched
+            concurrently and merged in `_event_sort_key` order.
     
     Returns:
         List[Dict]: List of calendar events
@@ -84,9 +156,10 @@ def fetch_google_calendar_events(access_token: str, date: str, user_timezone: st
             
         utc_tz = pytz.UTC
         
-        # Create start and end of day in user's timezone
+        # Create start of the first day and end of the last day in user's timezone
+        last_date = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=max(1, days) - 1)).strftime("%Y-%m-%d")
         start_local = user_tz.localize(datetime.strptime(f"{date} 00:00:00", "%Y-%m-%d %H:%M:%S"))
-        end_local = user_tz.localize(datetime.strptime(f"{date} 23:59:59", "%Y-%m-%d %H:%M:%S"))
+        end_local = user_tz.localize(datetime.strptime(f"{last_date} 23:59:59", "%Y-%m-%d %H:%M:%S"))
         
         # Convert to UTC for Google Calendar API
         start_utc = start_local.astimezone(utc_tz)
@@ -96,39 +169,63 @@ def fetch_google_calendar_events(access_token: str, date: str, user_timezone: st
         start_time = start_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
         end_time = end_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
         
-        print(f"DEBUG: Fetching events for {date} in timezone {user_timezone}")
+        print(f"DEBUG: Fetching events for {date} (+{max(1, days) - 1} days) in timezone {user_timezone}")
         print(f"DEBUG: Local time range: {start_local} to {end_local}")
         print(f"DEBUG: UTC time range: {start_time} to {end_time}")
         
-        # Google Calendar API endpoint
-        url = "https://www.googleapis.com/calendar/v3/calendars/primary/events"
-        
         # Request parameters
         params = {
             'timeMin': start_time,
             'timeMax': end_time,
             'singleEvents': True,
-            'orderBy': 'startTime'
+            'orderBy': 'startTime',
+            'fields': CALENDAR_EVENTS_LIST_FIELDS
         }
+        if days > 1:
+            params['maxResults'] = 250
         
         # Request headers
         headers = {
             'Authorization': f'Bearer {access_token}',
             'Accept': 'application/json'
         }
-        
-        # Make the API request
-        response = requests.get(url, params=params, headers=headers)
-        
-        if response.status_code == 200:
-            events_data = response.json()
-            return events_data.get('items', [])
-        elif response.status_code == 401:
-            # Bubble up 401 via special exception to allow caller to refresh & retry
-            raise PermissionError("Unauthorized")
-        else:
-            print(f"Google Calendar API error: {response.status_code} - {response.text}")
-            return []
+
+        # Unique calendar IDs, order preserved; primary when none are selected
+        calendars = list(dict.fromkeys(c for c in (calendar_ids or []) if isinstance(c, str) and c)) or ['primary']
+        if len(calendars) == 1:
+            return _fetch_calendar_event_pages(calendars[0], params, headers)
+
+        # Several calendars: fetch concurrently so latency is the slowest calendar, not the sum
+        futures = [
+            (calendar_id, _calendar_fetch_pool.submit(_fetch_calendar_event_pages, calendar_id, params, headers))
+            for calendar_id in calendars
+        ]
+        events: List[Dict] = []
+        seen_ids = set()
+        failure: Optional[Exception] = None
+        for calendar_id, future in futures:
+            try:
+                calendar_events = future.result()
+            except PermissionError:
+                # One token covers every calendar; let the caller refresh and retry
+                raise
+            except Exception as e:
+                print(f"Error fetching Google Calendar {calendar_id}: {e}")
+                failure = failure or e
+                continue
+            for event in calendar_events:
+                # An event the user is invited to can appear on more than one of their calendars
+                event_id = event.get('id')
+                if event_id and event_id in seen_ids:
+                    continue
+                seen_ids.add(event_id)
+                events.append(event)
+
+        if failure is not None and raise_errors:
+            # A partial result must not be stored as the user's whole window
+            raise failure
+        events.sort(key=_event_sort_key)
+        return events
             
     except PermissionError:
         # Do not swallow permission errors; callers handle refresh and retry
@@ -136,8 +233,81 @@ def fetch_google_calendar_events(access_token: str, date: str, user_timezone: st
     except Exception as e:
         print(f"Error fetching Google Calendar events: {e}")
         traceback.print_exc()
+        if raise_errors:
+            raise
         return []
 
+
+class CalendarSyncTokenExpired(Exception):
+    """Google rejected a stored syncToken (410 Gone); a full resync is required."""
+
+
+def fetch_google_calendar_changes(
+    access_token: str,
+    sync_token: Optional[str] = None,
+    time_min: Optional[str] = None,
+    time_max: Optional[str] = None,
+    fields: Optional[str] = None,
+    max_results: int = 250
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    List primary-calendar events changed since `sync_token`, following all pages.
+
+    Without a sync token this is the initial full listing (optionally bounded by
+    `time_min` and `time_max`) whose only purpose is to obtain the first nextSyncToken.
+
+    Args:
+        access_token (str): Google Calendar access token
+        sync_token (str): nextSyncToken from the previous sync
+        time_min (str): RFC3339 lower bound for the initial listing
+        time_max (str): RFC3339 upper bound for the initial listing; recurring
+            events are expanded into instances, so leave it unset only for short listings
+        fields (str): Partial-response selector (defaults to the event fields sync reads)
+        max_results (int): Page size
+
+    Returns:
+        Tuple of (changed events including cancelled ones, nextSyncToken)
+
+    Raises:
+        PermissionError: Access token rejected (401)
+        CalendarSyncTokenExpired: Sync token no longer valid (410)
+    """
+    url = "https://www.googleapis.com/calendar/v3/calendars/primary/events"
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'Accept': 'application/json'
+    }
+    params = {
+        'singleEvents': True,
+        'maxResults': max_results
+    }
+    if sync_token:
+        # Google remembers the original filters; timeMin/timeMax/orderBy are not allowed here
+        params['syncToken'] = sync_token
+    else:
+        if time_min:
+            params['timeMin'] = time_min
+        if time_max:
+            params['timeMax'] = time_max
+    params['fields'] = fields or CALENDAR_CHANGES_LIST_FIELDS
+
+    items: List[Dict] = []
+    while True:
+        response = google_http.get(url, endpoint='calendar.events', params=params, headers=headers)
+        if response.status_code == 401:
+            raise PermissionError("Unauthorized")
+        if response.status_code == 410:
+            raise CalendarSyncTokenExpired("Sync token expired")
+        if response.status_code != 200:
+            raise RuntimeError(f"Google Calendar API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        items.extend(data.get('items', []))
+        page_token = data.get('nextPageToken')
+        if not page_token:
+            return items, data.get('nextSyncToken')
+        params['pageToken'] = page_token
+
 # Use unified conversion from backend.services.calendar_service
 
 @calendar_bp.route("/connect", methods=["POST"])
@@ -210,6 +380,7 @@ def connect_google_calendar():
             {"googleId": user_id},
             {"$set": update_set}
         )
+        user_cache.invalidate(user_id)
         
         print(f"DEBUG: Calendar connection update result - modified count: {result.modified_count}")
         
@@ -306,10 +477,12 @@ def disconnect_google_calendar():
                 },
                 "$unset": {
                     "calendar.credentials": "",
-                    "calendar.selectedCalendars": ""
+                    "calendar.selectedCalendars": "",
+                    "calendar.syncToken": ""
                 }
             }
         )
+        user_cache.invalidate(user_id)
         
         if result.modified_count == 0:
             return jsonify({
@@ -415,7 +588,7 @@ def get_calendar_events():
         users = db['users']
         
         # Get user with calendar credentials
-        user = users.find_one({"googleId": user_id}, {"_id": 0})
+        user = user_cache.get_user(user_id, lambda: users.find_one({"googleId": user_id}, {"_id": 0}))
         
         if not user:
             return jsonify({
@@ -449,33 +622,52 @@ def get_calendar_events():
         candidate_timezone = stored_timezone or query_timezone
         user_timezone = get_reliable_user_timezone(candidate_timezone)
         
-        # Fetch events from Google Calendar with timezone-aware boundaries
-        try:
-            calendar_events = fetch_google_calendar_events(access_token, date, user_timezone)
-        except PermissionError:
-            # 401: Access token may have expired, try refreshing through centralized function
-            print(f"🔄 Calendar API returned 401 for user {user_id}, attempting token refresh")
-            refreshed_token = _refresh_access_token(users, user_id, credentials_data,
-                                                  credentials_data.get('refreshToken', ''))
-            if refreshed_token:
-                try:
-                    calendar_events = fetch_google_calendar_events(refreshed_token, date, user_timezone)
-                    print(f"✅ Calendar events fetched successfully after token refresh for user {user_id}")
-                except PermissionError:
-                    print(f"❌ Calendar API still returning 401 after refresh for user {user_id}")
+        # Serve from the local event store when its window covers this day;
+        # otherwise fetch a window from Google with timezone-aware boundaries
+        calendar_events = calendar_event_store.get_events(user, date, user_timezone)
+        if calendar_events is None:
+            window_days = calendar_event_store.window_days
+            fetched = True
+            try:
+                calendar_events = fetch_google_calendar_events(
+                    access_token, date, user_timezone, days=window_days, raise_errors=True,
+                    calendar_ids=calendar_data.get('selectedCalendars')
+                )
+            except PermissionError:
+                # 401: Access token may have expired, try refreshing through centralized function
+                print(f"🔄 Calendar API returned 401 for user {user_id}, attempting token refresh")
+                refreshed_token = _refresh_access_token(users, user_id, credentials_data,
+                                                      credentials_data.get('refreshToken', ''))
+                if refreshed_token:
+                    try:
+                        calendar_events = fetch_google_calendar_events(
+                            refreshed_token, date, user_timezone, days=window_days, raise_errors=True,
+                            calendar_ids=calendar_data.get('selectedCalendars')
+                        )
+                        print(f"✅ Calendar events fetched successfully after token refresh for user {user_id}")
+                    except PermissionError:
+                        print(f"❌ Calendar API still returning 401 after refresh for user {user_id}")
+                        return jsonify({
+                            "success": False,
+                            "error": "Failed to refresh access token",
+                            "tasks": []
+                        }), 400
+                else:
+                    # No valid token available; return error to trigger re-authentication
                     return jsonify({
                         "success": False,
-                        "error": "Failed to refresh access token",
+                        "error": "Calendar access token expired and refresh failed. Please reconnect your calendar.",
                         "tasks": []
                     }), 400
-            else:
-                # No valid token available; return error to trigger re-authentication
-                return jsonify({
-                    "success": False,
-                    "error": "Calendar access token expired and refresh failed. Please reconnect your calendar.",
-                    "tasks": []
-                }), 400
-        
+            except Exception as fetch_error:
+                # Proceed without calendar events, and do not store the failure as an empty window
+                print(f"Google Calendar fetch failed for user {user_id}: {fetch_error}")
+                calendar_events = []
+                fetched = False
+            if fetched:
+                calendar_event_store.store_window(users, user_id, date, user_timezone, calendar_events)
+        calendar_events = [ev for ev in calendar_events if _event_overlaps_date(ev, date, user_timezone)]
+
         # Convert events to tasks
         calendar_tasks = []
         for event in calendar_events:
@@ -535,7 +727,7 @@ def get_calendar_status(user_id: str):
         users = db['users']
         
         # Get user
-        user = users.find_one({"googleId": user_id}, {"_id": 0})
+        user = user_cache.get_user(user_id, lambda: users.find_one({"googleId": user_id}, {"_id": 0}))
         
         if not user:
             return jsonify({
@@ -575,8 +767,11 @@ def get_calendar_status(user_id: str):
 def calendar_webhook():
     """
     Google Calendar push notification webhook.
-    Validates channel headers, then fetches and syncs today's events for the user,
-    and publishes a schedule_updated SSE event.
+
+    Validates the channel headers and acknowledges immediately. The sync itself
+    runs from the webhook queue: notifications for the same channel within the
+    debounce window collapse into one `process_calendar_notification` call.
+    If the queue is unavailable the notification is processed inline.
     """
     try:
         channel_id = request.headers.get('X-Goog-Channel-ID')
@@ -587,65 +782,201 @@ def calendar_webhook():
             # Acknowledge but do nothing (avoid retries)
             return jsonify({"status": "ignored"}), 200
 
-        # Find user by matching watch info
-        db = get_database()
-        users = db['users']
-        user = users.find_one({
-            'calendar.watch.channelId': channel_id,
-            'calendar.watch.resourceId': resource_id,
-            'calendar.watch.token': channel_token
-        })
+        # Drained by this process unless CALENDAR_WEBHOOK_WORKER_IN_WEB=false hands it to APP_ROLE=calendar-webhooks
+        if calendar_webhook_queue.enqueue(channel_id, resource_id, channel_token):
+            calendar_webhook_queue.ensure_web_worker()
+            return jsonify({"status": "queued"}), 200
 
-        if not user:
-            return jsonify({"status": "no-user"}), 200
+        return jsonify(process_calendar_notification(channel_id, resource_id, channel_token)), 200
+    except Exception as e:
+        print(f"Error handling calendar webhook: {e}")
+        traceback.print_exc()
+        return jsonify({"status": "error"}), 200
 
-        user_id = user.get('googleId')
-        calendar_data = user.get('calendar', {})
-        credentials_data = calendar_data.get('credentials', {})
-        if not calendar_data.get('connected') or not credentials_data:
-            return jsonify({"status": "not-connected"}), 200
 
-        # Ensure token valid
-        access_token = _ensure_access_token_valid(users, user_id, credentials_data)
-        if not access_token:
-            return jsonify({"status": "no-token"}), 200
+def process_calendar_notification(channel_id: str, resource_id: str, channel_token: str) -> Dict[str, any]:
+    """
+    Sync the user behind a watch channel and publish a schedule_updated SSE
+    event per affected date.
 
-        # Compute today's date in user's timezone using robust timezone calculation
-        user_timezone = get_user_timezone_for_date_calculation(user)
+    With a stored sync token only the changed events are fetched and applied to the
+    dates they touch. Without one (or when Google answers 410 Gone) today's events
+    are fully resynced and a new token is obtained for the next notification.
+
+    Returns:
+        Status dict (also the webhook response body when processed inline)
+    """
+    # Find user by matching watch info (indexed on calendar.watch.channelId)
+    db = get_database()
+    users = db['users']
+    user = users.find_one({
+        'calendar.watch.channelId': channel_id,
+        'calendar.watch.resourceId': resource_id,
+        'calendar.watch.token': channel_token
+    })
+
+    if not user:
+        return {"status": "no-user"}
+
+    user_id = user.get('googleId')
+    calendar_data = user.get('calendar', {})
+    credentials_data = calendar_data.get('credentials', {})
+    if not calendar_data.get('connected') or not credentials_data:
+        return {"status": "not-connected"}
+
+    # Ensure token valid
+    access_token = _ensure_access_token_valid(users, user_id, credentials_data)
+    if not access_token:
+        return {"status": "no-token"}
+
+    # Compute today's date in user's timezone using robust timezone calculation
+    user_timezone = get_user_timezone_for_date_calculation(user)
+    try:
+        tz = pytz.timezone(user_timezone)
+    except Exception:
+        # Fallback to Australia/Sydney, never UTC for user operations
+        tz = pytz.timezone('Australia/Sydney')
+    now_local = datetime.now(tz)
+    date_str = now_local.strftime('%Y-%m-%d')
+
+    # Incremental path: fetch only what changed since the stored sync token
+    sync_token = calendar_data.get('syncToken')
+    covers_until = calendar_data.get('syncTokenCoversUntil')
+    horizon_end = (now_local + timedelta(days=calendar_delta_sync.horizon_days)).strftime('%Y-%m-%d')
+    if sync_token and covers_until and covers_until < horizon_end:
+        # The token's listing ends before the dates deltas are applied to
+        print(f"Calendar sync token for user {user_id} only covers until {covers_until}; running full resync")
+        sync_token = None
+    if sync_token:
         try:
-            tz = pytz.timezone(user_timezone)
-        except Exception:
-            # Fallback to Australia/Sydney, never UTC for user operations
-            tz = pytz.timezone('Australia/Sydney')
-        now_local = datetime.now(tz)
-        date_str = now_local.strftime('%Y-%m-%d')
-
-        # Fetch and convert
-        events = fetch_google_calendar_events(access_token, date_str, user_timezone)
-        calendar_tasks = []
-        for ev in events:
-            task = convert_calendar_event_to_task(ev, date_str)
-            if task:
-                calendar_tasks.append(task)
+            changes, next_sync_token = fetch_google_calendar_changes(access_token, sync_token=sync_token)
+            if (calendar_data.get('selectedCalendars') or [PRIMARY_CALENDAR_ID]) == [PRIMARY_CALENDAR_ID]:
+                calendar_event_store.apply_changes(user_id, changes)
+            else:
+                # The token lists 'primary', but the window is keyed by the selected calendar IDs
+                calendar_event_store.invalidate_window(users, user_id)
+            results = calendar_delta_sync.apply(user_id, changes, user_timezone, date_str)
+            _store_sync_token(users, user_id, next_sync_token)
 
-        # Persist via schedule service using webhook-specific merge rules
-        success, _ = schedule_service.apply_calendar_webhook_update(
-            user_id=user_id,
-            date=date_str,
-            calendar_tasks=calendar_tasks
-        )
+            for changed_date in results:
+                try:
+                    event_bus.publish(user_id, {"type": "schedule_updated", "date": changed_date})
+                except Exception:
+                    pass
+
+            return {
+                "status": "ok",
+                "mode": "incremental",
+                "changes": len(changes),
+                "dates": sorted(results),
+                "synced": all(results.values())
+            }
+        except CalendarSyncTokenExpired:
+            print(f"Calendar sync token expired for user {user_id}; running full resync")
+            _store_sync_token(users, user_id, None)
+        except Exception as e:
+            print(f"Incremental calendar sync failed for user {user_id}, running full resync: {e}")
+
+    # Full resync of today: fetch and convert
+    events = fetch_google_calendar_events(
+        access_token, date_str, user_timezone, calendar_ids=calendar_data.get('selectedCalendars')
+    )
+    calendar_tasks = []
+    for ev in events:
+        task = convert_calendar_event_to_task(ev, date_str)
+        if task:
+            calendar_tasks.append(task)
+
+    # Persist via schedule service using webhook-specific merge rules
+    success, _ = schedule_service.apply_calendar_webhook_update(
+        user_id=user_id,
+        date=date_str,
+        calendar_tasks=calendar_tasks
+    )
+
+    # Publish realtime notification regardless of success for v1 simplicity
+    try:
+        event_bus.publish(user_id, {"type": "schedule_updated", "date": date_str})
+    except Exception:
+        pass
+
+    # Changes outside today were not fetched, so the stored window is refetched on next read
+    calendar_event_store.invalidate_window(users, user_id)
+
+    # Start incremental sync for the next notification, in the background
+    _schedule_sync_token_bootstrap(users, user_id, access_token, now_local)
+
+    return {"status": "ok", "synced": success}
+
+
+def _store_sync_token(users, user_id: str, sync_token: Optional[str], covers_until: Optional[str] = None) -> None:
+    """
+    Persist (or clear) the user's Google Calendar nextSyncToken.
 
-        # Publish realtime notification regardless of success for v1 simplicity
+    Args:
+        covers_until: Last date (YYYY-MM-DD) of a freshly bootstrapped token's
+            listing; a rolled-forward token keeps the stored value
+    """
+    if sync_token:
+        fields = {"calendar.syncToken": sync_token}
+        if covers_until:
+            fields["calendar.syncTokenCoversUntil"] = covers_until
+        update = {"$set": fields}
+    else:
+        update = {"$unset": {"calendar.syncToken": "", "calendar.syncTokenCoversUntil": ""}}
+    users.update_one({"googleId": user_id}, update)
+    user_cache.invalidate(user_id)
+
+
+def _schedule_sync_token_bootstrap(users, user_id: str, access_token: str, now_local: datetime) -> Optional[Future]:
+    """Run `_bootstrap_sync_token` on the background pool, once at a time per user."""
+    with _sync_token_lock:
+        if user_id in _sync_token_inflight:
+            return None
+        _sync_token_inflight.add(user_id)
+
+    def _run():
         try:
-            event_bus.publish(user_id, {"type": "schedule_updated", "date": date_str})
-        except Exception:
-            pass
+            _bootstrap_sync_token(users, user_id, access_token, now_local)
+        finally:
+            with _sync_token_lock:
+                _sync_token_inflight.discard(user_id)
+
+    try:
+        return _sync_token_pool.submit(_run)
+    except RuntimeError as e:
+        # Pool shut down at interpreter exit
+        with _sync_token_lock:
+            _sync_token_inflight.discard(user_id)
+        print(f"Could not schedule calendar sync token bootstrap for user {user_id}: {e}")
+        return None
 
-        return jsonify({"status": "ok", "synced": success}), 200
+
+def _bootstrap_sync_token(users, user_id: str, access_token: str, now_local: datetime) -> None:
+    """
+    Obtain a first sync token with a token-only listing from the start of yesterday
+    to SYNC_TOKEN_BOOTSTRAP_DAYS ahead.
+
+    The listing is bounded because it expands recurring events into instances
+    (the same form the incremental changes are applied in).
+
+    Best effort: without a token the next notification simply runs another full resync.
+    """
+    try:
+        today = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+        time_min = today - timedelta(days=1)
+        time_max = today + timedelta(days=SYNC_TOKEN_BOOTSTRAP_DAYS)
+        _, sync_token = fetch_google_calendar_changes(
+            access_token,
+            time_min=time_min.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            time_max=time_max.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            fields='nextPageToken,nextSyncToken',
+            max_results=2500
+        )
+        if sync_token:
+            _store_sync_token(users, user_id, sync_token, covers_until=time_max.strftime('%Y-%m-%d'))
     except Exception as e:
-        print(f"Error handling calendar webhook: {e}")
-        traceback.print_exc()
-        return jsonify({"status": "error"}), 200
+        print(f"Could not obtain calendar sync token for user {user_id}: {e}")
 
 
 # -----------------------------
@@ -719,8 +1050,9 @@ def _ensure_access_token_valid(users, user_id: str, credentials_data: Dict[str,
             print(f"❌ Access token expired but no refresh token available for user {user_id} - need re-authentication")
             return None
 
-        # Attempt token refresh
-        return _refresh_access_token(users, user_id, credentials_data, refresh_token)
+        # The background refresher normally renews tokens before this point; refresh
+        # under the per-user lease so concurrent requests make one call to Google
+        return token_refresher.refresh_user(users, user_id, credentials_data)
 
     # Token is still valid
     if expires_dt:
@@ -761,7 +1093,7 @@ def _refresh_access_token(users, user_id: str, credentials_data: Dict[str, any],
             'client_secret': client_secret
         }
 
-        token_resp = requests.post(token_url, data=payload)
+        token_resp = google_http.post(token_url, endpoint='oauth.token', data=payload)
 
         if token_resp.status_code == 200:
             token_json = token_resp.json()
@@ -789,6 +1121,7 @@ def _refresh_access_token(users, user_id: str, credentials_data: Dict[str, any],
                         "calendar.lastSyncTime": datetime.now(timezone.utc)
                     }}
                 )
+                user_cache.invalidate(user_id)
 
                 print(f"✅ Successfully refreshed access token for user {user_id}, expires in {expires_in}s")
                 return new_access_token
@@ -816,15 +1149,50 @@ def _refresh_access_token(users, user_id: str, credentials_data: Dict[str, any],
 # This eliminates the double SSO issue where users were redirected to Railway domain
 
 
-def ensure_calendar_watch_for_user(user_id: str) -> Tuple[bool, Dict[str, any]]:
+def stop_calendar_watch_channel(access_token: str, channel_id: str, resource_id: str) -> bool:
+    """
+    Stop a Google Calendar watch channel so Google stops sending its notifications.
+
+    Returns:
+        True if Google stopped the channel or no longer knows it
+    """
+    if not access_token or not channel_id or not resource_id:
+        return False
+    resp = google_http.post(
+        "https://www.googleapis.com/calendar/v3/channels/stop",
+        endpoint='calendar.channels',
+        headers={
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        },
+        json={'id': channel_id, 'resourceId': resource_id}
+    )
+    # 404: channel already expired or stopped
+    return resp.status_code in (200, 204, 404)
+
+
+def ensure_calendar_watch_for_user(
+    user_id: str,
+    renew_within: Optional[timedelta] = None
+) -> Tuple[bool, Dict[str, any]]:
     """
     Ensure a Google Calendar watch channel exists for the user's primary calendar.
     Creates a new channel if missing or expired.
+
+    Args:
+        user_id: User's Google ID
+        renew_within: Also replace a channel expiring within this window; the
+            old channel is stopped once the new one is saved (used by the
+            watch renewal job)
     """
     db = get_database()
     users = db['users']
 
-    user = users.find_one({"googleId": user_id})
+    if renew_within is None:
+        user = user_cache.get_user(user_id, lambda: users.find_one({"googleId": user_id}))
+    else:
+        # Renewal runs out of process; read the live document, not a cached one
+        user = users.find_one({"googleId": user_id})
     if not user:
         return False, {"error": "User not found"}
 
@@ -841,10 +1209,15 @@ def ensure_calendar_watch_for_user(user_id: str) -> Tuple[bool, Dict[str, any]]:
 
     watch_info = calendar_data.get('watch') or {}
     not_expired = False
+    still_live = False
     if watch_info:
         expiration = watch_info.get('expiration')
         if isinstance(expiration, datetime):
-            not_expired = expiration > datetime.now(timezone.utc)
+            if expiration.tzinfo is None:
+                expiration = expiration.replace(tzinfo=timezone.utc)
+            now = datetime.now(timezone.utc)
+            still_live = expiration > now
+            not_expired = expiration > now + (renew_within or timedelta(0))
     if watch_info and not_expired:
         return True, {"watch": {
             "channelId": watch_info.get('channelId'),
@@ -871,7 +1244,13 @@ def ensure_calendar_watch_for_user(user_id: str) -> Tuple[bool, Dict[str, any]]:
         'address': webhook_address,
         'token': channel_token
     }
-    resp = requests.post(url, headers=headers, json=body)
+    resp = google_http.post(
+        url,
+        endpoint='calendar.watch',
+        params={'fields': 'id,resourceId,expiration'},
+        headers=headers,
+        json=body
+    )
     if resp.status_code != 200:
         return False, {"error": f"Failed to create watch: {resp.text}"}
 
@@ -891,6 +1270,14 @@ def ensure_calendar_watch_for_user(user_id: str) -> Tuple[bool, Dict[str, any]]:
         {"googleId": user_id},
         {"$set": {"calendar.watch": watch_doc}}
     )
+    user_cache.invalidate(user_id)
+
+    # Google keeps notifying the replaced channel until it expires
+    if still_live and watch_info.get('channelId') and watch_info.get('resourceId'):
+        try:
+            stop_calendar_watch_channel(access_token, watch_info['channelId'], watch_info['resourceId'])
+        except Exception as e:
+            print(f"Could not stop replaced watch channel for user {user_id}: {e}")
 
     return True, {"watch": {
         "channelId": watch_doc['channelId'],
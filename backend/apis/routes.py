@@ -1,6 +1,7 @@
-from flask import Blueprint, jsonify, request, Response, stream_with_context
+from flask import Blueprint, jsonify, request, Response, stream_with_context, g
 from backend.db_config import get_database, store_microstep_feedback, create_or_update_user as db_create_or_update_user, get_user_schedules_collection
 import traceback
+import hashlib
 
 from bson import ObjectId
 from datetime import datetime, timezone, timedelta
@@ -12,7 +13,7 @@ import firebase_admin
 from firebase_admin import auth as firebase_auth
 from firebase_admin import credentials
 from backend.utils.auth import verify_firebase_token as utils_verify_firebase_token
-from backend.utils.timezone import validate_timezone_update, get_reliable_user_timezone
+from backend.utils.timezone import validate_timezone_update
 import os
 # Import AI service functions directly
 from backend.services.ai_service import (
@@ -29,6 +30,8 @@ import uuid
 
 # Add import for the new schedule service
 from backend.services.schedule_service import schedule_service
+from backend.services.user_cache import user_cache, project_user
+from backend.services.single_flight import single_flight
 from backend.services.archive_service import (
     archive_task,
     get_archived_tasks,
@@ -38,7 +41,6 @@ from backend.services.archive_service import (
 
 from backend.services.slack_service import SlackService
 slack_service = SlackService()
-from backend.apis.calendar_routes import ensure_calendar_watch_for_user
 import os
 
 api_bp = Blueprint("api", __name__)
@@ -64,6 +66,10 @@ def handle_options_requests(path=None):
 # -----------------------------
 # Server-Sent Events (SSE)
 # -----------------------------
+# Seconds between keep-alive comments on an idle stream
+SSE_HEARTBEAT_SECONDS = 15
+
+
 @api_bp.route("/events/stream", methods=["GET"])
 def events_stream():
     """
@@ -79,16 +85,14 @@ def events_stream():
     """
     try:
         # Extract token from header or query param as fallback for EventSource
-        auth_header = request.headers.get('Authorization', '')
-        token = auth_header.split(' ')[1] if auth_header.startswith('Bearer ') else request.args.get('token')
-
-        if not token:
+        # Token comes from the header or the `token` query param (see resolve_request_user)
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
 
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -99,25 +103,11 @@ def events_stream():
 
         # Lazy import to avoid any circular dependencies at module load
         from backend.services.event_bus import event_bus
+        from backend.services.schedule_change_feed import schedule_change_feed
 
-        # Best-effort ensure Google Calendar watch is active for realtime calendar sync
-        try:
-            ensure_calendar_watch_for_user(user_id)
-        except Exception:
-            pass
-
-        def _get_user_timezone(user_doc: Dict[str, Any]) -> str:
-            user_tz = user_doc.get('timezone')
-            return get_reliable_user_timezone(user_tz)
-
-        def _today_in_tz(tz_str: str) -> str:
-            try:
-                import pytz
-                tz = pytz.timezone(tz_str)
-                now_local = datetime.now(tz)
-            except Exception:
-                now_local = datetime.now(timezone.utc)
-            return now_local.strftime('%Y-%m-%d')
+        # One watcher per worker turns schedule writes into events on the bus,
+        # so individual connections never poll the database
+        schedule_change_feed.ensure_started()
 
         def _safe_json_payload(event: Dict[str, Any]) -> str:
             return json.dumps(event)
@@ -127,38 +117,13 @@ def events_stream():
             try:
                 # Initial ping so the client knows the connection is up
                 yield "event: ping\ndata: {}\n\n"
-                # Prepare DB poll fallback state
-                last_seen_modified: Optional[str] = None
-                user_tz = _get_user_timezone(user)
-                current_date_str = _today_in_tz(user_tz)
                 while True:
                     try:
-                        # Wake up frequently for low-latency DB poll fallback
-                        message = subscriber_queue.get(timeout=2)
+                        message = subscriber_queue.get(timeout=SSE_HEARTBEAT_SECONDS)
                         yield f"data: {_safe_json_payload(message)}\n\n"
                     except Empty:
-                        # Heartbeat plus DB poll fallback across processes
-                        # 1) Heartbeat to prevent idle timeouts
+                        # Heartbeat to prevent idle timeouts
                         yield ": keep-alive\n\n"
-                        # 2) DB poll to detect schedule changes in other workers
-                        try:
-                            payload, last_seen_modified = _poll_schedule_update(
-                                user_id,
-                                user_tz,
-                                last_seen_modified,
-                                date_override=current_date_str
-                            )
-                            if payload is not None:
-                                yield f"data: {_safe_json_payload(payload)}\n\n"
-                        except Exception:
-                            # Never break the stream on poll errors
-                            pass
-                        # 3) Short sleep to avoid tight loop
-                        try:
-                            import time as _t
-                            _t.sleep(2)
-                        except Exception:
-                            pass
             finally:
                 event_bus.unsubscribe(user_id, subscriber_queue)
 
@@ -179,59 +144,6 @@ def events_stream():
         }), 500
 
 
-# Lightweight helper for SSE DB-poll fallback
-def _poll_schedule_update(
-    user_id: str,
-    user_timezone: str,
-    last_seen_modified: Optional[str],
-    date_override: Optional[str] = None
-) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-    """
-    Check the user's schedule document for "today" (in user_timezone) and
-    return a schedule_updated payload if metadata.last_modified changed.
-
-    Returns: (payload_or_none, new_last_seen_modified)
-    """
-    try:
-        # Resolve target date once per call
-        if date_override:
-            date_str = date_override
-        else:
-            try:
-                import pytz
-                tz = pytz.timezone(user_timezone or 'UTC')
-                now_local = datetime.now(tz)
-            except Exception:
-                now_local = datetime.now(timezone.utc)
-            date_str = now_local.strftime('%Y-%m-%d')
-
-        schedules = get_user_schedules_collection()
-        # Date is stored in canonical format
-        formatted_date = date_str
-        doc = schedules.find_one({
-            "userId": user_id,
-            "date": formatted_date
-        })
-        if not doc:
-            return None, last_seen_modified
-
-        metadata = (doc.get('metadata') or {})
-        current_last_modified = metadata.get('last_modified')
-        if not current_last_modified:
-            return None, last_seen_modified
-
-        if last_seen_modified is None:
-            # First observation; memorize and do not emit
-            return None, current_last_modified
-
-        if current_last_modified != last_seen_modified:
-            return {"type": "schedule_updated", "date": date_str}, current_last_modified
-
-        return None, last_seen_modified
-    except Exception:
-        return None, last_seen_modified
-
-
 @api_bp.route("/events/stream", methods=["OPTIONS"])
 def handle_events_stream_options():
     """Handle CORS preflight requests for the events stream endpoint."""
@@ -251,11 +163,9 @@ def update_user_timezone():
     """
     try:
         # Auth
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({"success": False, "error": "Authentication required"}), 401
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({"success": False, "error": "Invalid authentication token"}), 401
 
@@ -272,6 +182,7 @@ def update_user_timezone():
         db = get_database()
         users = db['users']
         users.update_one({"googleId": user['googleId']}, {"$set": {"timezone": tz_value}})
+        user_cache.invalidate(user['googleId'])
 
         return jsonify({"success": True, "timezone": tz_value})
     except Exception as e:
@@ -294,15 +205,32 @@ def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
     """Centralized verification via backend.utils.auth."""
     return utils_verify_firebase_token(token)
 
-def get_user_from_token(token: str) -> Optional[Dict[str, Any]]:
+# Fields routes need from the authenticated user; GET /auth/user loads the full document
+AUTH_USER_PROJECTION = {
+    "_id": 0,
+    "googleId": 1,
+    "email": 1,
+    "displayName": 1,
+    "role": 1,
+    "timezone": 1
+}
+
+# Endpoints whose handlers return the whole user document
+_FULL_USER_ENDPOINTS = {'api.get_auth_user_info'}
+
+
+def get_user_from_token(token: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
     """
     Get user data from database using a verified Firebase token.
 
-    CRITICAL FIX: Now tries both Firebase UID and Google Subject ID for backward compatibility
-    with existing users who were stored before Firebase UID migration.
+    Looks the user up by Firebase UID and by the legacy Google Subject ID in a single
+    `$in` query, preferring the Firebase UID match, for backward compatibility with
+    users stored before the Firebase UID migration.
 
     Args:
         token: The Firebase ID token
+        projection: Optional top-level inclusion projection for the returned user
+            (defaults to all fields except _id)
 
     Returns:
         User document from database or None if not found
@@ -318,39 +246,44 @@ def get_user_from_token(token: str) -> Optional[Dict[str, Any]]:
         if not user_id:
             return None
 
-        # Get database instance
-        db = get_database()
-        users = db['users']
-
-        # STEP 1: Try to find user by Firebase UID (new format)
-        # Exclude _id field to prevent BSON serialization issues
-        user = users.find_one({"googleId": user_id}, {"_id": 0})
-
-        # If user found with Firebase UID, return it
-        if user:
-            print(f"✅ User found by Firebase UID: {user.get('email')}")
-            return user
-
-        # STEP 2: FALLBACK - Try to find user by Google Subject ID (legacy format)
-        # Extract Google Subject ID from Firebase token identities
-        google_subject_id = None
+        # Extract Google Subject ID from Firebase token identities (legacy format)
         firebase_data = decoded_token.get('firebase', {})
         identities = firebase_data.get('identities', {})
         google_identities = identities.get('google.com', [])
+        google_subject_id = google_identities[0] if google_identities else None
 
-        if google_identities:
-            google_subject_id = google_identities[0]  # Take first Google identity
-            print(f"🔄 Attempting fallback lookup with Google Subject ID: {google_subject_id}")
+        candidate_ids = [user_id]
+        if google_subject_id and google_subject_id != user_id:
+            candidate_ids.append(google_subject_id)
 
-            # Try to find user by Google Subject ID
-            user = users.find_one({"googleId": google_subject_id}, {"_id": 0})
+        # Later reads in this request (calendar, Slack) hit the same cached document
+        for candidate_id in candidate_ids:
+            cached = user_cache.get(candidate_id)
+            if cached is not None:
+                return project_user(cached, projection)
 
-            if user:
-                print(f"✅ User found by Google Subject ID (legacy): {user.get('email')}")
-                print(f"⚠️  User needs migration from Google Subject ID to Firebase UID")
-                return user
+        # Get database instance
+        db = get_database()
+        users = db['users']
 
-        # STEP 3: Development bypass - return mock user only if user not found in database
+        # Load full documents (without _id, to prevent BSON serialization issues) so
+        # the cache can serve them; the projection is applied to the returned copy
+        matches = list(users.find(
+            {"googleId": {"$in": candidate_ids}},
+            {"_id": 0}
+        ).limit(len(candidate_ids)))
+        for match in matches:
+            user_cache.put(match)
+
+        if matches:
+            by_id = {match.get('googleId'): match for match in matches}
+            if user_id in by_id:
+                return project_user(by_id[user_id], projection)
+            user = by_id.get(google_subject_id) or matches[0]
+            print(f"⚠️  User {user.get('email')} found by Google Subject ID (legacy), needs migration to Firebase UID")
+            return project_user(user, projection)
+
+        # Development bypass - return mock user only if user not found in database
         if os.getenv('NODE_ENV') == 'development' and user_id == 'dev-user-123':
             return {
                 'googleId': 'dev-user-123',
@@ -371,7 +304,37 @@ def get_user_from_token(token: str) -> Optional[Dict[str, Any]]:
         print(f"Error getting user from token: {e}")
         traceback.print_exc()
         return None
-    
+
+
+@api_bp.before_request
+def resolve_request_user():
+    """
+    Resolve the authenticated user once per request and store it on flask.g.
+
+    Sets:
+        g.auth_token: Bearer token from the Authorization header (or the `token`
+            query param for the SSE endpoint, since EventSource cannot set headers);
+            None when no token was sent
+        g.auth_user: User document for the token, or None if the token is invalid
+            or the user does not exist
+    """
+    g.auth_token = None
+    g.auth_user = None
+    if request.method == 'OPTIONS':
+        return None
+
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header[7:] if auth_header.startswith('Bearer ') else None
+    if not token and request.endpoint == 'api.events_stream':
+        token = request.args.get('token')
+    if not token:
+        return None
+
+    g.auth_token = token
+    projection = {"_id": 0} if request.endpoint in _FULL_USER_ENDPOINTS else AUTH_USER_PROJECTION
+    g.auth_user = get_user_from_token(token, projection)
+    return None
+
 @api_bp.route("/auth/user", methods=["OPTIONS"])
 def handle_auth_user_options():
     """Handle CORS preflight requests for the auth user endpoint."""
@@ -389,11 +352,9 @@ def get_auth_user_info():
     """
     try:
         # Check if Authorization header is provided
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            # Extract token and get user
-            token = auth_header.split(' ')[1]
-            user = get_user_from_token(token)
+        if g.auth_token:
+            # Full user document resolved by resolve_request_user
+            user = g.auth_user
             
             if user:
                 # Process user for JSON serialization (handles BSON types)
@@ -530,14 +491,11 @@ def update_auth_user():
     """
     try:
         # Verify authentication
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header.split(' ')[1]
-        user = get_user_from_token(token)
+        user = g.auth_user
         
         if not user:
             return jsonify({
@@ -598,6 +556,7 @@ def update_auth_user():
             {"googleId": user['googleId']},
             {"$set": sanitized_updates}
         )
+        user_cache.invalidate(user['googleId'])
         
         if result.modified_count == 0:
             return jsonify({
@@ -810,15 +769,12 @@ def autogenerate_schedule_api():
     """
     try:
         # Auth required
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -844,18 +800,21 @@ def autogenerate_schedule_api():
                 "error": "Invalid date format. Use YYYY-MM-DD"
             }), 400
 
-        # Call with optional user_timezone only when provided to satisfy strict tests
-        if timezone_override:
-            success, result = schedule_service.autogenerate_schedule(
-                user_id,
-                date,
-                user_timezone=timezone_override
-            )
-        else:
-            success, result = schedule_service.autogenerate_schedule(
+        def _autogenerate():
+            # Call with optional user_timezone only when provided to satisfy strict tests
+            if timezone_override:
+                return schedule_service.autogenerate_schedule(
+                    user_id,
+                    date,
+                    user_timezone=timezone_override
+                )
+            return schedule_service.autogenerate_schedule(
                 user_id,
                 date
             )
+
+        # Concurrent duplicates (double clicks, several tabs, other workers) share one run
+        success, result = single_flight.run(user_id, date, 'autogenerate', _autogenerate)
         if not success:
             return jsonify({
                 "success": False,
@@ -881,14 +840,12 @@ def get_recent_with_tasks_api():
     Query: before=YYYY-MM-DD&days=30
     """
     try:
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -978,6 +935,7 @@ def update_user(user_id):
                 "lastModified": datetime.now().isoformat()
             }}
         )
+        user_cache.invalidate(user_id)
         
         if result.modified_count == 0:
             return jsonify({"error": "User not found"}), 404
@@ -1233,11 +1191,9 @@ def extract_user_id_from_request() -> Tuple[Optional[str], Optional[Dict[str, An
         Tuple of (user_id: Optional[str], error_response: Optional[Dict])
         If user_id is None, error_response contains the error details
     """
-    # Try to get user ID from authentication token
-    auth_header = request.headers.get('Authorization', '')
-    if auth_header.startswith('Bearer '):
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+    # Try to get user ID from the user resolved for this request
+    if g.auth_token:
+        user = g.auth_user
         if user and user.get('googleId'):
             return user.get('googleId'), None
     
@@ -1323,86 +1279,93 @@ def submit_data():
         validation_duration = time.time() - validation_start_time
         print(f"[TIMING] Validation and authentication: {validation_duration:.3f}s")
 
-        # Get existing schedule for fallback error handling
-        fallback_start_time = time.time()
-        existing_schedule = None
-        try:
-            success, result = schedule_service.get_schedule_by_date(user_id, date)
-            if success:
-                existing_schedule = result.get('schedule', [])
-        except Exception:
-            # Continue if we can't get existing schedule
-            pass
-        fallback_duration = time.time() - fallback_start_time
-        print(f"[TIMING] Existing schedule lookup: {fallback_duration:.3f}s")
+        def _generate_and_store():
+            # Get existing schedule for fallback error handling
+            fallback_start_time = time.time()
+            existing_schedule = None
+            try:
+                success, result = schedule_service.get_schedule_by_date(user_id, date)
+                if success:
+                    existing_schedule = result.get('schedule', [])
+            except Exception:
+                # Continue if we can't get existing schedule
+                pass
+            fallback_duration = time.time() - fallback_start_time
+            print(f"[TIMING] Existing schedule lookup: {fallback_duration:.3f}s")
 
-        # Call schedule_gen.py directly - bypass schedule service
-        generation_start_time = time.time()
-        try:
-            schedule_result = generate_schedule(data)
-            
-            if not schedule_result or not schedule_result.get('success', True):
-                raise Exception(schedule_result.get('error', 'Schedule generation failed'))
-            
-            generated_tasks = schedule_result.get('tasks', [])
-            if not generated_tasks:
-                raise Exception('No tasks generated')
+            # Call schedule_gen.py directly - bypass schedule service
+            generation_start_time = time.time()
+            try:
+                schedule_result = generate_schedule(data)
+
+                if not schedule_result or not schedule_result.get('success', True):
+                    raise Exception(schedule_result.get('error', 'Schedule generation failed'))
+
+                generated_tasks = schedule_result.get('tasks', [])
+                if not generated_tasks:
+                    raise Exception('No tasks generated')
+
+            except Exception as gen_error:
+                generation_duration = time.time() - generation_start_time
+                print(f"[TIMING] Schedule generation failed after: {generation_duration:.3f}s")
+                print(f"Schedule generation failed: {str(gen_error)}")
+                # Return existing schedule with error message
+                return {
+                    "success": False,
+                    "error": f"Failed to generate schedule: {str(gen_error)}",
+                    "schedule": existing_schedule or [],
+                    "fallback": True
+                }, 500
 
-        except Exception as gen_error:
             generation_duration = time.time() - generation_start_time
-            print(f"[TIMING] Schedule generation failed after: {generation_duration:.3f}s")
-            print(f"Schedule generation failed: {str(gen_error)}")
-            # Return existing schedule with error message
-            return jsonify({
-                "success": False,
-                "error": f"Failed to generate schedule: {str(gen_error)}",
-                "schedule": existing_schedule or [],
-                "fallback": True
-            }), 500
+            print(f"[TIMING] Schedule generation: {generation_duration:.3f}s")
 
-        generation_duration = time.time() - generation_start_time
-        print(f"[TIMING] Schedule generation: {generation_duration:.3f}s")
+            # Store the generated schedule using centralized service
+            storage_start_time = time.time()
+            try:
+                success, result = schedule_service.create_schedule_from_ai_generation(
+                    user_id=user_id,
+                    date=date,
+                    generated_tasks=generated_tasks,
+                    inputs=data
+                )
+
+                storage_duration = time.time() - storage_start_time
+                print(f"[TIMING] Schedule storage: {storage_duration:.3f}s")
+
+                if not success:
+                    print(f"Error storing AI-generated schedule: {result.get('error', 'Unknown error')}")
+                    # Return generated schedule even if storage fails
+                    return {
+                        "success": True,
+                        **result
+                    }, 200
+
+                return {
+                    "success": True,
+                    **result
+                }, 200
 
-        # Store the generated schedule using centralized service
-        storage_start_time = time.time()
-        try:
-            success, result = schedule_service.create_schedule_from_ai_generation(
-                user_id=user_id,
-                date=date,
-                generated_tasks=generated_tasks,
-                inputs=data
-            )
-            
-            storage_duration = time.time() - storage_start_time
-            print(f"[TIMING] Schedule storage: {storage_duration:.3f}s")
-            
-            if not success:
-                print(f"Error storing AI-generated schedule: {result.get('error', 'Unknown error')}")
+            except Exception as store_error:
+                storage_duration = time.time() - storage_start_time
+                print(f"[TIMING] Schedule storage failed after: {storage_duration:.3f}s")
+                print(f"Error storing schedule: {str(store_error)}")
                 # Return generated schedule even if storage fails
-                return jsonify({
+                return {
                     "success": True,
-                    **result
-                })
+                    "schedule": generated_tasks,
+                    "date": date,
+                    "warning": f"Schedule generated but storage failed: {str(store_error)}"
+                }, 200
 
-            request_duration = time.time() - request_start_time
-            print(f"[TIMING] Total submit_data request: {request_duration:.3f}s")
-            
-            return jsonify({
-                "success": True,
-                **result
-            })
+        # Identical concurrent submissions (double clicks, retries, other workers)
+        # share one LLM generation; different inputs for the same date do not
+        fingerprint = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        payload, status = single_flight.run(user_id, date, f"submit_data:{fingerprint}", _generate_and_store)
 
-        except Exception as store_error:
-            storage_duration = time.time() - storage_start_time
-            print(f"[TIMING] Schedule storage failed after: {storage_duration:.3f}s")
-            print(f"Error storing schedule: {str(store_error)}")
-            # Return generated schedule even if storage fails
-            return jsonify({
-                "success": True,
-                "schedule": generated_tasks,
-                "date": date,
-                "warning": f"Schedule generated but storage failed: {str(store_error)}"
-            })
+        request_duration = time.time() - request_start_time
+        print(f"[TIMING] Total submit_data request: {request_duration:.3f}s")
+        return jsonify(payload), status
 
     except Exception as e:
         request_duration = time.time() - request_start_time
@@ -1443,15 +1406,12 @@ def get_schedule_by_date(date):
             }), 400
 
         # Extract user ID (requires authentication for GET)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -1527,15 +1487,12 @@ def update_schedule_by_date(date):
             }), 400
 
         # Extract user ID (requires authentication for PUT)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -1590,15 +1547,12 @@ def create_schedule():
     """
     try:
         # Extract user ID (requires authentication)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -1705,15 +1659,12 @@ def delete_task(task_id):
     """
     try:
         # Extract user ID (requires authentication)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -1827,15 +1778,12 @@ def logout_user():
     """
     try:
         # Extract and validate authorization header
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -1883,15 +1831,12 @@ def delete_user_account():
     """
     try:
         # Extract and validate authorization header
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -1918,21 +1863,22 @@ def delete_user_account():
         # Step 2: Get database and clean up all user-related data
         db = get_database()
         
-        # Collections to clean up - delete all user-related data
+        # Collections to clean up - delete all user-related data, matched on the
+        # field each collection stores the user's googleId in
         collections_to_clean = [
-            'UserSchedules',           # User's daily schedules
-            'MicrostepFeedback',       # User's task feedback
-            'DecompositionPatterns',   # User's task decomposition patterns
-            'calendar_events',         # User's synced calendar events
-            'Processed Slack Messages' # User's Slack message tracking
+            ('UserSchedules', 'userId'),             # User's daily schedules
+            ('MicrostepFeedback', 'googleId'),       # User's task feedback
+            ('DecompositionPatterns', 'googleId'),   # User's task decomposition patterns
+            ('calendar_events', 'userId'),           # User's synced calendar events
+            ('Processed Slack Messages', 'googleId') # User's Slack message tracking
         ]
         
         # Delete from each collection
         total_deleted = 0
-        for collection_name in collections_to_clean:
+        for collection_name, user_field in collections_to_clean:
             try:
                 collection = db[collection_name]
-                result = collection.delete_many({"googleId": user_google_id})
+                result = collection.delete_many({user_field: user_google_id})
                 deleted_count = result.deleted_count
                 total_deleted += deleted_count
                 print(f"Deleted {deleted_count} documents from {collection_name}")
@@ -1944,6 +1890,7 @@ def delete_user_account():
         try:
             users_collection = db['users']
             user_result = users_collection.delete_one({"googleId": user_google_id})
+            user_cache.invalidate(user_google_id)
             if user_result.deleted_count > 0:
                 print(f"Deleted main user document for {user_email}")
                 total_deleted += user_result.deleted_count
@@ -2272,6 +2219,7 @@ def migrate_user_id():
                 }
             }
         )
+        user_cache.invalidate(google_subject_id, firebase_uid)
 
         if migration_result.modified_count == 0:
             print(f"❌ Migration failed - no documents modified")
@@ -2333,15 +2281,12 @@ def api_archive_task():
     """
     try:
         # Extract user ID (requires authentication)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -2422,15 +2367,12 @@ def api_get_archived_tasks():
     """
     try:
         # Extract user ID (requires authentication)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -2479,15 +2421,12 @@ def api_move_archived_task_to_today(task_id):
     """
     try:
         # Extract user ID (requires authentication)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
@@ -2537,15 +2476,12 @@ def api_delete_archived_task(task_id):
     """
     try:
         # Extract user ID (requires authentication)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
+        if not g.auth_token:
             return jsonify({
                 "success": False,
                 "error": "Authentication required"
             }), 401
-            
-        token = auth_header[7:]
-        user = get_user_from_token(token)
+        user = g.auth_user
         if not user or not user.get('googleId'):
             return jsonify({
                 "success": False,
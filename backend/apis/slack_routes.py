@@ -13,8 +13,10 @@ from typing import Dict, Any, Optional
 
 from backend.db_config import get_database
 from backend.services.slack_service import SlackService
-from backend.services.event_bus import event_bus
 from backend.services.slack_message_processor import SlackMessageProcessor
+from backend.services.slack_event_queue import slack_event_queue
+from backend.services.slack_user_router import slack_user_router
+from backend.services.slack_backfill import slack_backfill
 from backend.apis.routes import get_user_from_token
 
 # Use an explicit frontend URL (prefer these envs, fallback to dev Next port)
@@ -23,6 +25,9 @@ frontend_base_url = os.getenv('NEXT_PUBLIC_FRONTEND_URL') or 'http://localhost:8
 # Create blueprint
 slack_bp = Blueprint("slack_integration", __name__)
 
+# Callback types handed to the event queue
+SLACK_PAYLOAD_TYPES = ('event_callback', 'slash_command', 'interactive_component')
+
 # Initialize services
 db_client = get_database()
 message_processor = SlackMessageProcessor()
@@ -164,6 +169,12 @@ def handle_oauth_callback():
                 result = future.result()
         
         if result.get('success'):
+            # Turn recent mentions into tasks in the background; progress streams over SSE
+            try:
+                slack_backfill.start(user_id)
+            except Exception as backfill_error:
+                print(f"Could not start Slack backfill for user {user_id}: {backfill_error}")
+            
             # Redirect to success page instead of returning JSON
             # Construct query parameters for the success page
             success_params = {
@@ -212,8 +223,11 @@ def handle_webhook():
         X-Slack-Signature: HMAC signature (required)
         Content-Type: application/json (required)
     
+    Events are only verified and queued here; slack_event_queue workers process
+    them after the response, so Slack gets its 200 well inside its 3s timeout.
+    
     Returns:
-        200: Event processed successfully or URL verification challenge
+        200: Event accepted for processing or URL verification challenge
         401: Invalid webhook signature
         400: Malformed request
         500: Internal server error
@@ -248,24 +262,30 @@ def handle_webhook():
                 "error": "Invalid JSON payload"
             }), 400
         
-        # Process different event types
         event_type = event_data.get('type')
         
-        if event_type == 'event_callback':
-            # Handle workspace events (mentions, messages, etc.)
-            asyncio.run(process_workspace_event(event_data))
-            
-        elif event_type == 'slash_command':
-            # Handle slash commands (future feature)
-            asyncio.run(process_slash_command(event_data))
-            
-        elif event_type == 'interactive_component':
-            # Handle interactive components (future feature)
-            asyncio.run(process_interactive_component(event_data))
+        # Slack retry of an event that was already handled: acknowledge and stop the retries
+        if request.headers.get('X-Slack-Retry-Num') and slack_service.is_event_processed(event_data.get('event_id')):
+            print(f"Slack retry {request.headers.get('X-Slack-Retry-Num')} "
+                  f"({request.headers.get('X-Slack-Retry-Reason', 'unknown')}) for processed event {event_data.get('event_id')}")
+            return jsonify({
+                "status": "duplicate",
+                "event_type": event_type
+            }), 200, {"X-Slack-No-Retry": "1"}
+        
+        if event_type in SLACK_PAYLOAD_TYPES:
+            # Persist and acknowledge; this process's workers drain the queue unless
+            # SLACK_EVENT_WORKER_IN_WEB=false hands it to the slack-events process
+            if slack_event_queue.enqueue(request_body, event_data):
+                slack_event_queue.ensure_web_worker()
+            else:
+                # Queue unavailable: hand the event to this process's own workers
+                slack_event_queue.ensure_worker()
+                slack_event_queue.submit(event_data)
         
         # Return success response
         return jsonify({
-            "status": "processed",
+            "status": "accepted",
             "event_type": event_type
         }), 200
         
@@ -277,44 +297,71 @@ def handle_webhook():
         }), 500
 
 
+async def process_slack_payload(event_data: Dict[str, Any]):
+    """
+    Process one queued Slack callback (run by slack_event_queue workers)
+    
+    Args:
+        event_data: Verified Slack callback body
+    """
+    event_type = event_data.get('type')
+    
+    if event_type == 'event_callback':
+        # Handle workspace events (mentions, messages, etc.)
+        await process_workspace_event(event_data)
+        
+    elif event_type == 'slash_command':
+        # Handle slash commands (future feature)
+        await process_slash_command(event_data)
+        
+    elif event_type == 'interactive_component':
+        # Handle interactive components (future feature)
+        await process_interactive_component(event_data)
+
+
 async def process_workspace_event(event_data: Dict[str, Any]):
     """
     Process Slack workspace events (app mentions, messages)
     
     Args:
         event_data: Slack event callback data
+    
+    Raises:
+        RuntimeError: If any recipient failed, after every recipient was tried, so
+            the queue reschedules the event (recipients already done are
+            skipped on retry by the idempotency key)
     """
-    try:
-        team_id = event_data.get('team_id')
-        event = event_data.get('event', {})
-        
-        if not team_id or not event:
-            return
-        
-        # Find users connected to this workspace
-        users_collection = db_client.get_collection('users')
-        connected_users = users_collection.find({
-            'slack_integration.workspace_id': team_id
-        })
-        
-        # Process event for each connected user
-        for user in connected_users:
-            user_id = user.get('googleId')
-            if user_id:
-                # Process event through SlackService (run async function)
-                task = await slack_service.process_event(event_data, user_id)
-                
-                if task:
-                    print(f"Created task from Slack event: {task.text} for user {user_id}")
-                    # Notify user's active clients that today's schedule has been updated
-                    # Using UTC date to match current storage semantics
-                    date_str = datetime.utcnow().strftime('%Y-%m-%d')
-                    event_bus.publish(user_id, {
-                        "type": "schedule_updated",
-                        "date": date_str
-                    })
-    except Exception as e:
-        print(f"Error processing workspace event: {str(e)}")
+    team_id = event_data.get('team_id')
+    event = event_data.get('event', {})
+    
+    if not team_id or not event:
+        return
+    
+    # Same filter process_event applies, checked before any routing work
+    if event.get('type') != 'message' or event.get('bot_id'):
+        return
+    
+    # Parse mentions once and route to just the mentioned users (indexed, cached)
+    recipients = await asyncio.to_thread(slack_user_router.recipients, team_id, event)
+    
+    # Process event for each mentioned user
+    failures = []
+    for recipient in recipients:
+        user_id = recipient['user_id']
+        try:
+            # Process event through SlackService with the integration already in hand
+            task = await slack_service.process_event(event_data, user_id, recipient['integration'])
+        except Exception as e:
+            print(f"Error processing workspace event for user {user_id}: {str(e)}")
+            failures.append(user_id)
+            continue
+        
+        # The task buffer publishes one schedule_updated per flush
+        if task:
+            print(f"Created task from Slack event: {task.text} for user {user_id}")
+    
+    if failures:
+        raise RuntimeError(f"Slack event {event_data.get('event_id')} failed for {len(failures)} recipient(s)")
 
 
 async def process_slash_command(event_data: Dict[str, Any]):
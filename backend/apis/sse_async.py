@@ -0,0 +1,167 @@
+"""
+Asyncio serving path for /api/events/stream.
+
+Under gunicorn's gthread worker every open SSE connection pins a thread for its
+whole lifetime. This module serves the same endpoint from an aiohttp application
+instead: each idle connection is a coroutine waiting on an AsyncSubscriberQueue,
+so one event loop holds thousands of dashboards.
+
+Authentication (Bearer header or `token` query param) and the streamed message
+format are identical to the Flask endpoint in routes.py. Blocking work (token
+verification, user lookup) runs in the loop's thread pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from aiohttp import web
+
+from backend.services.event_bus import EventBus
+
+
+# Seconds between keep-alive comments on an idle stream (matches routes.py)
+SSE_HEARTBEAT_SECONDS = 15
+
+DEFAULT_ALLOWED_ORIGINS = "https://yourmum.app,https://yourmum-production.up.railway.app,http://localhost:3000,http://localhost:8000"
+
+BUS_KEY = web.AppKey("event_bus", EventBus)
+AUTHENTICATE_KEY = web.AppKey("authenticate", object)
+ON_CONNECT_KEY = web.AppKey("on_connect", object)
+
+
+def _default_authenticate(token: str) -> Optional[Dict[str, Any]]:
+    # Lazy import: routes pulls in Flask and the service layer
+    from backend.apis.routes import AUTH_USER_PROJECTION, get_user_from_token
+    return get_user_from_token(token, AUTH_USER_PROJECTION)
+
+
+def _default_on_connect(user_id: str) -> None:
+    """Start per-process background work (calendar watches are renewed by calendar_watch_renewer)."""
+    from backend.services.schedule_change_feed import schedule_change_feed
+
+    schedule_change_feed.ensure_started()
+
+
+def _cors_headers(request: web.Request) -> Dict[str, str]:
+    allowed = os.getenv("CORS_ALLOWED_ORIGINS", DEFAULT_ALLOWED_ORIGINS).split(",")
+    origin = request.headers.get("Origin")
+    if not origin or origin not in allowed:
+        return {}
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Allow-Methods": "GET, OPTIONS",
+        "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With, Accept, Origin, X-CSRFToken",
+        "Vary": "Origin",
+    }
+
+
+async def events_stream(request: web.Request) -> web.StreamResponse:
+    """
+    Establish a Server-Sent Events stream for realtime user notifications.
+
+    Streamed message format:
+        data: {"type": str, "date": "YYYY-MM-DD", ...}\\n\\n
+    """
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header.split(' ')[1] if auth_header.startswith('Bearer ') else request.query.get('token')
+
+    if not token:
+        return web.json_response({
+            "success": False,
+            "error": "Authentication required"
+        }, status=401, headers=_cors_headers(request))
+
+    loop = asyncio.get_running_loop()
+    try:
+        user = await loop.run_in_executor(None, request.app[AUTHENTICATE_KEY], token)
+    except Exception as e:
+        print(f"Error in async events_stream: {str(e)}")
+        return web.json_response({
+            "success": False,
+            "error": f"Failed to establish event stream: {str(e)}"
+        }, status=500, headers=_cors_headers(request))
+
+    if not user or not user.get('googleId'):
+        return web.json_response({
+            "success": False,
+            "error": "Invalid authentication token"
+        }, status=401, headers=_cors_headers(request))
+
+    user_id = user.get('googleId')
+    on_connect = request.app[ON_CONNECT_KEY]
+    if on_connect:
+        # Best effort; the stream does not wait for it
+        loop.run_in_executor(None, on_connect, user_id)
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # for nginx to disable buffering
+        "Connection": "keep-alive",
+        **_cors_headers(request),
+    })
+    await response.prepare(request)
+
+    bus: EventBus = request.app[BUS_KEY]
+    subscriber_queue = bus.subscribe_async(user_id)
+    try:
+        # Initial ping so the client knows the connection is up
+        await response.write(b"event: ping\ndata: {}\n\n")
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber_queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                await response.write(f"data: {json.dumps(message)}\n\n".encode())
+            except asyncio.TimeoutError:
+                # Heartbeat to prevent idle timeouts
+                await response.write(b": keep-alive\n\n")
+    except ConnectionResetError:
+        # Client went away
+        pass
+    finally:
+        # Also runs on cancellation (disconnect or worker shutdown), which then propagates
+        bus.unsubscribe(user_id, subscriber_queue)
+    return response
+
+
+async def handle_events_stream_options(request: web.Request) -> web.Response:
+    """Handle CORS preflight requests for the events stream endpoint."""
+    return web.json_response({"status": "ok"}, headers=_cors_headers(request))
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "healthy", "message": "SSE server is running"})
+
+
+def create_sse_app(
+    bus: Optional[EventBus] = None,
+    authenticate: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+    on_connect: Optional[Callable[[str], None]] = _default_on_connect
+) -> web.Application:
+    """
+    Build the aiohttp application serving /api/events/stream.
+
+    Args:
+        bus: EventBus to subscribe on (defaults to the shared singleton)
+        authenticate: Blocking callable mapping a Firebase token to a user document
+        on_connect: Blocking callable run in the background for each new stream
+
+    Returns:
+        aiohttp Application
+    """
+    if bus is None:
+        from backend.services.event_bus import event_bus
+        bus = event_bus
+
+    app = web.Application()
+    app[BUS_KEY] = bus
+    app[AUTHENTICATE_KEY] = authenticate or _default_authenticate
+    app[ON_CONNECT_KEY] = on_connect
+    app.router.add_get('/', health)
+    app.router.add_get('/api/events/stream', events_stream)
+    app.router.add_route('OPTIONS', '/api/events/stream', handle_events_stream_options)
+    return app
@@ -0,0 +1,138 @@
+"""
+Benchmark: sequential vs concurrent fetch of a user's selected calendars.
+
+Starts a local stub of the Calendar events.list endpoint (fixed think time plus
+jitter per calendar) and fetches a 14-day window for 1, 5 and 20 calendars:
+
+- sequential: one `_fetch_calendar_event_pages` call per calendar, in turn
+- concurrent: `fetch_google_calendar_events(..., calendar_ids=...)`, which fans
+  out over the shared bounded pool and merges by `_event_sort_key`
+
+Wall time for the concurrent path should track the slowest calendar rather than
+the sum, until the calendar count exceeds CALENDAR_FETCH_CONCURRENCY.
+
+Usage (from repo root):
+    python -m backend.benchmarks.calendar_multi_fetch_bench --latency-ms 80 --rounds 5
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.apis import calendar_routes  # noqa: E402
+from backend.utils.google_http import GoogleApiClient  # noqa: E402
+
+
+class StubCalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.08
+    jitter = 0.04
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        calendar = self.path.split('/calendars/')[1].split('/')[0]
+        items = [
+            {
+                'id': f'{calendar}-{i}',
+                'status': 'confirmed',
+                'summary': f'Event {i}',
+                'start': {'dateTime': f'2025-01-{20 + i % 7:02d}T{8 + i % 9:02d}:00:00Z'},
+                'end': {'dateTime': f'2025-01-{20 + i % 7:02d}T{9 + i % 9:02d}:00:00Z'}
+            }
+            for i in range(10)
+        ]
+        body = json.dumps({'items': items}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _LocalGoogle:
+    """Sends Google URLs to the stub server through a pooled client."""
+
+    def __init__(self, base_url, pool_size):
+        self._base_url = base_url
+        self._client = GoogleApiClient(pool_maxsize=pool_size)
+
+    def get(self, url, **kwargs):
+        return self._client.get(url.replace('https://www.googleapis.com', self._base_url), **kwargs)
+
+
+def _time(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='Stub think time per calendar request')
+    parser.add_argument('--jitter-ms', type=float, default=40.0)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--sizes', default='1,5,20', help='Calendar counts to measure')
+    args = parser.parse_args()
+
+    StubCalendarHandler.latency = args.latency_ms / 1000
+    StubCalendarHandler.jitter = args.jitter_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubCalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    local = _LocalGoogle(f"http://127.0.0.1:{server.server_address[1]}", pool_size=32)
+
+    headers = {'Authorization': 'Bearer bench', 'Accept': 'application/json'}
+    params = {'singleEvents': True, 'orderBy': 'startTime', 'maxResults': 250}
+    pool_size = calendar_routes._calendar_fetch_pool._max_workers
+
+    print(f"stub latency {args.latency_ms}ms + up to {args.jitter_ms}ms jitter, "
+          f"pool of {pool_size}, median of {args.rounds} rounds")
+    print(f"{'calendars':>10}{'sequential ms':>16}{'concurrent ms':>16}{'speedup':>10}{'events':>9}")
+    with patch.object(calendar_routes, 'google_http', local):
+        for size in (int(s) for s in args.sizes.split(',')):
+            calendars = ['primary'] + [f'cal{i}@group.calendar.google.com' for i in range(size - 1)]
+
+            def _sequential():
+                for calendar_id in calendars:
+                    calendar_routes._fetch_calendar_event_pages(calendar_id, params, headers)
+
+            result = {}
+
+            def _concurrent():
+                result['events'] = calendar_routes.fetch_google_calendar_events(
+                    'bench', '2025-01-20', 'America/New_York', days=14, raise_errors=True, calendar_ids=calendars
+                )
+
+            # Warm the connection pool so both modes reuse sockets
+            _concurrent()
+            sequential_ms = _time(_sequential, args.rounds)
+            concurrent_ms = _time(_concurrent, args.rounds)
+            print(f"{size:>10}{sequential_ms:>16.1f}{concurrent_ms:>16.1f}"
+                  f"{sequential_ms / concurrent_ms:>9.1f}x{len(result['events']):>9}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: cross-worker delivery latency of the MongoDB capped-collection EventBus backend.
+
+Starts a subscriber process and a publisher process that share only a capped
+collection on a local mongod, publishes N events and reports the publish-to-receive
+latency seen by the subscriber (target: well under one second).
+
+Usage (from repo root, with a local mongod running):
+    python -m backend.benchmarks.event_bus_latency_bench --uri "mongodb://localhost:27017/?directConnection=true"
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from bson import Timestamp
+from pymongo import MongoClient
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.services.event_bus import EventBus, MongoCappedEventBackend  # noqa: E402
+
+
+def _collection_getter(uri: str, db_name: str):
+    client = MongoClient(uri)
+    collection = client[db_name]['EventBusMessages']
+    return lambda: collection
+
+
+def _subscriber(uri: str, db_name: str, count: int, ready, results):
+    bus = EventBus(MongoCappedEventBackend(_collection_getter(uri, db_name)))
+    queue = bus.subscribe("bench-user")
+    # Give the tail cursor time to attach before events are published
+    time.sleep(1.0)
+    ready.set()
+    latencies = []
+    for _ in range(count):
+        event = queue.get(timeout=10)
+        latencies.append((time.time() - event["sent_at"]) * 1000)
+    results.put(latencies)
+
+
+def _publisher(uri: str, db_name: str, count: int, interval: float):
+    bus = EventBus(MongoCappedEventBackend(_collection_getter(uri, db_name)))
+    for i in range(count):
+        bus.publish("bench-user", {"type": "bench", "seq": i, "sent_at": time.time()})
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--uri', default="mongodb://localhost:27017/?directConnection=true")
+    parser.add_argument('--db', default="event_bus_bench")
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.01, help="Seconds between publishes")
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    client.drop_database(args.db)
+    client[args.db].create_collection('EventBusMessages', capped=True, size=16 * 1024 * 1024)
+    # Seed one document so tail cursors do not die on an empty collection
+    client[args.db]['EventBusMessages'].insert_one({"ts": Timestamp(0, 0), "seed": True})
+
+    ctx = multiprocessing.get_context('spawn')
+    ready, results = ctx.Event(), ctx.Queue()
+    subscriber = ctx.Process(target=_subscriber, args=(args.uri, args.db, args.events, ready, results))
+    subscriber.start()
+    ready.wait(30)
+
+    publisher = ctx.Process(target=_publisher, args=(args.uri, args.db, args.events, args.interval))
+    publisher.start()
+    publisher.join()
+    latencies = sorted(results.get(timeout=60))
+    subscriber.join(5)
+    client.drop_database(args.db)
+
+    print(f"{'events':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print(f"{len(latencies):>8} {statistics.median(latencies):>8.1f} "
+          f"{latencies[int(len(latencies) * 0.95) - 1]:>8.1f} "
+          f"{latencies[int(len(latencies) * 0.99) - 1]:>8.1f} {latencies[-1]:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark: bare requests.get vs the pooled GoogleApiClient against a local fake Google server.
+
+Starts a threaded HTTP server that mimics calendar events.list (optional per-request
+latency, gzip when the User-Agent asks for it, `fields=` partial responses, and an
+optional share of 503s) and measures, for each client mode:
+
+- new TCP connections opened (keep-alive reuse)
+- median / p95 latency per call
+- response bytes on the wire
+- calls that still failed (bare requests has no retries)
+
+The fake server speaks plain HTTP, so the saving measured for connection reuse
+is the TCP handshake only; against Google the TLS handshake adds more per new
+connection.
+
+Usage (from repo root):
+    python -m backend.benchmarks.google_http_bench --calls 200 --threads 8 --error-rate 0.05
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.utils.google_http import CALENDAR_EVENTS_LIST_FIELDS, GoogleApiClient  # noqa: E402
+
+
+def _full_event(i: int) -> dict:
+    # Roughly the shape Google returns for a timed event
+    return {
+        'kind': 'calendar#event',
+        'etag': f'"3{i:015d}"',
+        'id': f'event{i:05d}',
+        'status': 'confirmed',
+        'htmlLink': f'https://www.google.com/calendar/event?eid=event{i:05d}',
+        'created': '2025-01-01T00:00:00.000Z',
+        'updated': '2025-01-02T00:00:00.000Z',
+        'summary': f'Meeting {i}',
+        'description': 'Agenda: ' + 'discussion points ' * 10,
+        'creator': {'email': 'someone@example.com', 'self': True},
+        'organizer': {'email': 'someone@example.com', 'self': True},
+        'start': {'dateTime': '2025-01-20T09:00:00+11:00', 'timeZone': 'Australia/Sydney'},
+        'end': {'dateTime': '2025-01-20T10:00:00+11:00', 'timeZone': 'Australia/Sydney'},
+        'iCalUID': f'event{i:05d}@google.com',
+        'sequence': 0,
+        'attendees': [{'email': f'guest{j}@example.com', 'responseStatus': 'accepted'} for j in range(4)],
+        'reminders': {'useDefault': True},
+        'eventType': 'default'
+    }
+
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    error_rate = 0.0
+    events = [_full_event(i) for i in range(25)]
+    connections = 0
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without this, Nagle plus
+        # delayed ACKs add ~40ms to every reused connection
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with FakeGoogleHandler.lock:
+            FakeGoogleHandler.connections += 1
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self._send(503, b'{"error": "backendError"}', gzip_ok=False)
+            return
+        query = parse_qs(urlparse(self.path).query)
+        if query.get('fields'):
+            # Partial response: keep only the fields the backend reads
+            keep = ('id', 'status', 'summary', 'start', 'end')
+            items = [{k: e[k] for k in keep if k in e} for e in self.events]
+        else:
+            items = self.events
+        body = json.dumps({'kind': 'calendar#events', 'items': items}).encode()
+        gzip_ok = 'gzip' in self.headers.get('Accept-Encoding', '') and 'gzip' in self.headers.get('User-Agent', '')
+        self._send(200, body, gzip_ok)
+
+    def _send(self, status, body, gzip_ok):
+        if gzip_ok:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if gzip_ok:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+        with FakeGoogleHandler.lock:
+            FakeGoogleHandler.bytes_sent += len(body)
+
+
+def _run(label, call, calls, threads):
+    FakeGoogleHandler.connections = 0
+    FakeGoogleHandler.bytes_sent = 0
+    latencies = []
+    failures = 0
+
+    def _one(_):
+        start = time.perf_counter()
+        try:
+            ok = call().status_code == 200
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for latency, ok in pool.map(_one, range(calls)):
+            latencies.append(latency)
+            failures += 0 if ok else 1
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<28}{FakeGoogleHandler.connections:>8}{statistics.median(latencies):>10.2f}"
+          f"{p95:>10.2f}{FakeGoogleHandler.bytes_sent / calls:>11.0f}{failures:>9}{calls / wall:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Server think time per request')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Share of requests answered with 503')
+    args = parser.parse_args()
+
+    FakeGoogleHandler.latency = args.latency_ms / 1000
+    FakeGoogleHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGoogleHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/calendar/v3/calendars/primary/events"
+    params = {'singleEvents': True, 'orderBy': 'startTime'}
+
+    pooled = GoogleApiClient(pool_maxsize=args.threads, backoff_base=0.01)
+
+    print(f"{args.calls} calls, {args.threads} threads, {args.latency_ms}ms server latency, "
+          f"{args.error_rate:.0%} 503s")
+    print(f"{'mode':<28}{'conns':>8}{'p50 ms':>10}{'p95 ms':>10}{'bytes/call':>11}{'failed':>9}{'req/s':>9}")
+    _run('bare requests.get', lambda: requests.get(url, params=params), args.calls, args.threads)
+    _run('pooled client', lambda: pooled.get(url, endpoint='calendar.events', params=params),
+         args.calls, args.threads)
+    _run('pooled client + fields=', lambda: pooled.get(
+        url, endpoint='calendar.events', params={**params, 'fields': CALENDAR_EVENTS_LIST_FIELDS}
+    ), args.calls, args.threads)
+    print(f"pooled client retries: {pooled.stats()['retries']}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
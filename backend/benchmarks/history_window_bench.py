@@ -0,0 +1,123 @@
+"""
+Benchmark: ScheduleService history lookbacks, per-day find_one vs single history window.
+
+Seeds a sparse user (one schedule N days back) into a scratch database on a local
+mongod, then measures Mongo round trips and latency for the three lookbacks that
+autogenerate_schedule performs (source schedule, recurring tasks, inputs).
+
+Usage (from repo root, with a local mongod running):
+    python -m backend.benchmarks.history_window_bench --uri "mongodb://localhost:27017/?directConnection=true"
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, monitoring
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server (one per round trip)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ('find', 'getMore'):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def _legacy_lookbacks(collection, user_id: str, target_date: str, max_days_back: int = 30):
+    """Pre-change behaviour: each lookback walks back one find_one per day."""
+    from backend.models.schedule_schema import format_schedule_date
+
+    target_dt = datetime.strptime(target_date, '%Y-%m-%d')
+    for _lookback in ('tasks', 'recurring', 'inputs'):
+        for days_back in range(1, max_days_back + 1):
+            day = (target_dt - timedelta(days=days_back)).strftime('%Y-%m-%d')
+            doc = collection.find_one({"userId": user_id, "date": format_schedule_date(day)})
+            if doc and _lookback != 'recurring':
+                break
+
+
+def _windowed_lookbacks(service, user_id: str, target_date: str, max_days_back: int = 30):
+    """New behaviour: one ranged query shared by all three lookbacks."""
+    history = service._load_schedule_history(user_id, target_date, max_days_back)
+    service.get_most_recent_schedule_with_tasks(user_id, target_date, max_days_back, history=history)
+    service._get_recurring_tasks_for_date(user_id, target_date, history=history)
+    service._get_most_recent_schedule_with_inputs(user_id, target_date, history=history)
+
+
+def _measure(fn, counter: CommandCounter, iterations: int):
+    latencies = []
+    counter.count = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return counter.count / iterations, statistics.median(latencies), max(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uri', default='mongodb://localhost:27017/?directConnection=true')
+    parser.add_argument('--days-back', type=int, default=25, help='Age of the only stored schedule')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    # db_config reads MONGODB_URI at import time
+    os.environ.setdefault('MONGODB_URI', args.uri)
+    from backend.models.schedule_schema import format_schedule_date
+    from backend.services.schedule_service import ScheduleService
+
+    counter = CommandCounter()
+    client = MongoClient(args.uri, event_listeners=[counter])
+    collection = client['YourMumScheduleBench']['UserSchedules']
+    collection.drop()
+    collection.create_index([("userId", 1), ("date", 1)], unique=True)
+
+    user_id = 'bench-user'
+    target_date = '2025-03-01'
+    seed_day = (datetime.strptime(target_date, '%Y-%m-%d') - timedelta(days=args.days_back)).strftime('%Y-%m-%d')
+    collection.insert_one({
+        "userId": user_id,
+        "date": format_schedule_date(seed_day),
+        "schedule": [
+            {"id": "s1", "text": "Morning", "type": "section", "is_section": True},
+            {"id": "t1", "text": "Write report", "type": "task", "is_section": False, "completed": False},
+            {"id": "t2", "text": "Stretch", "type": "task", "is_section": False,
+             "is_recurring": {"frequency": "daily"}}
+        ],
+        "inputs": {"name": "Bench", "work_start_time": "09:00"},
+        "metadata": {"created_at": seed_day, "last_modified": seed_day, "source": "manual"}
+    })
+
+    service = ScheduleService()
+    service.schedules_collection = collection
+
+    before = _measure(lambda: _legacy_lookbacks(collection, user_id, target_date), counter, args.iterations)
+    after = _measure(lambda: _windowed_lookbacks(service, user_id, target_date), counter, args.iterations)
+
+    print(f"Sparse user, only schedule {args.days_back} days back, {args.iterations} iterations")
+    print(f"{'mode':<22}{'round trips':>12}{'median ms':>12}{'max ms':>10}")
+    print(f"{'per-day find_one':<22}{before[0]:>12.1f}{before[1]:>12.2f}{before[2]:>10.2f}")
+    print(f"{'history window':<22}{after[0]:>12.1f}{after[1]:>12.2f}{after[2]:>10.2f}")
+
+    collection.drop()
+
+
+if __name__ == '__main__':
+    main()
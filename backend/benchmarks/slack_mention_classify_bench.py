@@ -0,0 +1,175 @@
+"""
+Benchmark: cost and latency per 1k Slack mentions for AI actionability gating.
+
+Replays a synthetic mention stream (default 1,000 messages arriving at
+`--rate` per second, with `--noise` of them greetings, thanks, FYIs or bare
+acknowledgements) through three pipelines:
+
+- per-message: the old `process_mention`, with one Claude call per message
+- prefilter: precompiled local heuristics first, then one call per remaining message
+- batched: the current `process_mention`, which runs the prefilter and then
+  sends the candidates from each `--window-ms` window in one prompt
+
+The Anthropic client is a local fake. Latency is `--base-ms` plus
+`--ms-per-output-token` for each generated token. Token counts are estimated
+at 4 characters per token from the real prompts and responses, and priced at
+the Claude 3 Haiku list price. Reported per 1k messages: API calls, input and
+output tokens, cost, and p50/p95 time to verdict.
+
+Usage (from repo root):
+    python -m backend.benchmarks.slack_mention_classify_bench --messages 1000 --rate 50 --window-ms 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.services.slack_message_processor import SlackMessageProcessor  # noqa: E402
+
+# Claude 3 Haiku list price, USD per million tokens
+INPUT_PRICE_PER_MTOK = 0.25
+OUTPUT_PRICE_PER_MTOK = 1.25
+
+NOISE = [
+    "Thanks <@U1> for your help!", "Good morning <@U1>!", "FYI <@U1> - standup moved to 10",
+    "<@U1> 👍", "congrats <@U1>!!", "<@U1> ok", "hey <@U1>", "lol <@U1>", "<@U1> sounds good",
+]
+CANDIDATES = [
+    "<@U1> can you review the Q3 deck before Friday?", "<@U1> please send the updated designs",
+    "<@U1> what's the status of the deployment?", "<@U1> deploy the hotfix tonight",
+    "Hey <@U1>, could you help debug the login issue?", "<@U1> the migration failed again",
+    "<@U1> share the notes from the client call", "<!here> please fill in the survey by EOD",
+]
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+class _FakeAnthropic:
+    """Answers single and batch prompts after a latency that grows with output length."""
+
+    def __init__(self, base_ms, ms_per_output_token):
+        self._base = base_ms / 1000
+        self._per_token = ms_per_output_token / 1000
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        prompt = kwargs['messages'][0]['content']
+        entries = [json.loads(line) for line in prompt.splitlines() if line.startswith('{"id"')]
+        if entries:
+            text = json.dumps([
+                {"id": e["id"], "is_actionable": True, "task_text": "Follow up on request"} for e in entries
+            ])
+        else:
+            text = json.dumps({"is_actionable": True, "task_text": "Follow up on request"})
+        output_tokens = _tokens(text)
+        time.sleep(self._base + self._per_token * output_tokens)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += _tokens(prompt)
+            self.output_tokens += output_tokens
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=_tokens(prompt), output_tokens=output_tokens)
+        )
+
+
+def _stream(count, noise_share, seed=11):
+    rng = random.Random(seed)
+    return [
+        {
+            'text': rng.choice(NOISE if rng.random() < noise_share else CANDIDATES),
+            'channel_name': 'eng', 'user_name': 'sender', 'team_name': 'Bench'
+        }
+        for _ in range(count)
+    ]
+
+
+async def _replay(messages, rate, classify):
+    # Enough threads that per-message calls never queue for a worker
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=128))
+    latencies = []
+    interval = 1 / rate
+
+    async def _one(message):
+        start = time.perf_counter()
+        await classify(message)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tasks = []
+    for message in messages:
+        tasks.append(asyncio.ensure_future(_one(message)))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def _run(mode, messages, args):
+    client = _FakeAnthropic(args.base_ms, args.ms_per_output_token)
+    processor = SlackMessageProcessor(
+        anthropic_client=client,
+        batch_window_seconds=args.window_ms / 1000,
+        max_batch_size=args.max_batch
+    )
+
+    def _single(message):
+        response = client.messages.create(
+            model='bench', max_tokens=200, temperature=0.1,
+            messages=[{"role": "user", "content": processor._build_analysis_prompt(message)}]
+        )
+        return processor._parse_ai_response(response.content[0].text)
+
+    async def _classify(message):
+        if mode == 'batched':
+            return await processor.process_mention(message)
+        if mode == 'prefilter' and not processor.prefilter(message):
+            return False, ""
+        return await asyncio.to_thread(_single, message)
+
+    latencies = asyncio.run(_replay(messages, args.rate, _classify))
+    scale = 1000 / len(messages)
+    cost = (client.input_tokens * INPUT_PRICE_PER_MTOK + client.output_tokens * OUTPUT_PRICE_PER_MTOK) / 1e6
+    latencies.sort()
+    print(f"{mode:<13}{client.calls * scale:>8.0f}{client.input_tokens * scale:>11.0f}"
+          f"{client.output_tokens * scale:>10.0f}{cost * scale:>11.4f}"
+          f"{statistics.median(latencies):>9.0f}{latencies[int(len(latencies) * 0.95) - 1]:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=50.0, help='Arriving mentions per second')
+    parser.add_argument('--noise', type=float, default=0.4, help='Share of obvious non-actionable messages')
+    parser.add_argument('--window-ms', type=float, default=500.0)
+    parser.add_argument('--max-batch', type=int, default=20)
+    parser.add_argument('--base-ms', type=float, default=400.0, help='Simulated API latency per call')
+    parser.add_argument('--ms-per-output-token', type=float, default=5.0)
+    args = parser.parse_args()
+
+    messages = _stream(args.messages, args.noise)
+    print(f"{args.messages} mentions at {args.rate}/s, {args.noise:.0%} noise, window {args.window_ms}ms, "
+          f"batch <= {args.max_batch}; per 1k messages, Haiku pricing")
+    print(f"{'pipeline':<13}{'calls':>8}{'in tok':>11}{'out tok':>10}{'cost $':>11}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode in ('per-message', 'prefilter', 'batched'):
+        _run(mode, messages, args)
+
+
+if __name__ == '__main__':
+    main()
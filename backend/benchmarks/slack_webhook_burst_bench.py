@@ -0,0 +1,192 @@
+"""
+Benchmark: Slack webhook acknowledgement and processing throughput for an event burst.
+
+Posts a burst of signed `event_callback` requests (default 1,000) to the Slack
+webhook through Flask's test client, from several client threads, and
+compares:
+
+- inline: the old behaviour, where each request runs
+  `asyncio.run(process(event))` before responding
+- queued: the current webhook, which verifies the signature, stores the raw
+  event in SlackEventQueue and returns 200 so the async worker pool (the
+  slack-events process, run here in-process) can drain the queue
+
+Processing is simulated with `--work-ms` of awaited I/O per event, standing in
+for the Mongo reads, Slack API lookups and schedule writes. Reported: ack
+latency p50/p95/max, how many acks took longer than Slack's 3s timeout, ack
+throughput, and end-to-end throughput (time until every event is processed).
+
+`--store memory` keeps the queue in a locked in-process dict and adds
+`--store-latency-ms` per queue operation in place of a Mongo round trip. This
+measures the webhook and worker pool on their own. `--store mongo` uses the
+configured SlackEventQueue collection.
+
+Usage (from repo root, with MONGODB_URI and the Slack env vars set):
+    python -m backend.benchmarks.slack_webhook_burst_bench --events 1000 --work-ms 50 --workers 32
+    python -m backend.benchmarks.slack_webhook_burst_bench --store memory --store-latency-ms 1
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from flask import Flask
+from pymongo.errors import DuplicateKeyError
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.apis import slack_routes  # noqa: E402
+from backend.services.slack_event_queue import SlackEventQueue  # noqa: E402
+
+SLACK_ACK_TIMEOUT_MS = 3000
+
+
+class _MemoryQueueCollection:
+    """The queue's collection operations on a locked dict, with a simulated round trip."""
+
+    def __init__(self, latency_ms):
+        self._docs = {}
+        self._lock = threading.Lock()
+        self._latency = latency_ms / 1000
+
+    def insert_one(self, doc):
+        time.sleep(self._latency)
+        with self._lock:
+            if doc['_id'] in self._docs:
+                raise DuplicateKeyError("E11000 duplicate key error")
+            self._docs[doc['_id']] = dict(doc)
+
+    def find_one_and_update(self, query, update, sort=None, return_document=None):
+        time.sleep(self._latency)
+        with self._lock:
+            due = [d for d in self._docs.values() if d['leaseUntil'] <= query['leaseUntil']['$lte']]
+            if not due:
+                return None
+            doc = min(due, key=lambda d: (d['leaseUntil'], d['receivedAt']))
+            doc.update(update['$set'])
+            return dict(doc)
+
+    def update_one(self, query, update):
+        time.sleep(self._latency)
+        with self._lock:
+            self._docs[query['_id']].update(update['$set'])
+
+    def delete_one(self, query):
+        time.sleep(self._latency)
+        with self._lock:
+            self._docs.pop(query['_id'], None)
+
+
+def _signed_requests(count, run_id):
+    secret = slack_routes.slack_service.signing_secret
+    requests = []
+    for i in range(count):
+        body = json.dumps({
+            'type': 'event_callback',
+            'team_id': 'TBENCH',
+            'event_id': f'Ev{run_id}{i:06d}',
+            'event': {'type': 'message', 'channel': 'C1', 'user': 'U1', 'text': f'<@U2> task {i}', 'ts': f'{i}.0001'}
+        })
+        timestamp = str(int(time.time()))
+        signature = 'v0=' + hmac.new(secret.encode(), f'v0:{timestamp}:{body}'.encode(), hashlib.sha256).hexdigest()
+        requests.append((body, {'X-Slack-Request-Timestamp': timestamp, 'X-Slack-Signature': signature}))
+    return requests
+
+
+def _post_burst(app, requests, client_threads):
+    local = threading.local()
+
+    def _post(item):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        body, headers = item
+        start = time.perf_counter()
+        response = local.client.post('/api/integrations/slack/webhook', data=body,
+                                     content_type='application/json', headers=headers)
+        assert response.status_code == 200, response.data
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=client_threads) as pool:
+        return list(pool.map(_post, requests))
+
+
+def _report(label, latencies, ack_seconds, total_seconds):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    late = sum(1 for latency in latencies if latency > SLACK_ACK_TIMEOUT_MS)
+    print(f"{label:<10}{statistics.median(latencies):>9.1f}{p95:>9.1f}{latencies[-1]:>9.1f}{late:>7}"
+          f"{len(latencies) / ack_seconds:>11.0f}{len(latencies) / total_seconds:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--work-ms', type=float, default=50.0, help='Simulated I/O per event')
+    parser.add_argument('--workers', type=int, default=32, help='Async worker coroutines for the queue')
+    parser.add_argument('--client-threads', type=int, default=16, help='Concurrent webhook deliveries')
+    parser.add_argument('--store', choices=('mongo', 'memory'), default='mongo')
+    parser.add_argument('--store-latency-ms', type=float, default=1.0, help='Per-operation latency for --store memory')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.register_blueprint(slack_routes.slack_bp, url_prefix='/api/integrations/slack')
+    processed = []
+    lock = threading.Lock()
+
+    async def _simulated_processing(event_data):
+        await asyncio.sleep(args.work_ms / 1000)
+        with lock:
+            processed.append(event_data.get('event_id'))
+
+    print(f"{args.events} events, {args.work_ms}ms simulated work each, "
+          f"{args.client_threads} client threads, {args.workers} queue workers, {args.store} store")
+    print(f"{'mode':<10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'>3s':>7}{'acks/s':>11}{'events/s':>12}")
+
+    # Old behaviour: process inside the request on a fresh loop before acknowledging
+    def _inline_enqueue(_raw_body, event_data):
+        asyncio.run(_simulated_processing(event_data))
+        return True
+
+    with patch.object(slack_routes.slack_event_queue, 'enqueue', side_effect=_inline_enqueue):
+        start = time.perf_counter()
+        latencies = _post_burst(app, _signed_requests(args.events, 'inline'), args.client_threads)
+        elapsed = time.perf_counter() - start
+    _report('inline', latencies, elapsed, elapsed)
+
+    processed.clear()
+    collection_getter = None
+    if args.store == 'memory':
+        collection = _MemoryQueueCollection(args.store_latency_ms)
+        collection_getter = lambda: collection  # noqa: E731
+    queue = SlackEventQueue(
+        collection_getter=collection_getter,
+        processor=_simulated_processing,
+        concurrency=args.workers,
+        poll_interval=0.05
+    )
+    # Stands in for the slack-events worker process
+    queue.ensure_worker()
+    with patch.object(slack_routes, 'slack_event_queue', queue):
+        start = time.perf_counter()
+        latencies = _post_burst(app, _signed_requests(args.events, 'queued'), args.client_threads)
+        ack_seconds = time.perf_counter() - start
+        while len(processed) < args.events:
+            time.sleep(0.01)
+        total_seconds = time.perf_counter() - start
+        queue.stop()
+    _report('queued', latencies, ack_seconds, total_seconds)
+
+
+if __name__ == '__main__':
+    main()
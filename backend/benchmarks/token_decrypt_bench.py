@@ -0,0 +1,140 @@
+"""
+Benchmark: Fernet decrypts per Slack event, with and without the decrypted token cache.
+
+Runs `SlackService._enrich_event_data` over a synthetic stream of events spread
+across several workspaces, channels and senders. Slack is replaced by an
+in-process fake, so only local work is measured. Fernet decrypts are counted
+on the real `TokenEncryption` instance in two modes:
+
+- uncached: the old `decrypt_token`, i.e. base64 decode + HMAC verify + AES
+  decrypt on every call
+- cached: the current `decrypt_token`, which serves repeat ciphertexts from
+  `decrypted_token_cache`
+
+Each mode runs with two states of the name cache in front of it:
+
+- cold: every lookup misses (the worst case; one decrypt per lookup before
+  the cache)
+- warm: the slack_metadata name cache is on, so tokens are only
+  needed for names not seen before
+
+Reported: Fernet decrypts per event and decrypt time per event.
+
+Usage (from repo root):
+    python -m backend.benchmarks.token_decrypt_bench --events 5000 --workspaces 5 --senders 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+os.environ.setdefault('SLACK_CLIENT_ID', 'bench')
+os.environ.setdefault('SLACK_CLIENT_SECRET', 'bench')
+os.environ.setdefault('SLACK_SIGNING_SECRET', 'bench')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.services import slack_service as slack_service_module  # noqa: E402
+from backend.services.slack_metadata import SlackMetadataClient  # noqa: E402
+from backend.utils import encryption  # noqa: E402
+
+
+class _FakeSlack:
+    async def conversations_info(self, channel):
+        return {'ok': True, 'channel': {'name': f'chan-{channel}'}}
+
+    async def users_info(self, user):
+        return {'ok': True, 'user': {'name': f'user-{user}'}}
+
+
+def _events(count, workspaces, channels, senders, seed=7):
+    rng = random.Random(seed)
+    return [
+        (f'T{rng.randrange(workspaces)}', {
+            'type': 'message',
+            'channel': f'C{rng.randrange(channels)}',
+            'user': f'U{rng.randrange(senders)}',
+            'text': '<@U0> please review',
+            'ts': f'{i}.000100'
+        })
+        for i in range(count)
+    ]
+
+
+def _run(mode, metadata, events, integrations):
+    instance = encryption.get_encryption_instance()
+    real_decrypt = instance.decrypt_token
+    counter = {'decrypts': 0, 'seconds': 0.0}
+
+    def _counting_decrypt(token):
+        start = time.perf_counter()
+        try:
+            return real_decrypt(token)
+        finally:
+            counter['decrypts'] += 1
+            counter['seconds'] += time.perf_counter() - start
+
+    if mode == 'cached':
+        encryption.invalidate_decrypted_token()
+        decrypt = encryption.decrypt_token
+    else:
+        # Looked up per call so the counting wrapper below is hit
+        decrypt = lambda token: instance.decrypt_token(token)  # noqa: E731
+
+    names = SlackMetadataClient(
+        ttl_seconds=0.000001 if metadata == 'cold' else 3600,
+        client_factory=lambda token, session: _FakeSlack(),
+        session_factory=object
+    )
+    service = slack_service_module.SlackService(db_client=None)
+
+    async def _enrich_all():
+        for team_id, event in events:
+            await service._enrich_event_data(event, integrations[team_id])
+
+    with patch.object(instance, 'decrypt_token', _counting_decrypt), \
+            patch.object(slack_service_module, 'decrypt_token', decrypt), \
+            patch.object(slack_service_module, 'slack_metadata', names):
+        start = time.perf_counter()
+        asyncio.run(_enrich_all())
+        elapsed = time.perf_counter() - start
+
+    return counter['decrypts'], counter['seconds'], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--workspaces', type=int, default=5)
+    parser.add_argument('--channels', type=int, default=20, help='Channels per workspace')
+    parser.add_argument('--senders', type=int, default=200, help='Distinct senders per workspace')
+    args = parser.parse_args()
+
+    integrations = {
+        f'T{i}': {
+            'team_id': f'T{i}',
+            'workspace_name': f'Workspace {i}',
+            'bot_token': encryption.encrypt_token(f'xoxb-bench-{i}')
+        }
+        for i in range(args.workspaces)
+    }
+    events = _events(args.events, args.workspaces, args.channels, args.senders)
+
+    print(f"{args.events} events, {args.workspaces} workspaces, {args.channels} channels and "
+          f"{args.senders} senders per workspace")
+    print(f"{'metadata':<10}{'decrypt':<10}{'decrypts':>10}{'per event':>11}{'us/event':>10}{'total ms':>10}")
+    for metadata in ('cold', 'warm'):
+        for mode in ('uncached', 'cached'):
+            decrypts, decrypt_seconds, elapsed = _run(mode, metadata, events, integrations)
+            print(f"{metadata:<10}{mode:<10}{decrypts:>10}{decrypts / args.events:>11.3f}"
+                  f"{decrypt_seconds / args.events * 1e6:>10.1f}{elapsed * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -86,6 +86,18 @@ def get_archive_collection():
     db = get_database()
     return db['Archive']
 
+def get_operation_leases_collection() -> Collection:
+    """Get collection holding single-flight leases for in-progress operations."""
+    return get_collection('OperationLeases')
+
+def get_calendar_webhook_queue_collection() -> Collection:
+    """Get collection holding debounced Google Calendar push notifications (one per channel)."""
+    return get_collection('CalendarWebhookQueue')
+
+def get_slack_event_queue_collection() -> Collection:
+    """Get collection holding verified Slack event callbacks awaiting processing."""
+    return get_collection('SlackEventQueue')
+
 def initialize_user_collection():
     """Initialize the users collection with required indexes."""
     try:
@@ -96,7 +108,12 @@ def initialize_user_collection():
             IndexModel([("googleId", ASCENDING)], unique=True),
             IndexModel([("email", ASCENDING)], unique=True),
             IndexModel([("role", ASCENDING)]),  # For future RBAC queries
-            IndexModel([("lastLogin", ASCENDING)])  # For user activity tracking
+            IndexModel([("lastLogin", ASCENDING)]),  # For user activity tracking
+            # Slack event routing: workspace members -> YourMum users
+            IndexModel([
+                ("slack_integration.workspace_id", ASCENDING),
+                ("slack_integration.slack_user_id", ASCENDING)
+            ], sparse=True)
         ]
 
         users_collection.create_indexes(user_indexes)
@@ -120,10 +137,22 @@ def initialize_calendar_collections():
             IndexModel([
                 ("googleId", ASCENDING), 
                 ("calendar.selectedCalendars", ASCENDING)
-            ])
+            ]),
+            # Webhook notifications look users up by their watch channel
+            IndexModel([("calendar.watch.channelId", ASCENDING)], sparse=True),
+            # Token refresher scans for credentials about to expire
+            IndexModel([("calendar.credentials.expiresAt", ASCENDING)], sparse=True),
+            # Watch renewer scans for channels about to expire
+            IndexModel([("calendar.watch.expiration", ASCENDING)], sparse=True)
         ]
         users.create_indexes(user_calendar_indexes)
 
+        # Webhook queue: workers claim pending channels in dueAt order
+        webhook_queue = get_calendar_webhook_queue_collection()
+        webhook_queue.create_indexes([
+            IndexModel([("pending", ASCENDING), ("dueAt", ASCENDING)])
+        ])
+
         # Create calendar events indexes
         calendar_event_indexes = [
             IndexModel([("userId", ASCENDING), ("startTime", ASCENDING)]),
@@ -159,9 +188,16 @@ def initialize_slack_collections():
         slack_indexes = [
             IndexModel([("message_key", ASCENDING)], unique=True),
             IndexModel([("user_id", ASCENDING), ("processed_at", DESCENDING)]),
+            # Webhook retry fast path looks messages up by Slack event_id
+            IndexModel([("event_id", ASCENDING)], sparse=True),
             IndexModel([("created_at", ASCENDING)], expireAfterSeconds=86400*30)  # 30 days TTL
         ]
         processed_messages.create_indexes(slack_indexes)
+
+        # Event queue: workers claim the oldest event whose lease has lapsed
+        get_slack_event_queue_collection().create_indexes([
+            IndexModel([("leaseUntil", ASCENDING), ("receivedAt", ASCENDING)])
+        ])
         
         print("Slack collections initialized successfully")
         
@@ -204,6 +240,21 @@ def initialize_archive_collections():
         print(f"Error initializing Archive collections: {e}")
         raise
 
+def initialize_operation_leases_collection():
+    """Initialize the single-flight lease collection with required indexes."""
+    try:
+        leases = get_operation_leases_collection()
+        lease_indexes = [
+            # Expired leases and stale results are removed by MongoDB
+            IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+            IndexModel([("userId", ASCENDING), ("date", ASCENDING)]),
+        ]
+        leases.create_indexes(lease_indexes)
+        print("Operation leases collection initialized successfully")
+    except Exception as e:
+        print(f"Error initializing operation leases collection: {e}")
+        raise
+
 def initialize_db():
     """Initialize database connection and create necessary collections/indexes."""
     global _db_initialized
@@ -222,6 +273,7 @@ def initialize_db():
         initialize_slack_collections()
         initialize_archive_collections()
         initialize_user_schedules_collection()
+        initialize_operation_leases_collection()
 
         # Create or update collection with schema validation
         db = get_database()
@@ -239,6 +291,12 @@ def initialize_db():
         raise
 
 # Data manipulation/business logic functions
+def _invalidate_cached_users(*google_ids: Optional[str]) -> None:
+    """Drop users from the per-process user cache after a write."""
+    # Lazy import to avoid a circular import (services import db_config)
+    from backend.services.user_cache import user_cache
+    user_cache.invalidate(*google_ids)
+
 def get_user_by_google_id(users_collection: Collection, google_id: str) -> Optional[Dict[str, Any]]:
     """Get user by Google ID with proper error handling."""
     try:
@@ -259,6 +317,7 @@ def update_user_login(users_collection: Collection, google_id: str) -> bool:
                 }
             }
         )
+        _invalidate_cached_users(google_id)
         return result.modified_count > 0
     except Exception as e:
         print(f"Error updating user login: {e}")
@@ -346,6 +405,10 @@ def create_or_update_user(users_collection: Collection, user_data: Dict[str, Any
         )
 
         print(f"DEBUG: Upsert result - matched: {result.matched_count}, modified: {result.modified_count}, upserted: {bool(result.upserted_id)}")
+        _invalidate_cached_users(
+            user_data["googleId"],
+            existing_user_by_email.get('googleId') if existing_user_by_email else None
+        )
 
         # Return the updated user document
         return users_collection.find_one({"googleId": user_data["googleId"]}, {"_id": 0})
@@ -0,0 +1,287 @@
+"""
+Local store of Google Calendar events in the `calendar_events` collection.
+
+Reading a day used to mean a live Google API call for that single day, so
+moving between days on the dashboard paid a Google round trip each time. The
+store fetches a rolling window (the requested day plus the following
+`window_days - 1` days) in one call, upserts every event into
+`calendar_events`, and answers later reads for any day in that window with a
+local range query on `(userId, startTime, endTime)`.
+
+Which window a user has stored is recorded in `users.calendar.eventWindow`
+(start/end date, timezone, sync time). A window counts as fresh for
+`ttl_seconds`; the calendar webhook keeps it current between refreshes by
+applying incremental changes through `apply_changes` when the user reads only
+the primary calendar (the one the sync token lists); with other calendars
+selected the window is dropped and refetched instead.
+"""
+
+from __future__ import annotations
+
+import os
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from pymongo import DeleteMany, DeleteOne, ReplaceOne
+
+from backend.services.user_cache import user_cache
+
+
+PRIMARY_CALENDAR_ID = 'primary'
+
+
+def _event_bounds(event: Dict[str, Any]) -> Optional[Tuple[datetime, datetime, bool]]:
+    """Return (startTime, endTime, all_day) in UTC for storage and range queries."""
+    start = event.get('start', {}) or {}
+    end = event.get('end', {}) or {}
+    try:
+        if start.get('date'):
+            # All-day dates have no timezone; stored at UTC midnight and matched with padding
+            start_dt = datetime.strptime(start['date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            end_dt = datetime.strptime(end.get('date') or start['date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            return start_dt, max(end_dt, start_dt + timedelta(days=1)), True
+        if start.get('dateTime'):
+            start_dt = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')).astimezone(timezone.utc)
+            end_raw = end.get('dateTime') or start['dateTime']
+            end_dt = datetime.fromisoformat(end_raw.replace('Z', '+00:00')).astimezone(timezone.utc)
+            return start_dt, end_dt, False
+    except (ValueError, TypeError):
+        return None
+    return None
+
+
+def _day_bounds_utc(date: str, user_timezone: str) -> Tuple[datetime, datetime]:
+    try:
+        tz = ZoneInfo(user_timezone)
+    except Exception:
+        tz = ZoneInfo('UTC')
+    start_local = datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=tz)
+    return start_local.astimezone(timezone.utc), (start_local + timedelta(days=1)).astimezone(timezone.utc)
+
+
+class CalendarEventStore:
+    """Rolling-window cache of a user's Google Calendar events in MongoDB."""
+
+    def __init__(
+        self,
+        collection_getter: Optional[Callable[[], Any]] = None,
+        window_days: int = 14,
+        ttl_seconds: float = 900,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ) -> None:
+        """
+        Args:
+            collection_getter: Callable returning the calendar_events collection
+            window_days: Days fetched per Google call, starting at the requested day
+            ttl_seconds: How long a stored window is served without refetching
+            clock: Returns the current timezone-aware UTC time
+        """
+        self._collection_getter = collection_getter or _get_calendar_events_collection
+        self.window_days = max(1, window_days)
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._clock = clock
+
+    @staticmethod
+    def _event_key(user_id: str, gcal_event_id: str, calendar_id: str = PRIMARY_CALENDAR_ID) -> str:
+        # eventId is unique across the collection, and a shared meeting has the same
+        # Google ID in every attendee's calendar
+        return f"{user_id}:{calendar_id}:{gcal_event_id}"
+
+    @staticmethod
+    def _calendar_id(event: Dict[str, Any]) -> str:
+        # Set by the Google fetch for each calendar listed. Incremental changes come
+        # from the primary calendar's sync token and are only applied when the
+        # window was fetched from 'primary' alone
+        calendar_id = event.get('calendarId')
+        return calendar_id if isinstance(calendar_id, str) and calendar_id else PRIMARY_CALENDAR_ID
+
+    def _document(self, user_id: str, event: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
+        gcal_event_id = event.get('id')
+        bounds = _event_bounds(event)
+        if not gcal_event_id or not bounds:
+            return None
+        start_dt, end_dt, all_day = bounds
+        calendar_id = self._calendar_id(event)
+        return {
+            "eventId": self._event_key(user_id, gcal_event_id, calendar_id),
+            "userId": user_id,
+            "calendarId": calendar_id,
+            "gcalEventId": gcal_event_id,
+            "startTime": start_dt,
+            "endTime": end_dt,
+            "allDay": all_day,
+            "event": event,
+            "syncStatus": "synced",
+            "updatedAt": now
+        }
+
+    @staticmethod
+    def window_synced_at(user: Optional[Dict[str, Any]]) -> Optional[datetime]:
+        """When the user's stored window was last fetched from Google (UTC), if any."""
+        window = ((user or {}).get('calendar') or {}).get('eventWindow') or {}
+        synced_at = window.get('syncedAt')
+        if not isinstance(synced_at, datetime):
+            return None
+        if synced_at.tzinfo is None:
+            synced_at = synced_at.replace(tzinfo=timezone.utc)
+        return synced_at
+
+    def window_covers(
+        self,
+        user: Optional[Dict[str, Any]],
+        date: str,
+        user_timezone: str,
+        allow_stale: bool = False
+    ) -> bool:
+        """True if the user's stored window includes `date` and is still fresh
+        (or at all, with `allow_stale`)."""
+        window = ((user or {}).get('calendar') or {}).get('eventWindow') or {}
+        synced_at = self.window_synced_at(user)
+        if not window or synced_at is None:
+            return False
+        return (
+            window.get('timezone') == user_timezone
+            and window.get('start', '') <= date <= window.get('end', '')
+            and (allow_stale or self._clock() - synced_at < self._ttl)
+        )
+
+    def get_events(
+        self,
+        user: Optional[Dict[str, Any]],
+        date: str,
+        user_timezone: str,
+        allow_stale: bool = False
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the stored Google events overlapping `date`, or None if the store
+        does not cover that day (caller should fetch a new window).
+
+        With `allow_stale`, an expired window is still served; this is the
+        last-known state used when Google is too slow to answer in time.
+        """
+        if not user or not self.window_covers(user, date, user_timezone, allow_stale=allow_stale):
+            return None
+        day_start, day_end = _day_bounds_utc(date, user_timezone)
+        # All-day events are stored at UTC midnight, so pad the range by a day
+        # and leave the exact overlap check to the caller's timezone-aware filter
+        pad = timedelta(days=1)
+        try:
+            cursor = self._collection_getter().find(
+                {
+                    "userId": user.get('googleId'),
+                    "startTime": {"$lt": day_end + pad},
+                    "endTime": {"$gt": day_start - pad}
+                },
+                {"_id": 0, "event": 1}
+            )
+            return [doc['event'] for doc in cursor if doc.get('event')]
+        except Exception as e:
+            print(f"Calendar event store read failed for user {user.get('googleId')}: {e}")
+            return None
+
+    def store_window(
+        self,
+        users,
+        user_id: str,
+        start_date: str,
+        user_timezone: str,
+        events: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Replace the user's stored events for a freshly fetched window.
+
+        Args:
+            users: users collection (window metadata is kept on the user document)
+            user_id: User's googleId
+            start_date: First day of the window (YYYY-MM-DD)
+            user_timezone: Timezone the window boundaries were computed in
+            events: Every Google event returned for the window
+
+        Returns:
+            True if the window was stored
+        """
+        now = self._clock()
+        end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=self.window_days - 1)).strftime('%Y-%m-%d')
+        window_start, _ = _day_bounds_utc(start_date, user_timezone)
+        _, window_end = _day_bounds_utc(end_date, user_timezone)
+
+        docs = [doc for doc in (self._document(user_id, ev, now) for ev in events) if doc]
+        operations: List[Any] = [
+            # Events deleted upstream disappear from the window
+            DeleteMany({
+                "userId": user_id,
+                "startTime": {"$lt": window_end},
+                "endTime": {"$gt": window_start},
+                "eventId": {"$nin": [doc['eventId'] for doc in docs]}
+            })
+        ]
+        operations.extend(ReplaceOne({"eventId": doc['eventId']}, doc, upsert=True) for doc in docs)
+
+        try:
+            self._collection_getter().bulk_write(operations, ordered=False)
+            users.update_one(
+                {"googleId": user_id},
+                {"$set": {"calendar.eventWindow": {
+                    "start": start_date,
+                    "end": end_date,
+                    "timezone": user_timezone,
+                    "syncedAt": now
+                }}}
+            )
+            user_cache.invalidate(user_id)
+            return True
+        except Exception as e:
+            print(f"Failed to store calendar window for user {user_id}: {e}")
+            traceback.print_exc()
+            return False
+
+    def apply_changes(self, user_id: str, changes: List[Dict[str, Any]]) -> int:
+        """
+        Apply incremental Google changes (from a syncToken listing) to the store.
+
+        Returns:
+            Number of write operations sent
+        """
+        now = self._clock()
+        operations: List[Any] = []
+        for event in changes:
+            gcal_event_id = event.get('id')
+            if not gcal_event_id:
+                continue
+            if event.get('status') == 'cancelled':
+                operations.append(DeleteOne({"eventId": self._event_key(user_id, gcal_event_id, self._calendar_id(event))}))
+                continue
+            doc = self._document(user_id, event, now)
+            if doc:
+                operations.append(ReplaceOne({"eventId": doc['eventId']}, doc, upsert=True))
+        if not operations:
+            return 0
+        try:
+            self._collection_getter().bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"Failed to apply calendar changes to store for user {user_id}: {e}")
+            return 0
+        return len(operations)
+
+    def invalidate_window(self, users, user_id: str) -> None:
+        """Forget the stored window so the next read fetches from Google."""
+        try:
+            users.update_one({"googleId": user_id}, {"$unset": {"calendar.eventWindow": ""}})
+            user_cache.invalidate(user_id)
+        except Exception as e:
+            print(f"Failed to invalidate calendar window for user {user_id}: {e}")
+
+
+def _get_calendar_events_collection():
+    # Lazy import keeps this module importable without database configuration
+    from backend.db_config import get_calendar_events_collection
+    return get_calendar_events_collection()
+
+
+# Shared singleton instance for application use
+calendar_event_store = CalendarEventStore(
+    window_days=int(os.getenv('CALENDAR_STORE_WINDOW_DAYS', '14')),
+    ttl_seconds=float(os.getenv('CALENDAR_STORE_TTL_SECONDS', '900'))
+)
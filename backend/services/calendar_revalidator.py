@@ -0,0 +1,285 @@
+"""
+Stale-while-revalidate reads of a user's calendar tasks for autogenerate.
+
+Autogenerate used to start a new thread pool per call and wait up to 10s for
+Google; on timeout the user silently got a schedule with no calendar events.
+This module keeps one bounded pool for the process and gives each read a hard
+latency budget:
+
+- The live fetch starts immediately (concurrent reads of the same user/date
+  share one fetch).
+- If it answers within the budget, the fresh tasks are used.
+- Otherwise the last-known tasks from the calendar_events store are returned
+  straight away, even if that window has expired. With nothing stored, the
+  read waits up to the caller's cold-start timeout instead.
+- Either way a slow fetch keeps running. Once the caller has saved its schedule
+  it hands the fetch to `revalidate_in_background`, which merges the fresh
+  events with `apply_calendar_webhook_update` and pushes a `schedule_updated`
+  SSE event.
+
+Per-user staleness age (how old the served data was) and time-to-fresh (how
+long after a stale serve the fresh data landed) are exposed through `stats()`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+import backend.services.calendar_service as calendar_service
+
+
+class CalendarRevalidator:
+    """Latency-budgeted calendar reads with background revalidation."""
+
+    def __init__(
+        self,
+        budget_seconds: float = 1.5,
+        max_workers: int = 4,
+        service=None,
+        publisher: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        max_tracked_users: int = 5000,
+        timer: Callable[[], float] = time.monotonic,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ) -> None:
+        """
+        Args:
+            budget_seconds: How long a read waits for Google before serving stored data
+            max_workers: Size of the shared fetch pool
+            service: ScheduleService used to merge fresh events (defaults to the shared instance)
+            publisher: Callable(user_id, event) for SSE pushes (defaults to event_bus.publish)
+            max_tracked_users: Bound on the per-user metrics kept in memory
+            timer: Monotonic clock for latency measurements
+            clock: Returns the current timezone-aware UTC time (for staleness age)
+        """
+        self.budget_seconds = budget_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='calendar-read')
+        self._service = service
+        self._publisher = publisher
+        self._timer = timer
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str, Optional[str]], Future] = {}
+        # (user_id, date) -> timer value when stale data was first served
+        self._stale_since: Dict[Tuple[str, str], float] = {}
+        self._user_stats = TTLCache(maxsize=max_tracked_users, ttl=24 * 3600, timer=timer)
+        self._counters = {
+            'fresh_reads': 0,
+            'stale_reads': 0,
+            'empty_reads': 0,
+            'shared_fetches': 0,
+            'revalidations': 0,
+            'revalidation_failures': 0
+        }
+
+    def _get_service(self):
+        if self._service is None:
+            # Lazy import: schedule_service imports this module
+            from backend.services.schedule_service import schedule_service
+            self._service = schedule_service
+        return self._service
+
+    def _publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        if self._publisher is None:
+            from backend.services.event_bus import event_bus
+            self._publisher = event_bus.publish
+        self._publisher(user_id, event)
+
+    def _fetch_future(self, user_id: str, date: str, user_timezone: Optional[str]) -> Future:
+        key = (user_id, date, user_timezone)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None and not future.done():
+                self._counters['shared_fetches'] += 1
+                return future
+            future = self._executor.submit(
+                lambda: calendar_service.get_calendar_tasks_for_user_date(
+                    user_id,
+                    date,
+                    timezone_override=user_timezone
+                )
+            )
+            self._inflight[key] = future
+
+        def _forget(done: Future) -> None:
+            with self._lock:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+        future.add_done_callback(_forget)
+        return future
+
+    def read(
+        self,
+        user_id: str,
+        date: str,
+        user_timezone: Optional[str] = None,
+        cold_timeout_seconds: float = 10.0
+    ) -> Tuple[List[Dict[str, Any]], Optional[Future]]:
+        """
+        Return calendar tasks for a date within the latency budget.
+
+        Args:
+            user_id: User's googleId
+            date: Target date (YYYY-MM-DD)
+            user_timezone: Timezone override passed through to the calendar fetch
+            cold_timeout_seconds: Longest wait when there is no stored data to fall back to
+
+        Returns:
+            (tasks, pending) where pending is the still-running fetch when stale
+            or empty data was served, else None
+        """
+        started = self._timer()
+        future = self._fetch_future(user_id, date, user_timezone)
+        budget = min(self.budget_seconds, cold_timeout_seconds)
+        try:
+            tasks = future.result(timeout=budget)
+            self._record_fresh(user_id, date, self._timer() - started)
+            return tasks, None
+        except FuturesTimeout:
+            pass
+
+        stored = calendar_service.get_stored_calendar_tasks_for_user_date(user_id, date, user_timezone)
+        if stored is not None:
+            tasks, synced_at = stored
+            age = (self._clock() - synced_at).total_seconds() if synced_at else None
+            self._record_stale(user_id, date, age)
+            print(f"[CALENDAR] Serving stored events for {user_id} on {date} "
+                  f"(Google exceeded {budget}s budget, data age {age if age is None else round(age)}s)")
+            return tasks, future
+
+        try:
+            tasks = future.result(timeout=max(0.0, cold_timeout_seconds - (self._timer() - started)))
+            self._record_fresh(user_id, date, self._timer() - started)
+            return tasks, None
+        except FuturesTimeout:
+            self._record_stale(user_id, date, None, empty=True)
+            print(f"[CALENDAR] No calendar data for {user_id} on {date} within {cold_timeout_seconds}s; revalidating in background")
+            return [], future
+
+    def revalidate_in_background(self, user_id: str, date: str, pending: Optional[Future]) -> None:
+        """
+        Merge the result of a slow fetch once it lands and notify the client.
+
+        Call this after the schedule that used stale data has been saved, so the
+        fresh events are merged into it rather than overwritten by it.
+        """
+        if pending is None:
+            return
+
+        def _on_done(done: Future) -> None:
+            try:
+                self._executor.submit(self._apply_fresh, user_id, date, done)
+            except RuntimeError:
+                # Executor shut down at interpreter exit
+                pass
+
+        pending.add_done_callback(_on_done)
+
+    def _apply_fresh(self, user_id: str, date: str, done: Future) -> None:
+        try:
+            tasks = done.result()
+        except Exception as e:
+            self._count('revalidation_failures')
+            print(f"[CALENDAR] Background revalidation failed for {user_id} on {date}: {e}")
+            return
+        if not tasks:
+            # An empty fetch is indistinguishable from a failed one; keep what is there
+            self._record_time_to_fresh(user_id, date)
+            return
+        try:
+            success, _ = self._get_service().apply_calendar_webhook_update(
+                user_id=user_id,
+                date=date,
+                calendar_tasks=tasks
+            )
+            if not success:
+                self._count('revalidation_failures')
+                return
+            self._record_time_to_fresh(user_id, date)
+            self._count('revalidations')
+            self._publish(user_id, {"type": "schedule_updated", "date": date})
+        except Exception as e:
+            self._count('revalidation_failures')
+            print(f"[CALENDAR] Failed to apply revalidated events for {user_id} on {date}: {e}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _user_entry(self, user_id: str) -> Dict[str, Any]:
+        entry = self._user_stats.get(user_id)
+        if entry is None:
+            entry = {
+                'freshReads': 0,
+                'staleReads': 0,
+                'lastFetchSeconds': None,
+                'lastStalenessAgeSeconds': None,
+                'lastTimeToFreshSeconds': None
+            }
+        # Re-inserting refreshes the TTL for active users
+        self._user_stats[user_id] = entry
+        return entry
+
+    def _record_fresh(self, user_id: str, date: str, elapsed: float) -> None:
+        with self._lock:
+            self._counters['fresh_reads'] += 1
+            entry = self._user_entry(user_id)
+            entry['freshReads'] += 1
+            entry['lastFetchSeconds'] = round(elapsed, 3)
+            self._stale_since.pop((user_id, date), None)
+
+    def _record_stale(self, user_id: str, date: str, age: Optional[float], empty: bool = False) -> None:
+        with self._lock:
+            self._counters['empty_reads' if empty else 'stale_reads'] += 1
+            entry = self._user_entry(user_id)
+            entry['staleReads'] += 1
+            entry['lastStalenessAgeSeconds'] = None if age is None else round(age, 3)
+            self._stale_since.setdefault((user_id, date), self._timer())
+
+    def _record_time_to_fresh(self, user_id: str, date: str) -> None:
+        with self._lock:
+            since = self._stale_since.pop((user_id, date), None)
+            if since is not None:
+                self._user_entry(user_id)['lastTimeToFreshSeconds'] = round(self._timer() - since, 3)
+
+    def clear(self) -> None:
+        """Forget in-flight fetches and metrics; running fetches finish unobserved."""
+        with self._lock:
+            self._inflight.clear()
+            self._stale_since.clear()
+            self._user_stats.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def user_stats(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Staleness metrics for one user, or None if they have not read recently."""
+        with self._lock:
+            entry = self._user_stats.get(user_id)
+            return dict(entry) if entry else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Process-wide read counters plus time-to-fresh across tracked users."""
+        with self._lock:
+            ttf = [e['lastTimeToFreshSeconds'] for e in self._user_stats.values()
+                   if e['lastTimeToFreshSeconds'] is not None]
+            return {
+                **self._counters,
+                'budget_seconds': self.budget_seconds,
+                'pending_revalidations': len(self._stale_since),
+                'tracked_users': len(self._user_stats),
+                'max_time_to_fresh_seconds': max(ttf) if ttf else None
+            }
+
+
+# Shared singleton instance for application use
+calendar_revalidator = CalendarRevalidator(
+    budget_seconds=float(os.getenv('CALENDAR_READ_BUDGET_SECONDS', '1.5')),
+    max_workers=int(os.getenv('CALENDAR_READ_WORKERS', '4'))
+)
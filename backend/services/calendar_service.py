@@ -17,20 +17,28 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from backend.db_config import get_database
+from backend.services.calendar_event_store import calendar_event_store
+from backend.services.user_cache import user_cache
 from backend.utils.timezone import get_reliable_user_timezone
 
 
 # NOTE: need this to avoid circular dependency with schedule_service
 # In tests, this symbol is patched directly within this module.
 # In production, delegate to the real implementation in backend.apis.calendar_routes.
-def fetch_google_calendar_events(access_token: str, date: str, user_timezone: str) -> List[Dict]:  # pragma: no cover - thin wrapper
-    try:
-        # Lazy import to avoid circular dependencies during module import
-        from backend.apis.calendar_routes import fetch_google_calendar_events as _routes_fetch  # type: ignore
-        return _routes_fetch(access_token, date, user_timezone) or []
-    except Exception:
-        # Be resilient; the caller will gracefully proceed with an empty list
-        return []
+def fetch_google_calendar_events(
+    access_token: str,
+    date: str,
+    user_timezone: str,
+    days: int = 1,
+    calendar_ids: Optional[List[str]] = None
+) -> List[Dict]:  # pragma: no cover - thin wrapper
+    # Lazy import to avoid circular dependencies during module import
+    from backend.apis.calendar_routes import fetch_google_calendar_events as _routes_fetch  # type: ignore
+    # Errors propagate so a failed fetch is never stored as an empty window;
+    # PermissionError triggers the refresh-and-retry below
+    return _routes_fetch(
+        access_token, date, user_timezone, days=days, raise_errors=True, calendar_ids=calendar_ids
+    ) or []
 
 
 def _event_overlaps_date(event: Dict, date: str, timezone_str: str) -> bool:
@@ -158,6 +166,8 @@ def convert_calendar_event_to_task(event: Dict, date: str) -> Optional[Dict]:
 def get_calendar_tasks_for_user_date(user_id: str, date: str, timezone_override: Optional[str] = None) -> List[Dict]:
     """
     Fetch user's calendar events for a date and convert/sort/limit to tasks.
+    - Served from the calendar_events store when a fresh window covers the date;
+      otherwise fetches a window starting at the date and stores it
     - Includes all-day and multi-day events overlapping the date
     - Sorted by (all-day first) then start time chronological (user timezone)
     - Limited to earliest 10 (tie-break alphabetical)
@@ -166,7 +176,7 @@ def get_calendar_tasks_for_user_date(user_id: str, date: str, timezone_override:
         # Get user
         db = get_database()
         users = db['users']
-        user = users.find_one({'googleId': user_id})
+        user = user_cache.get_user(user_id, lambda: users.find_one({'googleId': user_id}))
         if not user:
             return []
 
@@ -191,37 +201,78 @@ def get_calendar_tasks_for_user_date(user_id: str, date: str, timezone_override:
         candidate_timezone = timezone_override or user.get('timezone')
         user_timezone = get_reliable_user_timezone(candidate_timezone)
 
-        # Fetch events and on PermissionError attempt one refresh-and-retry using shared helper.
-        try:
-            events = fetch_google_calendar_events(access_token, date, user_timezone) or []
-        except PermissionError:
-            # Refresh token and retry once
-            refreshed = _ensure_access_token_valid_wrapper(users, user_id, credentials)
-            if not refreshed or refreshed == access_token:
-                return []
+        # Serve from the local event store when its window covers this day
+        events = calendar_event_store.get_events(user, date, user_timezone)
+        if events is None:
+            # Fetch a whole window in one call and on PermissionError attempt one
+            # refresh-and-retry using shared helper.
+            window_days = calendar_event_store.window_days
+            selected_calendars = calendar_data.get('selectedCalendars')
             try:
-                events = fetch_google_calendar_events(refreshed, date, user_timezone) or []
+                events = fetch_google_calendar_events(
+                    access_token, date, user_timezone, days=window_days, calendar_ids=selected_calendars
+                ) or []
             except PermissionError:
-                return []
+                # Refresh token and retry once
+                refreshed = _ensure_access_token_valid_wrapper(users, user_id, credentials)
+                if not refreshed or refreshed == access_token:
+                    return []
+                try:
+                    events = fetch_google_calendar_events(
+                        refreshed, date, user_timezone, days=window_days, calendar_ids=selected_calendars
+                    ) or []
+                except PermissionError:
+                    return []
+            calendar_event_store.store_window(users, user_id, date, user_timezone, events)
+
+        return _events_to_tasks(events, date, user_timezone)
+    except Exception:
+        return []
+
+
+def get_stored_calendar_tasks_for_user_date(
+    user_id: str,
+    date: str,
+    timezone_override: Optional[str] = None
+) -> Optional[Tuple[List[Dict], Optional[datetime]]]:
+    """
+    Last-known calendar tasks for a date from the calendar_events store, even if
+    the stored window has expired. Never calls Google.
+
+    Returns:
+        (tasks, synced_at) where synced_at is when the window was fetched, or
+        None if nothing is stored for the date
+    """
+    try:
+        user = user_cache.get_user(user_id, lambda: get_database()['users'].find_one({'googleId': user_id}))
+        if not user:
+            return None
+        user_timezone = get_reliable_user_timezone(timezone_override or user.get('timezone'))
+        events = calendar_event_store.get_events(user, date, user_timezone, allow_stale=True)
+        if events is None:
+            return None
+        return _events_to_tasks(events, date, user_timezone), calendar_event_store.window_synced_at(user)
+    except Exception:
+        return None
 
-        # Filter: overlapping target date in the correct timezone
-        filtered = [ev for ev in events if _event_overlaps_date(ev, date, user_timezone)]
 
-        # Sort by all-day first, then time, then alphabetical
-        filtered.sort(key=_event_sort_key)
+def _events_to_tasks(events: List[Dict], date: str, user_timezone: str) -> List[Dict]:
+    # Filter: overlapping target date in the correct timezone
+    filtered = [ev for ev in events if _event_overlaps_date(ev, date, user_timezone)]
 
-        # Limit to earliest 10
-        limited = filtered[:10]
+    # Sort by all-day first, then time, then alphabetical
+    filtered.sort(key=_event_sort_key)
 
-        # Convert to tasks
-        tasks: List[Dict] = []
-        for ev in limited:
-            task = convert_calendar_event_to_task(ev, date)
-            if task:
-                tasks.append(task)
+    # Limit to earliest 10
+    limited = filtered[:10]
 
-        return tasks
-    except Exception:
-        return []
+    # Convert to tasks
+    tasks: List[Dict] = []
+    for ev in limited:
+        task = convert_calendar_event_to_task(ev, date)
+        if task:
+            tasks.append(task)
+
+    return tasks
 
 
@@ -0,0 +1,171 @@
+"""
+Incremental Google Calendar sync for the push-notification webhook.
+
+Google's events.list returns a `nextSyncToken`; listing again with that token
+returns only the events created, changed or cancelled since. The webhook keeps
+one token per user (`calendar.syncToken`) and uses this module to turn such a
+delta into per-date schedule updates:
+
+- Changed events are upserted on the dates they overlap (today, plus any date in
+  the sync horizon that already has a schedule).
+- Cancelled events, and events moved off a date, are removed from the schedules
+  that currently contain them.
+
+Only the affected dates are rewritten; everything else is left untouched.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from backend.models.schedule_schema import format_schedule_date
+from backend.services.calendar_service import _event_overlaps_date, convert_calendar_event_to_task
+
+
+class CalendarDeltaSync:
+    """Applies incremental Google Calendar changes to the affected schedule dates."""
+
+    def __init__(
+        self,
+        service=None,
+        schedules_getter: Optional[Callable[[], Any]] = None,
+        horizon_days: int = 14
+    ) -> None:
+        """
+        Args:
+            service: ScheduleService used to merge updates (defaults to the shared instance)
+            schedules_getter: Callable returning the UserSchedules collection
+            horizon_days: Number of days from today that deltas are applied to
+        """
+        self._service = service
+        self._schedules_getter = schedules_getter
+        self._horizon_days = max(1, horizon_days)
+
+    @property
+    def horizon_days(self) -> int:
+        return self._horizon_days
+
+    def _get_service(self):
+        if self._service is None:
+            # Lazy import: schedule_service pulls in the full service layer
+            from backend.services.schedule_service import schedule_service
+            self._service = schedule_service
+        return self._service
+
+    def _get_schedules_collection(self):
+        if self._schedules_getter is None:
+            from backend.db_config import get_user_schedules_collection
+            self._schedules_getter = get_user_schedules_collection
+        return self._schedules_getter()
+
+    def _horizon(self, today: str) -> List[str]:
+        start = datetime.strptime(today, '%Y-%m-%d')
+        return [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(self._horizon_days)]
+
+    def _existing_calendar_ids(self, user_id: str, dates: List[str]) -> Dict[str, Set[str]]:
+        """Map each date in the horizon that has a schedule to the gcal_event_ids it contains."""
+        cursor = self._get_schedules_collection().find(
+            {
+                "userId": user_id,
+                "date": {"$gte": format_schedule_date(dates[0]), "$lte": format_schedule_date(dates[-1])}
+            },
+            {"_id": 0, "date": 1, "schedule.gcal_event_id": 1}
+        )
+        by_date: Dict[str, Set[str]] = {}
+        for doc in cursor:
+            date = str(doc.get('date', ''))[:10]
+            by_date[date] = {
+                task.get('gcal_event_id')
+                for task in doc.get('schedule', [])
+                if task.get('gcal_event_id')
+            }
+        return by_date
+
+    def plan(
+        self,
+        user_id: str,
+        changes: List[Dict[str, Any]],
+        user_timezone: str,
+        today: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Work out which dates a delta touches.
+
+        Args:
+            user_id: User's googleId
+            changes: Events returned by a syncToken listing (may include status 'cancelled')
+            user_timezone: IANA timezone used for date boundaries
+            today: User's current date (YYYY-MM-DD)
+
+        Returns:
+            {date: {"upserts": [task, ...], "removed": [gcal_event_id, ...]}} for affected dates only
+        """
+        if not changes:
+            return {}
+
+        dates = self._horizon(today)
+        ids_by_date = self._existing_calendar_ids(user_id, dates)
+        # Upserts go to today and to dates the user already has a schedule for
+        upsert_dates = set(ids_by_date) | {today}
+
+        plan: Dict[str, Dict[str, Any]] = {}
+
+        def _entry(date: str) -> Dict[str, Any]:
+            return plan.setdefault(date, {"upserts": [], "removed": []})
+
+        for event in changes:
+            event_id = event.get('id')
+            if not event_id:
+                continue
+            holding_dates = [d for d, ids in ids_by_date.items() if event_id in ids]
+
+            if event.get('status') == 'cancelled':
+                for date in holding_dates:
+                    _entry(date)["removed"].append(event_id)
+                continue
+
+            overlap_dates = [d for d in dates if _event_overlaps_date(event, d, user_timezone)]
+            for date in overlap_dates:
+                if date not in upsert_dates:
+                    continue
+                task = convert_calendar_event_to_task(event, date)
+                if task:
+                    _entry(date)["upserts"].append(task)
+            for date in holding_dates:
+                if date not in overlap_dates:
+                    # Event moved to another day
+                    _entry(date)["removed"].append(event_id)
+
+        return plan
+
+    def apply(
+        self,
+        user_id: str,
+        changes: List[Dict[str, Any]],
+        user_timezone: str,
+        today: str
+    ) -> Dict[str, bool]:
+        """
+        Apply a delta to the affected dates.
+
+        Returns:
+            Mapping of each affected date to whether its update succeeded
+        """
+        results: Dict[str, bool] = {}
+        for date, entry in sorted(self.plan(user_id, changes, user_timezone, today).items()):
+            success, _ = self._get_service().apply_calendar_webhook_update(
+                user_id=user_id,
+                date=date,
+                calendar_tasks=entry["upserts"],
+                removed_event_ids=entry["removed"]
+            )
+            results[date] = success
+        return results
+
+
+# Shared singleton instance for application use
+calendar_delta_sync = CalendarDeltaSync(
+    horizon_days=int(os.getenv('CALENDAR_SYNC_HORIZON_DAYS', '14'))
+)
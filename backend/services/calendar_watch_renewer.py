@@ -0,0 +1,233 @@
+"""
+Scheduled renewal of Google Calendar watch channels.
+
+Both SSE stream handlers used to call `ensure_calendar_watch_for_user` every
+time a client connected: a user read, a possible token refresh and possibly a
+Google `events/watch` POST, all before the first byte streamed. Channels only
+need replacing as they approach expiry, so this job does that on a schedule
+and stream setup is now a pure subscription.
+
+Each pass:
+- renews connected users whose `calendar.watch.expiration` falls within
+  `horizon_seconds`, or who have no channel at all, in bounded-concurrency
+  batches. The replaced channel is stopped once the new one is saved.
+- stops and clears channels left on users who disconnected their calendar.
+
+Users whose renewal fails are skipped for `retry_seconds` via
+`calendar.watchRenewRetryAt`.
+
+Run as a separate process (not inside web workers):
+    python -m backend.services.calendar_watch_renewer
+    python -m backend.services.calendar_watch_renewer --once --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.services.user_cache import user_cache
+
+
+class CalendarWatchRenewer:
+    """Renews watch channels ahead of expiry and stops stale ones."""
+
+    def __init__(
+        self,
+        users_getter: Optional[Callable[[], Any]] = None,
+        horizon_seconds: float = 6 * 3600,
+        batch_size: int = 200,
+        max_workers: int = 4,
+        tick_seconds: float = 300.0,
+        retry_seconds: float = 1800,
+        dry_run: bool = False,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ) -> None:
+        """
+        Args:
+            users_getter: Callable returning the users collection
+            horizon_seconds: Renew channels expiring within this many seconds
+            batch_size: Most users handled per pass for each kind of work
+            max_workers: Concurrent renewals against Google
+            tick_seconds: Interval between passes in run_forever
+            retry_seconds: Back-off after a failed renewal before the user is tried again
+            dry_run: Log due users without renewing or stopping anything
+            clock: Returns the current timezone-aware UTC time
+        """
+        self._users_getter = users_getter
+        self._horizon = timedelta(seconds=horizon_seconds)
+        self._batch_size = max(1, batch_size)
+        self._max_workers = max(1, max_workers)
+        self._tick_seconds = tick_seconds
+        self._retry = timedelta(seconds=retry_seconds)
+        self._dry_run = dry_run
+        self._clock = clock
+        self._stop_event = threading.Event()
+
+    def _get_users_collection(self):
+        if self._users_getter is None:
+            from backend.db_config import get_users_collection
+            self._users_getter = get_users_collection
+        return self._users_getter()
+
+    def due_users(self, now: datetime) -> List[Dict[str, Any]]:
+        """Connected users whose channel is missing or expires within the horizon."""
+        cursor = self._get_users_collection().find(
+            {
+                "calendar.connected": True,
+                "calendar.credentials": {"$exists": True},
+                "$and": [
+                    {"$or": [
+                        {"calendar.watch.expiration": {"$exists": False}},
+                        {"calendar.watch.expiration": {"$lte": now + self._horizon}}
+                    ]},
+                    {"$or": [
+                        {"calendar.watchRenewRetryAt": {"$exists": False}},
+                        {"calendar.watchRenewRetryAt": {"$lte": now}}
+                    ]}
+                ]
+            },
+            {"_id": 0, "googleId": 1}
+        ).sort("calendar.watch.expiration", 1).limit(self._batch_size)
+        return list(cursor)
+
+    def stale_users(self) -> List[Dict[str, Any]]:
+        """Users who disconnected their calendar but still have a watch channel recorded."""
+        cursor = self._get_users_collection().find(
+            {"calendar.connected": {"$ne": True}, "calendar.watch.channelId": {"$exists": True}},
+            {"_id": 0, "googleId": 1, "calendar.watch": 1, "calendar.credentials": 1}
+        ).limit(self._batch_size)
+        return list(cursor)
+
+    def _renew_one(self, user: Dict[str, Any]) -> str:
+        user_id = user.get('googleId')
+        users = self._get_users_collection()
+        try:
+            # Lazy import: calendar_routes pulls in Flask and the service layer
+            from backend.apis.calendar_routes import ensure_calendar_watch_for_user
+            ok, result = ensure_calendar_watch_for_user(user_id, renew_within=self._horizon)
+            if not ok:
+                print(f"Watch renewal failed for user {user_id}: {result.get('error')}")
+        except Exception as e:
+            print(f"Watch renewal failed for user {user_id}: {e}")
+            traceback.print_exc()
+            ok = False
+
+        try:
+            if ok:
+                users.update_one({"googleId": user_id}, {"$unset": {"calendar.watchRenewRetryAt": ""}})
+            else:
+                users.update_one(
+                    {"googleId": user_id},
+                    {"$set": {"calendar.watchRenewRetryAt": self._clock() + self._retry}}
+                )
+            user_cache.invalidate(user_id)
+        except Exception as e:
+            print(f"Could not record watch renewal outcome for user {user_id}: {e}")
+        return 'renewed' if ok else 'failed'
+
+    def _stop_stale(self, user: Dict[str, Any]) -> str:
+        user_id = user.get('googleId')
+        calendar = user.get('calendar') or {}
+        watch = calendar.get('watch') or {}
+        access_token = (calendar.get('credentials') or {}).get('accessToken')
+        if access_token:
+            try:
+                from backend.apis.calendar_routes import stop_calendar_watch_channel
+                stop_calendar_watch_channel(access_token, watch.get('channelId'), watch.get('resourceId'))
+            except Exception as e:
+                # Without it Google notifies until expiry; the webhook finds no user and ignores them
+                print(f"Could not stop watch channel for user {user_id}: {e}")
+
+        try:
+            users = self._get_users_collection()
+            users.update_one(
+                {"googleId": user_id, "calendar.connected": {"$ne": True}},
+                {"$unset": {"calendar.watch": "", "calendar.watchRenewRetryAt": ""}}
+            )
+            user_cache.invalidate(user_id)
+        except Exception as e:
+            print(f"Could not clear stale watch for user {user_id}: {e}")
+            return 'failed'
+        return 'stopped'
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Run one renewal pass.
+
+        Returns:
+            Counts of due users and outcomes
+        """
+        due = self.due_users(self._clock())
+        stale = self.stale_users()
+        counts = {'due': len(due), 'renewed': 0, 'failed': 0, 'stale': len(stale), 'stopped': 0}
+        if not due and not stale:
+            return counts
+
+        if self._dry_run:
+            for user in due:
+                print(f"[DRY RUN] Would renew calendar watch for user {user.get('googleId')}")
+            for user in stale:
+                print(f"[DRY RUN] Would stop stale calendar watch for user {user.get('googleId')}")
+            return counts
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="watch-renew") as pool:
+            for outcome in pool.map(self._renew_one, due):
+                counts[outcome] += 1
+            for outcome in pool.map(self._stop_stale, stale):
+                if outcome == 'stopped':
+                    counts['stopped'] += 1
+
+        print(f"Calendar watch renewal pass: {counts}")
+        return counts
+
+    def run_forever(self) -> None:
+        """Run passes every `tick_seconds` until stop() is called."""
+        print(f"Calendar watch renewer started (horizon={int(self._horizon.total_seconds())}s, "
+              f"concurrency={self._max_workers})")
+        while not self._stop_event.is_set():
+            try:
+                counts = self.run_once()
+            except Exception as e:
+                print(f"Calendar watch renewal pass failed: {e}")
+                traceback.print_exc()
+                counts = {}
+            # A full batch means more users are due; go again without waiting
+            full = counts.get('due', 0) >= self._batch_size or counts.get('stale', 0) >= self._batch_size
+            if not full or self._dry_run:
+                self._stop_event.wait(self._tick_seconds)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Renew Google Calendar watch channels before they expire")
+    parser.add_argument('--horizon-seconds', type=float, default=6 * 3600,
+                        help="Renew channels expiring within this window")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent renewals against Google")
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--tick-seconds', type=float, default=300.0)
+    parser.add_argument('--dry-run', action='store_true', help="Log due users without renewing")
+    parser.add_argument('--once', action='store_true', help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    renewer = CalendarWatchRenewer(
+        horizon_seconds=args.horizon_seconds,
+        max_workers=args.concurrency,
+        batch_size=args.batch_size,
+        tick_seconds=args.tick_seconds,
+        dry_run=args.dry_run
+    )
+    if args.once:
+        print(renewer.run_once())
+    else:
+        renewer.run_forever()
+
+
+if __name__ == '__main__':
+    main()
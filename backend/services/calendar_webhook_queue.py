@@ -0,0 +1,265 @@
+"""
+Durable, per-channel debounced queue for Google Calendar push notifications.
+
+Google sends a burst of notifications when a user edits several events, and
+the webhook used to run a full sync (user lookup, token check, fetch, merge,
+write) inside each request. Now the webhook only records the notification and
+returns 200; syncs run from this queue.
+
+One document per watch channel lives in `CalendarWebhookQueue` (`_id` is the
+channel ID). The first notification sets `dueAt = now + debounce_seconds`;
+later ones in that window only bump a counter, so a burst collapses into one
+sync. The worker process claims due channels with an atomic
+find_one_and_update lease, runs `process_calendar_notification`, and deletes
+the document. A notification that arrives mid-sync marks the document pending
+again, so it is picked up once more after the current sync finishes. A worker
+that dies mid-sync leaves a lease that expires after `lease_seconds`, so
+several worker processes can share the queue.
+
+By default each web process starts a worker thread on its first notification.
+A deployment that runs a dedicated worker service sets
+CALENDAR_WEBHOOK_WORKER_IN_WEB=false on the web service, so web processes only
+enqueue, and runs the worker as a separate process (APP_ROLE=calendar-webhooks):
+    python -m backend.services.calendar_webhook_queue
+    python -m backend.services.calendar_webhook_queue --once
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+
+
+class CalendarWebhookQueue:
+    """Mongo-backed notification queue keyed by channel, with debounce."""
+
+    def __init__(
+        self,
+        collection_getter: Optional[Callable[[], Any]] = None,
+        processor: Optional[Callable[[str, str, str], Dict[str, Any]]] = None,
+        debounce_seconds: float = 3.0,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+        worker_in_web: bool = True
+    ) -> None:
+        """
+        Args:
+            collection_getter: Callable returning the CalendarWebhookQueue collection
+            processor: Callable(channel_id, resource_id, token) that runs the sync
+                (defaults to calendar_routes.process_calendar_notification)
+            debounce_seconds: Window in which notifications for a channel collapse
+            lease_seconds: How long a claimed channel is hidden from other workers
+            poll_interval: Worker sleep between empty polls
+            max_attempts: Failed syncs before a notification is dropped
+            clock: Returns the current timezone-aware UTC time
+            worker_in_web: Whether web processes drain the queue themselves
+                (False when a dedicated calendar-webhooks process runs)
+        """
+        self._collection_getter = collection_getter or _get_webhook_queue_collection
+        self._processor = processor
+        self._debounce = timedelta(seconds=debounce_seconds)
+        self._lease = timedelta(seconds=lease_seconds)
+        self._poll_interval = poll_interval
+        self._max_attempts = max(1, max_attempts)
+        self._clock = clock
+        self._worker_in_web = worker_in_web
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_pid: Optional[int] = None
+        self._counters = {'enqueued': 0, 'processed': 0, 'collapsed': 0, 'failed': 0, 'dropped': 0}
+
+    def _get_processor(self) -> Callable[[str, str, str], Dict[str, Any]]:
+        if self._processor is None:
+            # Lazy import: calendar_routes imports this module
+            from backend.apis.calendar_routes import process_calendar_notification
+            self._processor = process_calendar_notification
+        return self._processor
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def enqueue(self, channel_id: str, resource_id: str, channel_token: str) -> bool:
+        """
+        Record a notification for a channel.
+
+        Returns:
+            True if queued; False if the queue is unavailable (caller should process inline)
+        """
+        now = self._clock()
+        try:
+            self._collection_getter().update_one(
+                {"_id": channel_id},
+                {
+                    "$set": {
+                        "resourceId": resource_id,
+                        "token": channel_token,
+                        "pending": True,
+                        "lastReceivedAt": now
+                    },
+                    "$setOnInsert": {
+                        "firstReceivedAt": now,
+                        "dueAt": now + self._debounce,
+                        "leaseUntil": now,
+                        "attempts": 0
+                    },
+                    "$inc": {"notifications": 1}
+                },
+                upsert=True
+            )
+            self._count('enqueued')
+            return True
+        except Exception as e:
+            print(f"Calendar webhook enqueue failed for channel {channel_id}: {e}")
+            return False
+
+    def _claim(self, now: datetime, force: bool) -> Optional[Dict[str, Any]]:
+        query: Dict[str, Any] = {"pending": True, "leaseUntil": {"$lte": now}}
+        if not force:
+            query["dueAt"] = {"$lte": now}
+        return self._collection_getter().find_one_and_update(
+            query,
+            {"$set": {"pending": False, "leaseUntil": now + self._lease, "notifications": 0}},
+            sort=[("dueAt", 1)],
+            return_document=ReturnDocument.BEFORE
+        )
+
+    def _complete(self, channel_id: str) -> None:
+        collection = self._collection_getter()
+        result = collection.delete_one({"_id": channel_id, "pending": False})
+        if not getattr(result, 'deleted_count', 1):
+            # Notified again while syncing: run once more after a fresh debounce
+            now = self._clock()
+            collection.update_one(
+                {"_id": channel_id},
+                {"$set": {"leaseUntil": now, "dueAt": now + self._debounce, "attempts": 0}}
+            )
+
+    def _fail(self, doc: Dict[str, Any]) -> None:
+        collection = self._collection_getter()
+        attempts = int(doc.get('attempts', 0)) + 1
+        if attempts >= self._max_attempts:
+            collection.delete_one({"_id": doc['_id']})
+            self._count('dropped')
+            print(f"Dropping calendar notification for channel {doc['_id']} after {attempts} attempts")
+            return
+        now = self._clock()
+        # Back off linearly; a newer notification keeps pending=True as well
+        collection.update_one(
+            {"_id": doc['_id']},
+            {"$set": {
+                "pending": True,
+                "leaseUntil": now,
+                "dueAt": now + self._debounce * (attempts + 1),
+                "attempts": attempts
+            }}
+        )
+
+    def process_due(self, force: bool = False, limit: int = 100) -> int:
+        """
+        Claim and sync due channels.
+
+        Args:
+            force: Ignore the debounce deadline (used when draining)
+            limit: Most channels handled in one call
+
+        Returns:
+            Number of channels processed
+        """
+        processed = 0
+        while processed < limit:
+            try:
+                doc = self._claim(self._clock(), force)
+            except Exception as e:
+                print(f"Calendar webhook queue claim failed: {e}")
+                break
+            if not doc:
+                break
+            processed += 1
+            self._count('collapsed', max(0, int(doc.get('notifications', 1)) - 1))
+            try:
+                result = self._get_processor()(doc['_id'], doc.get('resourceId'), doc.get('token'))
+                print(f"Calendar notification for channel {doc['_id']} "
+                      f"({doc.get('notifications', 1)} collapsed): {(result or {}).get('status')}")
+                self._complete(doc['_id'])
+                self._count('processed')
+            except Exception as e:
+                print(f"Calendar notification sync failed for channel {doc['_id']}: {e}")
+                self._count('failed')
+                try:
+                    self._fail(doc)
+                except Exception as fail_error:
+                    print(f"Could not reschedule calendar notification {doc['_id']}: {fail_error}")
+        return processed
+
+    def ensure_worker(self) -> None:
+        """Start the queue worker thread once per process."""
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._owner_pid == os.getpid():
+                return
+            self._owner_pid = os.getpid()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="calendar-webhook-queue", daemon=True)
+            self._thread.start()
+
+    def ensure_web_worker(self) -> None:
+        """Start this web process's worker unless a dedicated calendar-webhooks process drains the queue."""
+        if self._worker_in_web:
+            self.ensure_worker()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            if not self.process_due():
+                self._stop_event.wait(self._poll_interval)
+
+    def run_forever(self) -> None:
+        """Process due channels in the foreground until stop() is called."""
+        print(f"Calendar webhook queue worker started (poll={self._poll_interval}s)")
+        self._run()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+def _get_webhook_queue_collection():
+    # Lazy import keeps this module importable without database configuration
+    from backend.db_config import get_calendar_webhook_queue_collection
+    return get_calendar_webhook_queue_collection()
+
+
+# Shared singleton instance for application use
+calendar_webhook_queue = CalendarWebhookQueue(
+    debounce_seconds=float(os.getenv('CALENDAR_WEBHOOK_DEBOUNCE_SECONDS', '3')),
+    poll_interval=float(os.getenv('CALENDAR_WEBHOOK_POLL_SECONDS', '1')),
+    worker_in_web=os.getenv('CALENDAR_WEBHOOK_WORKER_IN_WEB', 'true').lower() not in ('0', 'false', 'no')
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued Google Calendar push notifications")
+    parser.add_argument('--once', action='store_true', help="Process every queued channel now, ignoring debounce, and exit")
+    args = parser.parse_args()
+
+    if args.once:
+        print(calendar_webhook_queue.process_due(force=True))
+    else:
+        calendar_webhook_queue.run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,228 @@
 """
-Lightweight in-memory event bus for server-side publish/subscribe.
+Lightweight event bus for server-side publish/subscribe.
 
 This module provides a simple pub/sub mechanism used by the SSE endpoint to
-push realtime updates to connected clients. It is intentionally minimal and
-process-local. For multi-process or multi-instance deployments, replace the
-implementation with a shared broker (e.g., Redis Pub/Sub).
+push realtime updates to connected clients. Subscribers always live in the
+local process; publishing goes through a pluggable backend:
+
+- LocalEventBackend: delivers in-process only (default, and the stand-in for tests)
+- MongoCappedEventBackend: shares events between gunicorn workers and instances
+  through a MongoDB capped collection read with a tailable cursor
+
+Select the backend with EVENT_BUS_BACKEND=local|mongo.
 """
 
 from __future__ import annotations
 
+import asyncio
+import os
+import socket
+import threading
+import traceback
+import uuid
 from collections import defaultdict
+from datetime import datetime, timezone
 from queue import Queue
 from threading import Lock
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Union
+
+from bson import Timestamp
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+
+# Capped collection shared by all workers when EVENT_BUS_BACKEND=mongo
+EVENT_BUS_COLLECTION = 'EventBusMessages'
+EVENT_BUS_COLLECTION_SIZE_BYTES = 16 * 1024 * 1024
+
+DeliverFn = Callable[[str, Dict[str, Any]], None]
+
+
+class LocalEventBackend:
+    """Process-local backend: published events go straight to local subscribers."""
+
+    def start(self, deliver: DeliverFn) -> None:
+        self._deliver = deliver
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        self._deliver(user_id, event)
+
+    def stop(self) -> None:
+        pass
+
+
+class MongoCappedEventBackend:
+    """Cross-process backend built on a MongoDB capped collection.
+
+    Publishing delivers to local subscribers immediately and inserts the event
+    into the capped collection. A daemon thread per process tails the collection
+    with a TAILABLE_AWAIT cursor and delivers events written by other processes,
+    so cross-worker latency is bounded by the await timeout rather than a poll
+    interval.
+
+    Each document carries a `ts` that the server fills in on insert (an empty
+    BSON Timestamp), so `ts` follows insertion order across every publisher.
+    A restarted tail resumes after the last `ts` it saw; ObjectIds are made by
+    each client and are not ordered between processes.
+    """
+
+    def __init__(
+        self,
+        collection_getter: Optional[Callable[[], Any]] = None,
+        max_await_ms: int = 500
+    ) -> None:
+        """
+        Args:
+            collection_getter: Callable returning the capped collection
+                (defaults to EventBusMessages in the application database)
+            max_await_ms: How long the server holds a tail request open without new events
+        """
+        self._collection_getter = collection_getter or _get_event_bus_collection
+        self._max_await_ms = max_await_ms
+        self._deliver: Optional[DeliverFn] = None
+        self._lock = Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_pid: Optional[int] = None
+        self._origin: Optional[str] = None
+        self._last_ts: Optional[Timestamp] = None
+        # Broker collection resolved once per process (the getter may create it)
+        self._collection = None
+        self._collection_pid: Optional[int] = None
+        self._collection_lock = Lock()
+
+    @property
+    def origin(self) -> str:
+        """Identifier of this process, regenerated after a fork."""
+        if self._origin is None or self._owner_pid != os.getpid():
+            self._owner_pid = os.getpid()
+            self._origin = f"{socket.gethostname()}:{self._owner_pid}:{uuid.uuid4().hex[:8]}"
+        return self._origin
+
+    def start(self, deliver: DeliverFn) -> None:
+        self._deliver = deliver
+
+    def _get_collection(self):
+        with self._collection_lock:
+            if self._collection is None or self._collection_pid != os.getpid():
+                self._collection = self._collection_getter()
+                self._collection_pid = os.getpid()
+            return self._collection
+
+    def ensure_tailing(self) -> None:
+        """Start the tail thread once per process (called on first subscribe)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._owner_pid == os.getpid():
+                return
+            # Touch origin so a forked child gets its own identity before tailing
+            _ = self.origin
+            self._stop_event.clear()
+            self._last_ts = None
+            self._thread = threading.Thread(
+                target=self._run,
+                name="event-bus-tail",
+                daemon=True
+            )
+            self._thread.start()
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        # Local subscribers should not wait for a round trip through the database
+        if self._deliver:
+            self._deliver(user_id, event)
+        try:
+            self._get_collection().insert_one({
+                # Empty timestamp: the server stamps it with its insertion order
+                "ts": Timestamp(0, 0),
+                "userId": user_id,
+                "event": event,
+                "origin": self.origin,
+                "createdAt": datetime.now(timezone.utc)
+            })
+        except PyMongoError as e:
+            print(f"Event bus publish to broker failed for user {user_id}: {e}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+
+    def handle_document(self, doc: Dict[str, Any]) -> None:
+        """Deliver a broker document unless this process published it."""
+        if isinstance(doc.get('ts'), Timestamp):
+            self._last_ts = doc['ts']
+        if doc.get('origin') == self.origin or not self._deliver:
+            return
+        user_id = doc.get('userId')
+        event = doc.get('event')
+        if user_id and isinstance(event, dict):
+            self._deliver(user_id, event)
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stop_event.is_set():
+            try:
+                self._tail_once()
+                backoff = 0.5
+            except PyMongoError as e:
+                print(f"Event bus tail error: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 10.0)
+            except Exception as e:
+                print(f"Unexpected event bus tail error: {e}")
+                traceback.print_exc()
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 10.0)
+
+    def _tail_once(self) -> None:
+        """Follow the capped collection until the cursor dies or we are stopped."""
+        collection = self._get_collection()
+        if self._last_ts is None:
+            # Only events published after this process started tailing matter
+            newest = list(collection.find({}, {"ts": 1}).sort("$natural", -1).limit(1))
+            newest_ts = newest[0].get("ts") if newest else None
+            # Documents written before `ts` existed: start from now instead
+            self._last_ts = newest_ts if isinstance(newest_ts, Timestamp) else Timestamp(datetime.now(timezone.utc), 0)
+
+        query = {"ts": {"$gt": self._last_ts}}
+        cursor = collection.find(
+            query,
+            cursor_type=CursorType.TAILABLE_AWAIT
+        ).max_await_time_ms(self._max_await_ms)
+        try:
+            while cursor.alive and not self._stop_event.is_set():
+                for doc in cursor:
+                    self.handle_document(doc)
+                    if self._stop_event.is_set():
+                        break
+        finally:
+            cursor.close()
+
+        # A tailable cursor on an empty collection dies immediately
+        self._stop_event.wait(self._max_await_ms / 1000.0)
+
+
+class AsyncSubscriberQueue(asyncio.Queue):
+    """asyncio.Queue that publishers on other threads can feed.
+
+    EventBus publishers run on worker threads, so puts are handed to the owning
+    event loop instead of touching the queue directly.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__()
+        self._owner_loop = loop
+
+    def put_nowait(self, item: Any) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._owner_loop:
+            super().put_nowait(item)
+        else:
+            # Raises RuntimeError once the loop is closed, which drops the subscriber
+            self._owner_loop.call_soon_threadsafe(super().put_nowait, item)
 
 
 class EventBus:
@@ -20,22 +230,38 @@ class EventBus:
 
     Subscribers are keyed by `user_id`. Each subscriber is represented by a
     `Queue` that receives event payloads. Publishers push events to all queues
-    registered under the given `user_id`.
+    registered under the given `user_id`, in this process and, with a shared
+    backend, in every other process.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, backend=None) -> None:
         # Map of user_id to list of subscriber queues
-        self._subscribers: Dict[str, List[Queue]] = defaultdict(list)
+        self._subscribers: Dict[str, List[Union[Queue, AsyncSubscriberQueue]]] = defaultdict(list)
         self._lock = Lock()
+        self._backend = backend or LocalEventBackend()
+        self._backend.start(self.publish_local)
 
     def subscribe(self, user_id: str) -> Queue:
         """Register a new subscriber for a user and return its queue."""
+        ensure_tailing = getattr(self._backend, 'ensure_tailing', None)
+        if ensure_tailing:
+            ensure_tailing()
         subscriber_queue: Queue = Queue()
         with self._lock:
             self._subscribers[user_id].append(subscriber_queue)
         return subscriber_queue
 
-    def unsubscribe(self, user_id: str, subscriber_queue: Queue) -> None:
+    def subscribe_async(self, user_id: str) -> AsyncSubscriberQueue:
+        """Register a subscriber for a coroutine running on the current event loop."""
+        ensure_tailing = getattr(self._backend, 'ensure_tailing', None)
+        if ensure_tailing:
+            ensure_tailing()
+        subscriber_queue = AsyncSubscriberQueue(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].append(subscriber_queue)
+        return subscriber_queue
+
+    def unsubscribe(self, user_id: str, subscriber_queue: Union[Queue, AsyncSubscriberQueue]) -> None:
         """Remove a subscriber queue for a user if present."""
         with self._lock:
             queues = self._subscribers.get(user_id)
@@ -50,8 +276,17 @@ class EventBus:
                 # Clean up empty list to avoid memory growth
                 self._subscribers.pop(user_id, None)
 
+    def subscribed_user_ids(self) -> List[str]:
+        """Return a snapshot of user IDs with at least one local subscriber."""
+        with self._lock:
+            return [user_id for user_id, queues in self._subscribers.items() if queues]
+
     def publish(self, user_id: str, event: Dict[str, Any]) -> None:
-        """Publish an event to all subscribers of a user.
+        """Publish an event to all subscribers of a user, in every process."""
+        self._backend.publish(user_id, event)
+
+    def publish_local(self, user_id: str, event: Dict[str, Any]) -> None:
+        """Publish an event to subscribers of a user in this process only.
 
         If a queue refuses the event, it will be removed to prevent leaks.
         """
@@ -69,7 +304,42 @@ class EventBus:
                 self._subscribers.pop(user_id, None)
 
 
-# Shared singleton instance for application use
-event_bus = EventBus()
+def _get_event_bus_collection():
+    """Return the capped broker collection, creating it if it does not exist.
+
+    MongoCappedEventBackend calls this once per process and keeps the handle.
+    """
+    # Lazy import keeps this module importable without database configuration
+    from backend.db_config import get_database
+
+    db = get_database()
+    try:
+        db.create_collection(
+            EVENT_BUS_COLLECTION,
+            capped=True,
+            size=EVENT_BUS_COLLECTION_SIZE_BYTES
+        )
+        # Tailable cursors die immediately on an empty collection
+        db[EVENT_BUS_COLLECTION].insert_one({
+            "ts": Timestamp(0, 0),
+            "seed": True,
+            "createdAt": datetime.now(timezone.utc)
+        })
+    except CollectionInvalid:
+        # Already created (by an earlier run or another worker)
+        pass
+    return db[EVENT_BUS_COLLECTION]
 
 
+def create_event_backend(name: Optional[str] = None):
+    """Build the backend named by EVENT_BUS_BACKEND ('local' or 'mongo')."""
+    name = (name or os.getenv('EVENT_BUS_BACKEND', 'local')).lower()
+    if name == 'mongo':
+        return MongoCappedEventBackend()
+    if name != 'local':
+        print(f"Unknown EVENT_BUS_BACKEND '{name}', using local event bus")
+    return LocalEventBackend()
+
+
+# Shared singleton instance for application use
+event_bus = EventBus(create_event_backend())
@@ -0,0 +1,199 @@
+"""
+Per-process change feed for UserSchedules.
+
+One background watcher per worker process turns schedule writes (from any
+worker or instance) into `schedule_updated` events on the local EventBus, so
+SSE connections never query the database themselves.
+
+The watcher tails a MongoDB change stream when the deployment supports it
+(replica sets / Atlas). Otherwise it falls back to polling: each tick issues a
+single `$in` query covering every locally subscribed user, so database load
+follows the number of users with open dashboards on this worker rather than the
+number of open connections.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend.db_config import get_user_schedules_collection
+from backend.models.schedule_schema import format_schedule_date
+from backend.services.event_bus import EventBus, event_bus
+
+
+# Server error codes meaning change streams are unavailable on this deployment
+_CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 40324, 136}
+# ChangeStreamHistoryLost / ChangeStreamFatalError: the resume token can never be used again
+_RESUME_TOKEN_LOST_CODES = {286, 280}
+
+
+class ScheduleChangeFeed:
+    """Fans UserSchedules changes into the EventBus from a single daemon thread."""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        collection_getter=get_user_schedules_collection,
+        poll_interval: float = 2.0,
+        mode: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            bus: EventBus that receives `schedule_updated` events
+            collection_getter: Callable returning the UserSchedules collection
+            poll_interval: Seconds between polls when change streams are unavailable
+            mode: 'auto' (change stream with polling fallback), 'change_stream' or 'poll'
+        """
+        self._bus = bus
+        self._collection_getter = collection_getter
+        self._poll_interval = poll_interval
+        self._mode = mode or os.getenv('SCHEDULE_CHANGE_FEED_MODE', 'auto')
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_pid: Optional[int] = None
+        self._resume_token = None
+        # (user_id, stored date) -> last seen metadata.last_modified, for polling mode
+        self._last_seen: Dict[Tuple[str, str], str] = {}
+
+    def ensure_started(self) -> None:
+        """Start the watcher thread once per process (safe to call on every request)."""
+        with self._lock:
+            # A thread started before a fork does not exist in the child
+            if self._thread and self._thread.is_alive() and self._owner_pid == os.getpid():
+                return
+            self._stop_event.clear()
+            self._owner_pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="schedule-change-feed",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal the watcher thread to exit and wait briefly for it."""
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        use_change_stream = self._mode in ('auto', 'change_stream')
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                if use_change_stream:
+                    self._watch_change_stream()
+                else:
+                    self.poll_once()
+                    self._stop_event.wait(self._poll_interval)
+                backoff = 1.0
+            except OperationFailure as e:
+                if use_change_stream and self._mode == 'auto' and e.code in _CHANGE_STREAM_UNSUPPORTED_CODES:
+                    print("Schedule change feed: change streams unavailable, falling back to batched polling")
+                    use_change_stream = False
+                    continue
+                if use_change_stream and self._resume_token is not None and e.code in _RESUME_TOKEN_LOST_CODES:
+                    # Changes missed while disconnected are gone; restart the stream from now
+                    print(f"Schedule change feed: resume token no longer usable ({e.code}), restarting stream")
+                    self._resume_token = None
+                    continue
+                print(f"Schedule change feed error: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            except PyMongoError as e:
+                print(f"Schedule change feed error: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            except Exception as e:
+                print(f"Unexpected schedule change feed error: {e}")
+                traceback.print_exc()
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _watch_change_stream(self) -> None:
+        """Tail UserSchedules writes until stopped or the stream errors."""
+        collection = self._collection_getter()
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+            {"$project": {"fullDocument.userId": 1, "fullDocument.date": 1}}
+        ]
+        with collection.watch(
+            pipeline,
+            full_document='updateLookup',
+            resume_after=self._resume_token,
+            max_await_time_ms=1000
+        ) as stream:
+            while not self._stop_event.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    continue
+                self._resume_token = stream.resume_token
+                full_document = change.get('fullDocument') or {}
+                self._publish(full_document.get('userId'), full_document.get('date'))
+
+    def poll_once(self) -> int:
+        """
+        Check schedules of all locally subscribed users with one `$in` query.
+
+        Looks at yesterday/today/tomorrow (UTC), which covers "today" in every
+        timezone. The first observation of a schedule is only memorized; later
+        changes to metadata.last_modified publish `schedule_updated`.
+
+        Returns:
+            Number of events published
+        """
+        user_ids = self._bus.subscribed_user_ids()
+        if not user_ids:
+            self._last_seen.clear()
+            return 0
+
+        now_utc = datetime.now(timezone.utc)
+        dates = [
+            format_schedule_date((now_utc + timedelta(days=offset)).strftime('%Y-%m-%d'))
+            for offset in (-1, 0, 1)
+        ]
+
+        collection = self._collection_getter()
+        docs = collection.find(
+            {"userId": {"$in": user_ids}, "date": {"$in": dates}},
+            {"_id": 0, "userId": 1, "date": 1, "metadata.last_modified": 1}
+        )
+
+        published = 0
+        for doc in docs:
+            key = (doc.get('userId'), doc.get('date'))
+            current = (doc.get('metadata') or {}).get('last_modified')
+            if not current:
+                continue
+            previous = self._last_seen.get(key)
+            self._last_seen[key] = current
+            if previous is not None and previous != current:
+                self._publish(*key)
+                published += 1
+
+        # Forget users who disconnected and dates that rolled out of the window
+        subscribed, window = set(user_ids), set(dates)
+        for key in list(self._last_seen):
+            if key[0] not in subscribed or key[1] not in window:
+                self._last_seen.pop(key, None)
+        return published
+
+    def _publish(self, user_id: Optional[str], stored_date: Optional[str]) -> None:
+        if not user_id or not stored_date:
+            return
+        date_str = stored_date.split('T')[0]
+        # Every worker runs its own feed, so fan out locally rather than through
+        # a shared bus backend (which would deliver once per worker)
+        self._bus.publish_local(user_id, {"type": "schedule_updated", "date": date_str})
+
+
+# Shared singleton instance for application use
+schedule_change_feed = ScheduleChangeFeed(event_bus)
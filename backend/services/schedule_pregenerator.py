@@ -0,0 +1,243 @@
+"""
+Background pre-generation of each day's schedule.
+
+`autogenerate_schedule` normally runs on a user's first dashboard load of the day,
+putting the history scan, recurring-task expansion and Google Calendar fetch on
+the critical path of a cold page load. This job runs the same generation ahead
+of time: users are grouped by IANA timezone, and in the first `window_minutes`
+after each timezone's local midnight every user in it gets the new day's
+schedule built. Each user gets a stable slot within that window so the load is
+spread across the hour instead of spiking at :00.
+
+Generating after midnight rather than before it matters: carry-over copies the
+incomplete tasks of the previous day, and tasks finished late in the evening
+would otherwise be carried into a schedule that is never rebuilt.
+
+Generation is idempotent (an existing schedule is left untouched), so the
+morning request becomes a plain `get_schedule_by_date` read.
+
+Run as a separate process (not inside web workers):
+    python -m backend.services.schedule_pregenerator --concurrency 4
+    python -m backend.services.schedule_pregenerator --once --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from backend.utils.timezone import get_reliable_user_timezone
+
+
+# (user_id, timezone, target date YYYY-MM-DD)
+PregenJob = Tuple[str, str, str]
+
+
+class SchedulePregenerator:
+    """Generates each day's schedules shortly after each user's local midnight."""
+
+    def __init__(
+        self,
+        service=None,
+        users_getter: Optional[Callable[[], Any]] = None,
+        window_minutes: int = 60,
+        max_workers: int = 4,
+        dry_run: bool = False,
+        tick_seconds: float = 60.0,
+        groups_refresh_seconds: float = 900.0
+    ) -> None:
+        """
+        Args:
+            service: ScheduleService used for generation (defaults to the shared instance)
+            users_getter: Callable returning the users collection
+            window_minutes: Length of the window after local midnight used for generation
+            max_workers: Maximum schedules generated concurrently
+            dry_run: Log what would be generated without writing anything
+            tick_seconds: Interval between scheduling passes in run_forever
+            groups_refresh_seconds: How long the timezone grouping is reused before re-reading users
+        """
+        self._service = service
+        self._users_getter = users_getter
+        self._window_seconds = window_minutes * 60
+        self._max_workers = max(1, max_workers)
+        self._dry_run = dry_run
+        self._tick_seconds = tick_seconds
+        self._groups_refresh_seconds = groups_refresh_seconds
+        self._groups: Dict[str, List[str]] = {}
+        self._groups_loaded_at: Optional[float] = None
+        # target date -> user IDs already handled for it
+        self._done: Dict[str, set] = defaultdict(set)
+        self._stop_event = threading.Event()
+
+    def _get_service(self):
+        if self._service is None:
+            # Lazy import: schedule_service pulls in the full service layer
+            from backend.services.schedule_service import schedule_service
+            self._service = schedule_service
+        return self._service
+
+    def _get_users_collection(self):
+        if self._users_getter is None:
+            from backend.db_config import get_users_collection
+            self._users_getter = get_users_collection
+        return self._users_getter()
+
+    def group_users_by_timezone(self, force: bool = False) -> Dict[str, List[str]]:
+        """
+        Group user IDs by their reliable IANA timezone.
+
+        The grouping is cached for `groups_refresh_seconds` so each pass does
+        not re-read the whole users collection.
+        """
+        now = time.monotonic()
+        if (not force and self._groups_loaded_at is not None
+                and now - self._groups_loaded_at < self._groups_refresh_seconds):
+            return self._groups
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        cursor = self._get_users_collection().find({}, {"_id": 0, "googleId": 1, "timezone": 1})
+        for user in cursor:
+            user_id = user.get('googleId')
+            if user_id:
+                groups[get_reliable_user_timezone(user.get('timezone'))].append(user_id)
+
+        self._groups = dict(groups)
+        self._groups_loaded_at = now
+        return self._groups
+
+    def _slot_seconds(self, user_id: str) -> int:
+        """Stable offset of a user within the window (last 10% kept for retrying failures)."""
+        spread = max(1, int(self._window_seconds * 0.9))
+        digest = hashlib.sha1(user_id.encode('utf-8')).hexdigest()
+        return int(digest, 16) % spread
+
+    def due_jobs(self, now_utc: datetime, groups: Dict[str, List[str]]) -> List[PregenJob]:
+        """
+        Return jobs whose slot has arrived in the post-midnight window of their timezone.
+
+        Args:
+            now_utc: Current time (timezone-aware)
+            groups: Mapping of timezone to user IDs
+
+        Returns:
+            List of (user_id, timezone, target_date) not yet handled
+        """
+        jobs: List[PregenJob] = []
+        for tz_name, user_ids in groups.items():
+            local_now = now_utc.astimezone(ZoneInfo(tz_name))
+            midnight = datetime.combine(local_now.date(), datetime.min.time(), tzinfo=local_now.tzinfo)
+            elapsed_in_window = (local_now - midnight).total_seconds()
+            if elapsed_in_window >= self._window_seconds:
+                continue
+
+            target_date = local_now.strftime('%Y-%m-%d')
+            done = self._done[target_date]
+            for user_id in user_ids:
+                if user_id not in done and elapsed_in_window >= self._slot_seconds(user_id):
+                    jobs.append((user_id, tz_name, target_date))
+        return jobs
+
+    def _generate(self, job: PregenJob) -> str:
+        user_id, tz_name, target_date = job
+        try:
+            success, result = self._get_service().autogenerate_schedule(
+                user_id, target_date, user_timezone=tz_name
+            )
+            if not success:
+                print(f"Schedule pregeneration failed for user {user_id} on {target_date}: {result.get('error')}")
+                return 'failed'
+            if result.get('existed'):
+                return 'existed'
+            if not result.get('sourceFound', True) and not result.get('created'):
+                return 'no_source'
+            return 'created'
+        except Exception as e:
+            print(f"Error pregenerating schedule for user {user_id} on {target_date}: {e}")
+            traceback.print_exc()
+            return 'failed'
+
+    def run_once(self, now_utc: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Run one scheduling pass.
+
+        Returns:
+            Counts of due jobs and their outcomes
+        """
+        now_utc = now_utc or datetime.now(timezone.utc)
+        self._prune_done(now_utc)
+        jobs = self.due_jobs(now_utc, self.group_users_by_timezone())
+        counts = {'due': len(jobs), 'created': 0, 'existed': 0, 'no_source': 0, 'failed': 0}
+        if not jobs:
+            return counts
+
+        if self._dry_run:
+            for user_id, tz_name, target_date in jobs:
+                print(f"[DRY RUN] Would pregenerate {target_date} for user {user_id} ({tz_name})")
+                self._done[target_date].add(user_id)
+            return counts
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="schedule-pregen") as pool:
+            outcomes = list(pool.map(self._generate, jobs))
+
+        for job, outcome in zip(jobs, outcomes):
+            counts[outcome] += 1
+            # Failures are retried on the next pass while the window is still open
+            if outcome != 'failed':
+                self._done[job[2]].add(job[0])
+
+        print(f"Schedule pregeneration pass: {counts}")
+        return counts
+
+    def _prune_done(self, now_utc: datetime) -> None:
+        # Target dates are local dates within a day of UTC, so anything older is finished
+        cutoff = (now_utc - timedelta(days=2)).strftime('%Y-%m-%d')
+        for target_date in [d for d in self._done if d < cutoff]:
+            self._done.pop(target_date, None)
+
+    def run_forever(self) -> None:
+        """Run passes every `tick_seconds` until stop() is called."""
+        mode = "dry-run" if self._dry_run else f"concurrency={self._max_workers}"
+        print(f"Schedule pregenerator started ({mode}, window={self._window_seconds // 60}m)")
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Schedule pregenerator pass failed: {e}")
+                traceback.print_exc()
+            self._stop_event.wait(self._tick_seconds)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate each day's schedules just after each user's local midnight")
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum schedules generated at once")
+    parser.add_argument('--window-minutes', type=int, default=60, help="Window after local midnight to spread work across")
+    parser.add_argument('--tick-seconds', type=float, default=60.0)
+    parser.add_argument('--dry-run', action='store_true', help="Log due users without generating schedules")
+    parser.add_argument('--once', action='store_true', help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    pregenerator = SchedulePregenerator(
+        window_minutes=args.window_minutes,
+        max_workers=args.concurrency,
+        dry_run=args.dry_run,
+        tick_seconds=args.tick_seconds
+    )
+    if args.once:
+        print(pregenerator.run_once())
+    else:
+        pregenerator.run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,14 +14,17 @@ import traceback
 import uuid
 from datetime import datetime, timedelta
 
+from pymongo import DESCENDING
+
 from backend.db_config import get_user_schedules_collection
 from backend.services.schedule_gen import generate_local_sections
+from backend.services.user_cache import user_cache
 from backend.models.schedule_schema import (
     validate_schedule_document, 
     format_schedule_date, 
     format_timestamp
 )
-import backend.services.calendar_service as calendar_service
+from backend.services.calendar_revalidator import calendar_revalidator
 
 
 class ScheduleService:
@@ -37,7 +40,7 @@ class ScheduleService:
         self.schedules_collection = get_user_schedules_collection()
 
     def _get_calendar_fetch_timeout(self) -> float:
-        """Sub-timeout in seconds for calendar fetch; override in tests if needed."""
+        """Longest calendar wait when no stored events exist; override in tests if needed."""
         return 10.0
 
     def get_schedule_by_date(
@@ -243,7 +246,8 @@ class ScheduleService:
         self,
         user_id: str,
         date: str,
-        calendar_tasks: List[Dict[str, Any]]
+        calendar_tasks: List[Dict[str, Any]],
+        removed_event_ids: Optional[List[str]] = None
     ) -> Tuple[bool, Dict[str, Any]]:
         """
         Merge calendar events for webhook/SSE updates with a preservation-first strategy:
@@ -251,6 +255,8 @@ class ScheduleService:
         - Upsert fetched events by gcal_event_id, preserving local completion and ID, updating Google fields
         - Skip fetched events lacking gcal_event_id to avoid duplication
         - Leave schedule untouched if fetched set is empty (non-destructive)
+        - Drop calendar tasks whose gcal_event_id is in removed_event_ids (incremental
+          sync deltas for cancelled events or events moved off this date)
 
         This logic is intentionally scoped to webhook/SSE updates and differs from
         create_schedule_from_calendar_sync which is used for other sync paths.
@@ -265,6 +271,12 @@ class ScheduleService:
             })
 
             existing_tasks: List[Dict[str, Any]] = existing_schedule.get('schedule', []) if existing_schedule else []
+            if removed_event_ids:
+                removed = set(removed_event_ids)
+                existing_tasks = [
+                    t for t in existing_tasks
+                    if not (t.get('from_gcal', False) and t.get('gcal_event_id') in removed)
+                ]
             non_calendar_tasks = self._filter_non_calendar_tasks(existing_tasks)
             existing_calendar_tasks = self._filter_calendar_tasks(existing_tasks)
 
@@ -410,7 +422,9 @@ class ScheduleService:
             enhanced_tasks = list(tasks) if tasks else []
             
             # Step 2: Always get most recent schedule (needed for sections and inputs)
-            recent_schedule = self._get_most_recent_schedule_with_inputs(user_id, date)
+            # Load the lookback window once so inputs and recurring lookups share it
+            history = self._load_schedule_history(user_id, date)
+            recent_schedule = self._get_most_recent_schedule_with_inputs(user_id, date, history=history)
             
             # Use inputs from recent schedule if not provided
             if not inputs:
@@ -434,7 +448,7 @@ class ScheduleService:
                     print(f"Created {len(section_tasks)} section tasks from layout config")
             
             # Step 4: Find recurring tasks for this date
-            recurring_tasks = self._get_recurring_tasks_for_date(user_id, date)
+            recurring_tasks = self._get_recurring_tasks_for_date(user_id, date, history=history)
             
             # Step 5: Combine all tasks in order: sections first, then recurring tasks, then any provided tasks
             final_tasks = section_tasks + recurring_tasks + enhanced_tasks
@@ -573,7 +587,8 @@ class ScheduleService:
         self,
         user_id: str,
         before_date: str,
-        max_days_back: int = 30
+        max_days_back: int = 30,
+        history: Optional[List[Dict[str, Any]]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Find the most recent schedule (strictly before before_date) that has at least one
@@ -584,25 +599,16 @@ class ScheduleService:
             user_id: User's Google ID or Firebase UID
             before_date: Date string in YYYY-MM-DD format to search backwards from
             max_days_back: Maximum number of days to search backwards (default 30)
+            history: Optional pre-loaded window from _load_schedule_history
 
         Returns:
             The schedule document if found, otherwise None
         """
         try:
-            target_dt = datetime.strptime(before_date, '%Y-%m-%d')
-
-            for days_back in range(1, max_days_back + 1):
-                search_dt = target_dt - timedelta(days=days_back)
-                formatted_date = format_schedule_date(search_dt.strftime('%Y-%m-%d'))
-
-                schedule_doc = self.schedules_collection.find_one({
-                    "userId": user_id,
-                    "date": formatted_date
-                })
-
-                if not schedule_doc:
-                    continue
+            if history is None:
+                history = self._load_schedule_history(user_id, before_date, max_days_back)
 
+            for schedule_doc in self._iter_schedule_history(history, before_date, max_days_back):
                 tasks = schedule_doc.get('schedule', [])
                 non_section = [t for t in tasks if not t.get('is_section', False) and t.get('type') != 'section']
                 if len(non_section) > 0:
@@ -614,6 +620,70 @@ class ScheduleService:
             traceback.print_exc()
             return None
 
+    def _load_schedule_history(
+        self,
+        user_id: str,
+        before_date: str,
+        max_days_back: int = 30
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load all schedules in the window [before_date - max_days_back, before_date)
+        with a single ranged query on the (userId, date) index, newest first.
+
+        The history lookbacks accept the returned list via their `history` argument,
+        so a request that needs several of them pays for one round trip instead of
+        one find_one per day per lookback.
+
+        Args:
+            user_id: User's Google ID or Firebase UID
+            before_date: Date string in YYYY-MM-DD format (exclusive upper bound)
+            max_days_back: Number of days to load (default 30)
+
+        Returns:
+            List of schedule documents sorted by date descending, or None on error
+        """
+        try:
+            target_dt = datetime.strptime(before_date, '%Y-%m-%d')
+            window_start = format_schedule_date((target_dt - timedelta(days=max_days_back)).strftime('%Y-%m-%d'))
+            window_end = format_schedule_date(before_date)
+
+            cursor = self.schedules_collection.find(
+                {
+                    "userId": user_id,
+                    "date": {"$gte": window_start, "$lt": window_end}
+                },
+                {"_id": 0, "userId": 1, "date": 1, "schedule": 1, "inputs": 1, "metadata": 1}
+            ).sort("date", DESCENDING)
+
+            return list(cursor)
+        except Exception as e:
+            print(f"Error loading schedule history: {str(e)}")
+            traceback.print_exc()
+            return None
+
+    def _iter_schedule_history(
+        self,
+        history: Optional[List[Dict[str, Any]]],
+        before_date: str,
+        max_days_back: int
+    ):
+        """
+        Yield schedules from a pre-loaded history window (newest first) that fall
+        within [before_date - max_days_back, before_date). Lets callers with a
+        shorter lookback reuse a wider window.
+        """
+        if not history:
+            return
+
+        target_dt = datetime.strptime(before_date, '%Y-%m-%d')
+        window_start = format_schedule_date((target_dt - timedelta(days=max_days_back)).strftime('%Y-%m-%d'))
+        window_end = format_schedule_date(before_date)
+
+        for schedule_doc in history:
+            doc_date = schedule_doc.get('date') or ''
+            if window_start <= doc_date < window_end:
+                yield schedule_doc
+
     def autogenerate_schedule(
         self,
         user_id: str,
@@ -658,19 +728,26 @@ class ScheduleService:
                     "schedule": existing.get('schedule', [])
                 }
 
-            # Step 2: Find source schedule (this searches up to 30 days back)
+            # Step 2: Load the lookback window once; source, recurring and inputs lookups share it
+            history_load_start = time.time()
+            history = self._load_schedule_history(user_id, date, max(max_days_back, 30))
+            history_load_duration = time.time() - history_load_start
+            print(f"[TIMING] History window load ({len(history or [])} schedules): {history_load_duration:.3f}s")
+
+            # Find source schedule (this searches up to max_days_back days back)
             source_lookup_start = time.time()
-            source_schedule = self.get_most_recent_schedule_with_tasks(user_id, date, max_days_back)
+            source_schedule = self.get_most_recent_schedule_with_tasks(user_id, date, max_days_back, history=history)
             source_lookup_duration = time.time() - source_lookup_start
             print(f"[TIMING] Source schedule lookup (up to {max_days_back} days): {source_lookup_duration:.3f}s")
             
             if not source_schedule:
                 # Check if user has calendar connection before early return
                 try:
-                    # Atomic check: get user with calendar data in single query
-                    user_doc = self.schedules_collection.database['users'].find_one(
-                        {"googleId": user_id},
-                        {"calendar.connected": 1, "calendar.credentials": 1, "_id": 0}
+                    # Usually already cached by the request's auth lookup
+                    users = self.schedules_collection.database['users']
+                    user_doc = user_cache.get_user(
+                        user_id,
+                        lambda: users.find_one({"googleId": user_id}, {"_id": 0})
                     )
 
                     has_valid_calendar = False
@@ -769,54 +846,40 @@ class ScheduleService:
 
             # Find recurring tasks due on target date (exclude ones already carried over)
             recurring_start = time.time()
-            recurring_tasks = self._get_recurring_tasks_for_date(user_id, date, exclude_texts=carried_over_recurring_texts)
+            recurring_tasks = self._get_recurring_tasks_for_date(
+                user_id,
+                date,
+                exclude_texts=carried_over_recurring_texts,
+                history=history
+            )
             recurring_duration = time.time() - recurring_start
             print(f"[TIMING] Recurring tasks lookup: {recurring_duration:.3f}s")
 
-            # Step 4: Fetch calendar tasks for target date with sub-timeout to respect 10s UX
+            # Step 4: Fetch calendar tasks for target date within the read latency budget.
+            # When Google is slow the last-known events are used and the live fetch
+            # is merged in the background once the schedule is saved (Step 8).
             calendar_fetch_start = time.time()
             fetched_calendar_tasks: List[Dict[str, Any]] = []
+            pending_calendar_fetch = None
             try:
                 # Allow tests to override fetch timeout via method
                 timeout_seconds = self._get_calendar_fetch_timeout()
             except Exception:
                 timeout_seconds = 8.0
 
-            print(f"[TIMING] Starting calendar fetch with {timeout_seconds}s timeout")
-            
-            try:
-                from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+            print(f"[TIMING] Starting calendar fetch with {calendar_revalidator.budget_seconds}s budget ({timeout_seconds}s cold)")
 
-                def _fetch():
-                    return calendar_service.get_calendar_tasks_for_user_date(
-                        user_id,
-                        date,
-                        timezone_override=user_timezone
-                    )
+            try:
+                fetched_calendar_tasks, pending_calendar_fetch = calendar_revalidator.read(
+                    user_id,
+                    date,
+                    user_timezone,
+                    cold_timeout_seconds=timeout_seconds
+                )
+            except Exception as e:
+                fetched_calendar_tasks = []
+                print(f"[TIMING] Calendar fetch failed: {str(e)}")
 
-                with ThreadPoolExecutor(max_workers=2) as executor:
-                    future = executor.submit(_fetch)
-                    try:
-                        fetched_calendar_tasks = future.result(timeout=timeout_seconds)
-                    except FuturesTimeout:
-                        # Proceed without calendar on timeout
-                        fetched_calendar_tasks = []
-                        print(f"[TIMING] Calendar fetch timed out after {timeout_seconds}s")
-                    except Exception as e:
-                        fetched_calendar_tasks = []
-                        print(f"[TIMING] Calendar fetch failed: {str(e)}")
-            except Exception:
-                # Fallback to direct fetch without timeout (still protected)
-                try:
-                    fetched_calendar_tasks = calendar_service.get_calendar_tasks_for_user_date(
-                        user_id,
-                        date,
-                        timezone_override=user_timezone
-                    )
-                except Exception as e:
-                    fetched_calendar_tasks = []
-                    print(f"[TIMING] Calendar fetch fallback failed: {str(e)}")
-            
             calendar_fetch_duration = time.time() - calendar_fetch_start
             print(f"[TIMING] Calendar fetch: {calendar_fetch_duration:.3f}s (fetched {len(fetched_calendar_tasks)} events)")
 
@@ -908,7 +971,7 @@ class ScheduleService:
 
             # Step 7: Get inputs from most recent schedule with inputs
             inputs_lookup_start = time.time()
-            recent_with_inputs = self._get_most_recent_schedule_with_inputs(user_id, date)
+            recent_with_inputs = self._get_most_recent_schedule_with_inputs(user_id, date, history=history)
             inputs = recent_with_inputs.get('inputs', {}) if recent_with_inputs else {}
             inputs_lookup_duration = time.time() - inputs_lookup_start
             print(f"[TIMING] Inputs lookup: {inputs_lookup_duration:.3f}s")
@@ -938,6 +1001,9 @@ class ScheduleService:
             save_duration = time.time() - save_start
             print(f"[TIMING] Document creation and save: {save_duration:.3f}s")
 
+            # Fresh calendar events that missed the budget are merged into the saved schedule
+            calendar_revalidator.revalidate_in_background(user_id, date, pending_calendar_fetch)
+
             # Step 9: Calculate final metadata
             metadata_start = time.time()
             metadata = self._calculate_schedule_metadata(final_tasks)
@@ -1023,7 +1089,8 @@ class ScheduleService:
         self, 
         user_id: str, 
         target_date: str, 
-        max_days_back: int = 30
+        max_days_back: int = 30,
+        history: Optional[List[Dict[str, Any]]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Find the most recent schedule that has non-empty input config data.
@@ -1033,33 +1100,27 @@ class ScheduleService:
             user_id: User's Google ID or Firebase UID
             target_date: Date string in YYYY-MM-DD format to search backwards from
             max_days_back: Maximum number of days to search backwards (default 30)
+            history: Optional pre-loaded window from _load_schedule_history
             
         Returns:
             Schedule document with inputs config, or None if not found
         """
         try:
-            target_dt = datetime.strptime(target_date, '%Y-%m-%d')
-            
-            # Search backwards day by day
-            for days_back in range(1, max_days_back + 1):
-                search_date = target_dt - timedelta(days=days_back)
-                formatted_date = format_schedule_date(search_date.strftime('%Y-%m-%d'))
-                
-                schedule_doc = self.schedules_collection.find_one({
-                    "userId": user_id,
-                    "date": formatted_date
-                })
-                
-                if schedule_doc:
-                    inputs = schedule_doc.get('inputs', {})
-                    # Check if inputs has meaningful data (not empty or default)
-                    if inputs and any([
-                        inputs.get('name'),
-                        inputs.get('work_start_time'),
-                        inputs.get('layout_preference', {}).get('layout')
-                    ]):
-                        print(f"Found recent schedule with inputs from {search_date.strftime('%Y-%m-%d')}")
-                        return schedule_doc
+            if history is None:
+                history = self._load_schedule_history(user_id, target_date, max_days_back)
+
+            # Walk the window newest first
+            for schedule_doc in self._iter_schedule_history(history, target_date, max_days_back):
+                inputs = schedule_doc.get('inputs', {})
+                # Check if inputs has meaningful data (not empty or default)
+                if inputs and any([
+                    inputs.get('name'),
+                    inputs.get('work_start_time'),
+                    inputs.get('layout_preference', {}).get('layout')
+                ]):
+                    found_date = (schedule_doc.get('date') or '').split('T')[0]
+                    print(f"Found recent schedule with inputs from {found_date}")
+                    return schedule_doc
                         
             print(f"No recent schedule with inputs found within {max_days_back} days")
             return None
@@ -1166,7 +1227,8 @@ class ScheduleService:
         user_id: str, 
         target_date: str, 
         max_days_back: int = 30,
-        exclude_texts: set = None
+        exclude_texts: set = None,
+        history: Optional[List[Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Find all recurring tasks that should occur on the target date.
@@ -1177,6 +1239,7 @@ class ScheduleService:
             target_date: Date string in YYYY-MM-DD format
             max_days_back: Maximum number of days to search back for recurring tasks
             exclude_texts: Set of task texts to exclude (for tasks already carried over)
+            history: Optional pre-loaded window from _load_schedule_history
             
         Returns:
             List of recurring task objects that should occur on target date
@@ -1186,38 +1249,32 @@ class ScheduleService:
             recurring_tasks = []
             seen_task_texts = set()  # Prevent duplicates
             exclude_texts = exclude_texts or set()  # Default to empty set if None
+
+            if history is None:
+                history = self._load_schedule_history(user_id, target_date, max_days_back)
             
             # Search backwards through recent schedules
-            for days_back in range(1, max_days_back + 1):
-                search_date = target_dt - timedelta(days=days_back)
-                formatted_date = format_schedule_date(search_date.strftime('%Y-%m-%d'))
-                
-                schedule_doc = self.schedules_collection.find_one({
-                    "userId": user_id,
-                    "date": formatted_date
-                })
+            for schedule_doc in self._iter_schedule_history(history, target_date, max_days_back):
+                schedule_tasks = schedule_doc.get('schedule', [])
                 
-                if schedule_doc:
-                    schedule_tasks = schedule_doc.get('schedule', [])
-                    
-                    # Check each task for recurrence
-                    for task in schedule_tasks:
-                        task_text = task.get('text', '')
-                        if (task.get('is_recurring') and 
-                            not task.get('is_section', False) and
-                            task_text not in seen_task_texts and
-                            task_text not in exclude_texts):
-                            
-                            if self._should_task_recur_on_date(task, target_dt):
-                                # Create a copy of the task for the new date
-                                recurring_task = {
-                                    **task,
-                                    "id": str(uuid.uuid4()),  # New ID for new date
-                                    "start_date": target_date,
-                                    "completed": False  # Reset completion status
-                                }
-                                recurring_tasks.append(recurring_task)
-                                seen_task_texts.add(task_text)
+                # Check each task for recurrence
+                for task in schedule_tasks:
+                    task_text = task.get('text', '')
+                    if (task.get('is_recurring') and 
+                        not task.get('is_section', False) and
+                        task_text not in seen_task_texts and
+                        task_text not in exclude_texts):
+                        
+                        if self._should_task_recur_on_date(task, target_dt):
+                            # Create a copy of the task for the new date
+                            recurring_task = {
+                                **task,
+                                "id": str(uuid.uuid4()),  # New ID for new date
+                                "start_date": target_date,
+                                "completed": False  # Reset completion status
+                            }
+                            recurring_tasks.append(recurring_task)
+                            seen_task_texts.add(task_text)
                                 
             print(f"Found {len(recurring_tasks)} recurring tasks for {target_date}")
             return recurring_tasks
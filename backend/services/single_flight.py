@@ -0,0 +1,273 @@
+"""
+Single-flight coalescing for expensive per-user, per-date operations.
+
+A double-clicked "generate" button, a retried request or several tabs loading
+the dashboard at once can start the same `/schedules/autogenerate` or
+`/submit_data` computation more than once. Each copy repeats the history
+scan, the calendar fetch and (for submit_data) the LLM call, then races the
+others to write the schedule.
+
+`SingleFlight.run(user_id, date, operation, fn)` makes one caller the leader
+for a key and lets every concurrent duplicate wait for and reuse its result:
+
+- Within a process, followers block on the leader's in-flight call.
+- Across gunicorn workers and instances, the leader holds a lease document in
+  MongoDB (`OperationLeases`). Followers elsewhere poll that document and pick
+  up the stored result when the leader finishes.
+
+Leases expire, so a crashed leader only delays duplicates until `lease_seconds`
+pass; a follower that waits longer than `wait_timeout` computes the result
+itself rather than failing the request.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+
+OPERATION_LEASES_COLLECTION = 'OperationLeases'
+
+T = TypeVar('T')
+
+
+class _InflightCall:
+    """A computation in progress in this process and the callers waiting on it."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a `(user_id, date, operation)` key."""
+
+    def __init__(
+        self,
+        collection_getter: Optional[Callable[[], Any]] = None,
+        lease_seconds: float = 120.0,
+        result_ttl_seconds: float = 10.0,
+        poll_interval: float = 0.1,
+        wait_timeout: Optional[float] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ) -> None:
+        """
+        Args:
+            collection_getter: Callable returning the lease collection
+                (defaults to OperationLeases in the application database)
+            lease_seconds: How long a leader owns a key before others may take over
+            result_ttl_seconds: How long a finished result stays readable by waiting followers
+            poll_interval: Seconds between lease reads while following another worker
+            wait_timeout: Longest a follower waits before computing itself
+                (defaults to lease_seconds)
+            clock: Returns the current timezone-aware UTC time
+        """
+        self._collection_getter = collection_getter or _get_operation_leases_collection
+        self._lease = timedelta(seconds=lease_seconds)
+        self._result_ttl = timedelta(seconds=result_ttl_seconds)
+        self._poll_interval = poll_interval
+        self._wait_timeout = lease_seconds if wait_timeout is None else wait_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _InflightCall] = {}
+        self._owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = {'leader': 0, 'local_shared': 0, 'remote_shared': 0, 'wait_timeouts': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def make_key(user_id: str, date: str, operation: str) -> str:
+        return f"{operation}:{user_id}:{date}"
+
+    def run(
+        self,
+        user_id: str,
+        date: str,
+        operation: str,
+        fn: Callable[[], T],
+        share_result: bool = True
+    ) -> T:
+        """
+        Run `fn` once for concurrent callers with the same key and share its result.
+
+        Args:
+            user_id: User's googleId
+            date: Target date (YYYY-MM-DD)
+            operation: Name of the operation (e.g. 'autogenerate')
+            fn: Computation to run; its result must be BSON-serialisable to be
+                shared with other workers
+            share_result: Store the result for followers in other workers. When
+                False (e.g. secrets) the lease is released on completion and those
+                followers run `fn` themselves afterwards, which must then be cheap
+
+        Returns:
+            The result of `fn`, computed here or by another caller. Results
+            shared across workers come back from MongoDB, so tuples arrive as lists.
+        """
+        key = self.make_key(user_id, date, operation)
+
+        with self._lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InflightCall()
+                self._inflight[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            self._count('local_shared')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_distributed(key, user_id, date, operation, fn, share_result)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def _run_distributed(
+        self,
+        key: str,
+        user_id: str,
+        date: str,
+        operation: str,
+        fn: Callable[[], T],
+        share_result: bool = True
+    ) -> T:
+        owner = f"{self._owner_prefix}:{uuid.uuid4().hex[:8]}"
+        deadline = time.monotonic() + self._wait_timeout
+
+        acquired = self._try_acquire(key, owner, user_id, date, operation)
+        while True:
+            if acquired is None:
+                # Lease store unavailable: coalescing is best effort
+                return fn()
+            if acquired:
+                return self._lead(key, owner, fn, share_result)
+
+            time.sleep(self._poll_interval)
+            shared, found = self._read_result(key)
+            if found:
+                self._count('remote_shared')
+                return shared
+            if time.monotonic() >= deadline:
+                self._count('wait_timeouts')
+                print(f"Single-flight wait for {key} timed out; computing locally")
+                return fn()
+            # Take over if the leader's lease expired or it failed and released it
+            acquired = self._try_acquire(key, owner, user_id, date, operation)
+
+    def _lead(self, key: str, owner: str, fn: Callable[[], T], share_result: bool = True) -> T:
+        self._count('leader')
+        try:
+            result = fn()
+        except BaseException:
+            self._release(key, owner)
+            raise
+
+        if not share_result:
+            self._release(key, owner)
+            return result
+
+        try:
+            self._collection_getter().update_one(
+                {"_id": key, "owner": owner},
+                {"$set": {
+                    "status": "done",
+                    "result": result,
+                    "finishedAt": self._clock(),
+                    "expiresAt": self._clock() + self._result_ttl
+                }}
+            )
+        except Exception as e:
+            # Unstorable or oversized result: let followers compute for themselves
+            print(f"Single-flight could not share result for {key}: {e}")
+            self._release(key, owner)
+        return result
+
+    def _try_acquire(self, key: str, owner: str, user_id: str, date: str, operation: str) -> Optional[bool]:
+        """
+        Take the lease if it is free, expired or holds a finished result.
+
+        A finished result is only shared with callers that were already waiting
+        on it; a request arriving afterwards starts a new run.
+
+        Returns:
+            True if acquired, False if another caller holds it, None if MongoDB is unavailable
+        """
+        now = self._clock()
+        try:
+            self._collection_getter().find_one_and_update(
+                {"_id": key, "$or": [{"expiresAt": {"$lte": now}}, {"status": "done"}]},
+                {
+                    "$set": {
+                        "userId": user_id,
+                        "date": date,
+                        "operation": operation,
+                        "owner": owner,
+                        "status": "running",
+                        "startedAt": now,
+                        "expiresAt": now + self._lease
+                    },
+                    "$unset": {"result": "", "finishedAt": ""}
+                },
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # Another caller is running this operation
+            return False
+        except Exception as e:
+            print(f"Single-flight lease unavailable for {key}: {e}")
+            return None
+
+    def _read_result(self, key: str):
+        """Return (result, True) once the current lease holder has finished."""
+        try:
+            doc = self._collection_getter().find_one({"_id": key})
+        except PyMongoError:
+            return None, False
+        if not doc or doc.get('status') != 'done' or 'result' not in doc:
+            return None, False
+        expires_at = doc.get('expiresAt')
+        if isinstance(expires_at, datetime):
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at <= self._clock():
+                return None, False
+        return doc['result'], True
+
+    def _release(self, key: str, owner: str) -> None:
+        try:
+            self._collection_getter().delete_one({"_id": key, "owner": owner})
+        except PyMongoError as e:
+            print(f"Single-flight release failed for {key}: {e}")
+
+
+def _get_operation_leases_collection():
+    # Lazy import keeps this module importable without database configuration
+    from backend.db_config import get_operation_leases_collection
+    return get_operation_leases_collection()
+
+
+# Shared singleton instance for application use
+single_flight = SingleFlight(
+    lease_seconds=float(os.getenv('SINGLE_FLIGHT_LEASE_SECONDS', '120')),
+    result_ttl_seconds=float(os.getenv('SINGLE_FLIGHT_RESULT_TTL_SECONDS', '10'))
+)
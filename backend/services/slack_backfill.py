@@ -0,0 +1,288 @@
+"""
+Backfill of recent Slack mentions when a user connects the integration.
+
+Events only arrive for messages sent after the app is installed, so mentions
+from the days before connecting never became tasks. After a successful OAuth
+callback, the route starts this job in a background thread and returns. The
+job:
+
+1. lists the channels the user belongs to (`users.conversations`)
+2. pages through `conversations.history` for each one over the last `days`
+3. sends every message that directly mentions the user through
+   `SlackService.process_event`, the same path live events take
+
+Because process_event claims a `channel:ts:user` idempotency key, a message
+that is both backfilled and delivered live becomes a single task. Re-running
+the job is also safe. Tasks from one history page are processed together, so
+the task write buffer lands them in one bulk write.
+
+Slack rate limits are per method and per workspace. Calls are paced to
+`calls_per_minute` (Tier 3 by default) for each (workspace, method) pair. A
+429 pushes that pair back by `Retry-After` before the call is retried.
+Channels the bot is not a member of are skipped. Progress is published on the
+event bus as `slack_backfill` events, which reach the dashboard over the
+existing SSE stream.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from slack_sdk.errors import SlackApiError
+
+from backend.services.slack_metadata import retry_after_seconds, slack_metadata
+from backend.services.slack_user_router import parse_mentions
+from backend.utils.encryption import decrypt_token
+
+
+class _RatePacer:
+    """Thread-safe spacing of calls per key, shared by every running job."""
+
+    def __init__(self, calls_per_minute: float, timer: Callable[[], float] = time.monotonic) -> None:
+        self._interval = 60.0 / max(calls_per_minute, 0.001)
+        self._timer = timer
+        self._next: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: Any) -> float:
+        """Claim the next slot for key; returns how long to wait for it."""
+        with self._lock:
+            now = self._timer()
+            slot = max(now, self._next.get(key, now))
+            self._next[key] = slot + self._interval
+            return slot - now
+
+    def back_off(self, key: Any, seconds: float) -> None:
+        with self._lock:
+            self._next[key] = max(self._next.get(key, 0.0), self._timer() + seconds)
+
+
+class SlackMentionBackfill:
+    """Creates tasks from a user's recent Slack mentions without blocking OAuth."""
+
+    def __init__(
+        self,
+        service_getter: Optional[Callable[[], Any]] = None,
+        publisher: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        client_factory: Optional[Callable[[str], Any]] = None,
+        days: float = 7,
+        calls_per_minute: float = 50,
+        page_size: int = 200,
+        max_channels: int = 500,
+        concurrency: int = 16,
+        max_retries: int = 5,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        clock: Callable[[], float] = time.time,
+        metadata: Optional[Any] = None
+    ) -> None:
+        """
+        Args:
+            service_getter: Returns the configured SlackService (defaults to slack_routes.slack_service)
+            publisher: Callable(user_id, event) for SSE pushes (defaults to event_bus.publish)
+            client_factory: Builds a Slack client from the bot token; defaults to AsyncWebClient
+            days: How far back to read channel history
+            calls_per_minute: Pace per workspace and Web API method
+            page_size: Messages requested per conversations.history page
+            max_channels: Most channels scanned per backfill
+            concurrency: Mentions processed at once within a page
+            max_retries: 429 retries per call before the job gives up
+            sleep: Coroutine used for pacing and back-off
+            clock: Wall clock (epoch seconds) for the history window
+            metadata: Name lookup client whose per-loop session is closed when a
+                background run ends (defaults to the shared slack_metadata)
+        """
+        self._service_getter = service_getter
+        self._publisher = publisher
+        self._client_factory = client_factory or _async_web_client
+        self._days = days
+        self._pacer = _RatePacer(calls_per_minute)
+        self._page_size = page_size
+        self._max_channels = max_channels
+        self._concurrency = max(1, concurrency)
+        self._max_retries = max(0, max_retries)
+        self._sleep = sleep
+        self._clock = clock
+        self._metadata = metadata or slack_metadata
+        self._lock = threading.Lock()
+        self._active: Dict[str, threading.Thread] = {}
+
+    def _get_service(self):
+        if self._service_getter is None:
+            # Lazy import: slack_routes imports this module
+            from backend.apis.slack_routes import slack_service
+            self._service_getter = lambda: slack_service
+        return self._service_getter()
+
+    def _publish(self, user_id: str, progress: Dict[str, Any]) -> None:
+        if self._publisher is None:
+            from backend.services.event_bus import event_bus
+            self._publisher = event_bus.publish
+        try:
+            self._publisher(user_id, {"type": "slack_backfill", **progress})
+        except Exception as e:
+            print(f"Could not publish Slack backfill progress for user {user_id}: {e}")
+
+    def start(self, user_id: str) -> bool:
+        """
+        Run a backfill for the user in a background thread.
+
+        Returns:
+            False if one is already running for this user in this process
+        """
+        with self._lock:
+            running = self._active.get(user_id)
+            if running and running.is_alive():
+                return False
+            thread = threading.Thread(
+                target=self._run_in_thread, args=(user_id,), name=f"slack-backfill-{user_id}", daemon=True
+            )
+            self._active[user_id] = thread
+        thread.start()
+        return True
+
+    def _run_in_thread(self, user_id: str) -> None:
+        try:
+            asyncio.run(self._run_and_close(user_id))
+        finally:
+            with self._lock:
+                if self._active.get(user_id) is threading.current_thread():
+                    del self._active[user_id]
+
+    async def _run_and_close(self, user_id: str) -> None:
+        try:
+            await self.run(user_id)
+        finally:
+            # Name lookups opened an HTTP session on this loop; close it before asyncio.run closes the loop
+            try:
+                await self._metadata.close_session()
+            except Exception as e:
+                print(f"Could not close Slack metadata session after backfill for user {user_id}: {e}")
+
+    def is_running(self, user_id: str) -> bool:
+        with self._lock:
+            thread = self._active.get(user_id)
+            return bool(thread and thread.is_alive())
+
+    async def _call(self, team_id: str, method: str, fn: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        for attempt in range(self._max_retries + 1):
+            delay = self._pacer.reserve((team_id, method))
+            if delay > 0:
+                await self._sleep(delay)
+            try:
+                return await fn(**kwargs)
+            except SlackApiError as e:
+                if getattr(e.response, 'status_code', None) != 429 or attempt == self._max_retries:
+                    raise
+                self._pacer.back_off((team_id, method), retry_after_seconds(e.response))
+
+    async def _channels(self, client: Any, team_id: str, slack_user_id: str) -> List[str]:
+        channels: List[str] = []
+        cursor = None
+        while len(channels) < self._max_channels:
+            response = await self._call(
+                team_id, 'users.conversations', client.users_conversations,
+                user=slack_user_id, types='public_channel,private_channel',
+                exclude_archived=True, limit=200, cursor=cursor
+            )
+            channels.extend(channel['id'] for channel in response.get('channels', []))
+            cursor = (response.get('response_metadata') or {}).get('next_cursor')
+            if not cursor:
+                break
+        return channels[:self._max_channels]
+
+    async def run(self, user_id: str) -> Dict[str, Any]:
+        """
+        Backfill one user's recent mentions.
+
+        Returns:
+            Final progress counts (also published as the 'completed' or 'failed' event)
+        """
+        progress: Dict[str, Any] = {
+            'status': 'started', 'days': self._days, 'channels_total': 0, 'channels_done': 0,
+            'channels_skipped': 0, 'messages_scanned': 0, 'mentions': 0, 'tasks_created': 0, 'failed': 0
+        }
+        self._publish(user_id, progress)
+        try:
+            service = self._get_service()
+            integration = await asyncio.to_thread(service._get_user_integration, user_id)
+            if not integration or not integration.get('slack_user_id') or not integration.get('bot_token'):
+                raise ValueError("Slack integration not connected")
+
+            team_id = integration.get('team_id') or integration.get('workspace_id')
+            slack_user_id = integration['slack_user_id']
+            client = self._client_factory(decrypt_token(integration['bot_token']))
+            channels = await self._channels(client, team_id, slack_user_id)
+            progress.update(status='running', channels_total=len(channels))
+            self._publish(user_id, dict(progress))
+
+            oldest = f"{self._clock() - self._days * 86400:.6f}"
+            semaphore = asyncio.Semaphore(self._concurrency)
+
+            async def _process(channel_id: str, message: Dict[str, Any]) -> None:
+                event_data = {
+                    'type': 'event_callback',
+                    'team_id': team_id,
+                    'event': {**message, 'channel': channel_id}
+                }
+                async with semaphore:
+                    try:
+                        if await service.process_event(event_data, user_id, integration):
+                            progress['tasks_created'] += 1
+                    except Exception as e:
+                        # One failed mention should not stop the rest of the backfill
+                        print(f"Slack backfill could not process {channel_id}:{message.get('ts')} for user {user_id}: {e}")
+                        progress['failed'] += 1
+
+            for channel_id in channels:
+                try:
+                    cursor = None
+                    while True:
+                        response = await self._call(
+                            team_id, 'conversations.history', client.conversations_history,
+                            channel=channel_id, oldest=oldest, limit=self._page_size, cursor=cursor
+                        )
+                        messages = response.get('messages', [])
+                        progress['messages_scanned'] += len(messages)
+                        mentions = [
+                            message for message in messages
+                            if message.get('type') == 'message' and not message.get('bot_id')
+                            and message.get('subtype') in (None, 'thread_broadcast')
+                            and slack_user_id in parse_mentions(message.get('text'))[0]
+                        ]
+                        progress['mentions'] += len(mentions)
+                        await asyncio.gather(*(_process(channel_id, message) for message in mentions))
+                        cursor = (response.get('response_metadata') or {}).get('next_cursor')
+                        if not response.get('has_more') or not cursor:
+                            break
+                except SlackApiError as e:
+                    error = (e.response.get('error') if hasattr(e.response, 'get') else None) or str(e)
+                    if error not in ('not_in_channel', 'channel_not_found', 'missing_scope'):
+                        raise
+                    progress['channels_skipped'] += 1
+                progress['channels_done'] += 1
+                self._publish(user_id, dict(progress))
+
+            progress['status'] = 'completed'
+        except Exception as e:
+            print(f"Slack backfill failed for user {user_id}: {e}")
+            traceback.print_exc()
+            progress.update(status='failed', error=str(e))
+        self._publish(user_id, dict(progress))
+        return progress
+
+
+def _async_web_client(token: str) -> Any:
+    from slack_sdk.web.async_client import AsyncWebClient
+    return AsyncWebClient(token=token)
+
+
+# Shared singleton instance for application use
+slack_backfill = SlackMentionBackfill(
+    days=float(os.getenv('SLACK_BACKFILL_DAYS', '7')),
+    calls_per_minute=float(os.getenv('SLACK_BACKFILL_CALLS_PER_MINUTE', '50'))
+)
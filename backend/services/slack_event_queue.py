@@ -0,0 +1,347 @@
+"""
+Durable queue and async worker pool for Slack Events API callbacks.
+
+Slack expects a response within 3 seconds and retries anything slower, but the
+webhook used to process events inline: a fresh event loop per request
+(`asyncio.run`), blocking Mongo reads for every connected user, Slack API
+lookups and schedule writes, all before responding. Slow responses caused
+retries, and each retry repeated the work.
+
+Now the webhook verifies the signature, stores the raw body in
+`SlackEventQueue` (`_id` is Slack's event_id, so a retry of a queued event is a
+no-op insert) and returns 200. The worker process runs one event loop thread
+with `concurrency` worker coroutines. A worker claims the oldest event with an
+atomic find_one_and_update lease, awaits the processor, and deletes the
+document. Blocking Mongo calls run in the loop's thread pool so that one slow
+event does not stall the others. A worker that dies mid-event leaves a lease
+that expires after `lease_seconds`. If the queue collection is unavailable,
+the web process starts its own workers and hands them the event in memory.
+
+By default each web process starts its own workers on its first Slack
+callback. A deployment that runs a dedicated worker service sets
+SLACK_EVENT_WORKER_IN_WEB=false on the web service, so web processes only
+enqueue, and runs the worker as a separate process (APP_ROLE=slack-events):
+    python -m backend.services.slack_event_queue --concurrency 8
+    python -m backend.services.slack_event_queue --once
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class SlackEventQueue:
+    """Mongo-backed Slack event queue drained by an asyncio worker pool."""
+
+    def __init__(
+        self,
+        collection_getter: Optional[Callable[[], Any]] = None,
+        processor: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None,
+        concurrency: int = 8,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+        worker_in_web: bool = True
+    ) -> None:
+        """
+        Args:
+            collection_getter: Callable returning the SlackEventQueue collection
+            processor: Coroutine function run for each event payload
+                (defaults to slack_routes.process_slack_payload)
+            concurrency: Worker coroutines per process
+            lease_seconds: How long a claimed event is hidden from other workers
+            poll_interval: Worker sleep between empty polls
+            max_attempts: Failed attempts before an event is dropped
+            clock: Returns the current timezone-aware UTC time
+            worker_in_web: Whether web processes drain the queue themselves
+                (False when a dedicated slack-events process runs)
+        """
+        self._collection_getter = collection_getter or _get_slack_event_queue_collection
+        self._processor = processor
+        self._concurrency = max(1, concurrency)
+        self._lease = timedelta(seconds=lease_seconds)
+        self._poll_interval = poll_interval
+        self._max_attempts = max(1, max_attempts)
+        self._clock = clock
+        self._worker_in_web = worker_in_web
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # One token per new event wakes a single idle worker (no thundering herd)
+        self._signals: Optional[asyncio.Queue] = None
+        # Events that could not be persisted; processed ahead of the collection
+        self._in_memory: deque = deque()
+        self._counters = {'enqueued': 0, 'duplicates': 0, 'in_memory': 0, 'processed': 0, 'failed': 0, 'dropped': 0}
+
+    def _get_processor(self) -> Callable[[Dict[str, Any]], Awaitable[Any]]:
+        if self._processor is None:
+            # Lazy import: slack_routes imports this module
+            from backend.apis.slack_routes import process_slack_payload
+            self._processor = process_slack_payload
+        return self._processor
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def enqueue(self, raw_body: str, event_data: Dict[str, Any]) -> bool:
+        """
+        Persist a verified Slack callback for the workers.
+
+        Args:
+            raw_body: Request body exactly as Slack sent it
+            event_data: The parsed body
+
+        Returns:
+            True if queued (or already queued by an earlier delivery); False if
+            the queue is unavailable
+        """
+        now = self._clock()
+        try:
+            self._collection_getter().insert_one({
+                "_id": event_data.get('event_id') or str(uuid.uuid4()),
+                "body": raw_body,
+                "type": event_data.get('type'),
+                "teamId": event_data.get('team_id'),
+                "receivedAt": now,
+                "leaseUntil": now,
+                "attempts": 0
+            })
+            self._count('enqueued')
+        except DuplicateKeyError:
+            # Slack retried an event that is already queued or being processed
+            self._count('duplicates')
+        except Exception as e:
+            print(f"Slack event enqueue failed for {event_data.get('event_id')}: {e}")
+            return False
+        self._notify()
+        return True
+
+    def submit(self, event_data: Dict[str, Any]) -> None:
+        """Hand an event to the workers without persisting it (fallback when enqueue fails)."""
+        self._in_memory.append(event_data)
+        self._count('in_memory')
+        self._notify()
+
+    def _notify(self) -> None:
+        loop, signals = self._loop, self._signals
+        if loop is not None and signals is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(signals.put_nowait, None)
+            except RuntimeError:
+                pass
+
+    def _claim(self, now: datetime) -> Optional[Dict[str, Any]]:
+        return self._collection_getter().find_one_and_update(
+            {"leaseUntil": {"$lte": now}},
+            {"$set": {"leaseUntil": now + self._lease}},
+            sort=[("leaseUntil", 1), ("receivedAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _complete(self, event_id: str) -> None:
+        self._collection_getter().delete_one({"_id": event_id})
+
+    def _fail(self, doc: Dict[str, Any]) -> None:
+        collection = self._collection_getter()
+        attempts = int(doc.get('attempts', 0)) + 1
+        if attempts >= self._max_attempts:
+            collection.delete_one({"_id": doc['_id']})
+            self._count('dropped')
+            print(f"Dropping Slack event {doc['_id']} after {attempts} attempts")
+            return
+        # Back off linearly by pushing the lease out
+        collection.update_one(
+            {"_id": doc['_id']},
+            {"$set": {"leaseUntil": self._clock() + timedelta(seconds=5 * attempts), "attempts": attempts}}
+        )
+
+    async def _process_next(self) -> bool:
+        """Process one event. Returns False when there was nothing to do."""
+        loop = asyncio.get_running_loop()
+        doc = None
+        try:
+            event_data = self._in_memory.popleft()
+        except IndexError:
+            try:
+                doc = await loop.run_in_executor(None, self._claim, self._clock())
+            except Exception as e:
+                print(f"Slack event queue claim failed: {e}")
+                return False
+            if not doc:
+                return False
+            try:
+                event_data = json.loads(doc.get('body') or '{}')
+            except (TypeError, ValueError):
+                print(f"Discarding unparseable Slack event {doc['_id']}")
+                await loop.run_in_executor(None, self._complete, doc['_id'])
+                return True
+
+        try:
+            await self._get_processor()(event_data)
+            if doc is not None:
+                await loop.run_in_executor(None, self._complete, doc['_id'])
+            self._count('processed')
+        except Exception as e:
+            print(f"Slack event processing failed for {event_data.get('event_id')}: {e}")
+            self._count('failed')
+            if doc is not None:
+                try:
+                    await loop.run_in_executor(None, self._fail, doc)
+                except Exception as fail_error:
+                    print(f"Could not reschedule Slack event {doc['_id']}: {fail_error}")
+        return True
+
+    async def _drain(self, limit: int) -> int:
+        processed = 0
+
+        async def _drain_worker() -> None:
+            nonlocal processed
+            while processed < limit:
+                # Reserve a slot before awaiting so workers never overshoot the limit
+                processed += 1
+                if not await self._process_next():
+                    processed -= 1
+                    return
+
+        await asyncio.gather(*(_drain_worker() for _ in range(self._concurrency)))
+        return processed
+
+    def process_due(self, limit: int = 1000) -> int:
+        """
+        Drain queued events on a temporary event loop (used by tests and tooling).
+
+        Returns:
+            Number of events processed
+        """
+        return asyncio.run(self._drain_and_close(limit))
+
+    async def _drain_and_close(self, limit: int) -> int:
+        try:
+            return await self._drain(limit)
+        finally:
+            await _close_slack_sessions()
+
+    async def _worker(self) -> None:
+        while not self._stop_event.is_set():
+            if await self._process_next():
+                continue
+            try:
+                await asyncio.wait_for(self._signals.get(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        # Sized to the worker count so blocking calls never queue behind each other
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="slack-event-io")
+        )
+        self._signals = asyncio.Queue()
+        ready.set()
+        try:
+            loop.run_until_complete(asyncio.gather(*(self._worker() for _ in range(self._concurrency))))
+        finally:
+            loop.run_until_complete(_close_slack_sessions())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    def ensure_worker(self) -> None:
+        """Start the worker loop once per process."""
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._owner_pid == os.getpid():
+                return
+            self._owner_pid = os.getpid()
+            self._stop_event.clear()
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), name="slack-event-workers", daemon=True
+            )
+            self._thread.start()
+        ready.wait(5)
+
+    def ensure_web_worker(self) -> None:
+        """Start this web process's workers unless a dedicated slack-events process drains the queue."""
+        if self._worker_in_web:
+            self.ensure_worker()
+
+    def run_forever(self) -> None:
+        """Run the worker loop until stop() is called."""
+        print(f"Slack event queue worker started (concurrency={self._concurrency})")
+        self.ensure_worker()
+        thread = self._thread
+        if thread:
+            thread.join()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        for _ in range(self._concurrency):
+            self._notify()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, 'in_memory_pending': len(self._in_memory)}
+
+
+async def _close_slack_sessions() -> None:
+    # Name lookups made while processing events hold an HTTP session bound to this loop
+    from backend.services.slack_metadata import slack_metadata
+    try:
+        await slack_metadata.close_session()
+    except Exception as e:
+        print(f"Could not close Slack metadata session: {e}")
+
+
+def _get_slack_event_queue_collection():
+    # Lazy import keeps this module importable without database configuration
+    from backend.db_config import get_slack_event_queue_collection
+    return get_slack_event_queue_collection()
+
+
+# Shared singleton instance for application use
+slack_event_queue = SlackEventQueue(
+    concurrency=int(os.getenv('SLACK_EVENT_WORKERS', '8')),
+    poll_interval=float(os.getenv('SLACK_EVENT_POLL_SECONDS', '1')),
+    worker_in_web=os.getenv('SLACK_EVENT_WORKER_IN_WEB', 'true').lower() not in ('0', 'false', 'no')
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued Slack Events API callbacks")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('SLACK_EVENT_WORKERS', '8')),
+                        help="Events processed at once")
+    parser.add_argument('--once', action='store_true', help="Process every queued event now and exit")
+    args = parser.parse_args()
+
+    queue = SlackEventQueue(
+        concurrency=args.concurrency,
+        poll_interval=float(os.getenv('SLACK_EVENT_POLL_SECONDS', '1'))
+    )
+    if args.once:
+        print(queue.process_due())
+    else:
+        queue.run_forever()
+
+
+if __name__ == '__main__':
+    main()
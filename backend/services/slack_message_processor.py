@@ -1,11 +1,18 @@
 """
 Slack Message Processor Module
 AI-powered message filtering and task generation for Slack messages
+
+Mentions go through a two-stage pipeline:
+1. Precompiled local heuristics drop obvious non-actionable messages
+   (greetings, thanks, FYIs, bare acknowledgements) without an API call.
+2. The remaining candidates that arrive within a short window are classified
+   together in one Claude prompt that returns a verdict per message.
 """
 
+import asyncio
 import json
 import re
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
 import anthropic
 import os
 from dotenv import load_dotenv
@@ -13,16 +20,71 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+CLASSIFIER_MODEL = "claude-3-haiku-20240307"
+
+# Heuristic patterns, compiled once at import
+USER_MENTION_PATTERN = re.compile(r'<@([UW][A-Z0-9]+)>')
+CHANNEL_MENTION_PATTERN = re.compile(r'<#[C][A-Z0-9]+>')
+SPECIAL_MENTION_PATTERN = re.compile(r'<!(?:here|channel|everyone)(?:\|[^>]*)?>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+DEADLINE_PATTERN = re.compile(
+    r'by\s+(today|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+    r'|by\s+\d{1,2}(am|pm)'
+    r'|by\s+end\s+of\s+(day|week|month)'
+    r'|by\s+eod'
+    r'|before\s+'
+    r'|until\s+'
+    r'|deadline\s+'
+    r'|due\s+'
+)
+URGENCY_PATTERN = re.compile(r'urgent|asap|emergency|critical|immediately')
+QUESTION_PREFIXES = ('what', 'when', 'where', 'who', 'why', 'how', 'can', 'could', 'would', 'do', 'did')
+# Whole words only, so "high priority" or "thanksgiving rota" still reach the classifier
+NON_ACTIONABLE_PATTERN = re.compile(
+    r'^(thanks?|thank you)\b'
+    r'|^(hi|hello|hey)\b'
+    r'|^(good morning|good afternoon|good evening)\b'
+    r'|^(congrats|congratulations)\b'
+    r'|^(fyi|just fyi)\b'
+    r'|^(lol|haha)\b'
+    r'|^(😄|😂)'
+)
+ACTIONABLE_PATTERN = re.compile(
+    r'(can|could|would) you'
+    r'|please\s+'
+    r'|\?$'
+    r'|(help|assist|support)'
+    r'|(review|check|look at)'
+    r'|(send|share|provide)'
+    r'|(update|status|progress)'
+    r'|(by|before|until)\s+(today|tomorrow|friday)'
+)
+# Direct asks that keep a greeting/thanks-style message in the candidate set
+REQUEST_CUE_PATTERN = re.compile(r'(can|could|would|will) you|please\s|\?|asap|urgent')
+ACKNOWLEDGEMENT_PATTERN = re.compile(
+    r'^(ok(ay)?|k|sure|sounds good|will do|done|got it|noted|ack|\+1|👍|🙏|:[a-z0-9_+\-]+:)[\s!.]*$'
+)
+
+# Share of the batch output budget per message verdict
+BATCH_TOKENS_PER_MESSAGE = 80
+
 
 class SlackMessageProcessor:
     """AI-powered message filtering and task generation"""
     
-    def __init__(self, anthropic_client: Optional[anthropic.Anthropic] = None):
+    def __init__(
+        self,
+        anthropic_client: Optional[anthropic.Anthropic] = None,
+        batch_window_seconds: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
         """
         Initialize SlackMessageProcessor
         
         Args:
             anthropic_client: Optional custom Anthropic client instance
+            batch_window_seconds: How long the first candidate waits for others to share its prompt
+            max_batch_size: Candidates that trigger an immediate classification call
         """
         if anthropic_client:
             self.client = anthropic_client
@@ -31,10 +93,27 @@ class SlackMessageProcessor:
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY environment variable required")
             self.client = anthropic.Anthropic(api_key=api_key)
+        
+        if batch_window_seconds is None:
+            batch_window_seconds = float(os.getenv('SLACK_CLASSIFY_WINDOW_SECONDS', '0.5'))
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv('SLACK_CLASSIFY_BATCH_SIZE', '20'))
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        # Pending candidates per event loop: [(message_data, future), ...]
+        self._batches: Dict[asyncio.AbstractEventLoop, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self.stats = {
+            'messages': 0, 'prefiltered': 0, 'api_calls': 0,
+            'input_tokens': 0, 'output_tokens': 0
+        }
     
     async def process_mention(self, message_data: Dict[str, Any]) -> Tuple[bool, str]:
         """
-        Analyze message with Claude Haiku to determine if it's actionable
+        Determine whether a message is actionable for the mentioned user
+        
+        Obvious non-actionable messages are dropped locally. Everything else
+        waits up to `batch_window_seconds` and is classified with the other
+        candidates from that window in a single Claude Haiku call.
         
         Args:
             message_data: Slack message data with context
@@ -42,22 +121,94 @@ class SlackMessageProcessor:
         Returns:
             Tuple of (is_actionable: bool, task_text: str)
         """
+        self.stats['messages'] += 1
         try:
-            # Build analysis prompt
-            prompt = self._build_analysis_prompt(message_data)
+            if not self.prefilter(message_data):
+                self.stats['prefiltered'] += 1
+                return False, ""
             
-            # Call Claude Haiku for analysis
-            response = await self._call_anthropic(prompt)
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            batch = self._batches.setdefault(loop, [])
+            batch.append((message_data, future))
+            if len(batch) >= self.max_batch_size:
+                self._flush_batch(loop, batch)
+            elif len(batch) == 1:
+                loop.call_later(self.batch_window_seconds, self._flush_batch, loop, batch)
             
-            # Parse AI response
-            is_actionable, task_text = self._parse_ai_response(response)
-            
-            return is_actionable, task_text
+            return await future
             
         except Exception as e:
             print(f"Error processing Slack mention: {str(e)}")
             return False, ""
     
+    def prefilter(self, message_data: Dict[str, Any]) -> bool:
+        """
+        Cheap local gate in front of the AI classifier
+        
+        Args:
+            message_data: Slack message data
+            
+        Returns:
+            False for messages that are obviously not actionable, True for candidates
+        """
+        text = self.clean_message_text(message_data.get('text') or '')
+        text = SPECIAL_MENTION_PATTERN.sub('', text).strip(' ,:-').lower()
+        if not text or ACKNOWLEDGEMENT_PATTERN.match(text):
+            return False
+        if NON_ACTIONABLE_PATTERN.match(text) and not REQUEST_CUE_PATTERN.search(text):
+            return False
+        return True
+    
+    def _flush_batch(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Send a pending batch for classification (no-op if it already went)"""
+        if self._batches.get(loop) is not batch:
+            return
+        del self._batches[loop]
+        loop.create_task(self._resolve_batch(batch))
+    
+    async def _resolve_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            verdicts = await asyncio.to_thread(self.classify_batch, [message for message, _ in batch])
+        except Exception as e:
+            print(f"Error classifying Slack mention batch: {str(e)}")
+            verdicts = [(False, "")] * len(batch)
+        for (_, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
+    
+    def classify_batch(self, messages: List[Dict[str, Any]]) -> List[Tuple[bool, str]]:
+        """
+        Classify several messages with one Claude Haiku call
+        
+        Args:
+            messages: Slack message data, in order
+            
+        Returns:
+            One (is_actionable, task_text) per message, in the same order
+        """
+        if not messages:
+            return []
+        
+        prompt = self._build_batch_prompt(messages)
+        response = self.client.messages.create(
+            model=CLASSIFIER_MODEL,
+            max_tokens=min(4096, 50 + BATCH_TOKENS_PER_MESSAGE * len(messages)),
+            temperature=0.1,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }]
+        )
+        
+        self.stats['api_calls'] += 1
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self.stats['input_tokens'] += getattr(usage, 'input_tokens', 0) or 0
+            self.stats['output_tokens'] += getattr(usage, 'output_tokens', 0) or 0
+        
+        return self._parse_batch_response(response.content[0].text, len(messages))
+    
     def _build_analysis_prompt(self, message_data: Dict[str, Any]) -> str:
         """
         Build analysis prompt for AI processing
@@ -110,6 +261,87 @@ Respond in valid JSON format only:
 
         return prompt
     
+    def _build_batch_prompt(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Build one classification prompt covering several messages
+        
+        Args:
+            messages: Slack message data
+            
+        Returns:
+            Prompt asking for a JSON verdict per message id (1-based)
+        """
+        entries = "\n".join(
+            json.dumps({
+                "id": index,
+                "message": message.get('text', ''),
+                "channel": message.get('channel_name', 'Unknown Channel'),
+                "sender": message.get('user_name', 'Unknown User'),
+                "thread": bool(message.get('thread_ts'))
+            }, ensure_ascii=False)
+            for index, message in enumerate(messages, start=1)
+        )
+        
+        return f"""For each Slack message below, determine if it contains an actionable task for the mentioned user.
+
+Rules for determining actionability:
+1. Return true only if there's a clear action item for the mentioned user
+2. Tasks should be specific and actionable (not just questions or greetings)
+3. Extract a concise, actionable task description (remove mentions and conversational fluff)
+4. Ignore pure greetings, thank you messages, or FYI notifications
+5. Questions that require action/response ARE actionable
+6. Requests for help, review, or feedback ARE actionable
+
+Examples:
+- "Can you please review the quarterly report by Friday?" → "Review quarterly report by Friday"
+- "What's the status of the deployment?" → "Provide deployment status update"
+- "FYI - meeting moved to 3pm" → Not actionable
+
+Messages (one JSON object per line):
+{entries}
+
+Respond in valid JSON only, with exactly one entry per message id:
+[{{"id": 1, "is_actionable": true/false, "task_text": "extracted task or empty string"}}]"""
+    
+    def _parse_batch_response(self, response: str, count: int) -> List[Tuple[bool, str]]:
+        """
+        Parse per-message verdicts from a batch response
+        
+        Args:
+            response: AI response text
+            count: Number of messages in the batch
+            
+        Returns:
+            One (is_actionable, task_text) per message; messages without a
+            valid verdict are treated as not actionable
+        """
+        verdicts = [(False, "")] * count
+        try:
+            cleaned_response = response.strip()
+            if cleaned_response.startswith('```json'):
+                cleaned_response = cleaned_response[7:]
+            if cleaned_response.endswith('```'):
+                cleaned_response = cleaned_response[:-3]
+            parsed = json.loads(cleaned_response.strip())
+            if isinstance(parsed, dict):
+                parsed = parsed.get('results', [])
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse AI batch response as JSON: {response}")
+            print(f"JSON error: {str(e)}")
+            return verdicts
+        
+        for item in parsed if isinstance(parsed, list) else []:
+            try:
+                index = int(item.get('id')) - 1
+            except (AttributeError, TypeError, ValueError):
+                continue
+            if not 0 <= index < count:
+                continue
+            is_actionable = bool(item.get('is_actionable', False))
+            task_text = str(item.get('task_text') or '').strip()
+            verdicts[index] = (is_actionable and bool(task_text), task_text if is_actionable else "")
+        return verdicts
+    
     def _extract_mention_context(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract mention-specific context from message
@@ -122,31 +354,19 @@ Respond in valid JSON format only:
         """
         text = message_data.get('text', '')
         
+        lowered = text.lower()
+        
         # Find mentioned users
-        mentioned_users = re.findall(r'<@([UW][A-Z0-9]+)>', text)
+        mentioned_users = USER_MENTION_PATTERN.findall(text)
         
         # Check for deadline indicators
-        deadline_keywords = [
-            r'by\s+(today|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
-            r'by\s+\d{1,2}(am|pm)',
-            r'by\s+end\s+of\s+(day|week|month)',
-            r'by\s+eod',
-            r'before\s+',
-            r'until\s+',
-            r'deadline\s+',
-            r'due\s+'
-        ]
-        
-        has_deadline = any(re.search(pattern, text.lower()) for pattern in deadline_keywords)
+        has_deadline = bool(DEADLINE_PATTERN.search(lowered))
         
         # Check for urgency indicators
-        urgency_keywords = ['urgent', 'asap', 'emergency', 'critical', 'immediately']
-        has_urgency = any(keyword in text.lower() for keyword in urgency_keywords)
+        has_urgency = bool(URGENCY_PATTERN.search(lowered))
         
         # Check for question patterns
-        is_question = text.strip().endswith('?') or any(
-            text.lower().startswith(q) for q in ['what', 'when', 'where', 'who', 'why', 'how', 'can', 'could', 'would', 'do', 'did']
-        )
+        is_question = text.strip().endswith('?') or lowered.startswith(QUESTION_PREFIXES)
         
         return {
             'mentioned_users': mentioned_users,
@@ -168,7 +388,7 @@ Respond in valid JSON format only:
         """
         try:
             response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+                model=CLASSIFIER_MODEL,
                 max_tokens=200,
                 temperature=0.1,
                 messages=[{
@@ -250,13 +470,13 @@ Respond in valid JSON format only:
             Cleaned message text
         """
         # Remove user mentions for cleaner processing
-        cleaned = re.sub(r'<@[UW][A-Z0-9]+>', '', text)
+        cleaned = USER_MENTION_PATTERN.sub('', text)
         
         # Remove channel mentions
-        cleaned = re.sub(r'<#[C][A-Z0-9]+>', '', cleaned)
+        cleaned = CHANNEL_MENTION_PATTERN.sub('', cleaned)
         
         # Remove excessive whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        cleaned = WHITESPACE_PATTERN.sub(' ', cleaned).strip()
         
         return cleaned
     
@@ -273,29 +493,9 @@ Respond in valid JSON format only:
         """
         text = message_data.get('text', '').lower()
         
-        # Quick filters for obviously non-actionable messages
-        non_actionable_patterns = [
-            r'^(thanks?|thank you)',
-            r'^(hi|hello|hey)',
-            r'^(good morning|good afternoon|good evening)',
-            r'^(congrats|congratulations)',
-            r'^(fyi|just fyi)',
-            r'^(lol|haha|😄|😂)'
-        ]
-        
-        if any(re.match(pattern, text) for pattern in non_actionable_patterns):
+        # Quick filter for obviously non-actionable messages
+        if NON_ACTIONABLE_PATTERN.match(text):
             return False
         
-        # Quick filters for likely actionable messages
-        actionable_patterns = [
-            r'(can|could|would) you',
-            r'please\s+',
-            r'\?$',  # Questions
-            r'(help|assist|support)',
-            r'(review|check|look at)',
-            r'(send|share|provide)',
-            r'(update|status|progress)',
-            r'(by|before|until)\s+(today|tomorrow|friday)'
-        ]
-        
-        return any(re.search(pattern, text) for pattern in actionable_patterns)
\ No newline at end of file
+        # Quick filter for likely actionable messages
+        return bool(ACTIONABLE_PATTERN.search(text))
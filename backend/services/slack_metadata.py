@@ -0,0 +1,250 @@
+"""
+Cached, async lookups of Slack channel and user names.
+
+`SlackService._enrich_event_data` used to decrypt the bot token, build a new
+`WebClient` (and with it a new HTTP connection), and make blocking
+`conversations_info` and `users_info` calls for every event. A busy channel
+paid for two Slack round trips per message and ran into Tier 4 rate limits
+during bursts.
+
+This client resolves names with `AsyncWebClient` on one shared aiohttp session
+per event loop, so connections to slack.com are reused. Names are cached per
+workspace in TTL caches keyed by `(team_id, channel_id)` and `(team_id,
+user_id)`. Concurrent lookups of the same name on one loop share a single
+request. The bot token is only decrypted on a cache miss. A 429 response pauses
+lookups for that workspace for the `Retry-After` interval and is then retried,
+up to `max_retries` times. Once a channel and its active members are cached,
+enrichment costs no API calls.
+
+A session can only be closed on its own loop, so code that runs lookups on a
+short-lived loop (`asyncio.run`) awaits `close_session()` before the loop ends.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+from slack_sdk.errors import SlackApiError
+
+UNKNOWN_CHANNEL = 'Unknown Channel'
+UNKNOWN_USER = 'Unknown User'
+
+
+class SlackMetadataClient:
+    """Per-workspace TTL caches of Slack channel and user names."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 10000,
+        max_retries: int = 2,
+        max_retry_after: float = 30.0,
+        client_factory: Optional[Callable[[str, Any], Any]] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Args:
+            ttl_seconds: How long a resolved name is served from cache
+            max_entries: Cached names per kind (channels, users) across all workspaces
+            max_retries: Retries after a 429 before giving up on a lookup
+            max_retry_after: Upper bound on a single Retry-After wait
+            client_factory: Builds a Slack client from (token, session);
+                defaults to AsyncWebClient
+            session_factory: Builds the shared HTTP session for an event loop;
+                defaults to aiohttp.ClientSession
+            sleep: Coroutine used to wait out rate limits
+            timer: Monotonic clock for cache expiry and rate-limit windows
+        """
+        self._channels = TTLCache(maxsize=max_entries, ttl=ttl_seconds, timer=timer)
+        self._users = TTLCache(maxsize=max_entries, ttl=ttl_seconds, timer=timer)
+        self._lock = threading.Lock()
+        self._max_retries = max(0, max_retries)
+        self._max_retry_after = max_retry_after
+        self._client_factory = client_factory or _async_web_client
+        self._session_factory = session_factory or _client_session
+        self._sleep = sleep
+        self._timer = timer
+        # aiohttp sessions and in-flight tasks are bound to the loop that created them
+        self._sessions: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Task] = {}
+        # team_id -> timer value before which that workspace is rate limited
+        self._blocked_until: Dict[str, float] = {}
+        self._counters = {'hits': 0, 'misses': 0, 'api_calls': 0, 'rate_limited': 0, 'errors': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _session(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or getattr(session, 'closed', False):
+                # Forget sessions of loops that ended without close_session()
+                for stale in [l for l in self._sessions if l.is_closed()]:
+                    del self._sessions[stale]
+                session = self._sessions[loop] = self._session_factory()
+        return session
+
+    async def close_session(self) -> None:
+        """Close the running loop's HTTP session, if it has one."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None and not getattr(session, 'closed', False):
+            await session.close()
+
+    async def channel_name(self, team_id: str, channel_id: Optional[str],
+                           token_provider: Callable[[], str]) -> str:
+        """
+        Name of a channel, from cache or `conversations.info`.
+
+        Args:
+            team_id: Workspace the channel belongs to
+            channel_id: Slack channel ID
+            token_provider: Returns the decrypted bot token; only called on a miss
+
+        Returns:
+            Channel name, or 'Unknown Channel' if it cannot be resolved
+        """
+        if not channel_id:
+            return UNKNOWN_CHANNEL
+        return await self._lookup(
+            self._channels, ('channel', team_id, channel_id), team_id, token_provider,
+            lambda client: client.conversations_info(channel=channel_id),
+            lambda response: response['channel']['name'],
+            UNKNOWN_CHANNEL
+        )
+
+    async def user_name(self, team_id: str, user_id: Optional[str],
+                        token_provider: Callable[[], str]) -> str:
+        """
+        Name of a user, from cache or `users.info`.
+
+        Returns:
+            User name, or 'Unknown User' if it cannot be resolved
+        """
+        if not user_id:
+            return UNKNOWN_USER
+        return await self._lookup(
+            self._users, ('user', team_id, user_id), team_id, token_provider,
+            lambda client: client.users_info(user=user_id),
+            lambda response: response['user']['name'],
+            UNKNOWN_USER
+        )
+
+    async def _lookup(self, cache: TTLCache, key: Tuple[Any, ...], team_id: str,
+                      token_provider: Callable[[], str],
+                      call: Callable[[Any], Awaitable[Any]],
+                      extract: Callable[[Any], str], fallback: str) -> str:
+        cache_key = key[1:]
+        with self._lock:
+            name = cache.get(cache_key)
+        if name is not None:
+            self._count('hits')
+            return name
+
+        # Share one request between concurrent lookups of the same name
+        inflight_key = (asyncio.get_running_loop(),) + key
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            self._count('misses')
+            task = asyncio.ensure_future(self._fetch(team_id, token_provider, call, extract))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        name = await asyncio.shield(task)
+        if name is None:
+            return fallback
+        with self._lock:
+            cache[cache_key] = name
+        return name
+
+    async def _fetch(self, team_id: str, token_provider: Callable[[], str],
+                     call: Callable[[Any], Awaitable[Any]],
+                     extract: Callable[[Any], str]) -> Optional[str]:
+        try:
+            client = self._client_factory(token_provider(), self._session())
+        except Exception as e:
+            print(f"Could not build Slack client for team {team_id}: {e}")
+            self._count('errors')
+            return None
+
+        for attempt in range(self._max_retries + 1):
+            await self._wait_for_rate_limit(team_id)
+            try:
+                self._count('api_calls')
+                response = await call(client)
+                return extract(response) if response['ok'] else None
+            except SlackApiError as e:
+                response = e.response
+                if getattr(response, 'status_code', None) != 429 or attempt == self._max_retries:
+                    self._count('errors')
+                    return None
+                self._count('rate_limited')
+                self._block(team_id, retry_after_seconds(response))
+            except Exception as e:
+                print(f"Slack metadata lookup failed for team {team_id}: {e}")
+                self._count('errors')
+                return None
+        return None
+
+    def _block(self, team_id: str, retry_after: float) -> None:
+        until = self._timer() + min(retry_after, self._max_retry_after)
+        with self._lock:
+            self._blocked_until[team_id] = max(until, self._blocked_until.get(team_id, 0.0))
+
+    async def _wait_for_rate_limit(self, team_id: str) -> None:
+        with self._lock:
+            until = self._blocked_until.get(team_id)
+        if until is None:
+            return
+        remaining = until - self._timer()
+        if remaining > 0:
+            await self._sleep(remaining)
+        with self._lock:
+            if self._blocked_until.get(team_id, 0.0) <= self._timer():
+                self._blocked_until.pop(team_id, None)
+
+    def invalidate(self, team_id: Optional[str] = None) -> None:
+        """Drop cached names for one workspace, or all of them when team_id is None."""
+        with self._lock:
+            for cache in (self._channels, self._users):
+                if team_id is None:
+                    cache.clear()
+                else:
+                    for key in [k for k in list(cache.keys()) if k[0] == team_id]:
+                        cache.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, 'channels': len(self._channels), 'users': len(self._users)}
+
+
+def retry_after_seconds(response: Any) -> float:
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _async_web_client(token: str, session: Any) -> Any:
+    from slack_sdk.web.async_client import AsyncWebClient
+    return AsyncWebClient(token=token, session=session)
+
+
+def _client_session() -> Any:
+    import aiohttp
+    return aiohttp.ClientSession()
+
+
+# Shared singleton instance for application use
+slack_metadata = SlackMetadataClient(ttl_seconds=float(os.getenv('SLACK_METADATA_TTL_SECONDS', '3600')))
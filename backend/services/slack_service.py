@@ -5,19 +5,41 @@ Handles Slack OAuth, event processing, and task creation
 
 import os
 import re
+import asyncio
 import hmac
 import hashlib
 import uuid
 import base64
 import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from typing import Dict, Any, Optional, Tuple
-from datetime import datetime
-from slack_sdk import WebClient
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
 import aiohttp
 
 from backend.models.task import Task
-from backend.models.schedule_schema import format_schedule_date
-from backend.utils.encryption import encrypt_token, decrypt_token
+from backend.utils.encryption import encrypt_token, decrypt_token, invalidate_decrypted_token
+from backend.services.user_cache import user_cache
+from backend.services.slack_user_router import slack_user_router
+from backend.services.slack_metadata import slack_metadata
+from backend.services.slack_task_buffer import SlackTaskWriteBuffer
+
+
+# Idempotency keys for handled messages (unique message_key, 30-day TTL on created_at)
+PROCESSED_MESSAGES_COLLECTION = 'Processed Slack Messages'
+# A 'processing' key older than this belongs to a delivery that died and may be reclaimed
+PROCESSING_CLAIM_SECONDS = 600
+# Longest a Slack task waits for its batched schedule write
+STORE_TASK_TIMEOUT_SECONDS = 30
+
+
+class TaskWritePending(Exception):
+    """A task is still in the write buffer after STORE_TASK_TIMEOUT_SECONDS and may yet be written."""
+
+    def __init__(self, task_id: str, future: Future):
+        super().__init__(f"Task {task_id} not written after {STORE_TASK_TIMEOUT_SECONDS}s")
+        self.task_id = task_id
+        self.future = future
 
 
 class SlackService:
@@ -41,6 +63,11 @@ class SlackService:
         
         self.db_client = db_client
         self.message_processor = message_processor
+        self.task_buffer = SlackTaskWriteBuffer(
+            lambda: self.db_client.get_collection('UserSchedules'),
+            window_seconds=float(os.getenv('SLACK_TASK_BATCH_WINDOW_SECONDS', '0.2')),
+            max_batch=int(os.getenv('SLACK_TASK_BATCH_SIZE', '200'))
+        )
         
         # Base OAuth URL for Slack
         self.oauth_base_url = "https://slack.com/oauth/v2/authorize"
@@ -127,6 +154,8 @@ class SlackService:
             'app_mentions:read',
             'channels:history',
             'groups:history',
+            'channels:read',  # users.conversations for the connect-time mention backfill
+            'groups:read',
             'im:history',
             'chat:write',
             'users:read',
@@ -282,6 +311,7 @@ class SlackService:
         
         # Get users collection
         users_collection = self.db_client.get_collection('users')
+        previous = self._get_user_integration(user_id) or {}
         
         # Update user document with Slack integration
         users_collection.update_one(
@@ -289,6 +319,13 @@ class SlackService:
             {'$set': {'slack_integration': integration_data}},
             upsert=False
         )
+        user_cache.invalidate(user_id)
+        # Route events for the new (and any previous) workspace to this user
+        slack_user_router.invalidate(integration_data.get('workspace_id'))
+        if previous.get('workspace_id'):
+            slack_user_router.invalidate(previous['workspace_id'])
+        if previous.get('bot_token') and previous['bot_token'] != integration_data.get('bot_token'):
+            invalidate_decrypted_token(previous['bot_token'])
     
     def verify_webhook_signature(self, request_body: str, headers: Dict[str, str]) -> bool:
         """
@@ -329,72 +366,211 @@ class SlackService:
         except Exception:
             return False
     
-    async def process_event(self, event_data: Dict[str, Any], user_id: str) -> Optional[Task]:
+    async def process_event(
+        self,
+        event_data: Dict[str, Any],
+        user_id: str,
+        integration_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
         """
         Process Slack event and create task if needed
         
         Args:
             event_data: Slack event data
             user_id: YourMum user ID
+            integration_data: User's slack_integration when the caller already
+                has it (from the workspace routing table); loaded otherwise
             
         Returns:
             Task object if message is actionable, None otherwise
+            
+        Raises:
+            Any storage or Slack failure after the message was claimed; the
+            claim is released first so the queue's retry can reprocess it.
+            TaskWritePending keeps the claim until the buffered write settles,
+            so a retry cannot create the task a second time.
         """
+        # Extract event details
+        event = event_data.get('event', {})
+        event_type = event.get('type')
+        
+        # Only process message events
+        if event_type != 'message':
+            return None
+        
+        # Skip bot messages
+        if event.get('bot_id'):
+            return None
+        
+        # Get user integration data (blocking read, off the event loop)
+        if integration_data is None:
+            integration_data = await asyncio.to_thread(self._get_user_integration, user_id)
+        if not integration_data:
+            return None
+        
+        # Check if user is mentioned
+        if not self._is_user_mentioned(event, integration_data['slack_user_id']):
+            return None
+        
+        # Idempotency gate: only the first delivery for this message and user proceeds
+        message_key = self.build_message_key(event_data, user_id)
+        if not await asyncio.to_thread(self._claim_message, message_key, event_data, user_id):
+            print(f"[Slack] Skipping duplicate message {message_key}")
+            return None
+        
         try:
-            # Extract event details
-            event = event_data.get('event', {})
-            event_type = event.get('type')
-            
-            # Only process message events
-            if event_type != 'message':
-                return None
-            
-            # Skip bot messages
-            if event.get('bot_id'):
-                return None
-            
-            # Get user integration data (sync read)
-            integration_data = self._get_user_integration(user_id)
-            if not integration_data:
-                return None
-            
-            # Check if user is mentioned
-            if not self._is_user_mentioned(event, integration_data['slack_user_id']):
-                return None
-            
-            # Enrich event with additional context (best effort; do not fail task creation)
-            enriched_event = await self._enrich_event_data(event, integration_data)
-
-            # Derive a task title directly from message text without AI gating
-            raw_text = event.get('text', '')
-            task_text = self._extract_task_text(raw_text)
-            if not task_text:
-                # Provide a sensible fallback to ensure a task is always created
-                channel_name = enriched_event.get('channel_name', 'Slack')
-                task_text = f"Follow up on message in #{channel_name}"
-            
-            # Create task from Slack event
-            task = Task.from_slack_event(
-                event=enriched_event,
-                task_text=task_text,
-                user_id=user_id
+            task = await self._create_task_from_event(event, integration_data, user_id)
+        except TaskWritePending as pending:
+            # Mark done or release once the write lands or fails; off the loop in case it already has
+            task_id = pending.task_id
+            await asyncio.to_thread(
+                pending.future.add_done_callback,
+                lambda future: self._settle_message(message_key, task_id, future)
             )
-            
-            # Store task in database
-            self._store_task(task, user_id)
-            
-            # Light debug log for observability
+            raise
+        except Exception:
+            # Let a later retry of this message try again
+            await asyncio.to_thread(self._release_message, message_key)
+            raise
+        
+        await asyncio.to_thread(self._mark_message_processed, message_key, task.id)
+        return task
+
+    async def _create_task_from_event(
+        self,
+        event: Dict[str, Any],
+        integration_data: Dict[str, Any],
+        user_id: str
+    ) -> Task:
+        """Enrich a mentioning message, create its task and store it"""
+        # Enrich event with additional context (best effort; do not fail task creation)
+        enriched_event = await self._enrich_event_data(event, integration_data)
+
+        # Derive a task title directly from message text without AI gating
+        raw_text = event.get('text', '')
+        task_text = self._extract_task_text(raw_text)
+        if not task_text:
+            # Provide a sensible fallback to ensure a task is always created
+            channel_name = enriched_event.get('channel_name', 'Slack')
+            task_text = f"Follow up on message in #{channel_name}"
+        
+        # Create task from Slack event
+        task = Task.from_slack_event(
+            event=enriched_event,
+            task_text=task_text,
+            user_id=user_id
+        )
+        
+        # Store task in database
+        await asyncio.to_thread(self._store_task, task, user_id)
+        
+        # Light debug log for observability
+        try:
+            print(f"[Slack] Task created for user {user_id}: '{task_text}' (channel={enriched_event.get('channel_name','?')})")
+        except Exception:
+            pass
+        
+        return task
+
+    @staticmethod
+    def build_message_key(event_data: Dict[str, Any], user_id: str) -> str:
+        """
+        Idempotency key for one message and one YourMum user.
+
+        Channel + ts identifies the message itself, so the same message is
+        caught whether it arrives as an event, a retry or a history backfill;
+        event_id is the fallback when either is missing.
+        """
+        event = event_data.get('event', {}) or {}
+        channel = event.get('channel')
+        ts = event.get('ts')
+        message_id = f"{channel}:{ts}" if channel and ts else (event_data.get('event_id') or event.get('event_ts', ''))
+        return f"{message_id}:{user_id}"
+
+    def _get_processed_messages_collection(self):
+        return self.db_client.get_collection(PROCESSED_MESSAGES_COLLECTION)
+
+    def _claim_message(self, message_key: str, event_data: Dict[str, Any], user_id: str) -> bool:
+        """
+        Insert the message key before any Slack API call or schedule write.
+
+        Returns:
+            True if this delivery owns the message, False if it was already handled
+        """
+        if self.db_client is None:
+            return True
+        now = datetime.utcnow()
+        event = event_data.get('event', {}) or {}
+        try:
+            self._get_processed_messages_collection().insert_one({
+                'message_key': message_key,
+                'user_id': user_id,
+                'googleId': user_id,  # account deletion cleans up by googleId
+                'event_id': event_data.get('event_id'),
+                'channel': event.get('channel'),
+                'ts': event.get('ts'),
+                'status': 'processing',
+                'processed_at': now,
+                'created_at': now
+            })
+            return True
+        except DuplicateKeyError:
+            # Taken over only if the delivery that claimed it died mid-processing
             try:
-                print(f"[Slack] Task created for user {user_id}: '{task_text}' (channel={enriched_event.get('channel_name','?')})")
+                result = self._get_processed_messages_collection().update_one(
+                    {
+                        'message_key': message_key,
+                        'status': 'processing',
+                        'processed_at': {'$lt': now - timedelta(seconds=PROCESSING_CLAIM_SECONDS)}
+                    },
+                    {'$set': {'processed_at': now}}
+                )
+                return result.modified_count == 1
             except Exception:
-                pass
-            
-            return task
-            
+                return False
         except Exception as e:
-            # Log error but don't raise to avoid webhook failures
-            print(f"Error processing Slack event: {str(e)}")
-            return None
+            # Fail open: a missed duplicate is better than a dropped mention
+            print(f"[Slack] Idempotency check unavailable for {message_key}: {e}")
+            return True
+
+    def _release_message(self, message_key: str) -> None:
+        if self.db_client is None:
+            return
+        try:
+            self._get_processed_messages_collection().delete_one(
+                {'message_key': message_key, 'status': 'processing'}
+            )
+        except Exception as e:
+            print(f"[Slack] Could not release message key {message_key}: {e}")
+
+    def _mark_message_processed(self, message_key: str, task_id: str) -> None:
+        if self.db_client is None:
+            return
+        try:
+            self._get_processed_messages_collection().update_one(
+                {'message_key': message_key},
+                {'$set': {'status': 'done', 'task_id': task_id, 'processed_at': datetime.utcnow()}}
+            )
+        except Exception as e:
+            print(f"[Slack] Could not mark message {message_key} processed: {e}")
+
+    def _settle_message(self, message_key: str, task_id: str, future: Future) -> None:
+        """Resolve a claim whose task write outlived process_event."""
+        if future.exception() is None:
+            self._mark_message_processed(message_key, task_id)
+        else:
+            self._release_message(message_key)
+
+    def is_event_processed(self, event_id: Optional[str]) -> bool:
+        """True if any user has already handled this Slack event (retry fast path)."""
+        if not event_id or self.db_client is None:
+            return False
+        try:
+            return self._get_processed_messages_collection().find_one(
+                {'event_id': event_id}, {'_id': 1}
+            ) is not None
+        except Exception:
+            return False
 
     def _extract_task_text(self, text: str) -> str:
         """
@@ -425,7 +601,10 @@ class SlackService:
             return None
 
         users_collection = self.db_client.get_collection('users')
-        user_doc = users_collection.find_one({'googleId': user_id})
+        user_doc = user_cache.get_user(
+            user_id,
+            lambda: users_collection.find_one({'googleId': user_id})
+        )
 
         if not user_doc or 'slack_integration' not in user_doc:
             return None
@@ -474,55 +653,42 @@ class SlackService:
         return enriched_event
     
     async def _get_channel_name(self, channel_id: str, integration_data: Dict[str, Any]) -> str:
-        """Get channel name from Slack API"""
-        try:
-            bot_token = decrypt_token(integration_data['bot_token'])
-            client = WebClient(token=bot_token)
-            
-            response = client.conversations_info(channel=channel_id)
-            if response['ok']:
-                return response['channel']['name']
-        except Exception:
-            pass
-        
-        return 'Unknown Channel'
+        """Get channel name from the per-workspace metadata cache"""
+        return await slack_metadata.channel_name(
+            integration_data.get('team_id'),
+            channel_id,
+            lambda: decrypt_token(integration_data['bot_token'])
+        )
     
     async def _get_user_name(self, user_id: str, integration_data: Dict[str, Any]) -> str:
-        """Get user name from Slack API"""
-        try:
-            bot_token = decrypt_token(integration_data['bot_token'])
-            client = WebClient(token=bot_token)
-            
-            response = client.users_info(user=user_id)
-            if response['ok']:
-                return response['user']['name']
-        except Exception:
-            pass
-        
-        return 'Unknown User'
+        """Get user name from the per-workspace metadata cache"""
+        return await slack_metadata.user_name(
+            integration_data.get('team_id'),
+            user_id,
+            lambda: decrypt_token(integration_data['bot_token'])
+        )
     
     def _store_task(self, task: Task, user_id: str):
-        """Store task in database"""
+        """
+        Store task in database
+        
+        Tasks are batched per (user, date) by the write-behind buffer, which
+        also publishes one schedule_updated event per flush. Blocks until this
+        task's batch is written so a failure still releases the message key.
+        
+        Raises:
+            TaskWritePending: The batch was not written within STORE_TASK_TIMEOUT_SECONDS
+        """
         if self.db_client is None:
             return
         
-        # For now, we'll add to today's schedule
-        # This should integrate with existing schedule service
-        tasks_collection = self.db_client.get_collection('UserSchedules')
-
-        # Store under normalized date key used across schedule service
+        # For now, we'll add to today's schedule (UTC date key used across schedule service)
         today_str = datetime.utcnow().strftime('%Y-%m-%d')
-        formatted_date = format_schedule_date(today_str)
-
-        # Add task and update metadata timestamp without breaking existing schema
-        tasks_collection.update_one(
-            {'userId': user_id, 'date': formatted_date},
-            {
-                '$push': {'schedule': task.to_dict()},
-                '$set': {'metadata.last_modified': datetime.utcnow().isoformat()}
-            },
-            upsert=True
-        )
+        future = self.task_buffer.add(user_id, today_str, task.to_dict())
+        try:
+            future.result(timeout=STORE_TASK_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            raise TaskWritePending(task.id, future)
     
     def disconnect_integration(self, user_id: str) -> Dict[str, Any]:
         """
@@ -539,12 +705,18 @@ class SlackService:
                 raise ValueError("Database client not configured")
             
             users_collection = self.db_client.get_collection('users')
+            integration_data = self._get_user_integration(user_id) or {}
             
             # Remove Slack integration data
             users_collection.update_one(
                 {'googleId': user_id},
                 {'$unset': {'slack_integration': ""}}
             )
+            user_cache.invalidate(user_id)
+            # Stop routing the workspace's events to this user (all tables if unknown)
+            slack_user_router.invalidate(integration_data.get('workspace_id'))
+            if integration_data.get('bot_token'):
+                invalidate_decrypted_token(integration_data['bot_token'])
             
             return {'success': True}
             
@@ -0,0 +1,176 @@
+"""
+Write-behind buffer for Slack-derived schedule tasks.
+
+Each actionable Slack message used to cost one `update_one($push)` on the
+user's `UserSchedules` document, plus a `schedule_updated` SSE event. A burst
+in a busy channel therefore meant one round trip and one dashboard refetch per
+message for every mentioned user.
+
+Tasks are now grouped by `(user_id, date)` for `window_seconds` (or until
+`max_batch` tasks are pending). Each group is flushed as one
+`$push: {$each: [...]}` inside a single unordered `bulk_write`, and one
+`schedule_updated` event is published per group. `add()` returns a future that
+resolves once the task's group is written, so callers can wait for the write
+before marking the Slack message processed. A task is never acknowledged and
+then lost in the buffer.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.models.schedule_schema import format_schedule_date
+
+GroupKey = Tuple[str, str]
+
+
+class SlackTaskWriteBuffer:
+    """Coalesces Slack task inserts per (user, date) into batched bulk writes."""
+
+    def __init__(
+        self,
+        collection_getter: Callable[[], Any],
+        publisher: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        window_seconds: float = 0.2,
+        max_batch: int = 200
+    ) -> None:
+        """
+        Args:
+            collection_getter: Callable returning the UserSchedules collection
+            publisher: Callable(user_id, event) for SSE pushes (defaults to event_bus.publish)
+            window_seconds: How long the first task of a batch waits for company
+            max_batch: Pending tasks that trigger an immediate flush
+        """
+        self._collection_getter = collection_getter
+        self._publisher = publisher
+        self._window = window_seconds
+        self._max_batch = max(1, max_batch)
+        self._condition = threading.Condition()
+        self._pending: Dict[GroupKey, List[Tuple[Dict[str, Any], Future]]] = {}
+        self._pending_count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._counters = {'tasks': 0, 'flushes': 0, 'groups': 0, 'failed': 0}
+
+    def _publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        if self._publisher is None:
+            from backend.services.event_bus import event_bus
+            self._publisher = event_bus.publish
+        self._publisher(user_id, event)
+
+    def add(self, user_id: str, date_str: str, task: Dict[str, Any]) -> Future:
+        """
+        Queue a task for the user's schedule on `date_str` (YYYY-MM-DD).
+
+        Returns:
+            Future resolved with None once written, or with the write error
+        """
+        future: Future = Future()
+        with self._condition:
+            self._pending.setdefault((user_id, date_str), []).append((task, future))
+            self._pending_count += 1
+            self._counters['tasks'] += 1
+            self._ensure_thread()
+            # The flusher sleeps for the window once a batch starts; wake it early when full
+            if self._pending_count == 1 or self._pending_count >= self._max_batch:
+                self._condition.notify()
+        return future
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="slack-task-buffer", daemon=True)
+            self._thread.start()
+
+    def _take(self) -> Dict[GroupKey, List[Tuple[Dict[str, Any], Future]]]:
+        with self._condition:
+            batch, self._pending, self._pending_count = self._pending, {}, 0
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending and self._stopping:
+                    return
+                if self._pending_count < self._max_batch and not self._stopping:
+                    self._condition.wait(self._window)
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write every pending group now.
+
+        Returns:
+            Number of groups written
+        """
+        batch = self._take()
+        if not batch:
+            return 0
+        keys = list(batch)
+        now = datetime.utcnow().isoformat()
+        operations = [
+            UpdateOne(
+                {'userId': user_id, 'date': format_schedule_date(date_str)},
+                {
+                    '$push': {'schedule': {'$each': [task for task, _ in batch[(user_id, date_str)]]}},
+                    '$set': {'metadata.last_modified': now}
+                },
+                upsert=True
+            )
+            for user_id, date_str in keys
+        ]
+
+        failed: Dict[int, Exception] = {}
+        try:
+            self._collection_getter().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                failed[error['index']] = RuntimeError(error.get('errmsg', 'Schedule write failed'))
+        except Exception as e:
+            failed = {index: e for index in range(len(keys))}
+
+        written = 0
+        for index, (user_id, date_str) in enumerate(keys):
+            error = failed.get(index)
+            for _, future in batch[(user_id, date_str)]:
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+            if error is not None:
+                print(f"Slack task flush failed for user {user_id} on {date_str}: {error}")
+                continue
+            written += 1
+            try:
+                # One notification per schedule per flush, however many tasks landed
+                self._publish(user_id, {"type": "schedule_updated", "date": date_str})
+            except Exception as e:
+                print(f"Could not publish schedule update for user {user_id}: {e}")
+
+        with self._condition:
+            self._counters['flushes'] += 1
+            self._counters['groups'] += written
+            self._counters['failed'] += len(failed)
+        return written
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what is pending and stop the flusher thread."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {**self._counters, 'pending': self._pending_count}
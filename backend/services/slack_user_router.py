@@ -0,0 +1,123 @@
+"""
+Per-process routing table from Slack workspace members to YourMum users.
+
+`process_workspace_event` used to scan `users` by `slack_integration.workspace_id`
+with no supporting index. It then called `process_event` for every connected
+user, and each call loaded that user's document again only to find the user
+was not mentioned.
+
+This module keeps one table per workspace, mapping `slack_user_id` to the
+connected YourMum users and their integration data. The table is loaded with a
+single indexed query on `(slack_integration.workspace_id,
+slack_integration.slack_user_id)`. Each event's mentions are parsed once and
+looked up in the table, so only users who were actually mentioned are touched.
+SlackService invalidates a workspace's table on connect and disconnect. Other
+processes catch up within `ttl_seconds`.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from cachetools import TTLCache
+
+
+# <@U123> or <@U123|name>
+MENTION_PATTERN = re.compile(r"<@([UW][A-Z0-9]+)(?:\|[^>]*)?>")
+# <!here>, <!channel>, <!everyone> (optionally with a label)
+BROADCAST_PATTERN = re.compile(r"<!(?:here|channel|everyone)(?:\|[^>]*)?>", re.IGNORECASE)
+
+
+def parse_mentions(text: str) -> tuple[set, bool]:
+    """
+    Parse a Slack message once.
+
+    Returns:
+        (mentioned Slack user IDs, whether the message is a broadcast mention)
+    """
+    text = text or ''
+    return set(MENTION_PATTERN.findall(text)), bool(BROADCAST_PATTERN.search(text))
+
+
+class SlackUserRouter:
+    """Thread-safe TTL cache of workspace routing tables."""
+
+    def __init__(
+        self,
+        users_getter: Optional[Callable[[], Any]] = None,
+        ttl_seconds: float = 60,
+        max_workspaces: int = 1000,
+        timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._users_getter = users_getter
+        self._tables = TTLCache(maxsize=max_workspaces, ttl=ttl_seconds, timer=timer)
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _get_users_collection(self):
+        if self._users_getter is None:
+            from backend.db_config import get_users_collection
+            self._users_getter = get_users_collection
+        return self._users_getter()
+
+    def _load(self, team_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        cursor = self._get_users_collection().find(
+            {'slack_integration.workspace_id': team_id},
+            {'_id': 0, 'googleId': 1, 'slack_integration': 1}
+        )
+        table: Dict[str, List[Dict[str, Any]]] = {}
+        for user in cursor:
+            integration = user.get('slack_integration') or {}
+            if not user.get('googleId') or not integration.get('slack_user_id'):
+                continue
+            table.setdefault(integration['slack_user_id'], []).append({
+                'user_id': user['googleId'],
+                'integration': integration
+            })
+        return table
+
+    def table(self, team_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Routing table for a workspace, loading it on a miss."""
+        with self._lock:
+            table = self._tables.get(team_id)
+        if table is not None:
+            return table
+        table = self._load(team_id)
+        with self._lock:
+            self._tables[team_id] = table
+            self.loads += 1
+        return table
+
+    def recipients(self, team_id: str, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        YourMum users a message event concerns.
+
+        Returns:
+            List of {'user_id', 'integration'} for mentioned users, or every
+            connected user in the workspace for a broadcast mention
+        """
+        if not team_id:
+            return []
+        mentioned, broadcast = parse_mentions(event.get('text', ''))
+        if not mentioned and not broadcast:
+            return []
+        table = self.table(team_id)
+        if broadcast:
+            return [entry for entries in table.values() for entry in entries]
+        return [entry for slack_user_id in mentioned for entry in table.get(slack_user_id, [])]
+
+    def invalidate(self, team_id: Optional[str] = None) -> None:
+        """Drop one workspace's table, or every table when team_id is None."""
+        with self._lock:
+            if team_id is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(team_id, None)
+
+
+# Shared singleton instance for application use
+slack_user_router = SlackUserRouter(ttl_seconds=float(os.getenv('SLACK_ROUTING_TTL_SECONDS', '60')))
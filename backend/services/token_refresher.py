@@ -0,0 +1,259 @@
+"""
+Proactive Google OAuth access-token refresh.
+
+`_ensure_access_token_valid` used to refresh a token only after it had expired,
+inside whichever user request noticed first. That request paid the round trip
+to `oauth2.googleapis.com/token`, and concurrent requests on several workers
+could all refresh the same user at once and race on `calendar.credentials`.
+
+This job renews tokens `lead_seconds` before `expiresAt`, so request paths
+find a valid token. Every refresh, including the request-path fallback, goes
+through `refresh_user`, which holds a per-user single-flight lease in
+`OperationLeases`: one worker calls Google, and the others re-read the stored
+credentials after it finishes. The new token is never written to the lease
+document.
+
+Users whose refresh fails (e.g. revoked grant) are skipped for
+`retry_seconds` via `calendar.tokenRefreshRetryAt`.
+
+Run as a separate process (not inside web workers):
+    python -m backend.services.token_refresher
+    python -m backend.services.token_refresher --once --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.services.user_cache import user_cache
+
+
+TOKEN_REFRESH_OPERATION = 'token_refresh'
+
+
+def _expires_at(credentials: Dict[str, Any]) -> Optional[datetime]:
+    """Normalise the stored expiresAt (datetime, epoch seconds/ms or ISO string) to aware UTC."""
+    expires_at = credentials.get('expiresAt')
+    try:
+        if isinstance(expires_at, datetime):
+            return expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=timezone.utc)
+        if isinstance(expires_at, (int, float)):
+            return datetime.fromtimestamp(expires_at / 1000 if expires_at > 1e12 else expires_at, tz=timezone.utc)
+        if isinstance(expires_at, str):
+            return datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        return None
+    return None
+
+
+class TokenRefresher:
+    """Renews Google access tokens ahead of expiry, one worker per user at a time."""
+
+    def __init__(
+        self,
+        users_getter: Optional[Callable[[], Any]] = None,
+        flight=None,
+        lead_seconds: float = 300,
+        batch_size: int = 200,
+        max_workers: int = 4,
+        tick_seconds: float = 60.0,
+        retry_seconds: float = 900,
+        dry_run: bool = False,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ) -> None:
+        """
+        Args:
+            users_getter: Callable returning the users collection
+            flight: SingleFlight used for the per-user lease (defaults to the shared instance)
+            lead_seconds: Refresh tokens expiring within this many seconds
+            batch_size: Most users refreshed per pass
+            max_workers: Concurrent refresh calls to Google
+            tick_seconds: Interval between passes in run_forever
+            retry_seconds: Back-off after a failed refresh before the user is tried again
+            dry_run: Log due users without refreshing
+            clock: Returns the current timezone-aware UTC time
+        """
+        self._users_getter = users_getter
+        self._flight = flight
+        self._lead = timedelta(seconds=lead_seconds)
+        self._batch_size = max(1, batch_size)
+        self._max_workers = max(1, max_workers)
+        self._tick_seconds = tick_seconds
+        self._retry = timedelta(seconds=retry_seconds)
+        self._dry_run = dry_run
+        self._clock = clock
+        self._stop_event = threading.Event()
+
+    def _get_users_collection(self):
+        if self._users_getter is None:
+            from backend.db_config import get_users_collection
+            self._users_getter = get_users_collection
+        return self._users_getter()
+
+    def _get_flight(self):
+        if self._flight is None:
+            from backend.services.single_flight import single_flight
+            self._flight = single_flight
+        return self._flight
+
+    def refresh_user(
+        self,
+        users,
+        user_id: str,
+        credentials: Dict[str, Any],
+        lead: Optional[timedelta] = None
+    ) -> Optional[str]:
+        """
+        Return a valid access token for the user, refreshing it under the per-user lease.
+
+        Args:
+            users: users collection
+            user_id: User's googleId
+            credentials: Credentials the caller already holds (used if the re-read fails)
+            lead: Refresh if the token expires within this window (default: only if expired)
+
+        Returns:
+            Access token valid beyond the window, or None if it could not be refreshed
+        """
+        lead = lead or timedelta(0)
+
+        def _refresh() -> Optional[str]:
+            # Another worker may have refreshed while this one waited for the lease
+            current = credentials
+            try:
+                user = users.find_one({"googleId": user_id})
+                stored = ((user or {}).get('calendar') or {}).get('credentials') if isinstance(user, dict) else None
+                if isinstance(stored, dict) and stored.get('accessToken'):
+                    current = stored
+            except Exception as e:
+                print(f"Could not re-read credentials for user {user_id}: {e}")
+
+            expires_dt = _expires_at(current)
+            if current.get('accessToken') and expires_dt and expires_dt - self._clock() > lead:
+                return current.get('accessToken')
+
+            refresh_token = current.get('refreshToken') or current.get('refresh_token')
+            if not refresh_token:
+                return None
+            # Lazy import: calendar_routes imports this module
+            from backend.apis.calendar_routes import _refresh_access_token
+            return _refresh_access_token(users, user_id, current, refresh_token)
+
+        return self._get_flight().run(user_id, 'oauth', TOKEN_REFRESH_OPERATION, _refresh, share_result=False)
+
+    def due_users(self, now: datetime) -> List[Dict[str, Any]]:
+        """Connected users with a refresh token whose access token expires within the lead window."""
+        cursor = self._get_users_collection().find(
+            {
+                "calendar.connected": True,
+                "calendar.credentials.refreshToken": {"$nin": [None, ""]},
+                "calendar.credentials.expiresAt": {"$lte": now + self._lead},
+                "$or": [
+                    {"calendar.tokenRefreshRetryAt": {"$exists": False}},
+                    {"calendar.tokenRefreshRetryAt": {"$lte": now}}
+                ]
+            },
+            {"_id": 0, "googleId": 1, "calendar.credentials": 1}
+        ).sort("calendar.credentials.expiresAt", 1).limit(self._batch_size)
+        return list(cursor)
+
+    def _refresh_one(self, user: Dict[str, Any]) -> str:
+        user_id = user.get('googleId')
+        users = self._get_users_collection()
+        credentials = (user.get('calendar') or {}).get('credentials') or {}
+        try:
+            token = self.refresh_user(users, user_id, credentials, lead=self._lead)
+        except Exception as e:
+            print(f"Token refresh failed for user {user_id}: {e}")
+            traceback.print_exc()
+            token = None
+
+        try:
+            if token:
+                users.update_one({"googleId": user_id}, {"$unset": {"calendar.tokenRefreshRetryAt": ""}})
+            else:
+                users.update_one(
+                    {"googleId": user_id},
+                    {"$set": {"calendar.tokenRefreshRetryAt": self._clock() + self._retry}}
+                )
+            user_cache.invalidate(user_id)
+        except Exception as e:
+            print(f"Could not record token refresh outcome for user {user_id}: {e}")
+        return 'refreshed' if token else 'failed'
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Run one refresh pass.
+
+        Returns:
+            Counts of due users and outcomes
+        """
+        due = self.due_users(self._clock())
+        counts = {'due': len(due), 'refreshed': 0, 'failed': 0}
+        if not due:
+            return counts
+
+        if self._dry_run:
+            for user in due:
+                print(f"[DRY RUN] Would refresh access token for user {user.get('googleId')}")
+            return counts
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="token-refresh") as pool:
+            for outcome in pool.map(self._refresh_one, due):
+                counts[outcome] += 1
+
+        print(f"Token refresh pass: {counts}")
+        return counts
+
+    def run_forever(self) -> None:
+        """Run passes every `tick_seconds` until stop() is called."""
+        print(f"Token refresher started (lead={int(self._lead.total_seconds())}s, concurrency={self._max_workers})")
+        while not self._stop_event.is_set():
+            try:
+                counts = self.run_once()
+            except Exception as e:
+                print(f"Token refresh pass failed: {e}")
+                traceback.print_exc()
+                counts = {}
+            # A full batch means more users are due; go again without waiting
+            if counts.get('due', 0) < self._batch_size or self._dry_run:
+                self._stop_event.wait(self._tick_seconds)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+# Shared singleton instance for application use (request-path refreshes)
+token_refresher = TokenRefresher()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh Google access tokens before they expire")
+    parser.add_argument('--lead-seconds', type=float, default=300, help="Refresh tokens expiring within this window")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent refresh calls to Google")
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--tick-seconds', type=float, default=60.0)
+    parser.add_argument('--dry-run', action='store_true', help="Log due users without refreshing")
+    parser.add_argument('--once', action='store_true', help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    refresher = TokenRefresher(
+        lead_seconds=args.lead_seconds,
+        max_workers=args.concurrency,
+        batch_size=args.batch_size,
+        tick_seconds=args.tick_seconds,
+        dry_run=args.dry_run
+    )
+    if args.once:
+        print(refresher.run_once())
+    else:
+        refresher.run_forever()
+
+
+if __name__ == '__main__':
+    main()
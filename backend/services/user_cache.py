@@ -0,0 +1,140 @@
+"""
+Per-process, short-TTL cache of user documents keyed by googleId.
+
+A single request can read the same user document several times (auth,
+calendar credentials, watch setup, Slack integration). The cache serves those
+repeat reads from memory for a few seconds. Every code path that writes to the
+`users` collection calls `user_cache.invalidate(google_id)` so the next read
+goes back to MongoDB.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from cachetools import TTLCache
+
+
+class UserCache:
+    """Thread-safe TTL cache of full user documents (without `_id`).
+
+    Values are deep-copied on the way in and out so callers can mutate what
+    they get back (e.g. refreshed credentials) without corrupting the cache.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30,
+        max_entries: int = 5000,
+        timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl_seconds, timer=timer)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, google_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached user, or None (counted as a miss)."""
+        if not google_id:
+            return None
+        with self._lock:
+            user = self._cache.get(google_id)
+            if user is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(user)
+
+    def put(self, user: Optional[Dict[str, Any]]) -> None:
+        """Cache a full user document under its googleId."""
+        if not user or not user.get('googleId'):
+            return
+        stored = copy.deepcopy(user)
+        stored.pop('_id', None)
+        with self._lock:
+            self._cache[stored['googleId']] = stored
+
+    def get_user(
+        self,
+        google_id: str,
+        loader: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the user for `google_id`, loading and caching it on a miss.
+
+        Args:
+            google_id: User's googleId
+            loader: Callable returning the full user document from the database
+                (defaults to users.find_one by googleId)
+
+        Returns:
+            Copy of the user document without `_id`, or None if the user does not exist
+        """
+        cached = self.get(google_id)
+        if cached is not None:
+            return cached
+        if loader is None:
+            loader = lambda: _load_user(google_id)
+        user = loader()
+        if not user:
+            return user
+        self.put(user)
+        # Same shape as a cache hit
+        user = copy.deepcopy(user)
+        user.pop('_id', None)
+        return user
+
+    def invalidate(self, *google_ids: Optional[str]) -> None:
+        """Drop cached entries after a write to the users collection."""
+        with self._lock:
+            for google_id in google_ids:
+                if google_id and self._cache.pop(google_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters; every hit is a `users` read that never reached MongoDB."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'db_reads_saved': self.hits,
+                'hit_rate': self.hits / total if total else 0.0,
+                'invalidations': self.invalidations,
+                'size': len(self._cache)
+            }
+
+
+def project_user(user: Optional[Dict[str, Any]], projection: Optional[Dict[str, int]]) -> Optional[Dict[str, Any]]:
+    """Apply a top-level inclusion projection (as used for auth lookups) to a cached user."""
+    if not user or not projection:
+        return user
+    included = [field for field, flag in projection.items() if flag and field != '_id']
+    if not included:
+        return user
+    return {field: user[field] for field in included if field in user}
+
+
+def _load_user(google_id: str) -> Optional[Dict[str, Any]]:
+    # Lazy import keeps this module importable without database configuration
+    from backend.db_config import get_users_collection
+    return get_users_collection().find_one({"googleId": google_id}, {"_id": 0})
+
+
+# Shared singleton instance for application use
+user_cache = UserCache(
+    ttl_seconds=float(os.getenv('USER_CACHE_TTL_SECONDS', '30')),
+    max_entries=int(os.getenv('USER_CACHE_MAX_ENTRIES', '5000'))
+)
@@ -0,0 +1,20 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _clear_user_cache():
+    """Keep cached user documents from leaking between tests."""
+    # Lazy import so collecting unrelated tests does not load the service layer
+    from backend.services.user_cache import user_cache
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_calendar_revalidator():
+    """Keep in-flight calendar fetches from one test being shared with the next."""
+    from backend.services.calendar_revalidator import calendar_revalidator
+    calendar_revalidator.clear()
+    yield
+    calendar_revalidator.clear()
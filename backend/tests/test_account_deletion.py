@@ -141,4 +141,32 @@ class TestAccountDeletion:
         assert response.status_code == 500
         response_data = json.loads(response.data)
         assert response_data['success'] is False
-        assert 'error' in response_data 
\ No newline at end of file
+        assert 'error' in response_data 
+
+    @patch('backend.apis.routes.get_user_from_token')
+    @patch('backend.apis.routes.get_database')
+    def test_account_deletion_matches_each_collections_user_field(self, mock_get_db, mock_get_user, client, mock_user_data, auth_headers):
+        """Calendar events and schedules are keyed by userId, not googleId"""
+        mock_get_user.return_value = mock_user_data
+        collections = {}
+
+        def _collection(name):
+            collection = collections.setdefault(name, MagicMock())
+            collection.delete_many.return_value = MagicMock(deleted_count=1)
+            collection.delete_one.return_value = MagicMock(deleted_count=1)
+            return collection
+
+        mock_db = MagicMock()
+        mock_db.__getitem__.side_effect = _collection
+        mock_get_db.return_value = mock_db
+
+        with patch('backend.apis.routes.slack_service') as mock_slack_service:
+            mock_slack_service.disconnect_integration.return_value = (True, {"message": "Disconnected"})
+            response = client.delete('/api/auth/user', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert 'warnings' not in json.loads(response.data)
+        collections['calendar_events'].delete_many.assert_called_once_with({'userId': 'test-user-123'})
+        collections['UserSchedules'].delete_many.assert_called_once_with({'userId': 'test-user-123'})
+        collections['Processed Slack Messages'].delete_many.assert_called_once_with({'googleId': 'test-user-123'})
+        collections['users'].delete_one.assert_called_once_with({'googleId': 'test-user-123'})
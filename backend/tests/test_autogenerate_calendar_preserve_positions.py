@@ -33,7 +33,7 @@ def _make_schedule_doc(user_id: str, date: str, tasks, inputs=None):
     }
 
 
-@patch('backend.services.schedule_service.calendar_service.get_calendar_tasks_for_user_date')
+@patch('backend.services.calendar_service.get_calendar_tasks_for_user_date')
 def test_autogenerate_today_preserves_existing_calendar_positions(mock_get_calendar, _reset_mock_collection: MagicMock):
     user_id = 'u1'
     date = '2025-08-14'
@@ -70,6 +70,9 @@ def test_autogenerate_today_preserves_existing_calendar_positions(mock_get_calen
             if qdate == self._yesterday_fmt:
                 return self._first
             return None
+        def find(self, query, projection=None):
+            # History window query: yesterday is the only schedule before today
+            return MagicMock(sort=MagicMock(return_value=[self._first]))
         def replace_one(self, *args, **kwargs):
             return MagicMock(upserted_id='xyz')
     schedule_service.schedules_collection = FakeCollection(
@@ -0,0 +1,200 @@
+"""
+Tests for the rolling-window Google Calendar event store (calendar_events collection).
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from pymongo import DeleteOne, ReplaceOne
+
+from backend.services.calendar_event_store import CalendarEventStore
+
+
+NOW = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+
+
+class _FakeEvents:
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.bulk_calls = []
+        self.queries = []
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_calls.append(operations)
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return [
+            d for d in self.docs
+            if d['userId'] == query['userId']
+            and d['startTime'] < query['startTime']['$lt']
+            and d['endTime'] > query['endTime']['$gt']
+        ]
+
+
+def _store(collection, **kwargs):
+    return CalendarEventStore(collection_getter=lambda: collection, clock=lambda: NOW, **kwargs)
+
+
+def _event(eid, start, end, summary=None):
+    return {'id': eid, 'summary': summary or eid, 'status': 'confirmed',
+            'start': {'dateTime': start}, 'end': {'dateTime': end}}
+
+
+def _user(window=None, tz='UTC'):
+    calendar = {'connected': True, 'credentials': {'accessToken': 'at', 'expiresAt': NOW + timedelta(hours=1)}}
+    if window:
+        calendar['eventWindow'] = window
+    return {'googleId': 'u1', 'timezone': tz, 'calendar': calendar}
+
+
+FRESH_WINDOW = {'start': '2025-01-20', 'end': '2025-02-02', 'timezone': 'UTC', 'syncedAt': NOW - timedelta(minutes=5)}
+
+
+def test_window_covers_requires_fresh_matching_window():
+    store = _store(_FakeEvents(), ttl_seconds=900)
+
+    assert store.window_covers(_user(FRESH_WINDOW), '2025-01-25', 'UTC')
+    assert not store.window_covers(_user(FRESH_WINDOW), '2025-02-03', 'UTC')
+    assert not store.window_covers(_user(FRESH_WINDOW), '2025-01-25', 'Australia/Sydney')
+    assert not store.window_covers(_user({**FRESH_WINDOW, 'syncedAt': NOW - timedelta(hours=1)}), '2025-01-25', 'UTC')
+    assert not store.window_covers(_user(), '2025-01-25', 'UTC')
+
+
+def test_store_window_upserts_events_and_records_window():
+    events = _FakeEvents()
+    users = MagicMock()
+    store = _store(events, window_days=14)
+
+    with patch('backend.services.calendar_event_store.user_cache') as mock_cache:
+        ok = store.store_window(users, 'u1', '2025-01-20', 'UTC', [
+            _event('ev-1', '2025-01-20T09:00:00Z', '2025-01-20T10:00:00Z'),
+            {'id': 'ev-2', 'summary': 'Holiday', 'start': {'date': '2025-01-27'}, 'end': {'date': '2025-01-28'}},
+        ])
+
+    assert ok is True
+    operations = events.bulk_calls[0]
+    replaces = [op for op in operations if isinstance(op, ReplaceOne)]
+    assert [op._filter for op in replaces] == [{'eventId': 'u1:primary:ev-1'}, {'eventId': 'u1:primary:ev-2'}]
+    # Events deleted upstream are removed from the window
+    assert operations[0]._filter['eventId'] == {'$nin': ['u1:primary:ev-1', 'u1:primary:ev-2']}
+    users.update_one.assert_called_once_with({'googleId': 'u1'}, {'$set': {'calendar.eventWindow': {
+        'start': '2025-01-20', 'end': '2025-02-02', 'timezone': 'UTC', 'syncedAt': NOW
+    }}})
+    mock_cache.invalidate.assert_called_once_with('u1')
+
+
+def test_get_events_serves_covered_day_from_range_query():
+    stored = _event('ev-1', '2025-01-22T09:00:00Z', '2025-01-22T10:00:00Z')
+    events = _FakeEvents([{
+        'userId': 'u1',
+        'startTime': datetime(2025, 1, 22, 9, tzinfo=timezone.utc),
+        'endTime': datetime(2025, 1, 22, 10, tzinfo=timezone.utc),
+        'event': stored
+    }])
+    store = _store(events)
+
+    assert store.get_events(_user(FRESH_WINDOW), '2025-01-22', 'UTC') == [stored]
+    assert store.get_events(_user(FRESH_WINDOW), '2025-01-28', 'UTC') == []
+    assert store.get_events(_user(), '2025-01-22', 'UTC') is None
+
+
+def test_apply_changes_upserts_and_deletes():
+    events = _FakeEvents()
+    store = _store(events)
+
+    count = store.apply_changes('u1', [
+        _event('ev-1', '2025-01-22T09:00:00Z', '2025-01-22T10:00:00Z'),
+        {'id': 'ev-2', 'status': 'cancelled'},
+    ])
+
+    assert count == 2
+    replace, delete = events.bulk_calls[0]
+    assert isinstance(replace, ReplaceOne) and replace._filter == {'eventId': 'u1:primary:ev-1'}
+    assert delete == DeleteOne({'eventId': 'u1:primary:ev-2'})
+
+
+
+def test_events_are_keyed_by_the_calendar_they_came_from():
+    events = _FakeEvents()
+    store = _store(events)
+
+    with patch('backend.services.calendar_event_store.user_cache'):
+        store.store_window(MagicMock(), 'u1', '2025-01-20', 'UTC', [
+            _event('ev-1', '2025-01-20T09:00:00Z', '2025-01-20T10:00:00Z'),
+            {**_event('ev-2', '2025-01-20T11:00:00Z', '2025-01-20T12:00:00Z'), 'calendarId': 'team@group.calendar.google.com'},
+        ])
+
+    docs = [op._doc for op in events.bulk_calls[0] if isinstance(op, ReplaceOne)]
+    assert [(d['calendarId'], d['eventId']) for d in docs] == [
+        ('primary', 'u1:primary:ev-1'),
+        ('team@group.calendar.google.com', 'u1:team@group.calendar.google.com:ev-2'),
+    ]
+
+class _FakeUsers:
+    def __init__(self, user):
+        self.user = user
+        self.updates = []
+
+    def find_one(self, query):
+        return self.user if query.get('googleId') == self.user['googleId'] else None
+
+    def update_one(self, query, update):
+        self.updates.append(update)
+
+
+@patch('backend.services.calendar_service.get_database')
+@patch('backend.services.calendar_service.fetch_google_calendar_events')
+def test_calendar_tasks_for_covered_day_skip_google(mock_fetch, mock_get_db):
+    from backend.services import calendar_service as cs
+
+    mock_get_db.return_value = {'users': _FakeUsers(_user(FRESH_WINDOW))}
+    store = MagicMock()
+    store.get_events.return_value = [_event('ev-1', '2025-01-22T09:00:00Z', '2025-01-22T10:00:00Z', 'Standup')]
+
+    with patch.object(cs, 'calendar_event_store', store):
+        tasks = cs.get_calendar_tasks_for_user_date('u1', '2025-01-22')
+
+    assert [t['text'] for t in tasks] == ['Standup']
+    mock_fetch.assert_not_called()
+    store.store_window.assert_not_called()
+
+
+@patch('backend.services.calendar_service.get_database')
+@patch('backend.services.calendar_service.fetch_google_calendar_events')
+def test_calendar_tasks_for_uncovered_day_fetch_and_store_window(mock_fetch, mock_get_db):
+    from backend.services import calendar_service as cs
+
+    users = _FakeUsers(_user(tz='America/New_York'))
+    mock_get_db.return_value = {'users': users}
+    window = [
+        _event('ev-1', '2025-01-22T09:00:00Z', '2025-01-22T10:00:00Z', 'Today'),
+        _event('ev-2', '2025-01-24T09:00:00Z', '2025-01-24T10:00:00Z', 'Later'),
+    ]
+    mock_fetch.return_value = window
+    store = MagicMock()
+    store.window_days = 14
+    store.get_events.return_value = None
+
+    with patch.object(cs, 'calendar_event_store', store):
+        tasks = cs.get_calendar_tasks_for_user_date('u1', '2025-01-22')
+
+    assert [t['text'] for t in tasks] == ['Today']
+    assert mock_fetch.call_args.kwargs['days'] == 14
+    store.store_window.assert_called_once_with(users, 'u1', '2025-01-22', 'America/New_York', window)
+
+
+@patch('backend.services.calendar_service.get_database')
+@patch('backend.services.calendar_service.fetch_google_calendar_events', side_effect=RuntimeError('503'))
+def test_failed_fetch_is_not_stored(mock_fetch, mock_get_db):
+    from backend.services import calendar_service as cs
+
+    mock_get_db.return_value = {'users': _FakeUsers(_user())}
+    store = MagicMock()
+    store.window_days = 14
+    store.get_events.return_value = None
+
+    with patch.object(cs, 'calendar_event_store', store):
+        assert cs.get_calendar_tasks_for_user_date('u1', '2025-01-22') == []
+
+    store.store_window.assert_not_called()
@@ -0,0 +1,277 @@
+"""
+Tests for incremental (syncToken-based) Google Calendar sync in the webhook path.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.services.calendar_sync import CalendarDeltaSync
+
+
+USER_ID = "u-123"
+TODAY = "2025-01-20"
+
+
+class _FakeSchedules:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        low, high = query["date"]["$gte"], query["date"]["$lte"]
+        return [d for d in self.docs if d["userId"] == query["userId"] and low <= d["date"] <= high]
+
+
+def _schedule(date, *event_ids):
+    return {
+        "userId": USER_ID,
+        "date": f"{date}T00:00:00",
+        "schedule": [{"id": f"t-{e}", "text": e, "from_gcal": True, "gcal_event_id": e} for e in event_ids]
+    }
+
+
+def _timed(event_id, date, start="09:00", end="10:00", summary=None):
+    return {
+        "id": event_id,
+        "status": "confirmed",
+        "summary": summary or event_id,
+        "start": {"dateTime": f"{date}T{start}:00+00:00"},
+        "end": {"dateTime": f"{date}T{end}:00+00:00"},
+    }
+
+
+def _delta_sync(docs, service=None):
+    return CalendarDeltaSync(service=service or MagicMock(), schedules_getter=lambda: _FakeSchedules(docs))
+
+
+def test_plan_removes_cancelled_event_only_where_it_is_scheduled():
+    sync = _delta_sync([_schedule(TODAY, "ev-a"), _schedule("2025-01-22", "ev-b")])
+
+    plan = sync.plan(USER_ID, [{"id": "ev-b", "status": "cancelled"}], "UTC", TODAY)
+
+    assert plan == {"2025-01-22": {"upserts": [], "removed": ["ev-b"]}}
+
+
+def test_plan_upserts_changed_events_on_today_and_existing_schedules_only():
+    sync = _delta_sync([_schedule("2025-01-21")])
+
+    plan = sync.plan(USER_ID, [
+        _timed("ev-today", TODAY),
+        _timed("ev-tomorrow", "2025-01-21"),
+        _timed("ev-no-schedule", "2025-01-25"),
+        _timed("ev-beyond-horizon", "2025-03-01"),
+    ], "UTC", TODAY)
+
+    assert sorted(plan) == [TODAY, "2025-01-21"]
+    assert [t["gcal_event_id"] for t in plan[TODAY]["upserts"]] == ["ev-today"]
+    assert [t["gcal_event_id"] for t in plan["2025-01-21"]["upserts"]] == ["ev-tomorrow"]
+
+
+def test_plan_moves_rescheduled_event_between_dates():
+    sync = _delta_sync([_schedule(TODAY, "ev-moved"), _schedule("2025-01-21")])
+
+    plan = sync.plan(USER_ID, [_timed("ev-moved", "2025-01-21", summary="Moved")], "UTC", TODAY)
+
+    assert plan[TODAY] == {"upserts": [], "removed": ["ev-moved"]}
+    assert plan["2025-01-21"]["removed"] == []
+    assert plan["2025-01-21"]["upserts"][0]["text"] == "Moved"
+
+
+def test_apply_calls_webhook_merge_once_per_affected_date():
+    service = MagicMock()
+    service.apply_calendar_webhook_update.return_value = (True, {})
+    sync = _delta_sync([_schedule(TODAY, "ev-a"), _schedule("2025-01-23", "ev-b")], service)
+
+    results = sync.apply(USER_ID, [_timed("ev-a", TODAY, summary="Renamed"), {"id": "ev-b", "status": "cancelled"}], "UTC", TODAY)
+
+    assert results == {TODAY: True, "2025-01-23": True}
+    calls = {c.kwargs["date"]: c.kwargs for c in service.apply_calendar_webhook_update.call_args_list}
+    assert [t["text"] for t in calls[TODAY]["calendar_tasks"]] == ["Renamed"]
+    assert calls["2025-01-23"]["removed_event_ids"] == ["ev-b"]
+
+
+def test_apply_with_no_changes_touches_nothing():
+    service = MagicMock()
+    assert _delta_sync([], service).apply(USER_ID, [], "UTC", TODAY) == {}
+    service.apply_calendar_webhook_update.assert_not_called()
+
+
+def test_webhook_update_drops_removed_calendar_tasks():
+    from backend.services.schedule_service import ScheduleService
+
+    service = ScheduleService()
+    service.schedules_collection = MagicMock()
+    service.schedules_collection.find_one.return_value = {
+        "userId": USER_ID,
+        "date": f"{TODAY}T00:00:00",
+        "schedule": [
+            {"id": "manual", "text": "Manual", "type": "task", "completed": False},
+            {"id": "t-gone", "text": "Gone", "type": "task", "from_gcal": True, "gcal_event_id": "ev-gone", "completed": False},
+            {"id": "t-kept", "text": "Kept", "type": "task", "from_gcal": True, "gcal_event_id": "ev-kept", "completed": False},
+        ],
+        "metadata": {"created_at": "2025-01-01T00:00:00", "last_modified": "2025-01-01T00:00:00", "source": "test"},
+        "inputs": {}
+    }
+
+    success, result = service.apply_calendar_webhook_update(
+        user_id=USER_ID, date=TODAY, calendar_tasks=[], removed_event_ids=["ev-gone"]
+    )
+
+    assert success is True
+    assert [t["id"] for t in result["schedule"]] == ["manual", "t-kept"]
+
+
+def _webhook_user(sync_token=None):
+    calendar = {
+        'connected': True,
+        'credentials': {'accessToken': 'at', 'expiresAt': datetime(2099, 1, 1, tzinfo=timezone.utc)},
+        'watch': {'channelId': 'chan-1', 'resourceId': 'res-1', 'token': 'tok-1'}
+    }
+    if sync_token:
+        calendar['syncToken'] = sync_token
+    return {'googleId': USER_ID, 'timezone': 'UTC', 'calendar': calendar}
+
+
+@pytest.fixture
+def webhook():
+    from backend.apis.calendar_routes import process_calendar_notification
+
+    mock_users = MagicMock()
+    mock_db = MagicMock()
+    mock_db.__getitem__.side_effect = lambda name: mock_users if name == 'users' else MagicMock()
+
+    with patch('backend.apis.calendar_routes.get_database', return_value=mock_db):
+        def _process(user):
+            # What the webhook queue worker runs for a channel
+            mock_users.find_one.return_value = user
+            return process_calendar_notification('chan-1', 'res-1', 'tok-1')
+        yield _process, mock_users
+
+
+@patch('backend.apis.calendar_routes.fetch_google_calendar_events')
+@patch('backend.apis.calendar_routes.event_bus.publish')
+@patch('backend.apis.calendar_routes.calendar_event_store')
+@patch('backend.apis.calendar_routes.calendar_delta_sync')
+@patch('backend.apis.calendar_routes.fetch_google_calendar_changes')
+def test_webhook_with_sync_token_applies_delta_only(mock_changes, mock_delta, mock_store, mock_publish, mock_fetch_day, webhook):
+    post, mock_users = webhook
+    mock_changes.return_value = ([{"id": "ev-1", "status": "cancelled"}], "sync-2")
+    mock_delta.apply.return_value = {"2025-01-21": True, "2025-01-22": True}
+    mock_delta.horizon_days = 14
+
+    result = post(_webhook_user(sync_token="sync-1"))
+
+    assert result["mode"] == "incremental"
+    assert mock_changes.call_args.kwargs["sync_token"] == "sync-1"
+    mock_fetch_day.assert_not_called()
+    mock_store.apply_changes.assert_called_once_with(USER_ID, mock_changes.return_value[0])
+    assert sorted(c.args[1]["date"] for c in mock_publish.call_args_list) == ["2025-01-21", "2025-01-22"]
+    mock_users.update_one.assert_called_with({"googleId": USER_ID}, {"$set": {"calendar.syncToken": "sync-2"}})
+
+
+@patch('backend.apis.calendar_routes.fetch_google_calendar_events')
+@patch('backend.apis.calendar_routes.event_bus.publish')
+@patch('backend.apis.calendar_routes.calendar_event_store')
+@patch('backend.apis.calendar_routes.calendar_delta_sync')
+@patch('backend.apis.calendar_routes.fetch_google_calendar_changes')
+def test_primary_changes_refetch_the_window_when_other_calendars_are_selected(
+        mock_changes, mock_delta, mock_store, mock_publish, mock_fetch_day, webhook):
+    post, mock_users = webhook
+    mock_changes.return_value = ([{"id": "ev-1", "status": "cancelled"}], "sync-2")
+    mock_delta.apply.return_value = {}
+    mock_delta.horizon_days = 14
+    user = _webhook_user(sync_token="sync-1")
+    user['calendar']['selectedCalendars'] = ['me@example.com', 'team@group.calendar.google.com']
+
+    result = post(user)
+
+    assert result["mode"] == "incremental"
+    # Stored events are keyed by the selected IDs, not 'primary'
+    mock_store.apply_changes.assert_not_called()
+    mock_store.invalidate_window.assert_called_once_with(mock_users, USER_ID)
+
+
+class _DeferredPool:
+    """Holds submitted bootstraps until the test runs them."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn):
+        self.pending.append(fn)
+
+    def run(self):
+        while self.pending:
+            self.pending.pop(0)()
+
+
+@patch('backend.apis.calendar_routes.fetch_google_calendar_events', return_value=[])
+@patch('backend.apis.calendar_routes.event_bus.publish')
+@patch('backend.apis.calendar_routes.schedule_service.apply_calendar_webhook_update', return_value=(True, {}))
+@patch('backend.apis.calendar_routes.fetch_google_calendar_changes')
+def test_webhook_falls_back_to_full_resync_on_410(mock_changes, mock_apply, mock_publish, mock_fetch_day, webhook):
+    from backend.apis.calendar_routes import CalendarSyncTokenExpired
+
+    post, mock_users = webhook
+    mock_changes.side_effect = [CalendarSyncTokenExpired("gone"), ([], "fresh-token")]
+    pool = _DeferredPool()
+
+    with patch('backend.apis.calendar_routes._sync_token_pool', pool):
+        result = post(_webhook_user(sync_token="stale"))
+
+        assert result["status"] == "ok"
+        assert "mode" not in result
+        mock_fetch_day.assert_called_once()
+        mock_apply.assert_called_once()
+        # The token listing is not part of processing the notification
+        assert mock_changes.call_count == 1 and len(pool.pending) == 1
+        pool.run()
+
+    updates = [c.args[1] for c in mock_users.update_one.call_args_list]
+    assert updates[:2] == [
+        {"$unset": {"calendar.syncToken": "", "calendar.syncTokenCoversUntil": ""}},
+        {"$unset": {"calendar.eventWindow": ""}},
+    ]
+    assert updates[2]["$set"]["calendar.syncToken"] == "fresh-token"
+    # Bootstrap listing only asks for tokens, over a bounded window
+    kwargs = mock_changes.call_args.kwargs
+    assert kwargs["fields"] == 'nextPageToken,nextSyncToken'
+    assert kwargs["time_min"] < kwargs["time_max"]
+
+
+@patch('backend.apis.calendar_routes.fetch_google_calendar_changes', return_value=([], "fresh-token"))
+def test_bootstrap_lists_a_bounded_window_and_records_its_end(mock_changes):
+    from backend.apis.calendar_routes import _bootstrap_sync_token
+
+    users = MagicMock()
+    now_local = datetime(2025, 1, 20, 15, 30, tzinfo=timezone.utc)
+
+    with patch('backend.apis.calendar_routes.SYNC_TOKEN_BOOTSTRAP_DAYS', 30):
+        _bootstrap_sync_token(users, USER_ID, 'at', now_local)
+
+    kwargs = mock_changes.call_args.kwargs
+    assert (kwargs["time_min"], kwargs["time_max"]) == ("2025-01-19T00:00:00Z", "2025-02-19T00:00:00Z")
+    users.update_one.assert_called_once_with({"googleId": USER_ID}, {"$set": {
+        "calendar.syncToken": "fresh-token", "calendar.syncTokenCoversUntil": "2025-02-19"
+    }})
+
+
+@patch('backend.apis.calendar_routes.fetch_google_calendar_events', return_value=[])
+@patch('backend.apis.calendar_routes.event_bus.publish')
+@patch('backend.apis.calendar_routes.schedule_service.apply_calendar_webhook_update', return_value=(True, {}))
+@patch('backend.apis.calendar_routes.fetch_google_calendar_changes')
+def test_token_that_ends_before_the_sync_horizon_is_replaced(mock_changes, mock_apply, mock_publish, mock_fetch_day, webhook):
+    post, _ = webhook
+    user = _webhook_user(sync_token="old")
+    user['calendar']['syncTokenCoversUntil'] = "2000-01-01"
+
+    with patch('backend.apis.calendar_routes._sync_token_pool', _DeferredPool()) as pool:
+        result = post(user)
+
+    assert "mode" not in result
+    mock_changes.assert_not_called()
+    mock_fetch_day.assert_called_once()
+    assert len(pool.pending) == 1
@@ -0,0 +1,100 @@
+"""
+Tests for fetching all of a user's selected calendars concurrently.
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from urllib.parse import quote
+
+import pytest
+
+from backend.apis.calendar_routes import fetch_google_calendar_events
+
+
+def _event(event_id, start, summary):
+    return {'id': event_id, 'summary': summary, 'start': {'dateTime': start}, 'end': {'dateTime': start}}
+
+
+def _response(status, items=None):
+    response = MagicMock(status_code=status, text='')
+    response.json.return_value = {'items': items or []}
+    return response
+
+
+CALENDARS = {
+    'primary': [_event('a', '2025-01-20T09:00:00Z', 'Standup'), _event('shared', '2025-01-20T12:00:00Z', 'Lunch')],
+    'work@example.com': [_event('b', '2025-01-20T08:00:00Z', 'Early'), _event('shared', '2025-01-20T12:00:00Z', 'Lunch')],
+    'en.australian#holiday@group.v.calendar.google.com': [
+        {'id': 'h', 'summary': 'Holiday', 'start': {'date': '2025-01-20'}, 'end': {'date': '2025-01-21'}}
+    ],
+}
+
+
+def _fake_get(delay=0.0, statuses=None):
+    statuses = statuses or {}
+    calls = []
+    lock = threading.Lock()
+
+    def _get(url, endpoint=None, params=None, headers=None):
+        calendar_id = next(c for c in CALENDARS if url.endswith(f"/{quote(c, safe='')}/events"))
+        with lock:
+            calls.append(calendar_id)
+        time.sleep(delay)
+        status = statuses.get(calendar_id, 200)
+        return _response(status, CALENDARS[calendar_id] if status == 200 else None)
+
+    return _get, calls
+
+
+def test_selected_calendars_are_merged_in_sort_order():
+    fake_get, calls = _fake_get()
+
+    with patch('backend.apis.calendar_routes.google_http.get', side_effect=fake_get):
+        events = fetch_google_calendar_events('at', '2025-01-20', 'America/New_York', calendar_ids=list(CALENDARS))
+
+    assert sorted(calls) == sorted(CALENDARS)
+    # All-day first, then by start time; the event on two calendars appears once
+    assert [e['id'] for e in events] == ['h', 'b', 'a', 'shared']
+
+
+def test_calendars_are_fetched_concurrently():
+    fake_get, _ = _fake_get(delay=0.2)
+
+    with patch('backend.apis.calendar_routes.google_http.get', side_effect=fake_get):
+        start = time.perf_counter()
+        fetch_google_calendar_events('at', '2025-01-20', 'America/New_York', calendar_ids=list(CALENDARS))
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+
+
+def test_defaults_to_primary_calendar():
+    fake_get, calls = _fake_get()
+
+    with patch('backend.apis.calendar_routes.google_http.get', side_effect=fake_get):
+        events = fetch_google_calendar_events('at', '2025-01-20', 'America/New_York', calendar_ids=[])
+
+    assert calls == ['primary']
+    assert [e['id'] for e in events] == ['a', 'shared']
+
+
+def test_one_failed_calendar_fails_the_window_when_raising():
+    fake_get, _ = _fake_get(statuses={'work@example.com': 503})
+
+    with patch('backend.apis.calendar_routes.google_http.get', side_effect=fake_get):
+        with pytest.raises(RuntimeError):
+            fetch_google_calendar_events('at', '2025-01-20', 'America/New_York',
+                                         raise_errors=True, calendar_ids=list(CALENDARS))
+        # Best effort: keep the calendars that did load
+        events = fetch_google_calendar_events('at', '2025-01-20', 'America/New_York', calendar_ids=list(CALENDARS))
+
+    assert [e['id'] for e in events] == ['h', 'a', 'shared']
+
+
+def test_unauthorized_calendar_raises_permission_error():
+    fake_get, _ = _fake_get(statuses={'work@example.com': 401})
+
+    with patch('backend.apis.calendar_routes.google_http.get', side_effect=fake_get):
+        with pytest.raises(PermissionError):
+            fetch_google_calendar_events('at', '2025-01-20', 'America/New_York', calendar_ids=list(CALENDARS))
@@ -0,0 +1,139 @@
+"""
+Tests for stale-while-revalidate calendar reads used by autogenerate.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from backend.services.calendar_revalidator import CalendarRevalidator
+
+
+NOW = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+FRESH = [{'id': 'fresh', 'text': 'Fresh', 'from_gcal': True, 'gcal_event_id': 'ev-1'}]
+STALE = [{'id': 'stale', 'text': 'Stale', 'from_gcal': True, 'gcal_event_id': 'ev-1'}]
+
+
+def _revalidator(service=None, publisher=None, budget=0.05):
+    return CalendarRevalidator(
+        budget_seconds=budget,
+        service=service or MagicMock(),
+        publisher=publisher or MagicMock(),
+        clock=lambda: NOW
+    )
+
+
+def _blocked_fetch(release):
+    def _fetch(*_args, **_kwargs):
+        release.wait(5)
+        return FRESH
+    return _fetch
+
+
+@patch('backend.services.calendar_service.get_stored_calendar_tasks_for_user_date')
+@patch('backend.services.calendar_service.get_calendar_tasks_for_user_date', return_value=FRESH)
+def test_fast_fetch_is_served_fresh(mock_fetch, mock_stored):
+    revalidator = _revalidator()
+
+    tasks, pending = revalidator.read('u1', '2025-01-20', 'America/New_York')
+
+    assert tasks == FRESH and pending is None
+    mock_stored.assert_not_called()
+    assert revalidator.stats()['fresh_reads'] == 1
+
+
+@patch('backend.services.calendar_service.get_stored_calendar_tasks_for_user_date')
+@patch('backend.services.calendar_service.get_calendar_tasks_for_user_date')
+def test_slow_fetch_serves_stored_events_then_revalidates(mock_fetch, mock_stored):
+    release = threading.Event()
+    mock_fetch.side_effect = _blocked_fetch(release)
+    mock_stored.return_value = (STALE, NOW - timedelta(minutes=40))
+    service = MagicMock()
+    service.apply_calendar_webhook_update.return_value = (True, {})
+    published = threading.Event()
+    publisher = MagicMock(side_effect=lambda *_: published.set())
+    revalidator = _revalidator(service, publisher)
+
+    tasks, pending = revalidator.read('u1', '2025-01-20', 'America/New_York', cold_timeout_seconds=5)
+
+    assert tasks == STALE
+    assert pending is not None and not pending.done()
+    assert revalidator.user_stats('u1')['lastStalenessAgeSeconds'] == 2400
+
+    revalidator.revalidate_in_background('u1', '2025-01-20', pending)
+    release.set()
+    assert published.wait(2)
+
+    service.apply_calendar_webhook_update.assert_called_once_with(
+        user_id='u1', date='2025-01-20', calendar_tasks=FRESH
+    )
+    publisher.assert_called_once_with('u1', {"type": "schedule_updated", "date": "2025-01-20"})
+    assert revalidator.user_stats('u1')['lastTimeToFreshSeconds'] is not None
+    assert revalidator.stats()['stale_reads'] == 1
+    assert revalidator.stats()['pending_revalidations'] == 0
+
+
+@patch('backend.services.calendar_service.get_stored_calendar_tasks_for_user_date', return_value=None)
+@patch('backend.services.calendar_service.get_calendar_tasks_for_user_date')
+def test_without_stored_events_waits_for_cold_timeout(mock_fetch, mock_stored):
+    release = threading.Event()
+    mock_fetch.side_effect = _blocked_fetch(release)
+    timer = threading.Timer(0.1, release.set)
+    timer.start()
+
+    tasks, pending = _revalidator(budget=0.01).read('u1', '2025-01-20', cold_timeout_seconds=5)
+
+    assert tasks == FRESH and pending is None
+
+
+@patch('backend.services.calendar_service.get_stored_calendar_tasks_for_user_date')
+@patch('backend.services.calendar_service.get_calendar_tasks_for_user_date')
+def test_concurrent_reads_share_one_fetch(mock_fetch, mock_stored):
+    release = threading.Event()
+    mock_fetch.side_effect = _blocked_fetch(release)
+    mock_stored.return_value = (STALE, NOW)
+    revalidator = _revalidator()
+
+    first = revalidator.read('u1', '2025-01-20', 'America/New_York')
+    second = revalidator.read('u1', '2025-01-20', 'America/New_York')
+    release.set()
+
+    assert first[1] is second[1]
+    assert mock_fetch.call_count == 1
+    assert revalidator.stats()['shared_fetches'] == 1
+
+
+def test_empty_revalidation_leaves_schedule_untouched():
+    service = MagicMock()
+    publisher = MagicMock()
+    revalidator = _revalidator(service, publisher)
+    done = MagicMock()
+    done.result.return_value = []
+
+    revalidator._apply_fresh('u1', '2025-01-20', done)
+
+    service.apply_calendar_webhook_update.assert_not_called()
+    publisher.assert_not_called()
+
+
+def test_stored_tasks_ignore_window_ttl():
+    from backend.services import calendar_service as cs
+
+    synced_at = NOW - timedelta(hours=3)
+    user = {'googleId': 'u1', 'timezone': 'America/New_York', 'calendar': {'eventWindow': {
+        'start': '2025-01-20', 'end': '2025-02-02', 'timezone': 'America/New_York', 'syncedAt': synced_at
+    }}}
+    event = {'id': 'ev-1', 'summary': 'Standup', 'start': {'dateTime': '2025-01-20T09:00:00-05:00'},
+             'end': {'dateTime': '2025-01-20T09:30:00-05:00'}}
+    store = MagicMock()
+    store.get_events.return_value = [event]
+    store.window_synced_at.return_value = synced_at
+
+    with patch.object(cs, 'calendar_event_store', store), \
+            patch.object(cs, 'get_database', return_value={'users': MagicMock(find_one=MagicMock(return_value=user))}), \
+            patch.object(cs.user_cache, 'get_user', side_effect=lambda _id, loader: loader()):
+        tasks, stored_at = cs.get_stored_calendar_tasks_for_user_date('u1', '2025-01-20')
+
+    assert [t['text'] for t in tasks] == ['Standup']
+    assert stored_at == synced_at
+    assert store.get_events.call_args.kwargs['allow_stale'] is True
@@ -147,8 +147,8 @@ def test_get_calendar_events(mock_fetch_google_events, mock_get_user_id, client,
 
 @patch.dict(os.environ, {"GOOGLE_CLIENT_ID": "cid", "GOOGLE_CLIENT_SECRET": "csecret"}, clear=False)
 @patch('backend.apis.calendar_routes.get_user_id_from_token')
-@patch('backend.apis.calendar_routes.requests.post')
-@patch('backend.apis.calendar_routes.requests.get')
+@patch('backend.apis.calendar_routes.google_http.post')
+@patch('backend.apis.calendar_routes.google_http.get')
 def test_get_calendar_events_retries_on_401_refresh(mock_get, mock_post, mock_get_user_id, client, mock_db_connection):
     """If Google returns 401 for valid-looking token, route refreshes and retries once."""
     mock_get_user_id.return_value = 'u-401'
@@ -72,7 +72,7 @@ def test_service_refresh_and_retry_on_permission_error(mock_get_db, mock_ensure,
     assert second_call_args[0] == 'new-token'
 
 
-@patch('backend.apis.calendar_routes.requests.get')
+@patch('backend.apis.calendar_routes.google_http.get')
 def test_fetch_bubbles_permission_error_on_401(mock_get):
     # Simulate Google API 401
     resp = MagicMock()
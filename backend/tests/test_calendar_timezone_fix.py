@@ -77,7 +77,7 @@ class TestCalendarTimezoneFixPrimaryBug:
 class TestCalendarTimezoneFixSydneyTimezone:
     """Test timezone handling for Sydney (UTC+10) to fix the 'tomorrow's events' bug"""
     
-    @patch('backend.apis.calendar_routes.requests.get')
+    @patch('backend.apis.calendar_routes.google_http.get')
     def test_fetch_events_sydney_timezone_boundaries(self, mock_requests_get):
         """Test that Google Calendar API is called with correct timezone boundaries for Sydney"""
         # Mock successful API response
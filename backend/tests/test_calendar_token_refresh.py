@@ -18,7 +18,7 @@ def _mock_db():
 
 
 @patch.dict(os.environ, {"GOOGLE_CLIENT_ID": "cid", "GOOGLE_CLIENT_SECRET": "csecret"}, clear=False)
-@patch('backend.apis.calendar_routes.requests.post')
+@patch('backend.apis.calendar_routes.google_http.post')
 @patch('backend.apis.calendar_routes.fetch_google_calendar_events')
 @patch('backend.apis.calendar_routes.get_user_id_from_token', return_value='u-789')
 @patch('backend.apis.calendar_routes.get_database')
@@ -69,11 +69,15 @@ def test_token_refresh_on_expired_access_token(mock_get_db, _mock_token, mock_fe
         assert kwargs['data']['client_id'] == 'cid'
         assert kwargs['data']['client_secret'] == 'csecret'
 
-        # Stored credentials updated
+        # Stored credentials updated (the event store also records its window afterwards)
         assert mock_users.update_one.called
-        call_args, call_kwargs = mock_users.update_one.call_args
-        update_doc = call_kwargs if call_kwargs else call_args[1]
-        set_doc = update_doc['$set']
+        set_docs = [
+            (c.kwargs if c.kwargs else c.args[1]).get('$set', {})
+            for c in mock_users.update_one.call_args_list
+        ]
+        credential_updates = [d for d in set_docs if 'calendar.credentials' in d]
+        assert len(credential_updates) == 1
+        set_doc = credential_updates[0]
         assert set_doc['calendar.credentials']['accessToken'] == 'new-token'
         assert 'expiresAt' in set_doc['calendar.credentials']
 
@@ -83,7 +87,7 @@ def test_token_refresh_on_expired_access_token(mock_get_db, _mock_token, mock_fe
 
 
 @patch.dict(os.environ, {"GOOGLE_CLIENT_ID": "cid", "GOOGLE_CLIENT_SECRET": "csecret"}, clear=False)
-@patch('backend.apis.calendar_routes.requests.post')
+@patch('backend.apis.calendar_routes.google_http.post')
 @patch('backend.apis.calendar_routes.get_user_id_from_token', return_value='u-000')
 @patch('backend.apis.calendar_routes.get_database')
 def test_token_refresh_failure_returns_error(mock_get_db, _mock_token, mock_post, client=None):
@@ -16,7 +16,7 @@ def _mock_db():
     "GOOGLE_CLIENT_SECRET": "csecret",
     "GOOGLE_CALENDAR_WEBHOOK_URL": "https://yourdai-production.up.railway.app/api/calendar/webhook"
 }, clear=False)
-@patch('backend.apis.calendar_routes.requests.post')
+@patch('backend.apis.calendar_routes.google_http.post')
 @patch('backend.apis.calendar_routes.get_user_id_from_token', return_value='u-123')
 @patch('backend.apis.calendar_routes.get_database')
 def test_ensure_watch_creates_channel_when_missing(mock_get_db, _mock_uid, mock_post, client=None):
@@ -128,7 +128,7 @@ def test_ensure_watch_noop_when_valid_watch_exists(mock_get_db, _mock_uid, clien
     "GOOGLE_CLIENT_SECRET": "csecret",
     "GOOGLE_CALENDAR_WEBHOOK_URL": "https://yourdai-production.up.railway.app/api/calendar/webhook"
 }, clear=False)
-@patch('backend.apis.calendar_routes.requests.post')
+@patch('backend.apis.calendar_routes.google_http.post')
 @patch('backend.apis.calendar_routes.get_user_id_from_token', return_value='u-345')
 @patch('backend.apis.calendar_routes.get_database')
 def test_ensure_watch_refreshes_when_expired(mock_get_db, _mock_uid, mock_post, client=None):
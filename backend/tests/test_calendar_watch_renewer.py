@@ -0,0 +1,126 @@
+"""
+Tests for the scheduled calendar watch-channel renewal job.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from backend.services.calendar_watch_renewer import CalendarWatchRenewer
+
+
+NOW = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+
+
+class _FakeUsers:
+    def __init__(self, due=None, stale=None):
+        self.due = due or []
+        self.stale = stale or []
+        self.queries = []
+        self.updates = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        users = self.stale if 'calendar.watch.channelId' in query else self.due
+        cursor = MagicMock()
+        cursor.sort.return_value.limit.return_value = users
+        cursor.limit.return_value = users
+        return cursor
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+def _renewer(users, **kwargs):
+    return CalendarWatchRenewer(users_getter=lambda: users, clock=lambda: NOW, **kwargs)
+
+
+def test_renews_users_inside_horizon():
+    users = _FakeUsers(due=[{'googleId': 'u1'}, {'googleId': 'u2'}])
+
+    with patch('backend.apis.calendar_routes.ensure_calendar_watch_for_user',
+               return_value=(True, {})) as mock_ensure:
+        counts = _renewer(users, horizon_seconds=3600, max_workers=2).run_once()
+
+    assert counts['due'] == 2 and counts['renewed'] == 2
+    renewed = sorted(call.args[0] for call in mock_ensure.call_args_list)
+    assert renewed == ['u1', 'u2']
+    assert all(call.kwargs['renew_within'] == timedelta(seconds=3600) for call in mock_ensure.call_args_list)
+    expiry_clause = users.queries[0]['$and'][0]['$or'][1]
+    assert expiry_clause == {'calendar.watch.expiration': {'$lte': NOW + timedelta(seconds=3600)}}
+
+
+def test_failed_renewal_backs_off():
+    users = _FakeUsers(due=[{'googleId': 'u1'}])
+
+    with patch('backend.apis.calendar_routes.ensure_calendar_watch_for_user',
+               return_value=(False, {'error': 'No valid access token'})):
+        counts = _renewer(users, retry_seconds=600).run_once()
+
+    assert counts['failed'] == 1
+    assert users.updates == [
+        ({'googleId': 'u1'}, {'$set': {'calendar.watchRenewRetryAt': NOW + timedelta(seconds=600)}})
+    ]
+
+
+def test_stale_channels_are_stopped_and_cleared():
+    stale = {
+        'googleId': 'u3',
+        'calendar': {
+            'watch': {'channelId': 'chan-old', 'resourceId': 'res-old'},
+            'credentials': {'accessToken': 'at'}
+        }
+    }
+    users = _FakeUsers(stale=[stale])
+
+    with patch('backend.apis.calendar_routes.stop_calendar_watch_channel', return_value=True) as mock_stop:
+        counts = _renewer(users).run_once()
+
+    assert counts['stopped'] == 1
+    mock_stop.assert_called_once_with('at', 'chan-old', 'res-old')
+    query, update = users.updates[0]
+    assert query['googleId'] == 'u3'
+    assert 'calendar.watch' in update['$unset']
+
+
+def test_dry_run_touches_nothing():
+    users = _FakeUsers(due=[{'googleId': 'u1'}])
+
+    with patch('backend.apis.calendar_routes.ensure_calendar_watch_for_user') as mock_ensure:
+        counts = _renewer(users, dry_run=True).run_once()
+
+    assert counts['due'] == 1
+    mock_ensure.assert_not_called()
+    assert users.updates == []
+
+
+@patch('backend.apis.calendar_routes.stop_calendar_watch_channel', return_value=True)
+@patch('backend.apis.calendar_routes.google_http.post')
+@patch('backend.apis.calendar_routes.get_database')
+def test_renewal_replaces_live_channel_and_stops_old_one(mock_get_db, mock_post, mock_stop, monkeypatch):
+    from backend.apis.calendar_routes import ensure_calendar_watch_for_user
+
+    monkeypatch.setenv('GOOGLE_CALENDAR_WEBHOOK_URL', 'https://example.com/api/calendar/webhook')
+    now = datetime.now(timezone.utc)
+    mock_users = MagicMock()
+    mock_users.find_one.return_value = {
+        'googleId': 'u1',
+        'calendar': {
+            'connected': True,
+            'credentials': {'accessToken': 'at', 'expiresAt': now + timedelta(hours=1)},
+            'watch': {'channelId': 'chan-old', 'resourceId': 'res-old', 'expiration': now + timedelta(hours=2)}
+        }
+    }
+    mock_get_db.return_value = {'users': mock_users}
+    mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value={
+        'id': 'chan-new', 'resourceId': 'res-new',
+        'expiration': str(int((now + timedelta(days=7)).timestamp() * 1000))
+    }))
+
+    # Outside the horizon: nothing to do
+    ok, result = ensure_calendar_watch_for_user('u1', renew_within=timedelta(hours=1))
+    assert ok and result['watch']['channelId'] == 'chan-old'
+    mock_post.assert_not_called()
+
+    ok, result = ensure_calendar_watch_for_user('u1', renew_within=timedelta(hours=6))
+    assert ok and result['watch']['channelId'] == 'chan-new'
+    mock_stop.assert_called_once_with('at', 'chan-old', 'res-old')
@@ -10,11 +10,12 @@ def _mock_db(user_doc):
     return mock_db, mock_users
 
 
+@patch('backend.apis.calendar_routes.fetch_google_calendar_changes', return_value=([], 'sync-1'))
 @patch('backend.apis.calendar_routes.fetch_google_calendar_events')
 @patch('backend.services.event_bus.event_bus.publish')
 @patch('backend.apis.calendar_routes.schedule_service.apply_calendar_webhook_update', return_value=(True, {"schedule": []}))
 @patch('backend.apis.calendar_routes.get_database')
-def test_webhook_valid_triggers_sync_and_publish(mock_get_db, _mock_sync, mock_publish, mock_fetch, client=None):
+def test_webhook_valid_triggers_sync_and_publish(mock_get_db, _mock_sync, mock_publish, mock_fetch, mock_changes, client=None):
     import application as app
     with app.create_app(testing=True).test_client() as client:
         # Prepare user doc with matching watch and valid credentials
@@ -41,19 +42,29 @@ def test_webhook_valid_triggers_sync_and_publish(mock_get_db, _mock_sync, mock_p
         # Mock fetch events to return an empty list (we only assert publish is called)
         mock_fetch.return_value = []
 
-        # Send webhook request with required headers
-        resp = client.post(
-            '/api/calendar/webhook',
-            headers={
-                'X-Goog-Channel-ID': 'chan-1',
-                'X-Goog-Resource-ID': 'res-1',
-                'X-Goog-Channel-Token': 'tok-1',
-                'Content-Type': 'application/json'
-            },
-            data=b''
-        )
+        # Send webhook request with required headers; it is acknowledged and queued
+        with patch('backend.apis.calendar_routes.calendar_webhook_queue') as mock_queue:
+            mock_queue.enqueue.return_value = True
+            resp = client.post(
+                '/api/calendar/webhook',
+                headers={
+                    'X-Goog-Channel-ID': 'chan-1',
+                    'X-Goog-Resource-ID': 'res-1',
+                    'X-Goog-Channel-Token': 'tok-1',
+                    'Content-Type': 'application/json'
+                },
+                data=b''
+            )
 
         assert resp.status_code == 200
+        assert resp.get_json() == {"status": "queued"}
+        mock_queue.enqueue.assert_called_once_with('chan-1', 'res-1', 'tok-1')
+        mock_queue.ensure_web_worker.assert_called_once_with()
+        assert not _mock_sync.called
+
+        # The queue worker then runs the sync for the channel
+        from backend.apis.calendar_routes import process_calendar_notification
+        assert process_calendar_notification('chan-1', 'res-1', 'tok-1')['status'] == 'ok'
 
         # Verify schedule sync called with today's date
         args, kwargs = _mock_sync.call_args
@@ -73,6 +84,12 @@ def test_webhook_valid_triggers_sync_and_publish(mock_get_db, _mock_sync, mock_p
         assert pub_args[1]['type'] == 'schedule_updated'
         assert 'date' in pub_args[1]
 
+        # Without a stored sync token, one is obtained for the next notification
+        mock_users.update_one.assert_called_with(
+            {"googleId": "u-123"},
+            {"$set": {"calendar.syncToken": "sync-1"}}
+        )
+
 
 @patch('backend.apis.calendar_routes.fetch_google_calendar_events')
 @patch('backend.services.event_bus.event_bus.publish')
@@ -85,18 +102,21 @@ def test_webhook_no_matching_watch_is_noop(mock_get_db, mock_sync, mock_publish,
         mock_db, mock_users = _mock_db(None)
         mock_get_db.return_value = mock_db
 
-        resp = client.post(
-            '/api/calendar/webhook',
-            headers={
-                'X-Goog-Channel-ID': 'chan-x',
-                'X-Goog-Resource-ID': 'res-x',
-                'X-Goog-Channel-Token': 'tok-x'
-            },
-            data=b''
-        )
+        # Queue unavailable: the notification is processed inline
+        with patch('backend.apis.calendar_routes.calendar_webhook_queue.enqueue', return_value=False):
+            resp = client.post(
+                '/api/calendar/webhook',
+                headers={
+                    'X-Goog-Channel-ID': 'chan-x',
+                    'X-Goog-Resource-ID': 'res-x',
+                    'X-Goog-Channel-Token': 'tok-x'
+                },
+                data=b''
+            )
 
         # Still respond 200 OK quickly but no actions
         assert resp.status_code == 200
+        assert resp.get_json() == {"status": "no-user"}
         assert not mock_sync.called
         assert not mock_publish.called
 
@@ -0,0 +1,197 @@
+"""
+Tests for the per-channel debounced calendar webhook queue.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from backend.services.calendar_webhook_queue import CalendarWebhookQueue
+
+
+class _Clock:
+    def __init__(self):
+        self.now = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class _FakeQueueCollection:
+    """Implements just the queue's operations on an in-memory dict."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query['_id'])
+        if doc is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0)
+            doc = {'_id': query['_id'], **update.get('$setOnInsert', {})}
+            self.docs[query['_id']] = doc
+        doc.update(update.get('$set', {}))
+        for field, amount in update.get('$inc', {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        return SimpleNamespace(matched_count=1)
+
+    def find_one_and_update(self, query, update, sort=None, return_document=None):
+        due = [
+            d for d in self.docs.values()
+            if d['pending'] == query['pending']
+            and d['leaseUntil'] <= query['leaseUntil']['$lte']
+            and ('dueAt' not in query or d['dueAt'] <= query['dueAt']['$lte'])
+        ]
+        if not due:
+            return None
+        doc = min(due, key=lambda d: d['dueAt'])
+        before = dict(doc)
+        doc.update(update['$set'])
+        return before
+
+    def delete_one(self, query):
+        doc = self.docs.get(query['_id'])
+        if doc is None or any(doc.get(k) != v for k, v in query.items() if k != '_id'):
+            return SimpleNamespace(deleted_count=0)
+        del self.docs[query['_id']]
+        return SimpleNamespace(deleted_count=1)
+
+
+def _queue(processor, **kwargs):
+    collection = _FakeQueueCollection()
+    clock = _Clock()
+    queue = CalendarWebhookQueue(
+        collection_getter=lambda: collection,
+        processor=processor,
+        debounce_seconds=3,
+        clock=clock,
+        **kwargs
+    )
+    return queue, collection, clock
+
+
+def test_burst_for_one_channel_collapses_into_one_sync():
+    calls = []
+    queue, collection, clock = _queue(lambda *args: calls.append(args) or {"status": "ok"})
+
+    for _ in range(5):
+        assert queue.enqueue('chan-1', 'res-1', 'tok-1')
+        clock.advance(0.5)
+
+    # Still inside the debounce window
+    assert queue.process_due() == 0
+    clock.advance(1)
+    assert queue.process_due() == 1
+
+    assert calls == [('chan-1', 'res-1', 'tok-1')]
+    assert collection.docs == {}
+    assert queue.stats()['collapsed'] == 4
+
+
+def test_channels_are_debounced_independently():
+    calls = []
+    queue, _, clock = _queue(lambda channel, *_: calls.append(channel) or {"status": "ok"})
+
+    queue.enqueue('chan-1', 'res-1', 'tok-1')
+    clock.advance(2)
+    queue.enqueue('chan-2', 'res-2', 'tok-2')
+    clock.advance(1.5)
+
+    assert queue.process_due() == 1
+    assert calls == ['chan-1']
+
+
+def test_notification_during_sync_runs_again_after_debounce():
+    queue, collection, clock = _queue(None)
+
+    def _process(channel, *_):
+        # Google notifies again while this sync is running
+        queue.enqueue(channel, 'res-1', 'tok-1')
+        return {"status": "ok"}
+
+    queue._processor = _process
+    queue.enqueue('chan-1', 'res-1', 'tok-1')
+    clock.advance(3)
+    queue.process_due()
+
+    assert collection.docs['chan-1']['pending'] is True
+    assert collection.docs['chan-1']['dueAt'] == clock.now + timedelta(seconds=3)
+
+
+def test_failed_sync_is_retried_then_dropped():
+    def _boom(*_):
+        raise RuntimeError('google down')
+
+    queue, collection, clock = _queue(_boom, max_attempts=2)
+    queue.enqueue('chan-1', 'res-1', 'tok-1')
+    clock.advance(3)
+
+    queue.process_due()
+    assert collection.docs['chan-1']['attempts'] == 1
+    assert collection.docs['chan-1']['pending'] is True
+
+    clock.advance(6)
+    queue.process_due()
+    assert collection.docs == {}
+    assert queue.stats()['dropped'] == 1
+
+
+def test_claimed_channel_is_hidden_until_lease_expires():
+    queue, collection, clock = _queue(lambda *_: {"status": "ok"}, lease_seconds=60)
+    queue.enqueue('chan-1', 'res-1', 'tok-1')
+    clock.advance(3)
+
+    # A worker claimed it and died before completing
+    assert queue._claim(clock(), force=False)['_id'] == 'chan-1'
+    collection.docs['chan-1']['pending'] = True
+    assert queue.process_due() == 0
+
+    clock.advance(61)
+    assert queue.process_due() == 1
+
+
+def test_enqueue_reports_unavailable_queue():
+    def _no_db():
+        raise RuntimeError('no mongo')
+
+    queue = CalendarWebhookQueue(collection_getter=_no_db)
+
+    assert queue.enqueue('chan-1', 'res-1', 'tok-1') is False
+
+
+def test_worker_process_drains_the_queue_until_stopped():
+    import threading
+
+    calls = []
+    queue, collection, clock = _queue(lambda channel, *_: calls.append(channel) or {"status": "ok"}, poll_interval=0.01)
+    queue.enqueue('chan-1', 'res-1', 'tok-1')
+    clock.advance(3)
+
+    worker = threading.Thread(target=queue.run_forever)
+    worker.start()
+    try:
+        for _ in range(200):
+            if calls:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        queue.stop()
+        worker.join(2)
+
+    assert calls == ['chan-1'] and collection.docs == {}
+    assert not worker.is_alive()
+
+
+def test_web_worker_is_skipped_when_a_dedicated_process_drains_the_queue():
+    dedicated, _, _ = _queue(None, worker_in_web=False)
+    dedicated.ensure_web_worker()
+    assert dedicated._thread is None
+
+    in_web, _, _ = _queue(lambda *_: {"status": "ok"}, poll_interval=0.01)
+    in_web.ensure_web_worker()
+    try:
+        assert in_web._thread.is_alive()
+    finally:
+        in_web.stop()
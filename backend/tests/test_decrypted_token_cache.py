@@ -0,0 +1,109 @@
+"""
+Tests for the decrypted integration token cache.
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from backend.services.slack_service import SlackService
+from backend.utils import encryption
+from backend.utils.encryption import DecryptedTokenCache, TokenEncryption
+
+
+class _CountingDecrypt:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, encrypted_token):
+        with self._lock:
+            self.calls += 1
+        return f"plain:{encrypted_token}"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_repeat_lookups_decrypt_once_and_key_by_digest():
+    cache = DecryptedTokenCache()
+    decrypt = _CountingDecrypt()
+
+    for _ in range(100):
+        assert cache.get_or_decrypt('cipher-a', decrypt) == 'plain:cipher-a'
+    cache.get_or_decrypt('cipher-b', decrypt)
+
+    assert decrypt.calls == 2
+    assert cache.stats() == {'hits': 99, 'misses': 2, 'size': 2}
+    # Neither the ciphertext nor the plaintext is used as a key
+    assert all(len(key) == 64 for key in cache._cache.keys())
+
+
+def test_entries_expire_and_cache_is_bounded():
+    clock = _Clock()
+    cache = DecryptedTokenCache(ttl_seconds=60, max_entries=2, timer=clock)
+    decrypt = _CountingDecrypt()
+
+    cache.get_or_decrypt('a', decrypt)
+    clock.now = 61
+    cache.get_or_decrypt('a', decrypt)
+    assert decrypt.calls == 2
+
+    cache.get_or_decrypt('b', decrypt)
+    cache.get_or_decrypt('c', decrypt)
+    assert cache.stats()['size'] == 2
+
+
+def test_failed_decrypt_is_not_cached():
+    cache = DecryptedTokenCache()
+    failing = Mock(side_effect=ValueError("Failed to decrypt token"))
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get_or_decrypt('bad', failing)
+    assert failing.call_count == 2
+    assert cache.stats()['size'] == 0
+
+
+def test_decrypt_token_uses_cache_and_is_thread_safe(monkeypatch):
+    instance = TokenEncryption()
+    calls = []
+    real_decrypt = instance.decrypt_token
+    monkeypatch.setattr(instance, 'decrypt_token', lambda token: calls.append(token) or real_decrypt(token))
+    monkeypatch.setattr(encryption, '_encryption_instance', instance)
+    monkeypatch.setattr(encryption, 'decrypted_token_cache', DecryptedTokenCache())
+    ciphertext = instance.encrypt_token('xoxb-secret')
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.extend(encryption.decrypt_token(ciphertext) for _ in range(50)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['xoxb-secret'] * 400
+    # Concurrent first misses may each decrypt; every later call is a hit
+    assert 1 <= len(calls) <= 8
+
+
+def test_disconnect_invalidates_cached_bot_token(monkeypatch):
+    for name in ('SLACK_CLIENT_ID', 'SLACK_CLIENT_SECRET', 'SLACK_SIGNING_SECRET'):
+        monkeypatch.setenv(name, 'x')
+    cache = DecryptedTokenCache()
+    monkeypatch.setattr(encryption, 'decrypted_token_cache', cache)
+    cache.get_or_decrypt('cipher-bot', _CountingDecrypt())
+
+    service = SlackService(db_client=Mock())
+    service._get_user_integration = Mock(return_value={'workspace_id': 'T1', 'bot_token': 'cipher-bot'})
+
+    assert service.disconnect_integration('user-1')['success'] is True
+    assert cache.stats()['size'] == 0
@@ -103,8 +103,8 @@ class TestTask22EnhancedEmptySchedule:
     ):
         """Test finding most recent schedule with input config"""
         
-        # Mock database calls - first call returns None, second returns recent schedule
-        mock_user_schedules_collection.find_one.side_effect = [None, sample_recent_schedule]
+        # Mock the history window query - one ranged query returns the recent schedule
+        mock_user_schedules_collection.find.return_value.sort.return_value = [sample_recent_schedule]
         
         # Create schedule service instance
         schedule_service = ScheduleService()
@@ -123,6 +123,13 @@ class TestTask22EnhancedEmptySchedule:
         assert 'inputs' in result
         assert result['inputs']['name'] == "Test User"
         assert result['inputs']['layout_preference']['subcategory'] == "day-sections"
+        
+        # Verify the lookback used a single ranged query instead of per-day lookups
+        mock_user_schedules_collection.find.assert_called_once()
+        query = mock_user_schedules_collection.find.call_args[0][0]
+        assert query['userId'] == "test_user_123"
+        assert query['date'] == {"$gte": "2025-01-11T00:00:00", "$lt": "2025-01-16T00:00:00"}
+        mock_user_schedules_collection.find_one.assert_not_called()
 
     def test_create_sections_from_config(self):
         """Test creating section tasks from layout preference"""
@@ -227,13 +234,11 @@ class TestTask22EnhancedEmptySchedule:
         mock_result.upserted_id = ObjectId()
         mock_user_schedules_collection.replace_one.return_value = mock_result
         
-        # Mock finding recent schedule with inputs
-        # Need to provide enough responses for all the database calls:
-        # 1. Initial check for target date (None)
-        # 2. Search for recent schedule with inputs (returns sample_recent_schedule)
-        # 3-32. Search for recurring tasks (30 days back, returns sample_recent_schedule for first few, then None)
-        mock_responses = [None, sample_recent_schedule] + [sample_recent_schedule] * 5 + [None] * 25
-        mock_user_schedules_collection.find_one.side_effect = mock_responses
+        # Mock the history window shared by the inputs and recurring task lookups
+        # (recent schedule from the day before the Monday target date)
+        mock_user_schedules_collection.find.return_value.sort.return_value = [
+            {**sample_recent_schedule, "date": "2025-01-05T00:00:00"}
+        ]
         
         # Create schedule service instance
         schedule_service = ScheduleService()
@@ -281,6 +286,7 @@ class TestTask22EnhancedEmptySchedule:
         mock_result.upserted_id = ObjectId()
         mock_user_schedules_collection.replace_one.return_value = mock_result
         mock_user_schedules_collection.find_one.return_value = None  # Always return None
+        mock_user_schedules_collection.find.return_value.sort.return_value = []  # Empty history window
         
         # Create schedule service instance
         schedule_service = ScheduleService()
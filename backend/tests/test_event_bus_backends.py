@@ -0,0 +1,158 @@
+"""
+Tests for the pluggable EventBus backends.
+"""
+
+import os
+from queue import Empty
+
+import pytest
+from bson import ObjectId, Timestamp
+
+from backend.services.event_bus import (
+    EventBus,
+    LocalEventBackend,
+    MongoCappedEventBackend,
+    create_event_backend,
+)
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.alive = True
+
+    def sort(self, key, direction):
+        assert key == "$natural"
+        return _FakeCursor(self.docs[::direction])
+
+    def limit(self, count):
+        return _FakeCursor(self.docs[:count])
+
+    def max_await_time_ms(self, ms):
+        return self
+
+    def __iter__(self):
+        self.alive = False
+        return iter(self.docs)
+
+    def close(self):
+        pass
+
+
+class _FakeCappedCollection:
+    """Stands in for the shared capped collection between two 'processes'."""
+
+    def __init__(self):
+        self.docs = []
+
+    def insert_one(self, doc, _id=None):
+        # The server stamps an empty timestamp in insertion order; ObjectIds come from clients
+        ts = Timestamp(1700000000, len(self.docs) + 1)
+        doc = {**doc, "_id": _id or ObjectId(), "ts": ts if doc.get("ts") == Timestamp(0, 0) else doc.get("ts")}
+        self.docs.append(doc)
+
+    def find(self, query, projection=None, cursor_type=None):
+        after = (query.get("ts") or {}).get("$gt")
+        return _FakeCursor([d for d in self.docs if after is None or d["ts"] > after])
+
+
+def _worker(collection, origin):
+    backend = MongoCappedEventBackend(collection_getter=lambda: collection)
+    backend._origin = origin
+    backend._owner_pid = os.getpid()
+    # Tail documents by hand instead of from a background thread
+    backend.ensure_tailing = lambda: None
+    return EventBus(backend), backend
+
+
+def test_local_backend_keeps_existing_api():
+    bus = EventBus(LocalEventBackend())
+    q = bus.subscribe("u1")
+    bus.publish("u1", {"type": "schedule_updated", "date": "2025-01-01"})
+    assert q.get_nowait() == {"type": "schedule_updated", "date": "2025-01-01"}
+
+    bus.unsubscribe("u1", q)
+    bus.publish("u1", {"type": "ignored"})
+    assert bus.subscribed_user_ids() == []
+
+
+def test_mongo_backend_delivers_across_workers_once():
+    collection = _FakeCappedCollection()
+    bus_a, backend_a = _worker(collection, "host:1:a")
+    bus_b, backend_b = _worker(collection, "host:2:b")
+    queue_a = bus_a.subscribe("u1")
+    queue_b = bus_b.subscribe("u1")
+
+    event = {"type": "calendar_events_updated", "date": "2025-01-01"}
+    bus_a.publish("u1", event)
+
+    # Publisher's own subscribers get it immediately, without the broker
+    assert queue_a.get_nowait() == event
+    assert collection.docs[0]["origin"] == "host:1:a"
+
+    # Each worker's tailer sees the broker document
+    for doc in collection.docs:
+        backend_a.handle_document(doc)
+        backend_b.handle_document(doc)
+
+    assert queue_b.get_nowait() == event
+    # The publishing worker skips its own document (no duplicate)
+    with pytest.raises(Empty):
+        queue_a.get_nowait()
+
+
+def test_publish_local_bypasses_broker():
+    collection = _FakeCappedCollection()
+    bus, _ = _worker(collection, "host:1:a")
+    q = bus.subscribe("u1")
+
+    bus.publish_local("u1", {"type": "schedule_updated", "date": "2025-01-01"})
+
+    assert q.get_nowait()["type"] == "schedule_updated"
+    assert collection.docs == []
+
+
+def test_create_event_backend_from_name():
+    assert isinstance(create_event_backend("local"), LocalEventBackend)
+    assert isinstance(create_event_backend("mongo"), MongoCappedEventBackend)
+    assert isinstance(create_event_backend("bogus"), LocalEventBackend)
+
+
+def test_tail_resumes_by_insertion_order_not_object_id():
+    collection = _FakeCappedCollection()
+    bus, backend = _worker(collection, "host:1:a")
+    backend._max_await_ms = 0
+    q = bus.subscribe("u1")
+    other = MongoCappedEventBackend(collection_getter=lambda: collection)
+    other._origin = "host:2:b"
+
+    # Tailing began before anything was published
+    backend._last_ts = Timestamp(1700000000, 0)
+    other.publish("u1", {"type": "first"})
+    backend._tail_once()
+    assert q.get_nowait() == {"type": "first"}
+    # A third process whose ObjectIds sort before the last one seen
+    collection.insert_one(
+        {"ts": Timestamp(0, 0), "userId": "u1", "event": {"type": "second"}, "origin": "host:3:c"},
+        _id=ObjectId("000000000000000000000001")
+    )
+
+    backend._tail_once()
+
+    assert q.get_nowait() == {"type": "second"}
+
+
+def test_broker_collection_is_resolved_once():
+    collection = _FakeCappedCollection()
+    calls = []
+
+    def _getter():
+        calls.append(1)
+        return collection
+
+    backend = MongoCappedEventBackend(collection_getter=_getter)
+    for i in range(5):
+        backend.publish("u1", {"type": "schedule_updated", "n": i})
+
+    assert len(calls) == 1
+    assert len(collection.docs) == 5
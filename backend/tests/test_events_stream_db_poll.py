@@ -1,8 +1,8 @@
 import sys
 import os
-from types import SimpleNamespace
 
 import pytest
+from pymongo.errors import OperationFailure
 
 # Ensure project root on sys.path for imports
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,67 +11,157 @@ if PROJECT_ROOT not in sys.path:
 
 import application  # noqa: F401
 
+from backend.services.event_bus import EventBus
+from backend.services.schedule_change_feed import ScheduleChangeFeed
+
 
 class _FakeCollection:
-    def __init__(self, docs_by_date):
-        self._docs_by_date = docs_by_date
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
 
-    def find_one(self, query):
-        # Expecting query contains userId and date
-        date = query.get("date")
-        return self._docs_by_date.get(date)
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        users = set(query["userId"]["$in"])
+        dates = set(query["date"]["$in"])
+        return [d for d in self.docs if d["userId"] in users and d["date"] in dates]
 
 
 def _doc(user_id: str, date: str, last_modified: str):
     return {
         "userId": user_id,
         "date": date,
-        "schedule": [],
-        "metadata": {
-            "created_at": "2025-01-01T00:00:00",
-            "last_modified": last_modified,
-            "source": "test"
-        },
-        "inputs": {}
+        "metadata": {"last_modified": last_modified}
     }
 
 
-@pytest.mark.parametrize("initial,last,next_lm,should_emit", [
-    (None, "2025-08-14T00:00:00", "2025-08-14T00:00:00", False),  # initial set only
-    ("2025-08-14T00:00:00", "2025-08-14T00:00:00", "2025-08-14T01:00:00", True),  # change triggers emit
-])
-def test_poll_helper_detects_change(monkeypatch, initial, last, next_lm, should_emit):
-    user_id = "u1"
-    tz = "Australia/Sydney"
-    date = "2025-08-14"
-
-    # Prepare fake collection docs across two reads
-    docs = {
-        date: _doc(user_id, date, last)
-    }
-    fake_collection = _FakeCollection(docs)
+def _today_stored_date(feed_collection):
+    # Middle entry of the yesterday/today/tomorrow window
+    return feed_collection.queries[-1]["date"]["$in"][1]
+
 
-    # Patch get_user_schedules_collection to our fake
-    from backend.apis import routes as routes_mod
+def test_poll_once_batches_all_subscribers_into_one_query():
+    bus = EventBus()
+    bus.subscribe("u1")
+    bus.subscribe("u2")
+    bus.subscribe("u2")  # second tab for the same user
+    collection = _FakeCollection([])
+    feed = ScheduleChangeFeed(bus, collection_getter=lambda: collection, mode='poll')
 
-    def _get_user_schedules_collection():
-        return fake_collection
+    feed.poll_once()
 
-    monkeypatch.setattr(routes_mod, 'get_user_schedules_collection', _get_user_schedules_collection)
+    assert len(collection.queries) == 1
+    assert sorted(collection.queries[0]["userId"]["$in"]) == ["u1", "u2"]
+    assert len(collection.queries[0]["date"]["$in"]) == 3
 
-    # Call helper first time
-    payload, new_seen = routes_mod._poll_schedule_update(user_id, tz, initial, date_override=date)
-    assert (payload is not None) == False
-    assert new_seen == last
 
-    # Update doc with new last_modified
-    docs[date] = _doc(user_id, date, next_lm)
+def test_poll_once_skips_query_without_subscribers():
+    collection = _FakeCollection([])
+    feed = ScheduleChangeFeed(EventBus(), collection_getter=lambda: collection, mode='poll')
 
-    payload2, new_seen2 = routes_mod._poll_schedule_update(user_id, tz, new_seen, date_override=date)
-    assert (payload2 is not None) == should_emit
+    assert feed.poll_once() == 0
+    assert collection.queries == []
+
+
+@pytest.mark.parametrize("first,second,should_emit", [
+    ("2025-08-14T00:00:00", "2025-08-14T00:00:00", False),  # initial set only
+    ("2025-08-14T00:00:00", "2025-08-14T01:00:00", True),  # change triggers emit
+])
+def test_poll_once_detects_change(first, second, should_emit):
+    bus = EventBus()
+    queue = bus.subscribe("u1")
+    collection = _FakeCollection([])
+    feed = ScheduleChangeFeed(bus, collection_getter=lambda: collection, mode='poll')
+
+    feed.poll_once()
+    stored_date = _today_stored_date(collection)
+    collection.docs = [_doc("u1", stored_date, first)]
+
+    # First observation is memorized, not emitted
+    assert feed.poll_once() == 0
+    assert queue.empty()
+
+    collection.docs = [_doc("u1", stored_date, second)]
+    assert feed.poll_once() == (1 if should_emit else 0)
     if should_emit:
-        assert payload2.get('type') == 'schedule_updated'
-        assert payload2.get('date') == date
-    assert new_seen2 == next_lm
+        event = queue.get_nowait()
+        assert event == {"type": "schedule_updated", "date": stored_date.split("T")[0]}
+    else:
+        assert queue.empty()
+
+
+def test_change_stream_publishes_schedule_updates():
+    bus = EventBus()
+    queue = bus.subscribe("u1")
+
+    class _FakeStream:
+        alive = True
+        resume_token = {"_data": "t1"}
+
+        def __init__(self, feed):
+            self._feed = feed
+            self._changes = [{"fullDocument": {"userId": "u1", "date": "2025-08-14T00:00:00"}}]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def try_next(self):
+            if self._changes:
+                return self._changes.pop(0)
+            self._feed.stop()
+            return None
+
+    class _WatchCollection:
+        def watch(self, pipeline, **kwargs):
+            self.kwargs = kwargs
+            return _FakeStream(feed)
+
+    collection = _WatchCollection()
+    feed = ScheduleChangeFeed(bus, collection_getter=lambda: collection, mode='change_stream')
+
+    feed._watch_change_stream()
+
+    assert queue.get_nowait() == {"type": "schedule_updated", "date": "2025-08-14"}
+    assert collection.kwargs["full_document"] == "updateLookup"
+    assert feed._resume_token == {"_data": "t1"}
+
+
+def test_change_stream_restarts_without_resume_token_after_history_lost():
+    bus = EventBus()
+    queue = bus.subscribe("u1")
+    watched = []
+
+    class _FakeStream:
+        alive = True
+        resume_token = {"_data": "t2"}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def try_next(self):
+            feed.stop()
+            return {"fullDocument": {"userId": "u1", "date": "2025-08-14T00:00:00"}}
+
+    class _WatchCollection:
+        def watch(self, pipeline, **kwargs):
+            watched.append(kwargs["resume_after"])
+            if kwargs["resume_after"] is not None:
+                # The token fell out of the oplog while the feed was disconnected
+                raise OperationFailure("resume point no longer in the oplog", code=286)
+            return _FakeStream()
+
+    collection = _WatchCollection()
+    feed = ScheduleChangeFeed(bus, collection_getter=lambda: collection, mode='change_stream')
+    feed._resume_token = {"_data": "t1"}
 
+    feed._run()
 
+    assert watched == [{"_data": "t1"}, None]
+    assert queue.get_nowait() == {"type": "schedule_updated", "date": "2025-08-14"}
+    assert feed._resume_token == {"_data": "t2"}
@@ -3,15 +3,22 @@ from unittest.mock import patch
 
 @patch('backend.apis.calendar_routes.ensure_calendar_watch_for_user', return_value=(True, {}))
 @patch('backend.apis.routes.get_user_from_token', return_value={'googleId': 'u-777'})
-def test_sse_stream_ensures_watch(_mock_user, mock_ensure, client=None):
+def test_sse_stream_does_not_ensure_watch(_mock_user, mock_ensure, client=None):
     import application as app
     with app.create_app(testing=True).test_client() as client:
         # Hit SSE endpoint (it will return a streaming response)
         resp = client.get('/api/events/stream?token=any')
 
-        # Should still return 200 and have attempted to ensure the watch
+        # Stream setup is a pure subscription; watches are renewed by the scheduled job
         assert resp.status_code == 200
-        assert mock_ensure.called
-        args, _ = mock_ensure.call_args
-        assert args[0] == 'u-777'
+        assert not mock_ensure.called
 
+
+@patch('backend.apis.calendar_routes.ensure_calendar_watch_for_user')
+@patch('backend.services.schedule_change_feed.schedule_change_feed')
+def test_async_stream_on_connect_does_not_ensure_watch(_mock_feed, mock_ensure):
+    from backend.apis.sse_async import _default_on_connect
+
+    _default_on_connect('u-777')
+
+    assert not mock_ensure.called
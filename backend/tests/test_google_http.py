@@ -0,0 +1,97 @@
+"""
+Tests for the shared Google API HTTP client (timeouts, retries, backoff).
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from backend.utils.google_http import GoogleApiClient
+
+
+def _response(status, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    return resp
+
+
+def _client(*outcomes, **kwargs):
+    session = MagicMock()
+    session.request.side_effect = list(outcomes)
+    sleeps = []
+    client = GoogleApiClient(
+        session=session,
+        sleep=sleeps.append,
+        jitter=lambda low, high: high,
+        **kwargs
+    )
+    return client, session, sleeps
+
+
+def test_applies_endpoint_timeout_and_returns_success():
+    client, session, sleeps = _client(_response(200))
+
+    resp = client.get('https://www.googleapis.com/calendar/v3/x', endpoint='calendar.events', params={'a': 1})
+
+    assert resp.status_code == 200
+    assert session.request.call_args.kwargs['timeout'] == client.timeout_for('calendar.events')
+    assert session.request.call_args.kwargs['params'] == {'a': 1}
+    assert sleeps == []
+
+
+def test_retries_5xx_with_exponential_jitter_then_succeeds():
+    client, session, sleeps = _client(_response(503), _response(500), _response(200), backoff_base=0.5)
+
+    resp = client.get('https://example.test', endpoint='calendar.events')
+
+    assert resp.status_code == 200
+    assert session.request.call_count == 3
+    assert sleeps == [0.5, 1.0]
+    assert client.stats() == {'requests': 3, 'retries': 2, 'errors': 0}
+
+
+def test_honours_retry_after_capped():
+    client, _, sleeps = _client(_response(429, {'Retry-After': '120'}), _response(200), backoff_cap=4.0)
+
+    client.post('https://oauth2.googleapis.com/token', endpoint='oauth.token', data={})
+
+    assert sleeps == [4.0]
+
+
+def test_gives_up_after_max_retries_and_returns_last_response():
+    client, session, _ = _client(_response(503), _response(503), max_retries=1)
+
+    resp = client.get('https://example.test')
+
+    assert resp.status_code == 503
+    assert session.request.call_count == 2
+    assert client.stats()['errors'] == 1
+
+
+def test_client_errors_are_not_retried():
+    client, session, _ = _client(_response(401))
+
+    assert client.get('https://example.test').status_code == 401
+    assert session.request.call_count == 1
+
+
+def test_connection_errors_retry_then_raise():
+    client, session, sleeps = _client(
+        requests.ConnectionError('reset'), requests.Timeout('slow'), max_retries=1
+    )
+
+    with pytest.raises(requests.Timeout):
+        client.get('https://example.test')
+    assert session.request.call_count == 2
+    assert len(sleeps) == 1
+
+
+def test_default_session_pools_and_requests_gzip():
+    client = GoogleApiClient(pool_maxsize=7)
+    session = client._session
+
+    assert 'gzip' in session.headers['User-Agent']
+    assert session.headers['Accept-Encoding'] == 'gzip'
+    assert session.get_adapter('https://www.googleapis.com')._pool_maxsize == 7
@@ -89,6 +89,14 @@ class TestInputsConfigPreservation:
         mock_result.upserted_id = ObjectId()
         mock_schedules_collection.replace_one.return_value = mock_result
         
+        # Previous day's schedule is in the history window (no sections to copy)
+        mock_schedules_collection.find.return_value.sort.return_value = [{
+            "userId": "test_user_123",
+            "date": "2025-07-23T00:00:00",
+            "schedule": [],
+            "inputs": sample_inputs_config
+        }]
+        
         # Setup schedule service
         schedule_service.schedules_collection = mock_schedules_collection
         
@@ -0,0 +1,99 @@
+"""
+Tests for request-scoped user resolution (resolve_request_user / get_user_from_token).
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from backend.apis import routes
+from backend.apis.routes import AUTH_USER_PROJECTION, api_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def _users_collection(docs):
+    users = MagicMock()
+    users.find.return_value.limit.return_value = docs
+    db = MagicMock()
+    db.__getitem__.return_value = users
+    return db, users
+
+
+DECODED_LEGACY = {
+    "uid": "firebase-uid",
+    "firebase": {"identities": {"google.com": ["google-sub"]}}
+}
+
+
+def test_lookup_uses_one_in_query_over_both_ids():
+    db, users = _users_collection([
+        {"googleId": "firebase-uid", "email": "a@b.c", "calendar": {"connected": True}}
+    ])
+    with patch.object(routes, 'verify_firebase_token', return_value=DECODED_LEGACY), \
+            patch.object(routes, 'get_database', return_value=db):
+        user = routes.get_user_from_token("tok", AUTH_USER_PROJECTION)
+
+    assert user == {"googleId": "firebase-uid", "email": "a@b.c"}
+    query, projection = users.find.call_args[0]
+    assert query == {"googleId": {"$in": ["firebase-uid", "google-sub"]}}
+    # Full document is loaded once for the user cache; the caller gets the projected view
+    assert projection == {"_id": 0}
+    users.find_one.assert_not_called()
+
+
+def test_firebase_uid_match_wins_over_legacy_match():
+    db, _ = _users_collection([
+        {"googleId": "google-sub", "email": "legacy@b.c"},
+        {"googleId": "firebase-uid", "email": "new@b.c"},
+    ])
+    with patch.object(routes, 'verify_firebase_token', return_value=DECODED_LEGACY), \
+            patch.object(routes, 'get_database', return_value=db):
+        assert routes.get_user_from_token("tok")["email"] == "new@b.c"
+
+
+def test_legacy_subject_id_still_resolves():
+    db, _ = _users_collection([{"googleId": "google-sub", "email": "legacy@b.c"}])
+    with patch.object(routes, 'verify_firebase_token', return_value=DECODED_LEGACY), \
+            patch.object(routes, 'get_database', return_value=db):
+        assert routes.get_user_from_token("tok")["googleId"] == "google-sub"
+
+
+@patch('backend.apis.routes.schedule_service')
+@patch('backend.apis.routes.get_user_from_token', return_value={'googleId': 'user123'})
+def test_user_resolved_once_per_request_with_minimal_projection(mock_get_user, mock_schedule_service, client):
+    mock_schedule_service.get_most_recent_schedule_with_tasks.return_value = None
+
+    resp = client.get(
+        '/api/schedules/recent-with-tasks?before=2025-01-20&days=30',
+        headers={'Authorization': 'Bearer tok'}
+    )
+
+    assert resp.status_code == 200
+    mock_get_user.assert_called_once_with('tok', AUTH_USER_PROJECTION)
+
+
+@patch('backend.apis.routes.get_user_from_token')
+def test_no_lookup_without_bearer_token(mock_get_user, client):
+    resp = client.get('/api/schedules/recent-with-tasks?before=2025-01-20&days=30')
+
+    assert resp.status_code == 401
+    assert json.loads(resp.data)['error'] == 'Authentication required'
+    mock_get_user.assert_not_called()
+
+
+@patch('backend.apis.routes.get_user_from_token', return_value={'googleId': 'user123', 'email': 'a@b.c'})
+def test_auth_user_endpoint_loads_full_document(mock_get_user, client):
+    resp = client.get('/api/auth/user', headers={'Authorization': 'Bearer tok'})
+
+    assert resp.status_code == 200
+    mock_get_user.assert_called_once_with('tok', {"_id": 0})
@@ -0,0 +1,84 @@
+"""
+Tests for the single-query history window shared by ScheduleService lookbacks.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from backend.services.schedule_service import ScheduleService
+
+
+def _doc(date: str, tasks=None, inputs=None):
+    return {
+        "userId": "u1",
+        "date": f"{date}T00:00:00",
+        "schedule": tasks or [],
+        "inputs": inputs or {},
+        "metadata": {"created_at": "2025-01-01T00:00:00", "source": "manual"}
+    }
+
+
+def _task(text: str, **extra):
+    return {"id": f"id-{text}", "text": text, "type": "task", "is_section": False, "completed": False, **extra}
+
+
+def _service_with_history(history):
+    service = ScheduleService()
+    collection = MagicMock()
+    collection.find.return_value.sort.return_value = history
+    collection.find_one.return_value = None
+    collection.replace_one.return_value = SimpleNamespace(upserted_id="xyz")
+    service.schedules_collection = collection
+    return service, collection
+
+
+def test_load_schedule_history_issues_one_ranged_sorted_query():
+    service, collection = _service_with_history([_doc("2025-01-19")])
+
+    history = service._load_schedule_history("u1", "2025-01-20", 30)
+
+    assert len(history) == 1
+    query, projection = collection.find.call_args[0]
+    assert query == {
+        "userId": "u1",
+        "date": {"$gte": "2024-12-21T00:00:00", "$lt": "2025-01-20T00:00:00"}
+    }
+    assert projection["_id"] == 0
+    assert projection["schedule"] == 1 and projection["inputs"] == 1
+    collection.find.return_value.sort.assert_called_once_with("date", -1)
+
+
+def test_lookbacks_respect_their_own_window_within_shared_history():
+    history = [
+        _doc("2025-01-18"),  # sections only
+        _doc("2025-01-10", tasks=[_task("old task")]),
+    ]
+    service, collection = _service_with_history(history)
+
+    # 5-day lookback must not reach the 2025-01-10 schedule
+    assert service.get_most_recent_schedule_with_tasks("u1", "2025-01-20", 5, history=history) is None
+    found = service.get_most_recent_schedule_with_tasks("u1", "2025-01-20", 30, history=history)
+    assert found["date"] == "2025-01-10T00:00:00"
+    collection.find.assert_not_called()
+
+
+@patch('backend.services.calendar_service.get_calendar_tasks_for_user_date', return_value=[])
+def test_autogenerate_answers_all_lookbacks_from_one_query(_mock_calendar):
+    daily = {"frequency": "daily"}
+    history = [
+        _doc("2025-01-19", tasks=[_task("carry me")]),
+        _doc("2025-01-15", tasks=[_task("stretch", is_recurring=daily, completed=True)],
+             inputs={"name": "Sam", "work_start_time": "09:00"}),
+    ]
+    service, collection = _service_with_history(history)
+
+    ok, result = service.autogenerate_schedule("u1", "2025-01-20")
+
+    assert ok and result["created"] is True
+    texts = [t["text"] for t in result["schedule"]]
+    assert "carry me" in texts
+    assert "stretch" in texts
+    # Source, recurring and inputs lookbacks shared a single ranged query
+    assert collection.find.call_count == 1
+    saved_document = collection.replace_one.call_args[0][1]
+    assert saved_document["inputs"]["name"] == "Sam"
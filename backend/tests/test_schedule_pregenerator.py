@@ -0,0 +1,128 @@
+"""
+Tests for the daily schedule pregeneration job.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+from backend.services.schedule_pregenerator import SchedulePregenerator
+
+
+class _FakeUsers:
+    def __init__(self, users):
+        self.users = users
+        self.find_calls = 0
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        return list(self.users)
+
+
+class _FakeService:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def autogenerate_schedule(self, user_id, date, user_timezone=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.calls.append((user_id, date, user_timezone))
+        return True, {"created": True, "existed": False, "sourceFound": True, "date": date}
+
+
+USERS = [
+    {"googleId": "syd-1", "timezone": "Australia/Sydney"},
+    {"googleId": "syd-2", "timezone": "UTC"},          # unreliable -> Sydney fallback
+    {"googleId": "ny-1", "timezone": "America/New_York"},
+    {"googleId": "bad-1", "timezone": "Not/AZone"},   # invalid -> Sydney fallback
+]
+
+# 13:59:59 UTC on 2025-01-20 is 00:59:59 on the 21st in Sydney (AEDT, UTC+11) and 08:59:59 in New York
+END_OF_SYDNEY_WINDOW = datetime(2025, 1, 20, 13, 59, 59, tzinfo=timezone.utc)
+# 23:30 on the 20th in Sydney
+SYDNEY_LATE_EVENING = datetime(2025, 1, 20, 12, 30, tzinfo=timezone.utc)
+SYDNEY_AFTERNOON = datetime(2025, 1, 20, 3, 0, tzinfo=timezone.utc)
+
+
+def _pregen(service, **kwargs):
+    return SchedulePregenerator(service=service, users_getter=lambda: _FakeUsers(USERS), **kwargs)
+
+
+def test_groups_users_by_reliable_timezone():
+    groups = _pregen(_FakeService()).group_users_by_timezone()
+    assert sorted(groups["Australia/Sydney"]) == ["bad-1", "syd-1", "syd-2"]
+    assert groups["America/New_York"] == ["ny-1"]
+
+
+def test_generates_the_new_day_only_for_timezones_just_past_midnight():
+    service = _FakeService()
+    counts = _pregen(service).run_once(END_OF_SYDNEY_WINDOW)
+
+    assert counts["due"] == 3 and counts["created"] == 3
+    assert sorted(call[0] for call in service.calls) == ["bad-1", "syd-1", "syd-2"]
+    assert {call[1] for call in service.calls} == {"2025-01-21"}
+    assert {call[2] for call in service.calls} == {"Australia/Sydney"}
+
+
+def test_nothing_due_outside_window_and_no_repeat_within_window():
+    service = _FakeService()
+    pregen = _pregen(service)
+
+    assert pregen.run_once(SYDNEY_AFTERNOON)["due"] == 0
+    assert pregen.run_once(SYDNEY_LATE_EVENING)["due"] == 0
+    pregen.run_once(END_OF_SYDNEY_WINDOW)
+    assert pregen.run_once(END_OF_SYDNEY_WINDOW)["due"] == 0
+    assert len(service.calls) == 3
+
+
+def test_slots_spread_users_across_the_window():
+    pregen = _pregen(_FakeService(), window_minutes=60)
+    slots = {pregen._slot_seconds(f"user-{i}") for i in range(200)}
+    assert min(slots) >= 0 and max(slots) < 3600 * 0.9
+    # Users land in many distinct minutes rather than all at the top of the hour
+    assert len({slot // 60 for slot in slots}) > 30
+
+
+def test_dry_run_does_not_generate():
+    service = _FakeService()
+    counts = _pregen(service, dry_run=True).run_once(END_OF_SYDNEY_WINDOW)
+    assert counts["due"] == 3
+    assert service.calls == []
+
+
+def test_concurrency_limit_is_respected():
+    users = [{"googleId": f"u{i}", "timezone": "Australia/Sydney"} for i in range(12)]
+    service = _FakeService(delay=0.05)
+    pregen = SchedulePregenerator(service=service, users_getter=lambda: _FakeUsers(users), max_workers=3)
+
+    pregen.run_once(END_OF_SYDNEY_WINDOW)
+
+    assert len(service.calls) == 12
+    assert service.max_active <= 3
+
+
+def test_task_completed_late_in_the_evening_is_not_carried_over():
+    yesterday = {"2025-01-20": [{"text": "Write report", "completed": False}]}
+
+    class _CarryOverService(_FakeService):
+        def autogenerate_schedule(self, user_id, date, user_timezone=None):
+            self.calls.append([t["text"] for t in yesterday["2025-01-20"] if not t["completed"]])
+            return True, {"created": True, "existed": False, "sourceFound": True, "date": date}
+
+    service = _CarryOverService()
+    pregen = _pregen(service)
+
+    # Pregenerating before midnight would have copied the still-open task here
+    assert pregen.run_once(SYDNEY_LATE_EVENING)["due"] == 0
+    yesterday["2025-01-20"][0]["completed"] = True
+    pregen.run_once(END_OF_SYDNEY_WINDOW)
+
+    assert service.calls == [[], [], []]
@@ -0,0 +1,236 @@
+"""
+Tests for single-flight coalescing of autogenerate/submit_data computations.
+"""
+
+import copy
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+
+from backend.services.single_flight import SingleFlight
+
+
+class _FakeLeases:
+    """Minimal lease collection shared by several SingleFlight instances ("workers")."""
+
+    def __init__(self):
+        self.docs = {}
+        self._lock = threading.Lock()
+
+    def _takeable(self, doc, now):
+        return doc['expiresAt'] <= now or doc.get('status') == 'done'
+
+    def find_one_and_update(self, query, update, upsert=False):
+        now = query['$or'][0]['expiresAt']['$lte']
+        with self._lock:
+            doc = self.docs.get(query['_id'])
+            if doc is not None and not self._takeable(doc, now):
+                # Upsert of an existing _id that did not match the filter
+                raise DuplicateKeyError("E11000 duplicate key error")
+            doc = doc or {"_id": query['_id']}
+            doc.update(copy.deepcopy(update['$set']))
+            for field in update.get('$unset', {}):
+                doc.pop(field, None)
+            self.docs[query['_id']] = doc
+            return None
+
+    def update_one(self, query, update):
+        with self._lock:
+            doc = self.docs.get(query['_id'])
+            if doc and doc.get('owner') == query['owner']:
+                doc.update(copy.deepcopy(update['$set']))
+
+    def find_one(self, query):
+        with self._lock:
+            return copy.deepcopy(self.docs.get(query['_id']))
+
+    def delete_one(self, query):
+        with self._lock:
+            doc = self.docs.get(query['_id'])
+            if doc and doc.get('owner') == query['owner']:
+                del self.docs[query['_id']]
+
+
+class _Computation:
+    def __init__(self, delay=0.2, result=None, error=None):
+        self.delay = delay
+        self.result = result if result is not None else [True, {"schedule": [{"text": "Task"}]}]
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def _flight(leases, **kwargs):
+    kwargs.setdefault('poll_interval', 0.01)
+    return SingleFlight(collection_getter=lambda: leases, **kwargs)
+
+
+def _run_concurrently(targets):
+    results = [None] * len(targets)
+    errors = [None] * len(targets)
+
+    def _runner(i, target):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=_runner, args=(i, t)) for i, t in enumerate(targets)]
+    for t in threads:
+        t.start()
+        time.sleep(0.01)
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_calls_in_one_process_share_a_single_run():
+    flight = _flight(_FakeLeases())
+    compute = _Computation()
+
+    results, errors = _run_concurrently(
+        [lambda: flight.run('u1', '2025-01-20', 'autogenerate', compute)] * 5
+    )
+
+    assert compute.calls == 1
+    assert errors == [None] * 5
+    assert all(r == compute.result for r in results)
+    assert flight.stats['leader'] == 1
+    assert flight.stats['local_shared'] == 4
+
+
+def test_duplicate_on_another_worker_reuses_stored_result():
+    leases = _FakeLeases()
+    worker_a, worker_b = _flight(leases), _flight(leases)
+    compute_a, compute_b = _Computation(), _Computation(result=[True, {"schedule": []}])
+
+    results, errors = _run_concurrently([
+        lambda: worker_a.run('u1', '2025-01-20', 'autogenerate', compute_a),
+        lambda: worker_b.run('u1', '2025-01-20', 'autogenerate', compute_b),
+    ])
+
+    assert errors == [None, None]
+    assert compute_a.calls == 1
+    assert compute_b.calls == 0
+    assert results[1] == compute_a.result
+    assert worker_b.stats['remote_shared'] == 1
+
+
+def test_different_keys_do_not_coalesce():
+    flight = _flight(_FakeLeases())
+    compute = _Computation(delay=0.05)
+
+    _run_concurrently([
+        lambda: flight.run('u1', '2025-01-20', 'autogenerate', compute),
+        lambda: flight.run('u1', '2025-01-21', 'autogenerate', compute),
+        lambda: flight.run('u2', '2025-01-20', 'autogenerate', compute),
+        lambda: flight.run('u1', '2025-01-20', 'submit_data:abc', compute),
+    ])
+
+    assert compute.calls == 4
+
+
+def test_failed_leader_releases_lease_for_remote_waiter():
+    leases = _FakeLeases()
+    worker_a, worker_b = _flight(leases), _flight(leases)
+    failing = _Computation(error=RuntimeError("LLM down"))
+    fallback = _Computation(delay=0.0)
+
+    results, errors = _run_concurrently([
+        lambda: worker_a.run('u1', '2025-01-20', 'autogenerate', failing),
+        lambda: worker_b.run('u1', '2025-01-20', 'autogenerate', fallback),
+    ])
+
+    assert isinstance(errors[0], RuntimeError)
+    assert errors[1] is None
+    assert fallback.calls == 1
+    assert results[1] == fallback.result
+
+
+def test_request_after_completion_starts_a_new_run():
+    flight = _flight(_FakeLeases())
+    compute = _Computation(delay=0.0)
+
+    flight.run('u1', '2025-01-20', 'autogenerate', compute)
+    flight.run('u1', '2025-01-20', 'autogenerate', compute)
+
+    assert compute.calls == 2
+
+
+def test_waiter_computes_after_wait_timeout():
+    leases = _FakeLeases()
+    worker_a = _flight(leases)
+    worker_b = _flight(leases, wait_timeout=0.05)
+    slow, fallback = _Computation(delay=0.5), _Computation(delay=0.0)
+
+    results, errors = _run_concurrently([
+        lambda: worker_a.run('u1', '2025-01-20', 'autogenerate', slow),
+        lambda: worker_b.run('u1', '2025-01-20', 'autogenerate', fallback),
+    ])
+
+    assert errors == [None, None]
+    assert fallback.calls == 1
+    assert worker_b.stats['wait_timeouts'] == 1
+
+
+def test_unavailable_lease_store_still_computes():
+    class _DownLeases(_FakeLeases):
+        def find_one_and_update(self, *args, **kwargs):
+            raise ServerSelectionTimeoutError("no servers")
+
+    compute = _Computation(delay=0.0)
+    assert _flight(_DownLeases()).run('u1', '2025-01-20', 'autogenerate', compute) == compute.result
+    assert compute.calls == 1
+
+
+@pytest.fixture
+def client():
+    from flask import Flask
+    from backend.apis.routes import api_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+@patch('backend.apis.routes.get_user_from_token')
+@patch('backend.apis.routes.schedule_service')
+def test_concurrent_autogenerate_requests_run_once(mock_schedule_service, mock_get_user_from_token, client):
+    mock_get_user_from_token.return_value = {'googleId': 'user123'}
+    calls = []
+
+    def _slow_autogenerate(user_id, date, **kwargs):
+        calls.append((user_id, date))
+        time.sleep(0.2)
+        return True, {"existed": False, "created": True, "date": date, "schedule": []}
+
+    mock_schedule_service.autogenerate_schedule.side_effect = _slow_autogenerate
+
+    def _post():
+        return client.post(
+            '/api/schedules/autogenerate',
+            data=json.dumps({"date": "2025-01-20"}),
+            content_type='application/json',
+            headers={'Authorization': 'Bearer mock-token'}
+        )
+
+    with patch('backend.apis.routes.single_flight', _flight(_FakeLeases())):
+        results, errors = _run_concurrently([_post] * 3)
+
+    assert errors == [None] * 3
+    assert [r.status_code for r in results] == [200] * 3
+    assert all(json.loads(r.data)['created'] is True for r in results)
+    assert calls == [('user123', '2025-01-20')]
@@ -161,7 +161,7 @@ class TestSingleOAuthBackendIntegration(unittest.TestCase):
             self.assertIn('calendar', user_data)
 
     @patch.dict(os.environ, {"GOOGLE_CLIENT_ID": "test-client-id", "GOOGLE_CLIENT_SECRET": "test-client-secret"}, clear=False)
-    @patch('backend.apis.calendar_routes.requests.post')
+    @patch('backend.apis.calendar_routes.google_http.post')
     @patch('backend.apis.calendar_routes.fetch_google_calendar_events')
     @patch('backend.apis.calendar_routes.get_user_id_from_token', return_value='user-with-refresh')
     @patch('backend.apis.calendar_routes.get_database')
@@ -242,7 +242,7 @@ class TestSingleOAuthBackendIntegration(unittest.TestCase):
             self.assertEqual(fetch_call[0][0], 'new-refreshed-access-token')
 
     @patch.dict(os.environ, {"GOOGLE_CLIENT_ID": "test-client-id", "GOOGLE_CLIENT_SECRET": "test-client-secret"}, clear=False)
-    @patch('backend.apis.calendar_routes.requests.post')
+    @patch('backend.apis.calendar_routes.google_http.post')
     @patch('backend.apis.calendar_routes.get_user_id_from_token', return_value='user-invalid-refresh')
     @patch('backend.apis.calendar_routes.get_database')
     def test_calendar_api_handles_invalid_refresh_token(self, mock_get_db, mock_get_user, mock_post):
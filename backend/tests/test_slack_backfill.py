@@ -0,0 +1,180 @@
+"""
+Tests for the connect-time Slack mention backfill.
+"""
+
+import asyncio
+import threading
+
+from slack_sdk.errors import SlackApiError
+
+from backend.services.slack_backfill import SlackMentionBackfill
+from backend.services.slack_service import SlackService
+from backend.utils.encryption import encrypt_token
+
+
+class _FakeResponse(dict):
+    def __init__(self, status_code=200, headers=None, **data):
+        super().__init__(data)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _message(ts, text, **extra):
+    return {'type': 'message', 'ts': ts, 'user': 'U2', 'text': text, **extra}
+
+
+class _FakeSlack:
+    def __init__(self, rate_limit_history=0):
+        self.calls = []
+        self.rate_limit_history = rate_limit_history
+        self.pages = {
+            'C1': [
+                [_message('1.1', '<@U1> please review'), _message('1.2', '<@U12> not for U1'),
+                 _message('1.3', '<@U1> bot ping', bot_id='B1')],
+                [_message('1.4', 'ship it <@U1|me>'), _message('1.5', '<@U1> joined', subtype='channel_join')],
+            ],
+            'C2': [[_message('2.1', '<@U1> can you check the logs?')]],
+        }
+
+    async def users_conversations(self, **kwargs):
+        self.calls.append(('users.conversations', kwargs))
+        if kwargs.get('cursor') is None:
+            return _FakeResponse(channels=[{'id': 'C1'}, {'id': 'C2'}], response_metadata={'next_cursor': 'p2'})
+        return _FakeResponse(channels=[{'id': 'C3'}], response_metadata={'next_cursor': ''})
+
+    async def conversations_history(self, **kwargs):
+        self.calls.append(('conversations.history', kwargs))
+        if self.rate_limit_history:
+            self.rate_limit_history -= 1
+            raise SlackApiError('ratelimited', _FakeResponse(429, {'Retry-After': '20'}, ok=False))
+        channel = kwargs['channel']
+        if channel == 'C3':
+            raise SlackApiError('not_in_channel', _FakeResponse(ok=False, error='not_in_channel'))
+        page = int(kwargs.get('cursor') or 0)
+        pages = self.pages[channel]
+        has_more = page + 1 < len(pages)
+        return _FakeResponse(
+            messages=pages[page], has_more=has_more,
+            response_metadata={'next_cursor': str(page + 1) if has_more else ''}
+        )
+
+
+class _FakeService:
+    """process_event that dedupes on SlackService's idempotency key."""
+
+    def __init__(self, gate=None):
+        self.integration = {
+            'team_id': 'T1', 'workspace_id': 'T1', 'slack_user_id': 'U1',
+            'bot_token': encrypt_token('xoxb-test')
+        }
+        self.keys = set()
+        self.events = []
+        self.gate = gate
+
+    def _get_user_integration(self, user_id):
+        if self.gate:
+            self.gate.wait(5)
+        return self.integration
+
+    async def process_event(self, event_data, user_id, integration_data=None):
+        self.events.append(event_data)
+        key = SlackService.build_message_key(event_data, user_id)
+        if key in self.keys:
+            return None
+        self.keys.add(key)
+        return object()
+
+
+def _backfill(slack, service, **kwargs):
+    published, sleeps = [], []
+
+    async def _sleep(seconds):
+        sleeps.append(seconds)
+
+    backfill = SlackMentionBackfill(
+        service_getter=lambda: service,
+        publisher=lambda user_id, event: published.append((user_id, event)),
+        client_factory=lambda token: slack,
+        sleep=_sleep,
+        clock=lambda: 1_000_000.0,
+        **kwargs
+    )
+    return backfill, published, sleeps
+
+
+def test_backfill_pages_history_and_creates_tasks_for_direct_mentions():
+    slack, service = _FakeSlack(), _FakeService()
+    backfill, published, _ = _backfill(slack, service, days=2)
+
+    result = asyncio.run(backfill.run('g1'))
+
+    assert result['status'] == 'completed'
+    assert sorted(e['event']['ts'] for e in service.events) == ['1.1', '1.4', '2.1']
+    assert {e['event']['channel'] for e in service.events} == {'C1', 'C2'}
+    assert result['tasks_created'] == 3 and result['channels_total'] == 3
+    assert result['channels_skipped'] == 1 and result['messages_scanned'] == 6
+    history_calls = [kwargs for name, kwargs in slack.calls if name == 'conversations.history']
+    assert all(kwargs['oldest'] == f"{1_000_000.0 - 2 * 86400:.6f}" for kwargs in history_calls)
+
+
+def test_progress_is_streamed_as_slack_backfill_events():
+    backfill, published, _ = _backfill(_FakeSlack(), _FakeService())
+
+    asyncio.run(backfill.run('g1'))
+
+    assert all(user_id == 'g1' and event['type'] == 'slack_backfill' for user_id, event in published)
+    statuses = [event['status'] for _, event in published]
+    assert statuses[0] == 'started' and statuses[-1] == 'completed'
+    assert [event['channels_done'] for _, event in published if event['status'] == 'running'] == [0, 1, 2, 3]
+
+
+def test_rerun_and_live_duplicates_do_not_create_tasks_twice():
+    service = _FakeService()
+    # A live event for one of the messages already created its task
+    service.keys.add('C1:1.1:g1')
+    backfill, _, _ = _backfill(_FakeSlack(), service)
+
+    assert asyncio.run(backfill.run('g1'))['tasks_created'] == 2
+    assert asyncio.run(backfill.run('g1'))['tasks_created'] == 0
+
+
+def test_calls_are_paced_per_method_and_429_waits_for_retry_after():
+    slack = _FakeSlack(rate_limit_history=1)
+    backfill, _, sleeps = _backfill(slack, _FakeService(), calls_per_minute=60)
+
+    result = asyncio.run(backfill.run('g1'))
+
+    assert result['status'] == 'completed'
+    # Second users.conversations page waits ~1s; the retried history call waits out Retry-After
+    assert any(0.9 < s <= 1.0 for s in sleeps)
+    assert any(19.0 < s <= 20.0 for s in sleeps)
+    assert sum(1 for name, _ in slack.calls if name == 'conversations.history') == 5
+
+
+class _FakeMetadata:
+    def __init__(self):
+        self.closed = []
+
+    async def close_session(self):
+        self.closed.append(asyncio.get_running_loop())
+
+
+def test_start_runs_in_background_once_per_user():
+    gate = threading.Event()
+    service = _FakeService(gate=gate)
+    metadata = _FakeMetadata()
+    backfill, published, _ = _backfill(_FakeSlack(), service, metadata=metadata)
+
+    assert backfill.start('g1') is True
+    assert backfill.start('g1') is False
+    assert backfill.is_running('g1')
+
+    gate.set()
+    for _ in range(200):
+        if not backfill.is_running('g1'):
+            break
+        threading.Event().wait(0.01)
+    assert not backfill.is_running('g1')
+    assert published[-1][1]['status'] == 'completed'
+    # The background loop's lookup session is closed before the loop ends
+    assert len(metadata.closed) == 1
@@ -0,0 +1,218 @@
+"""
+Tests for the Slack event queue and its async worker pool.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.slack_event_queue import SlackEventQueue
+
+
+class _Clock:
+    def __init__(self):
+        self.now = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class _FakeQueueCollection:
+    """Implements just the queue's operations on an in-memory dict."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def insert_one(self, doc):
+        if doc['_id'] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.docs[doc['_id']] = dict(doc)
+
+    def find_one_and_update(self, query, update, sort=None, return_document=None):
+        due = [d for d in self.docs.values() if d['leaseUntil'] <= query['leaseUntil']['$lte']]
+        if not due:
+            return None
+        doc = min(due, key=lambda d: (d['leaseUntil'], d['receivedAt']))
+        doc.update(update['$set'])
+        return dict(doc)
+
+    def update_one(self, query, update):
+        self.docs[query['_id']].update(update['$set'])
+
+    def delete_one(self, query):
+        self.docs.pop(query['_id'], None)
+        return SimpleNamespace(deleted_count=1)
+
+
+def _event(event_id, text='hello'):
+    data = {'type': 'event_callback', 'team_id': 'T1', 'event_id': event_id, 'event': {'type': 'message', 'text': text}}
+    return json.dumps(data), data
+
+
+def _queue(processor, **kwargs):
+    collection = _FakeQueueCollection()
+    clock = _Clock()
+    queue = SlackEventQueue(collection_getter=lambda: collection, processor=processor, clock=clock, **kwargs)
+    return queue, collection, clock
+
+
+def test_enqueued_events_are_processed_and_removed():
+    seen = []
+
+    async def _process(event_data):
+        seen.append(event_data['event_id'])
+
+    queue, collection, _ = _queue(_process)
+    for i in range(3):
+        assert queue.enqueue(*_event(f'Ev{i}'))
+
+    assert queue.process_due() == 3
+    assert sorted(seen) == ['Ev0', 'Ev1', 'Ev2']
+    assert collection.docs == {}
+
+
+def test_slack_retry_of_queued_event_is_not_queued_twice():
+    queue, collection, _ = _queue(None)
+
+    assert queue.enqueue(*_event('Ev1'))
+    assert queue.enqueue(*_event('Ev1'))
+
+    assert len(collection.docs) == 1
+    assert queue.stats()['duplicates'] == 1
+
+
+def test_workers_process_events_concurrently():
+    async def _slow(_event_data):
+        await asyncio.sleep(0.1)
+
+    queue, _, _ = _queue(_slow, concurrency=10)
+    for i in range(20):
+        queue.enqueue(*_event(f'Ev{i}'))
+
+    start = time.perf_counter()
+    assert queue.process_due() == 20
+    # 20 events x 100ms on 10 workers
+    assert time.perf_counter() - start < 1.0
+
+
+def test_failed_event_is_retried_then_dropped():
+    async def _boom(_event_data):
+        raise RuntimeError('slack down')
+
+    queue, collection, clock = _queue(_boom, max_attempts=2)
+    queue.enqueue(*_event('Ev1'))
+
+    assert queue.process_due() == 1
+    assert collection.docs['Ev1']['attempts'] == 1
+    # Backed off: not claimable yet
+    assert queue.process_due() == 0
+
+    clock.advance(5)
+    queue.process_due()
+    assert collection.docs == {}
+    assert queue.stats()['dropped'] == 1
+
+
+def test_unavailable_queue_falls_back_to_in_memory_workers():
+    seen = []
+
+    async def _process(event_data):
+        seen.append(event_data['event_id'])
+
+    def _no_db():
+        raise RuntimeError('no mongo')
+
+    queue = SlackEventQueue(collection_getter=_no_db, processor=_process, poll_interval=0.05)
+    raw, data = _event('Ev1')
+    assert queue.enqueue(raw, data) is False
+
+    queue.ensure_worker()
+    try:
+        queue.submit(data)
+        deadline = time.time() + 2
+        while not seen and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        queue.stop()
+
+    assert seen == ['Ev1']
+
+
+def test_failed_store_reschedules_the_event_instead_of_deleting_it(monkeypatch):
+    from unittest.mock import Mock, patch
+
+    from backend.apis import slack_routes
+    from backend.services.slack_service import SlackService
+
+    for name in ('SLACK_CLIENT_ID', 'SLACK_CLIENT_SECRET', 'SLACK_SIGNING_SECRET'):
+        monkeypatch.setenv(name, 'x')
+    service = SlackService(db_client=Mock())
+    service._claim_message = Mock(return_value=True)
+    service._release_message = Mock()
+    service._get_channel_name = Mock(side_effect=lambda *_: asyncio.sleep(0, 'general'))
+    service._get_user_name = Mock(side_effect=lambda *_: asyncio.sleep(0, 'sender'))
+    service._store_task = Mock(side_effect=RuntimeError('mongo down'))
+    integration = {'slack_user_id': 'U1', 'team_id': 'T1', 'workspace_name': 'Team', 'bot_token': 'encrypted'}
+    router = Mock()
+    router.recipients.return_value = [{'user_id': 'user-1', 'integration': integration}]
+
+    queue, collection, _ = _queue(slack_routes.process_slack_payload)
+    raw, data = _event('Ev1', text='<@U1> review the deck')
+    data['event'].update(channel='C1', user='U9', ts='1700000000.000100')
+    queue.enqueue(json.dumps(data), data)
+
+    with patch.object(slack_routes, 'slack_service', service), \
+            patch.object(slack_routes, 'slack_user_router', router):
+        assert queue.process_due() == 1
+
+    assert collection.docs['Ev1']['attempts'] == 1
+    assert collection.docs['Ev1']['leaseUntil'] > _Clock()()
+    service._release_message.assert_called_once_with('C1:1700000000.000100:user-1')
+
+
+def test_worker_process_drains_the_queue_until_stopped():
+    import threading
+
+    seen = []
+
+    async def _process(event_data):
+        seen.append(event_data['event_id'])
+
+    queue, collection, _ = _queue(_process, poll_interval=0.01)
+    queue.enqueue(*_event('Ev1'))
+
+    worker = threading.Thread(target=queue.run_forever)
+    worker.start()
+    try:
+        deadline = time.time() + 2
+        while not seen and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        queue.stop()
+        worker.join(2)
+
+    assert seen == ['Ev1'] and collection.docs == {}
+    assert not worker.is_alive()
+
+
+def test_web_worker_is_skipped_when_a_dedicated_process_drains_the_queue():
+    async def _process(event_data):
+        pass
+
+    dedicated, _, _ = _queue(_process, worker_in_web=False)
+    dedicated.ensure_web_worker()
+    assert dedicated._thread is None
+
+    in_web, _, _ = _queue(_process)
+    in_web.ensure_web_worker()
+    try:
+        assert in_web._thread.is_alive()
+    finally:
+        in_web.stop()
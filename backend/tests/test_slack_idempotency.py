@@ -0,0 +1,163 @@
+"""
+Tests for idempotent Slack event ingestion via the Processed Slack Messages collection.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.slack_service import PROCESSED_MESSAGES_COLLECTION, SlackService, TaskWritePending
+
+
+class _FakeProcessedMessages:
+    """Unique message_key index on an in-memory dict."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def insert_one(self, doc):
+        if doc['message_key'] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.docs[doc['message_key']] = dict(doc)
+
+    def update_one(self, query, update):
+        doc = self.docs.get(query['message_key'])
+        if doc is None or ('status' in query and doc['status'] != query['status']):
+            return SimpleNamespace(modified_count=0)
+        if 'processed_at' in query and not doc['processed_at'] < query['processed_at']['$lt']:
+            return SimpleNamespace(modified_count=0)
+        doc.update(update['$set'])
+        return SimpleNamespace(modified_count=1)
+
+    def delete_one(self, query):
+        doc = self.docs.get(query['message_key'])
+        if doc and doc['status'] == query.get('status', doc['status']):
+            del self.docs[query['message_key']]
+
+    def find_one(self, query, projection=None):
+        return next((d for d in self.docs.values() if d.get('event_id') == query['event_id']), None)
+
+
+INTEGRATION = {
+    'slack_user_id': 'U1',
+    'team_id': 'T1',
+    'workspace_name': 'Team',
+    'bot_token': 'encrypted'
+}
+
+
+def _event(event_id='Ev1', ts='1700000000.000100'):
+    return {
+        'type': 'event_callback',
+        'team_id': 'T1',
+        'event_id': event_id,
+        'event': {'type': 'message', 'channel': 'C1', 'user': 'U9', 'text': '<@U1> review the deck', 'ts': ts}
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('SLACK_CLIENT_ID', 'id')
+    monkeypatch.setenv('SLACK_CLIENT_SECRET', 'secret')
+    monkeypatch.setenv('SLACK_SIGNING_SECRET', 'signing')
+    processed = _FakeProcessedMessages()
+    db = Mock()
+    db.get_collection.side_effect = lambda name: processed if name == PROCESSED_MESSAGES_COLLECTION else Mock()
+    svc = SlackService(db_client=db)
+    svc._get_user_integration = Mock(return_value=INTEGRATION)
+    svc._store_task = Mock()
+    svc._get_channel_name = Mock(side_effect=lambda *_: asyncio.sleep(0, 'general'))
+    svc._get_user_name = Mock(side_effect=lambda *_: asyncio.sleep(0, 'sender'))
+    svc.processed = processed
+    return svc
+
+
+def test_duplicate_delivery_short_circuits_before_slack_calls(service):
+    first = asyncio.run(service.process_event(_event(), 'user-1'))
+    # Slack retry of the same event
+    second = asyncio.run(service.process_event(_event(), 'user-1'))
+
+    assert first is not None and second is None
+    assert service._store_task.call_count == 1
+    assert service._get_channel_name.call_count == 1
+    assert service.processed.docs['C1:1700000000.000100:user-1']['status'] == 'done'
+
+
+def test_same_message_is_processed_once_per_user(service):
+    assert asyncio.run(service.process_event(_event(), 'user-1')) is not None
+    assert asyncio.run(service.process_event(_event(), 'user-2')) is not None
+    assert service._store_task.call_count == 2
+
+
+def test_same_message_under_a_new_event_id_is_still_a_duplicate(service):
+    asyncio.run(service.process_event(_event(event_id='Ev1'), 'user-1'))
+
+    assert asyncio.run(service.process_event(_event(event_id='Ev2'), 'user-1')) is None
+
+
+def test_failed_processing_releases_the_key(service):
+    service._store_task.side_effect = [RuntimeError('mongo down'), None]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.process_event(_event(), 'user-1'))
+    assert service.processed.docs == {}
+    assert asyncio.run(service.process_event(_event(), 'user-1')) is not None
+
+
+@pytest.mark.parametrize("write_error,status", [(None, 'done'), (RuntimeError('mongo down'), None)])
+def test_timed_out_write_keeps_the_claim_until_it_settles(service, write_error, status):
+    from concurrent.futures import Future
+
+    key = 'C1:1700000000.000100:user-1'
+    write = Future()
+    service._store_task.side_effect = TaskWritePending('t1', write)
+
+    with pytest.raises(TaskWritePending):
+        asyncio.run(service.process_event(_event(), 'user-1'))
+    # The task is still buffered, so the queue's retry must not create it again
+    assert service.processed.docs[key]['status'] == 'processing'
+    assert asyncio.run(service.process_event(_event(), 'user-1')) is None
+
+    if write_error is None:
+        write.set_result(None)
+    else:
+        write.set_exception(write_error)
+    assert service.processed.docs.get(key, {}).get('status') == status
+
+
+def test_stale_processing_claim_is_taken_over(service):
+    key = 'C1:1700000000.000100:user-1'
+    service.processed.docs[key] = {
+        'message_key': key, 'status': 'processing', 'processed_at': datetime.utcnow() - timedelta(hours=1)
+    }
+
+    assert asyncio.run(service.process_event(_event(), 'user-1')) is not None
+
+
+def test_retry_header_fast_path_skips_processed_events(service):
+    from flask import Flask
+    from backend.apis import slack_routes
+
+    asyncio.run(service.process_event(_event(), 'user-1'))
+    service.verify_webhook_signature = Mock(return_value=True)
+    app = Flask(__name__)
+    app.register_blueprint(slack_routes.slack_bp, url_prefix='/api/integrations/slack')
+
+    with patch.object(slack_routes, 'slack_service', service), \
+            patch.object(slack_routes, 'slack_event_queue') as mock_queue:
+        response = app.test_client().post(
+            '/api/integrations/slack/webhook',
+            data=json.dumps(_event()),
+            content_type='application/json',
+            headers={'X-Slack-Retry-Num': '1', 'X-Slack-Retry-Reason': 'http_timeout'}
+        )
+
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'duplicate'
+    assert response.headers['X-Slack-No-Retry'] == '1'
+    mock_queue.enqueue.assert_not_called()
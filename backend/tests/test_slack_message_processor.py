@@ -3,6 +3,7 @@ Test Suite for Slack Message Processor
 Tests the SlackMessageProcessor class following TDD approach
 """
 
+import asyncio
 import pytest
 import json
 from unittest.mock import Mock, patch, AsyncMock
@@ -334,4 +335,103 @@ class TestSlackMessageProcessorIntegration:
         assert len(results) == 3
         assert all(result == "done" for result in results)
         
-        loop.close()
\ No newline at end of file
+        loop.close()
+
+class _FakeMessages:
+    """Answers batch prompts with a verdict per message id, in reverse order."""
+
+    def __init__(self, fail=False):
+        self.prompts = []
+        self.fail = fail
+
+    def create(self, **kwargs):
+        prompt = kwargs['messages'][0]['content']
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("overloaded")
+        entries = [json.loads(line) for line in prompt.splitlines() if line.startswith('{"id"')]
+        verdicts = [
+            {"id": entry["id"], "is_actionable": 'review' in entry["message"],
+             "task_text": "Review it" if 'review' in entry["message"] else ""}
+            for entry in reversed(entries)
+        ]
+        response = Mock()
+        response.content = [Mock(text=json.dumps(verdicts))]
+        response.usage = Mock(input_tokens=len(prompt) // 4, output_tokens=20 * len(entries))
+        return response
+
+
+class TestSlackMentionPipeline:
+    """Local pre-filter plus batched classification"""
+
+    def _processor(self, **kwargs):
+        messages = _FakeMessages(fail=kwargs.pop('fail', False))
+        client = Mock()
+        client.messages = messages
+        return SlackMessageProcessor(anthropic_client=client, **kwargs), messages
+
+    def test_prefilter_drops_obvious_non_actionable_without_api_calls(self):
+        processor, messages = self._processor(batch_window_seconds=0.01)
+
+        for text in ["Thanks <@U1> for your help!", "Good morning everyone!", "FYI - meeting moved to 3pm", "<@U1> 👍"]:
+            assert processor.prefilter({"text": text}) is False
+            assert asyncio.run(processor.process_mention({"text": text})) == (False, "")
+
+        assert messages.prompts == []
+        assert processor.stats['prefiltered'] == 4
+        assert processor.prefilter({"text": "Hey <@U1>, could you please review the proposal?"}) is True
+        assert processor.prefilter({"text": "<@U1> deploy the hotfix tonight"}) is True
+
+    def test_prefilter_matches_greetings_and_thanks_as_whole_words(self):
+        processor, _ = self._processor()
+
+        for text in [
+            "<@U1> high priority: deploy the hotfix tonight",
+            "<@U1> hiring panel moved to you, prep the questions",
+            "<@U1> thanksgiving rota needs your name",
+            "<@U1> fyis for the launch are in the doc, compile them",
+        ]:
+            assert processor.prefilter({"text": text}) is True
+        for text in ["Hi <@U1>!", "thanks <@U1>", "<@U1> fyi: lunch is here", "<@U1> 😂"]:
+            assert processor.prefilter({"text": text}) is False
+
+    def test_candidates_in_one_window_share_one_prompt(self):
+        processor, messages = self._processor(batch_window_seconds=0.05, max_batch_size=50)
+        texts = ["<@U1> please review the PR", "<@U1> deploy the hotfix tonight", "<@U1> can you review the doc?"]
+
+        async def _burst():
+            return await asyncio.gather(*(processor.process_mention({"text": text}) for text in texts))
+
+        results = asyncio.run(_burst())
+
+        assert results == [(True, "Review it"), (False, ""), (True, "Review it")]
+        assert len(messages.prompts) == 1
+        assert processor.stats['api_calls'] == 1 and processor.stats['output_tokens'] == 60
+
+    def test_full_batch_is_sent_without_waiting_for_the_window(self):
+        processor, messages = self._processor(batch_window_seconds=30, max_batch_size=2)
+
+        async def _burst():
+            return await asyncio.wait_for(
+                asyncio.gather(*(processor.process_mention({"text": f"<@U1> please review {i}"}) for i in range(4))),
+                timeout=5
+            )
+
+        assert asyncio.run(_burst()) == [(True, "Review it")] * 4
+        assert len(messages.prompts) == 2
+
+    def test_missing_or_failed_verdicts_are_not_actionable(self):
+        processor, _ = self._processor(batch_window_seconds=0.01, fail=True)
+
+        assert asyncio.run(processor.process_mention({"text": "<@U1> please review"})) == (False, "")
+        assert processor._parse_batch_response('[{"id": 2, "is_actionable": true, "task_text": "Do it"}, {"id": 9}]', 2) == [
+            (False, ""), (True, "Do it")
+        ]
+        assert processor._parse_batch_response('not json', 1) == [(False, "")]
+
+    def test_is_likely_actionable_heuristics_are_unchanged(self):
+        processor, _ = self._processor()
+
+        assert processor.is_likely_actionable({"text": "could you review this"}) is True
+        assert processor.is_likely_actionable({"text": "thanks, could you review this"}) is False
+        assert processor.is_likely_actionable({"text": "see you tomorrow"}) is False
@@ -0,0 +1,144 @@
+"""
+Tests for the cached Slack channel/user name client.
+"""
+
+import asyncio
+
+from slack_sdk.errors import SlackApiError
+
+from backend.services.slack_metadata import SlackMetadataClient
+
+
+class _FakeResponse(dict):
+    def __init__(self, status_code=200, headers=None, **data):
+        super().__init__(data)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _FakeSlackClient:
+    def __init__(self, calls, rate_limit_first=0, latency=0.0):
+        self.calls = calls
+        self.rate_limit_first = rate_limit_first
+        self.latency = latency
+
+    async def conversations_info(self, channel):
+        self.calls.append(('conversations_info', channel))
+        await asyncio.sleep(self.latency)
+        if len(self.calls) <= self.rate_limit_first:
+            raise SlackApiError('ratelimited', _FakeResponse(429, {'Retry-After': '3'}, ok=False))
+        return _FakeResponse(ok=True, channel={'name': f'name-{channel}'})
+
+    async def users_info(self, user):
+        self.calls.append(('users_info', user))
+        await asyncio.sleep(self.latency)
+        return _FakeResponse(ok=True, user={'name': f'name-{user}'})
+
+
+def _client(**kwargs):
+    calls, tokens, sleeps = [], [], []
+    rate_limit_first = kwargs.pop('rate_limit_first', 0)
+    latency = kwargs.pop('latency', 0.0)
+
+    async def _sleep(seconds):
+        sleeps.append(seconds)
+
+    def _token():
+        tokens.append(1)
+        return 'xoxb-test'
+
+    client = SlackMetadataClient(
+        client_factory=lambda token, session: _FakeSlackClient(calls, rate_limit_first, latency),
+        session_factory=object,
+        sleep=_sleep,
+        **kwargs
+    )
+    return client, calls, tokens, sleeps, _token
+
+
+def test_warm_cache_costs_no_api_calls_or_decrypts():
+    client, calls, tokens, _, token = _client()
+
+    async def _burst():
+        for _ in range(50):
+            assert await client.channel_name('T1', 'C1', token) == 'name-C1'
+            assert await client.user_name('T1', 'U1', token) == 'name-U1'
+
+    asyncio.run(_burst())
+
+    assert calls == [('conversations_info', 'C1'), ('users_info', 'U1')]
+    assert len(tokens) == 2
+    assert client.stats()['hits'] == 98
+
+
+def test_names_are_cached_per_workspace():
+    client, calls, _, _, token = _client()
+
+    async def _lookups():
+        await client.channel_name('T1', 'C1', token)
+        await client.channel_name('T2', 'C1', token)
+        await client.channel_name('T1', 'C1', token)
+
+    asyncio.run(_lookups())
+    assert len(calls) == 2
+
+    client.invalidate('T1')
+    asyncio.run(_lookups())
+    assert len(calls) == 3
+
+
+def test_concurrent_misses_share_one_request():
+    client, calls, _, _, token = _client(latency=0.01)
+
+    async def _burst():
+        return await asyncio.gather(*(client.channel_name('T1', 'C1', token) for _ in range(20)))
+
+    names = asyncio.run(_burst())
+
+    assert names == ['name-C1'] * 20
+    assert calls == [('conversations_info', 'C1')]
+
+
+def test_rate_limit_waits_for_retry_after_then_retries():
+    client, calls, _, sleeps, token = _client(rate_limit_first=1)
+
+    name = asyncio.run(client.channel_name('T1', 'C1', token))
+
+    assert name == 'name-C1'
+    assert len(calls) == 2
+    assert len(sleeps) == 1 and 2.9 < sleeps[0] <= 3
+    assert client.stats()['rate_limited'] == 1
+
+
+def test_persistent_rate_limit_falls_back_without_caching():
+    client, calls, _, _, token = _client(rate_limit_first=100, max_retries=2)
+
+    assert asyncio.run(client.channel_name('T1', 'C1', token)) == 'Unknown Channel'
+    assert len(calls) == 3
+    assert client.stats()['channels'] == 0
+
+
+def test_close_session_closes_the_running_loops_session():
+    closed = []
+
+    class _Session:
+        closed = False
+
+        async def close(self):
+            closed.append(self)
+            self.closed = True
+
+    client = SlackMetadataClient(
+        client_factory=lambda token, session: _FakeSlackClient([]),
+        session_factory=_Session
+    )
+
+    async def _short_lived_loop(channel_id):
+        await client.channel_name('T1', channel_id, lambda: 'xoxb-test')
+        await client.close_session()
+
+    asyncio.run(_short_lived_loop('C1'))
+    asyncio.run(_short_lived_loop('C2'))
+
+    assert len(closed) == 2 and all(session.closed for session in closed)
+    assert client._sessions == {}
@@ -73,6 +73,12 @@ class TestSlackRoutes:
         mock.disconnect_integration.return_value = {'success': True}
         return mock
 
+    @pytest.fixture
+    def mock_slack_backfill(self):
+        """Mock the connect-time mention backfill so no background thread starts"""
+        with patch('backend.apis.slack_routes.slack_backfill') as mock:
+            yield mock
+
     @pytest.fixture
     def valid_slack_event(self):
         """Sample valid Slack event data"""
@@ -148,7 +154,7 @@ class TestSlackRoutes:
             assert parts[1].isdigit()  # timestamp
             assert len(parts[2]) == 36  # UUID length
 
-    def test_oauth_callback_success_legacy_with_auth(self, client, mock_firebase_token, mock_slack_service):
+    def test_oauth_callback_success_legacy_with_auth(self, client, mock_firebase_token, mock_slack_service, mock_slack_backfill):
         """Test successful OAuth callback handling with legacy auth (backward compatibility)"""
         with patch('backend.apis.slack_routes.slack_service', mock_slack_service):
             response = client.get('/api/integrations/slack/auth/callback?code=test_code&state=simple_state',
@@ -158,8 +164,9 @@ class TestSlackRoutes:
             data = json.loads(response.data)
             assert data['success'] is True
             assert 'workspace_name' in data
+            mock_slack_backfill.start.assert_called_once_with('test-user-123')
 
-    def test_oauth_callback_missing_code(self, client, mock_firebase_token):
+    def test_oauth_callback_missing_code(self, client, mock_firebase_token, mock_slack_backfill):
         """Test OAuth callback without authorization code"""
         response = client.get('/api/integrations/slack/auth/callback?state=test_state',
                             headers={'Authorization': 'Bearer valid_token'})
@@ -168,6 +175,7 @@ class TestSlackRoutes:
         data = json.loads(response.data)
         assert data['success'] is False
         assert 'Missing authorization code' in data['error']
+        mock_slack_backfill.start.assert_not_called()
 
     def test_webhook_verification_valid(self, client, valid_slack_event):
         """Test webhook URL verification challenge"""
@@ -189,7 +197,9 @@ class TestSlackRoutes:
         timestamp = str(int(datetime.utcnow().timestamp()))
         body = json.dumps(valid_slack_event)
         
-        with patch('backend.apis.slack_routes.slack_service', mock_slack_service):
+        with patch('backend.apis.slack_routes.slack_service', mock_slack_service), \
+                patch('backend.apis.slack_routes.slack_event_queue') as mock_queue:
+            mock_queue.enqueue.return_value = True
             with patch('backend.apis.slack_routes.os.environ.get') as mock_env:
                 mock_env.return_value = 'test_signing_secret'
                 
@@ -211,7 +221,13 @@ class TestSlackRoutes:
                 
                 assert response.status_code == 200
                 data = json.loads(response.data)
-                assert data['status'] == 'processed'
+                # Acknowledged immediately; processing happens on the worker pool
+                assert data['status'] == 'accepted'
+                mock_queue.enqueue.assert_called_once_with(body, valid_slack_event)
+                # This process drains the queue unless a slack-events process does
+                mock_queue.ensure_web_worker.assert_called_once_with()
+                mock_queue.submit.assert_not_called()
+                mock_slack_service.process_event.assert_not_called()
 
     def test_webhook_invalid_signature(self, client, valid_slack_event):
         """Test webhook with invalid signature"""
@@ -288,7 +304,7 @@ class TestSlackRoutes:
             data = json.loads(response.data)
             assert 'Authentication required' in data['error']
 
-    def test_oauth_callback_with_secure_state_success(self, client, mock_slack_service):
+    def test_oauth_callback_with_secure_state_success(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback with secure state token containing user ID"""
         import base64
         import time
@@ -315,8 +331,27 @@ class TestSlackRoutes:
             mock_slack_service.validate_and_extract_user_from_state.assert_called_once_with(secure_state)
             # Verify slack_service.handle_oauth_callback was called with extracted user_id
             mock_slack_service.handle_oauth_callback.assert_called_once_with('test_code', secure_state, user_id)
+            # Recent mentions are backfilled only once the workspace is connected
+            mock_slack_backfill.start.assert_called_once_with(user_id)
     
-    def test_oauth_callback_with_malformed_state(self, client, mock_slack_service):
+    def test_oauth_callback_starts_backfill_only_on_success(self, client, mock_slack_service, mock_slack_backfill):
+        """The mention backfill starts after a successful connect and never after a failed one"""
+        mock_slack_service.validate_and_extract_user_from_state.return_value = 'test-user-123'
+
+        with patch('backend.apis.slack_routes.slack_service', mock_slack_service):
+            mock_slack_service.handle_oauth_callback = AsyncMock(return_value={
+                'success': False, 'error': 'OAuth failed: invalid_code'
+            })
+            client.get('/api/integrations/slack/auth/callback?code=bad_code&state=secure_state')
+            mock_slack_backfill.start.assert_not_called()
+
+            mock_slack_service.handle_oauth_callback = AsyncMock(return_value={
+                'success': True, 'workspace_id': 'T0123456789', 'workspace_name': 'Test Workspace'
+            })
+            client.get('/api/integrations/slack/auth/callback?code=test_code&state=secure_state')
+            mock_slack_backfill.start.assert_called_once_with('test-user-123')
+
+    def test_oauth_callback_with_malformed_state(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback with malformed state token"""
         malformed_states = [
             'invalid_base64',
@@ -336,8 +371,9 @@ class TestSlackRoutes:
                 data = json.loads(response.data)
                 assert data['success'] is False
                 assert 'Invalid state parameter' in data['error']
+            mock_slack_backfill.start.assert_not_called()
     
-    def test_oauth_callback_with_expired_state(self, client, mock_slack_service):
+    def test_oauth_callback_with_expired_state(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback with expired state token (older than 10 minutes)"""
         import base64
         import uuid
@@ -359,8 +395,9 @@ class TestSlackRoutes:
             data = json.loads(response.data)
             assert data['success'] is False
             assert 'Invalid state parameter' in data['error']
+            mock_slack_backfill.start.assert_not_called()
     
-    def test_oauth_callback_authentication_required_legacy(self, client, mock_slack_service):
+    def test_oauth_callback_authentication_required_legacy(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback authentication for legacy non-secure state (backward compatibility)"""
         # Mock validation to return None (simulating legacy state format)
         mock_slack_service.validate_and_extract_user_from_state.return_value = None
@@ -372,6 +409,7 @@ class TestSlackRoutes:
             assert response.status_code == 400
             data = json.loads(response.data)
             assert 'Invalid state parameter' in data['error']
+            mock_slack_backfill.start.assert_not_called()
 
 
 class TestSlackService:
@@ -517,6 +555,12 @@ class TestSlackRoutesIntegration:
         })
         return mock
 
+    @pytest.fixture
+    def mock_slack_backfill(self):
+        """Mock the connect-time mention backfill so no background thread starts"""
+        with patch('backend.apis.slack_routes.slack_backfill') as mock:
+            yield mock
+
     @pytest.fixture
     def mock_database(self):
         """Mock database operations"""
@@ -582,7 +626,7 @@ class TestSlackRoutesIntegration:
         assert loop is not None
         loop.close()
 
-    def test_oauth_callback_missing_bot_token(self, client, mock_slack_service):
+    def test_oauth_callback_missing_bot_token(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback when Slack response is missing bot token"""
         import base64
         import time
@@ -611,8 +655,9 @@ class TestSlackRoutesIntegration:
             data = json.loads(response.data)
             assert data['success'] is False
             assert 'Missing bot access token' in data['error']
+            mock_slack_backfill.start.assert_not_called()
     
-    def test_oauth_callback_invalid_oauth_response(self, client, mock_slack_service):
+    def test_oauth_callback_invalid_oauth_response(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback when Slack returns oauth error"""
         import base64
         import time
@@ -641,8 +686,9 @@ class TestSlackRoutesIntegration:
             data = json.loads(response.data)
             assert data['success'] is False
             assert 'OAuth failed: invalid_code' in data['error']
+            mock_slack_backfill.start.assert_not_called()
     
-    def test_oauth_callback_missing_team_info(self, client, mock_slack_service):
+    def test_oauth_callback_missing_team_info(self, client, mock_slack_service, mock_slack_backfill):
         """Test OAuth callback when Slack response is missing team information"""
         import base64
         import time
@@ -671,6 +717,7 @@ class TestSlackRoutesIntegration:
             data = json.loads(response.data)
             assert data['success'] is False
             assert 'Missing team information' in data['error']
+            mock_slack_backfill.start.assert_not_called()
     
     def test_security_validation_placeholder(self):
         """Test placeholder for security validation"""
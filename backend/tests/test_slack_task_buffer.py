@@ -0,0 +1,126 @@
+"""
+Tests for batched Slack task writes to UserSchedules.
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from backend.models.task import Task
+from backend.services.slack_service import SlackService
+from backend.services.slack_task_buffer import SlackTaskWriteBuffer
+
+
+class _FakeSchedules:
+    def __init__(self, fail_index=None):
+        self.bulk_calls = []
+        self.fail_index = fail_index
+
+    def bulk_write(self, operations, ordered=True):
+        assert ordered is False
+        self.bulk_calls.append([(op._filter, op._doc, op._upsert) for op in operations])
+        if self.fail_index is not None:
+            raise BulkWriteError({'writeErrors': [{'index': self.fail_index, 'errmsg': 'boom'}]})
+
+
+def _buffer(schedules, **kwargs):
+    published = []
+    buffer = SlackTaskWriteBuffer(
+        lambda: schedules,
+        publisher=lambda user_id, event: published.append((user_id, event)),
+        **kwargs
+    )
+    return buffer, published
+
+
+def test_tasks_for_one_schedule_become_one_push_each():
+    schedules = _FakeSchedules()
+    buffer, published = _buffer(schedules, window_seconds=60)
+    futures = []
+    for i in range(5):
+        futures.append(buffer.add('u1', '2025-01-20', {'id': f't{i}'}))
+
+    assert buffer.flush() == 1
+
+    (operations,) = schedules.bulk_calls
+    (query, update, upsert) = operations[0]
+    assert len(operations) == 1 and upsert is True
+    assert query['userId'] == 'u1'
+    assert update['$push']['schedule']['$each'] == [{'id': f't{i}'} for i in range(5)]
+    assert published == [('u1', {'type': 'schedule_updated', 'date': '2025-01-20'})]
+    assert all(f.result(timeout=1) is None for f in futures)
+
+
+def test_one_bulk_write_and_one_notification_per_group():
+    schedules = _FakeSchedules()
+    buffer, published = _buffer(schedules, window_seconds=60)
+    for user_id, date in [('u1', '2025-01-20'), ('u2', '2025-01-20'), ('u1', '2025-01-20'), ('u1', '2025-01-21')]:
+        buffer.add(user_id, date, {'id': f'{user_id}-{date}'})
+
+    assert buffer.flush() == 3
+
+    assert len(schedules.bulk_calls) == 1 and len(schedules.bulk_calls[0]) == 3
+    assert sorted(published, key=str) == sorted([
+        ('u1', {'type': 'schedule_updated', 'date': '2025-01-20'}),
+        ('u2', {'type': 'schedule_updated', 'date': '2025-01-20'}),
+        ('u1', {'type': 'schedule_updated', 'date': '2025-01-21'}),
+    ], key=str)
+
+
+def test_failed_group_rejects_only_its_tasks():
+    schedules = _FakeSchedules(fail_index=1)
+    buffer, published = _buffer(schedules, window_seconds=60)
+    ok = buffer.add('u1', '2025-01-20', {'id': 'a'})
+    failed = buffer.add('u2', '2025-01-20', {'id': 'b'})
+
+    assert buffer.flush() == 1
+
+    assert ok.result(timeout=1) is None
+    with pytest.raises(RuntimeError):
+        failed.result(timeout=1)
+    assert [user_id for user_id, _ in published] == ['u1']
+    assert buffer.stats()['failed'] == 1
+
+
+def test_concurrent_adds_within_window_are_flushed_together():
+    schedules = _FakeSchedules()
+    buffer, published = _buffer(schedules, window_seconds=0.2)
+    futures = []
+    lock = threading.Lock()
+
+    def _add(i):
+        future = buffer.add('u1', '2025-01-20', {'id': i})
+        with lock:
+            futures.append(future)
+
+    threads = [threading.Thread(target=_add, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result(timeout=5)
+    buffer.stop()
+
+    assert len(schedules.bulk_calls) == 1
+    assert len(schedules.bulk_calls[0][0][1]['$push']['schedule']['$each']) == 20
+    assert len(published) == 1
+
+
+def test_store_task_waits_for_the_batched_write(monkeypatch):
+    for name in ('SLACK_CLIENT_ID', 'SLACK_CLIENT_SECRET', 'SLACK_SIGNING_SECRET'):
+        monkeypatch.setenv(name, 'x')
+    schedules = _FakeSchedules()
+    db = Mock()
+    db.get_collection.return_value = schedules
+    service = SlackService(db_client=db)
+    service.task_buffer._publisher = Mock()
+
+    service._store_task(Task(id='t1', text='Review PR', categories=[]), 'u1')
+
+    db.get_collection.assert_called_with('UserSchedules')
+    assert len(schedules.bulk_calls) == 1
+    service.task_buffer._publisher.assert_called_once()
+    service.task_buffer.stop()
@@ -0,0 +1,88 @@
+"""
+Tests for routing Slack workspace events to mentioned YourMum users.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from backend.services.slack_user_router import SlackUserRouter, parse_mentions
+
+
+class _FakeUsers:
+    def __init__(self, users):
+        self.users = users
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return [u for u in self.users if u['slack_integration']['workspace_id'] == query['slack_integration.workspace_id']]
+
+
+def _user(google_id, slack_user_id, workspace='T1'):
+    return {'googleId': google_id, 'slack_integration': {'workspace_id': workspace, 'slack_user_id': slack_user_id}}
+
+
+USERS = [_user('g1', 'U1'), _user('g2', 'U2'), _user('g3', 'U3'), _user('g9', 'U1', workspace='T2')]
+
+
+def _router(users=None):
+    users = users or _FakeUsers(USERS)
+    return SlackUserRouter(users_getter=lambda: users), users
+
+
+def test_parse_mentions():
+    assert parse_mentions('<@U1> and <@W2|bob> please') == ({'U1', 'W2'}, False)
+    assert parse_mentions('<!here> standup') == (set(), True)
+    assert parse_mentions('no mentions') == (set(), False)
+
+
+def test_only_mentioned_users_are_routed():
+    router, users = _router()
+
+    recipients = router.recipients('T1', {'text': '<@U2> can you review?'})
+
+    assert [r['user_id'] for r in recipients] == ['g2']
+    assert recipients[0]['integration']['slack_user_id'] == 'U2'
+
+
+def test_broadcast_routes_to_every_connected_user_in_workspace():
+    router, _ = _router()
+
+    recipients = router.recipients('T1', {'text': '<!channel> deploy at 5'})
+
+    assert sorted(r['user_id'] for r in recipients) == ['g1', 'g2', 'g3']
+
+
+def test_table_is_loaded_once_until_invalidated():
+    router, users = _router()
+
+    for _ in range(5):
+        router.recipients('T1', {'text': '<@U1> hi'})
+    # Messages without mentions never touch the table
+    router.recipients('T3', {'text': 'just chatting'})
+    assert len(users.queries) == 1
+
+    users.users.append(_user('g4', 'U4'))
+    assert router.recipients('T1', {'text': '<@U4> hi'}) == []
+    router.invalidate('T1')
+    assert [r['user_id'] for r in router.recipients('T1', {'text': '<@U4> hi'})] == ['g4']
+
+
+def test_workspace_event_only_processes_mentioned_users():
+    from backend.apis import slack_routes
+
+    router, _ = _router()
+    event_data = {
+        'type': 'event_callback',
+        'team_id': 'T1',
+        'event': {'type': 'message', 'channel': 'C1', 'text': '<@U3> ship it', 'ts': '1.0'}
+    }
+
+    with patch.object(slack_routes, 'slack_user_router', router), \
+            patch.object(slack_routes, 'slack_service') as mock_service:
+        mock_service.process_event = AsyncMock(return_value=None)
+        asyncio.run(slack_routes.process_workspace_event(event_data))
+
+    mock_service.process_event.assert_awaited_once()
+    _, user_id, integration = mock_service.process_event.await_args.args
+    assert user_id == 'g3' and integration['slack_user_id'] == 'U3'
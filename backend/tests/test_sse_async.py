@@ -0,0 +1,165 @@
+"""
+Tests for the asyncio SSE serving path, plus an opt-in soak test that holds
+many concurrent streams on a single event loop.
+
+The soak test raises RLIMIT_NOFILE and takes a while, so it only runs with
+SSE_SOAK=1, e.g. `SSE_SOAK=1 SSE_SOAK_STREAMS=5000 pytest backend/tests/test_sse_async.py`.
+"""
+
+import asyncio
+import json
+import os
+import resource
+import threading
+import time
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+
+from backend.apis.sse_async import create_sse_app
+from backend.services.event_bus import EventBus
+
+# The soak test is opt-in; SSE_SOAK_STREAMS sets how many streams it holds open
+RUN_SOAK = os.getenv('SSE_SOAK', '').lower() in ('1', 'true', 'yes')
+SOAK_STREAMS = int(os.getenv('SSE_SOAK_STREAMS', '200'))
+
+
+def _authenticate(token):
+    # token "user-<n>" maps to googleId "user-<n>"; anything else is rejected
+    return {"googleId": token} if token.startswith("user-") else None
+
+
+async def _read_event(resp):
+    """Read one SSE frame (up to the blank line) and return its lines."""
+    lines = []
+    while True:
+        raw = await resp.content.readline()
+        line = raw.decode().rstrip("\n")
+        if line == "":
+            if lines:
+                return lines
+            continue
+        lines.append(line)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_requires_token_and_valid_user():
+    async def scenario():
+        app = create_sse_app(bus=EventBus(), authenticate=_authenticate, on_connect=None)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            async with session.get(server.make_url('/api/events/stream')) as resp:
+                assert resp.status == 401
+                assert (await resp.json())["error"] == "Authentication required"
+            async with session.get(server.make_url('/api/events/stream?token=bogus')) as resp:
+                assert resp.status == 401
+                assert (await resp.json())["error"] == "Invalid authentication token"
+
+    _run(scenario())
+
+
+def test_stream_delivers_events_published_from_other_threads():
+    async def scenario():
+        bus = EventBus()
+        connected = []
+        app = create_sse_app(bus=bus, authenticate=_authenticate, on_connect=connected.append)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            headers = {"Authorization": "Bearer user-1"}
+            async with session.get(server.make_url('/api/events/stream'), headers=headers) as resp:
+                assert resp.status == 200
+                assert resp.headers["Content-Type"].startswith("text/event-stream")
+                assert await _read_event(resp) == ["event: ping", "data: {}"]
+
+                # Publishers (webhooks, request threads) run off the event loop
+                event = {"type": "schedule_updated", "date": "2025-08-14"}
+                threading.Thread(target=bus.publish, args=("user-1", event)).start()
+
+                lines = await asyncio.wait_for(_read_event(resp), timeout=5)
+                assert lines == [f"data: {json.dumps(event)}"]
+        assert connected == ["user-1"]
+        # Disconnect unsubscribes
+        for _ in range(50):
+            if not bus.subscribed_user_ids():
+                break
+            await asyncio.sleep(0.02)
+        assert bus.subscribed_user_ids() == []
+
+    _run(scenario())
+
+
+def test_cancelled_stream_unsubscribes_and_propagates_cancellation():
+    from aiohttp.test_utils import make_mocked_request
+
+    from backend.apis.sse_async import events_stream
+
+    async def scenario():
+        bus = EventBus()
+        app = create_sse_app(bus=bus, authenticate=_authenticate, on_connect=None)
+        request = make_mocked_request('GET', '/api/events/stream?token=user-1', app=app)
+        handler = asyncio.ensure_future(events_stream(request))
+        for _ in range(50):
+            if bus.subscribed_user_ids():
+                break
+            await asyncio.sleep(0.01)
+        assert bus.subscribed_user_ids() == ["user-1"]
+
+        # e.g. the worker shutting down; the handler must not swallow it
+        handler.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await handler
+        assert bus.subscribed_user_ids() == []
+
+    _run(scenario())
+
+
+@pytest.mark.skipif(not RUN_SOAK, reason="set SSE_SOAK=1 to run the SSE soak test")
+def test_soak_holds_many_streams_on_one_loop():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    # Each stream uses a client and a server socket in this process
+    needed = SOAK_STREAMS * 2 + 256
+    if soft < needed:
+        if hard != resource.RLIM_INFINITY and hard < needed:
+            pytest.skip(f"RLIMIT_NOFILE hard limit {hard} too low for {SOAK_STREAMS} streams")
+        resource.setrlimit(resource.RLIMIT_NOFILE, (needed, hard))
+
+    async def scenario():
+        bus = EventBus()
+        app = create_sse_app(bus=bus, authenticate=_authenticate, on_connect=None)
+        connector = aiohttp.TCPConnector(limit=0)
+        async with TestServer(app) as server, aiohttp.ClientSession(connector=connector) as session:
+            url = server.make_url('/api/events/stream')
+
+            async def open_stream(i):
+                resp = await session.get(url, params={"token": f"user-{i}"})
+                assert resp.status == 200
+                assert await _read_event(resp) == ["event: ping", "data: {}"]
+                return resp
+
+            started = time.perf_counter()
+            streams = []
+            for batch_start in range(0, SOAK_STREAMS, 500):
+                batch = range(batch_start, min(batch_start + 500, SOAK_STREAMS))
+                streams.extend(await asyncio.gather(*(open_stream(i) for i in batch)))
+            connect_seconds = time.perf_counter() - started
+            assert len(bus.subscribed_user_ids()) == SOAK_STREAMS
+
+            # Every stream is still served while all are open
+            started = time.perf_counter()
+            for i in range(SOAK_STREAMS):
+                bus.publish(f"user-{i}", {"type": "schedule_updated", "date": "2025-08-14", "n": i})
+            frames = await asyncio.wait_for(
+                asyncio.gather(*(_read_event(resp) for resp in streams)), timeout=60
+            )
+            fanout_seconds = time.perf_counter() - started
+            for i, lines in enumerate(frames):
+                assert json.loads(lines[0][len("data: "):])["n"] == i
+
+            print(f"SSE soak: {SOAK_STREAMS} streams connected in {connect_seconds:.2f}s, "
+                  f"fan-out delivered in {fanout_seconds:.2f}s on one event loop")
+            for resp in streams:
+                resp.close()
+
+    _run(scenario())
@@ -0,0 +1,155 @@
+"""
+Tests for proactive OAuth token refresh with a per-user cross-worker lease.
+"""
+
+import copy
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.single_flight import SingleFlight
+from backend.services.token_refresher import TokenRefresher
+
+
+NOW = datetime(2025, 1, 20, 8, 0, tzinfo=timezone.utc)
+
+
+class _FakeLeases:
+    def __init__(self):
+        self.docs = {}
+        self._lock = threading.Lock()
+
+    def find_one_and_update(self, query, update, upsert=False):
+        now = query['$or'][0]['expiresAt']['$lte']
+        with self._lock:
+            doc = self.docs.get(query['_id'])
+            if doc is not None and doc['expiresAt'] > now and doc.get('status') != 'done':
+                raise DuplicateKeyError("E11000 duplicate key error")
+            doc = {"_id": query['_id'], **copy.deepcopy(update['$set'])}
+            self.docs[query['_id']] = doc
+
+    def update_one(self, query, update):
+        with self._lock:
+            doc = self.docs.get(query['_id'])
+            if doc and doc.get('owner') == query['owner']:
+                doc.update(copy.deepcopy(update['$set']))
+
+    def find_one(self, query):
+        with self._lock:
+            return copy.deepcopy(self.docs.get(query['_id']))
+
+    def delete_one(self, query):
+        with self._lock:
+            doc = self.docs.get(query['_id'])
+            if doc and doc.get('owner') == query['owner']:
+                del self.docs[query['_id']]
+
+
+class _FakeUsers:
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.queries = []
+        self.updates = []
+
+    def find_one(self, query):
+        return {'googleId': query['googleId'], 'calendar': {'credentials': copy.deepcopy(self.credentials)}}
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        users = [{'googleId': 'u1', 'calendar': {'credentials': copy.deepcopy(self.credentials)}}]
+        cursor = MagicMock()
+        cursor.sort.return_value.limit.return_value = users
+        return cursor
+
+    def update_one(self, query, update):
+        self.updates.append(update)
+
+
+def _credentials(expires_in_seconds, token='old-token'):
+    return {'accessToken': token, 'refreshToken': 'refresh-1', 'expiresAt': NOW + timedelta(seconds=expires_in_seconds)}
+
+
+def _refresher(users, leases=None, **kwargs):
+    flight = SingleFlight(collection_getter=lambda: leases or _FakeLeases(), poll_interval=0.01)
+    return TokenRefresher(users_getter=lambda: users, flight=flight, clock=lambda: NOW, **kwargs)
+
+
+def test_concurrent_workers_refresh_a_user_once():
+    users = _FakeUsers(_credentials(-10))
+    leases = _FakeLeases()
+    calls = []
+
+    def _slow_refresh(_users, user_id, credentials, refresh_token):
+        calls.append(user_id)
+        time.sleep(0.2)
+        users.credentials = _credentials(3600, token='new-token')
+        return 'new-token'
+
+    # Two "workers" share only the lease collection
+    workers = [_refresher(users, leases), _refresher(users, leases)]
+    results = []
+    with patch('backend.apis.calendar_routes._refresh_access_token', side_effect=_slow_refresh):
+        threads = [
+            threading.Thread(target=lambda w=w: results.append(w.refresh_user(users, 'u1', _credentials(-10))))
+            for w in workers
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert calls == ['u1']
+    assert results == ['new-token', 'new-token']
+    # The token itself is never written to the lease document
+    assert all('result' not in doc for doc in leases.docs.values())
+
+
+def test_refresh_skipped_when_stored_token_is_already_fresh():
+    users = _FakeUsers(_credentials(3600, token='fresh'))
+
+    with patch('backend.apis.calendar_routes._refresh_access_token') as mock_refresh:
+        token = _refresher(users).refresh_user(users, 'u1', _credentials(-10))
+
+    assert token == 'fresh'
+    mock_refresh.assert_not_called()
+
+
+def test_run_once_refreshes_tokens_inside_lead_window():
+    users = _FakeUsers(_credentials(120))
+
+    with patch('backend.apis.calendar_routes._refresh_access_token', return_value='new-token') as mock_refresh:
+        counts = _refresher(users, lead_seconds=300).run_once()
+
+    assert counts == {'due': 1, 'refreshed': 1, 'failed': 0}
+    mock_refresh.assert_called_once()
+    query = users.queries[0]
+    assert query['calendar.credentials.expiresAt'] == {'$lte': NOW + timedelta(seconds=300)}
+    assert users.updates == [{'$unset': {'calendar.tokenRefreshRetryAt': ''}}]
+
+
+def test_failed_refresh_backs_off():
+    users = _FakeUsers(_credentials(120))
+
+    with patch('backend.apis.calendar_routes._refresh_access_token', return_value=None):
+        counts = _refresher(users, retry_seconds=900).run_once()
+
+    assert counts['failed'] == 1
+    assert users.updates == [{'$set': {'calendar.tokenRefreshRetryAt': NOW + timedelta(seconds=900)}}]
+
+
+def test_request_path_refreshes_expired_token_through_lease():
+    from backend.apis.calendar_routes import _ensure_access_token_valid
+
+    credentials = {
+        'accessToken': 'old',
+        'refreshToken': 'refresh-1',
+        'expiresAt': datetime.now(timezone.utc) - timedelta(minutes=5)
+    }
+    with patch('backend.apis.calendar_routes.token_refresher') as mock_refresher:
+        mock_refresher.refresh_user.return_value = 'new'
+        assert _ensure_access_token_valid(MagicMock(), 'u1', credentials) == 'new'
+
+    mock_refresher.refresh_user.assert_called_once()
@@ -0,0 +1,108 @@
+"""
+Tests for the per-process user document cache and its write-path invalidation.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from backend.apis.routes import api_bp
+from backend.services.slack_service import SlackService
+from backend.services.user_cache import UserCache, project_user, user_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_repeat_reads_are_served_from_cache_and_counted():
+    cache = UserCache(ttl_seconds=30)
+    loader = MagicMock(return_value={"googleId": "u1", "_id": "oid", "calendar": {"connected": True}})
+
+    first = cache.get_user("u1", loader)
+    second = cache.get_user("u1", loader)
+
+    assert loader.call_count == 1
+    assert first == second == {"googleId": "u1", "calendar": {"connected": True}}
+    assert cache.stats()["db_reads_saved"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = _Clock()
+    cache = UserCache(ttl_seconds=5, timer=clock)
+    cache.put({"googleId": "u1"})
+    assert cache.get("u1") is not None
+
+    clock.now += 6
+    assert cache.get("u1") is None
+
+
+def test_callers_cannot_mutate_cached_document():
+    cache = UserCache()
+    cache.put({"googleId": "u1", "calendar": {"credentials": {"accessToken": "old"}}})
+
+    copy = cache.get("u1")
+    copy["calendar"]["credentials"]["accessToken"] = "mutated"
+
+    assert cache.get("u1")["calendar"]["credentials"]["accessToken"] == "old"
+
+
+def test_missing_users_are_not_cached():
+    cache = UserCache()
+    loader = MagicMock(return_value=None)
+    assert cache.get_user("ghost", loader) is None
+    assert cache.get_user("ghost", loader) is None
+    assert loader.call_count == 2
+
+
+def test_project_user_applies_top_level_inclusion():
+    user = {"googleId": "u1", "email": "a@b.c", "slack_integration": {"access_token": "x"}}
+    assert project_user(user, {"_id": 0, "googleId": 1, "email": 1}) == {"googleId": "u1", "email": "a@b.c"}
+    assert project_user(user, {"_id": 0}) is user
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@patch('backend.apis.routes.get_database')
+@patch('backend.apis.routes.get_user_from_token', return_value={'googleId': 'u1'})
+def test_timezone_update_invalidates_cached_user(_mock_user, mock_get_database, client):
+    user_cache.put({"googleId": "u1", "timezone": "UTC"})
+
+    resp = client.put(
+        '/api/user/timezone',
+        data=json.dumps({"timezone": "Australia/Sydney"}),
+        content_type='application/json',
+        headers={'Authorization': 'Bearer tok'}
+    )
+
+    assert resp.status_code == 200
+    assert user_cache.get("u1") is None
+
+
+def test_slack_disconnect_invalidates_and_integration_read_uses_cache():
+    users = MagicMock()
+    users.find_one.return_value = {"googleId": "u1", "slack_integration": {"team_id": "T1"}}
+    db_client = MagicMock()
+    db_client.get_collection.return_value = users
+    service = SlackService(db_client=db_client)
+
+    assert service._get_user_integration("u1") == {"team_id": "T1"}
+    assert service._get_user_integration("u1") == {"team_id": "T1"}
+    assert users.find_one.call_count == 1
+
+    service.disconnect_integration("u1")
+    assert user_cache.get("u1") is None
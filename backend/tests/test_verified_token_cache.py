@@ -0,0 +1,85 @@
+"""
+Tests for the verified Firebase ID token cache in backend.utils.auth.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from backend.utils import auth as auth_utils
+from backend.utils.auth import VerifiedTokenCache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    auth_utils.verified_token_cache.clear()
+    yield
+    auth_utils.verified_token_cache.clear()
+
+
+def _decoded(uid="u1", exp_in=3600):
+    return {"uid": uid, "exp": int(time.time()) + exp_in}
+
+
+@patch.dict('firebase_admin._apps', {'[DEFAULT]': object()})
+def test_second_verification_is_a_cache_hit():
+    with patch('firebase_admin.auth.verify_id_token', return_value=_decoded()) as mock_verify:
+        first = auth_utils.verify_firebase_token("tok-a")
+        second = auth_utils.verify_firebase_token("tok-a")
+
+    assert first["uid"] == second["uid"] == "u1"
+    assert mock_verify.call_count == 1
+    stats = auth_utils.verified_token_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+
+
+@patch.dict('firebase_admin._apps', {'[DEFAULT]': object()})
+def test_failed_verification_is_not_cached():
+    with patch('firebase_admin.auth.verify_id_token', side_effect=ValueError("bad")) as mock_verify:
+        assert auth_utils.verify_firebase_token("tok-bad") is None
+        assert auth_utils.verify_firebase_token("tok-bad") is None
+
+    assert mock_verify.call_count == 2
+    assert auth_utils.verified_token_cache.stats()["size"] == 0
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_at_token_exp():
+    clock = _Clock()
+    cache = VerifiedTokenCache(max_entries=10, max_ttl_seconds=3600, timer=clock)
+    cache.put("tok", {"uid": "u1", "exp": clock.now + 5})
+    assert cache.get("tok")["uid"] == "u1"
+
+    clock.now += 6
+    assert cache.get("tok") is None
+
+
+def test_max_ttl_caps_long_lived_tokens_and_size_is_bounded():
+    clock = _Clock()
+    cache = VerifiedTokenCache(max_entries=2, max_ttl_seconds=10, timer=clock)
+    cache.put("a", {"uid": "a", "exp": clock.now + 3600})
+    cache.put("b", {"uid": "b", "exp": clock.now + 3600})
+    cache.put("c", {"uid": "c", "exp": clock.now + 3600})
+    assert cache.stats()["size"] == 2
+    assert cache.get("a") is None  # least recently used was evicted
+
+    clock.now += 11
+    assert cache.get("c") is None
+
+
+def test_cache_keys_are_digests_and_values_are_copies():
+    cache = VerifiedTokenCache()
+    cache.put("secret-token", _decoded())
+    assert "secret-token" not in cache._cache
+
+    cached = cache.get("secret-token")
+    cached["uid"] = "tampered"
+    assert cache.get("secret-token")["uid"] == "u1"
@@ -2,18 +2,102 @@
 Auth utilities for Firebase token verification and initialization.
 
 Centralizes dev bypass, Firebase Admin initialization, and token verification
-to avoid duplication across API modules.
+to avoid duplication across API modules. Verified tokens are cached until their
+`exp` claim so repeat calls with the same token skip signature verification.
 """
 
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
+import hashlib
 import os
 import json
+import threading
+import time
 import traceback
 
+from cachetools import TLRUCache
 import firebase_admin
 from firebase_admin import credentials, get_app
 
 
+class VerifiedTokenCache:
+    """Bounded, thread-safe cache of decoded Firebase ID tokens.
+
+    Entries are keyed by a SHA-256 digest of the raw token (the token itself is
+    never stored as a key) and expire at the token's `exp` claim or after
+    `max_ttl_seconds`, whichever comes first. Least recently used entries are
+    evicted once `max_entries` is reached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_ttl_seconds: float = 900,
+        timer: Callable[[], float] = time.time
+    ) -> None:
+        self._max_ttl_seconds = max_ttl_seconds
+        self._timer = timer
+        # Each value carries its own expiry; TLRUCache evicts on that deadline
+        self._cache = TLRUCache(
+            maxsize=max_entries,
+            ttu=lambda _key, value, _now: value[0],
+            timer=timer
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached decoded token, or None on a miss."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, token: str, decoded: Dict[str, Any]) -> None:
+        """Cache a verified token until its exp claim (bounded by max_ttl_seconds)."""
+        exp = decoded.get('exp')
+        if not isinstance(exp, (int, float)):
+            return
+        now = self._timer()
+        expires_at = min(float(exp), now + self._max_ttl_seconds)
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._cache[self._key(token)] = (expires_at, dict(decoded))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._cache)
+            }
+
+
+# Shared cache of verified tokens for this process
+verified_token_cache = VerifiedTokenCache(
+    max_entries=int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', '10000')),
+    max_ttl_seconds=float(os.getenv('TOKEN_CACHE_MAX_TTL_SECONDS', '900'))
+)
+
+
 def _initialize_firebase_from_env() -> Optional[firebase_admin.App]:
     """Initialize Firebase Admin SDK using FIREBASE_JSON when available.
 
@@ -52,7 +136,8 @@ def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
     """Verify a Firebase ID token and return the decoded token, or None on failure.
 
     Supports development bypass when NODE_ENV=development and token matches
-    the mock token used on the frontend.
+    the mock token used on the frontend. Successful verifications are served from
+    `verified_token_cache` until the token expires.
     """
     if not token:
         return None
@@ -65,6 +150,10 @@ def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
             'name': 'Dev User'
         }
 
+    cached = verified_token_cache.get(token)
+    if cached is not None:
+        return cached
+
     # Ensure Firebase Admin is initialized
     if not firebase_admin._apps:
         if not _initialize_firebase_from_env():
@@ -72,7 +161,9 @@ def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
 
     try:
         from firebase_admin import auth
-        return auth.verify_id_token(token)
+        decoded = auth.verify_id_token(token)
+        verified_token_cache.put(token, decoded)
+        return decoded
     except Exception as e:
         print(f"Auth utils: Token verification error: {e}")
         traceback.print_exc()
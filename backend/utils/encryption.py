@@ -1,10 +1,22 @@
 """
 Encryption utilities for secure token storage
 Provides encryption and decryption for sensitive Slack OAuth tokens
+
+Decrypted tokens are kept in a small in-process TTL cache keyed by a SHA-256
+digest of the ciphertext, so that hot paths (Slack event enrichment) do not
+base64-decode and Fernet-verify/decrypt the same token on every call. The
+plaintext is never used as a key. Call `invalidate_decrypted_token` when an
+integration is disconnected or replaced.
 """
 
 import os
 import base64
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from cachetools import TTLCache
 from cryptography.fernet import Fernet
 
 
@@ -66,8 +78,59 @@ class TokenEncryption:
             raise ValueError(f"Failed to decrypt token: {str(e)}")
 
 
+class DecryptedTokenCache:
+    """Bounded, thread-safe TTL cache of decrypted tokens keyed by ciphertext digest"""
+    
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 1024,
+                 timer: Callable[[], float] = time.monotonic):
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl_seconds, timer=timer)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def _key(encrypted_token: str) -> str:
+        return hashlib.sha256(encrypted_token.encode()).hexdigest()
+    
+    def get_or_decrypt(self, encrypted_token: str, decrypt: Callable[[str], str]) -> str:
+        """
+        Return the cached plaintext for a ciphertext, decrypting on a miss
+        
+        Args:
+            encrypted_token: Base64 encoded encrypted token
+            decrypt: Decrypts the token; its errors propagate and are not cached
+        """
+        key = self._key(encrypted_token)
+        with self._lock:
+            token = self._cache.get(key)
+            if token is not None:
+                self._counters['hits'] += 1
+                return token
+            self._counters['misses'] += 1
+        # Decrypt outside the lock; a concurrent miss just decrypts twice
+        token = decrypt(encrypted_token)
+        with self._lock:
+            self._cache[key] = token
+        return token
+    
+    def invalidate(self, encrypted_token: Optional[str] = None) -> None:
+        """Forget one ciphertext, or everything when encrypted_token is None"""
+        with self._lock:
+            if encrypted_token is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self._key(encrypted_token), None)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, 'size': len(self._cache)}
+
+
 # Global instance for easy access
 _encryption_instance = None
+decrypted_token_cache = DecryptedTokenCache(
+    ttl_seconds=float(os.getenv('DECRYPTED_TOKEN_CACHE_TTL_SECONDS', '300')),
+    max_entries=int(os.getenv('DECRYPTED_TOKEN_CACHE_SIZE', '1024'))
+)
 
 def get_encryption_instance() -> TokenEncryption:
     """Get global encryption instance"""
@@ -81,5 +144,11 @@ def encrypt_token(token: str) -> str:
     return get_encryption_instance().encrypt_token(token)
 
 def decrypt_token(encrypted_token: str) -> str:
-    """Convenience function to decrypt a token"""
-    return get_encryption_instance().decrypt_token(encrypted_token)
\ No newline at end of file
+    """Convenience function to decrypt a token (cached by ciphertext digest)"""
+    if not encrypted_token:
+        raise ValueError("Encrypted token cannot be empty")
+    return decrypted_token_cache.get_or_decrypt(encrypted_token, get_encryption_instance().decrypt_token)
+
+def invalidate_decrypted_token(encrypted_token: Optional[str] = None) -> None:
+    """Drop a token (or all tokens) from the decrypted token cache"""
+    decrypted_token_cache.invalidate(encrypted_token)
@@ -0,0 +1,165 @@
+"""
+Shared HTTP client for Google APIs (Calendar, OAuth token endpoint).
+
+Bare `requests.get`/`requests.post` calls opened a new TLS connection every
+time and had no timeout, so a stalled Google endpoint could hang a worker
+thread indefinitely. All Google calls go through one `requests.Session` with:
+
+- keep-alive connection pooling (one pool per host, shared across threads)
+- per-endpoint (connect, read) timeouts
+- bounded retries with full jitter on 429/5xx and connection errors, honouring
+  `Retry-After` when Google sends one
+- gzip responses (Google only compresses when the User-Agent contains "gzip")
+
+Callers keep handling status codes themselves; after the last retry the final
+response is returned as-is.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# (connect, read) seconds per logical endpoint
+ENDPOINT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    'calendar.events': (3.05, 15.0),
+    'calendar.watch': (3.05, 10.0),
+    'calendar.channels': (3.05, 10.0),
+    'oauth.token': (3.05, 10.0),
+}
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 10.0)
+
+# Partial responses: only the event fields the backend reads
+CALENDAR_EVENT_FIELDS = 'id,status,summary,start,end'
+CALENDAR_EVENTS_LIST_FIELDS = f'nextPageToken,items({CALENDAR_EVENT_FIELDS})'
+CALENDAR_CHANGES_LIST_FIELDS = f'nextPageToken,nextSyncToken,items({CALENDAR_EVENT_FIELDS})'
+
+
+class GoogleApiClient:
+    """Pooled, timeout-bounded HTTP client with jittered retries."""
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_cap: float = 4.0,
+        pool_maxsize: int = 20,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+        session: Optional[requests.Session] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[float, float], float] = random.uniform
+    ) -> None:
+        """
+        Args:
+            max_retries: Retries after the first attempt for retryable failures
+            backoff_base: First backoff ceiling in seconds (doubles per attempt)
+            backoff_cap: Longest single wait, including Retry-After
+            pool_maxsize: Keep-alive connections kept per host
+            timeouts: Overrides for ENDPOINT_TIMEOUTS
+            session: Session to use (tests pass a stub)
+            sleep: Sleep function (tests pass a recorder)
+            jitter: Random source for full-jitter backoff
+        """
+        self.max_retries = max(0, max_retries)
+        self._backoff_base = backoff_base
+        self._backoff_cap = backoff_cap
+        self._timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self._sleep = sleep
+        self._jitter = jitter
+        self._session = session or self._build_session(pool_maxsize)
+        self._lock = threading.Lock()
+        self._counters = {'requests': 0, 'retries': 0, 'errors': 0}
+
+    @staticmethod
+    def _build_session(pool_maxsize: int) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled in request() so they can use jitter and Retry-After
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'yourmum-backend (gzip)'
+        })
+        return session
+
+    def timeout_for(self, endpoint: str) -> Tuple[float, float]:
+        return self._timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self._backoff_cap, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form; fall back to jittered backoff
+        return self._jitter(0, min(self._backoff_cap, self._backoff_base * (2 ** attempt)))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def request(self, method: str, url: str, endpoint: str = 'default', **kwargs: Any) -> requests.Response:
+        """
+        Send a request, retrying 429/5xx responses and connection failures.
+
+        Args:
+            method: HTTP method
+            url: Full Google API URL
+            endpoint: Logical endpoint name used to pick timeouts
+            **kwargs: Passed to requests (params, headers, data, json, ...)
+
+        Returns:
+            The final response (possibly still a 429/5xx after the last retry)
+
+        Raises:
+            requests.RequestException: Network failure on the last attempt
+        """
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        attempt = 0
+        while True:
+            self._count('requests')
+            try:
+                response = self._session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    self._count('errors')
+                    raise
+                delay = self._backoff(attempt, None)
+                print(f"Google API {endpoint} {type(e).__name__}; retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                    if response.status_code in RETRYABLE_STATUSES:
+                        self._count('errors')
+                    return response
+                delay = self._backoff(attempt, response)
+                print(f"Google API {endpoint} returned {response.status_code}; retrying in {delay:.2f}s")
+            self._count('retries')
+            attempt += 1
+            self._sleep(delay)
+
+    def get(self, url: str, endpoint: str = 'default', **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, endpoint=endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str = 'default', **kwargs: Any) -> requests.Response:
+        return self.request('POST', url, endpoint=endpoint, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+# Shared singleton instance for application use
+google_http = GoogleApiClient(
+    max_retries=int(os.getenv('GOOGLE_HTTP_MAX_RETRIES', '2')),
+    pool_maxsize=int(os.getenv('GOOGLE_HTTP_POOL_SIZE', '20'))
+)
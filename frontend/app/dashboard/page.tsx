@@ -1289,7 +1289,7 @@ const Dashboard: React.FC = () => {
       try {
         if (!currentUser) return
         const token = await currentUser.getIdToken()
-        const apiBase = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+        const apiBase = process.env.NEXT_PUBLIC_SSE_URL || process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
         es = new EventSource(`${apiBase}/api/events/stream?token=${encodeURIComponent(token)}`)
 
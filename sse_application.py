@@ -0,0 +1,34 @@
+"""
+Entry point for the asyncio SSE server.
+
+Serves /api/events/stream from a single event loop so idle dashboards do not
+pin gunicorn threads. Run it next to the Flask API and point
+NEXT_PUBLIC_SSE_URL at it:
+
+    gunicorn -w 1 -k aiohttp.GunicornWebWorker -b 0.0.0.0:8001 sse_application:application
+
+Events are published by the API workers, so both services must share the
+cross-process event bus (EVENT_BUS_BACKEND=mongo, the default here).
+"""
+
+import os
+
+os.environ.setdefault('EVENT_BUS_BACKEND', 'mongo')
+
+from backend.apis.calendar_routes import initialize_firebase  # noqa: E402
+from backend.apis.sse_async import create_sse_app  # noqa: E402
+
+try:
+    initialize_firebase()
+    print("Firebase initialized successfully")
+except Exception as e:
+    print(f"Firebase initialization error: {str(e)}")
+
+application = create_sse_app()
+
+if __name__ == '__main__':
+    from aiohttp import web
+
+    port = int(os.getenv('PORT', 8001))
+    print(f"Starting SSE server on port {port}")
+    web.run_app(application, host="0.0.0.0", port=port)